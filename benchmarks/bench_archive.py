@@ -0,0 +1,115 @@
+#!/usr/bin/python3
+"""
+Benchmark of the indexed payload archive versus a linear scan of
+length-prefixed payloads.
+
+Run from the repository root: `python benchmarks/bench_archive.py`
+
+:copyright: Copyright 2021 by the Florian Münchbach.
+:license: BSD, see LICENSE for details.
+"""
+
+import argparse
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# pylint: disable=wrong-import-position
+from someip.tlv.converter import json_parser
+from someip.tlv.converter.decoder import compile_description
+from someip.transport.archive import ArchiveReader, ArchiveWriter
+
+DESCRIPTION = {
+    "type": "struct", "dataID": None, "wiretype": 6, "value": {
+        "counter":  {"type": "uint32", "dataID": 0, "value": 0},
+        "label":    {"type": "string", "dataID": 1, "value": "archive"},
+        "samples":  {"type": "array", "dataID": 2, "elementtype": "sint16",
+                     "value": list(range(0, 64))},
+        }}
+
+_PREFIX_STRUCT = struct.Struct('!qI')
+
+
+def _scan(path, index):
+    """
+    Reads the payload #`index` from a file of length-prefixed payloads.
+    """
+    with open(path, 'rb') as blob_file:
+        for _ in range(0, index):
+            _, length = _PREFIX_STRUCT.unpack(blob_file.read(_PREFIX_STRUCT.size))
+            blob_file.seek(length, os.SEEK_CUR)
+        _, length = _PREFIX_STRUCT.unpack(blob_file.read(_PREFIX_STRUCT.size))
+        return blob_file.read(length)
+
+
+def _scan_range(path, start, end):
+    """
+    Reads the payloads with timestamps in [start, end) from a file of
+    length-prefixed payloads.
+    """
+    payloads = []
+    with open(path, 'rb') as blob_file:
+        while True:
+            prefix = blob_file.read(_PREFIX_STRUCT.size)
+            if not prefix:
+                break
+            timestamp, length = _PREFIX_STRUCT.unpack(prefix)
+            if timestamp >= end:
+                break
+            if timestamp >= start:
+                payloads.append(blob_file.read(length))
+            else:
+                blob_file.seek(length, os.SEEK_CUR)
+    return payloads
+
+
+def _measure(name, function, count):
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    print(f'{name:44s} {elapsed * 1000:9.1f} ms ({elapsed / count * 1e6:8.1f} us per lookup)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--messages', type=int, default=100000)
+    parser.add_argument('--lookups', type=int, default=100)
+    args = parser.parse_args()
+
+    message = json_parser.loadd(DESCRIPTION)
+    codec = compile_description(DESCRIPTION)
+    indices = [random.randrange(0, args.messages) for _ in range(0, args.lookups)]
+    with tempfile.TemporaryDirectory() as directory:
+        archive_path = os.path.join(directory, 'trace.someip')
+        blob_path = os.path.join(directory, 'trace.blob')
+        with ArchiveWriter(archive_path) as writer, open(blob_path, 'wb') as blob_file:
+            for counter in range(0, args.messages):
+                message["counter"].value = counter
+                payload = bytes(message.serialization)
+                writer.append(payload, timestamp=counter * 1000, name=message.name)
+                blob_file.write(_PREFIX_STRUCT.pack(counter * 1000, len(payload)) + payload)
+        print(f'{args.messages} payloads of {len(payload)} bytes')
+
+        with ArchiveReader(archive_path) as reader:
+            _measure('random access (archive)',
+                    lambda: [codec.decode(reader[index].payload) for index in indices],
+                    args.lookups)
+            _measure('random access (linear scan)',
+                    lambda: [codec.decode(_scan(blob_path, index)) for index in indices],
+                    args.lookups)
+            ranges = [(index * 1000, index * 1000 + 100000) for index in indices]
+            _measure('time range of 100 payloads (archive)',
+                    lambda: [[record.payload for record in reader.range(start, end)]
+                            for start, end in ranges], args.lookups)
+            _measure('time range of 100 payloads (linear scan)',
+                    lambda: [_scan_range(blob_path, start, end) for start, end in ranges],
+                    args.lookups)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/python3
+"""
+Benchmark of `encode_many()` and `decode_many()` with worker processes versus
+in the calling process.
+
+Run from the repository root: `python benchmarks/bench_batch.py`
+
+:copyright: Copyright 2021 by the Florian Münchbach.
+:license: BSD, see LICENSE for details.
+"""
+
+import argparse
+import copy
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# pylint: disable=wrong-import-position
+from someip.tlv.converter.batch import decode_many, encode_many
+
+
+def _description(signals):
+    return {
+        "type": "struct", "dataID": None, "wiretype": 6, "value": {
+            "counter":  {"type": "uint32", "dataID": 0, "value": 0},
+            "signals":  {"type": "struct", "dataID": 1, "value": {
+                            f"s{i}": {"type": "float32", "dataID": i, "value": 0.5}
+                            for i in range(0, signals)}},
+            "label":    {"type": "string", "dataID": 2, "value": "batch"},
+            "samples":  {"type": "array", "dataID": 3, "elementtype": "sint16",
+                         "value": list(range(0, 64))},
+            }}
+
+
+def _counter(message):
+    return message["counter"].value
+
+
+def _measure(name, function, count):
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    print(f'{name:44s} {elapsed * 1000:9.1f} ms ({elapsed / count * 1e6:7.1f} us per message)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--messages', type=int, default=10000)
+    parser.add_argument('--signals', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    description = _description(args.signals)
+    descriptions = []
+    for counter in range(0, args.messages):
+        message = copy.deepcopy(description)
+        message['value']['counter']['value'] = counter
+        descriptions.append(message)
+    payloads = encode_many(descriptions, workers=1)
+    print(f'{args.workers} worker(s), {os.cpu_count()} CPU(s)')
+
+    for count in (100, 1000, args.messages):
+        print(f'{count} messages')
+        _measure('    encode_many (in process)',
+                lambda: encode_many(descriptions[:count], workers=1), count)
+        _measure('    encode_many (workers)',
+                lambda: encode_many(descriptions[:count], args.workers, min_parallel=0), count)
+        _measure('    decode_many (in process)',
+                lambda: decode_many(payloads[:count], description, workers=1), count)
+        _measure('    decode_many (workers)',
+                lambda: decode_many(payloads[:count], description, args.workers,
+                        min_parallel=0), count)
+        _measure('    decode_many (workers, function)',
+                lambda: decode_many(payloads[:count], description, args.workers,
+                        min_parallel=0, function=_counter), count)
+
+
+if __name__ == "__main__":
+    main()
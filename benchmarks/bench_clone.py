@@ -0,0 +1,62 @@
+#!/usr/bin/python3
+"""
+Benchmark of producing message variants by `clone()` versus `copy.deepcopy()`.
+
+Run from the repository root: `python benchmarks/bench_clone.py`
+
+:copyright: Copyright 2021 by the Florian Münchbach.
+:license: BSD, see LICENSE for details.
+"""
+
+import argparse
+import copy
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# pylint: disable=wrong-import-position
+from someip.tlv.converter import json_parser
+
+
+def _description(sensors):
+    return {
+        "type": "struct", "dataID": None, "wiretype": 7, "value": {
+            f"sensor{j}": {"type": "struct", "dataID": j, "wiretype": 6, "value": {
+                "id":       {"type": "uint16", "dataID": 0, "value": j},
+                "label":    {"type": "string", "dataID": 1, "value": f"sensor {j} " * 4},
+                "values":   {"type": "array", "dataID": 2, "elementtype": "float32",
+                             "value": [0.5] * 16},
+                }} for j in range(0, sensors)}}
+
+
+def _variant(message, clone, scenario):
+    variant = clone(message)
+    # Three fields differ between the scenarios
+    variant["sensor0"]["id"].value = scenario
+    variant["sensor1"]["label"].string = f"scenario {scenario}"
+    variant["sensor2"]["values"].items[0].value = float(scenario)
+    return variant
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scenarios', type=int, default=200)
+    parser.add_argument('--sensors', type=int, default=50)
+    args = parser.parse_args()
+
+    message = json_parser.loadd(_description(args.sensors))
+
+    for name, clone in (
+            ('copy.deepcopy', copy.deepcopy),
+            ('clone', lambda element: element.clone())):
+        start = time.perf_counter()
+        for scenario in range(0, args.scenarios):
+            _variant(message, clone, scenario).serialization_length
+        elapsed = (time.perf_counter() - start) / args.scenarios
+        print(f'{name:20s} {elapsed * 1000:8.3f} ms per variant')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/python3
+"""
+Benchmark of the structural diff against decoding and comparing both payloads.
+
+Run from the repository root: `python benchmarks/bench_diff.py`
+
+:copyright: Copyright 2021 by the Florian Münchbach.
+:license: BSD, see LICENSE for details.
+"""
+
+import argparse
+import copy
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# pylint: disable=wrong-import-position
+from someip.tlv.converter import json_parser
+from someip.tlv.converter.decoder import compile_description
+from someip.tlv.converter.diff import diff
+
+RECORD = {
+    "type": "struct", "dataID": None, "wiretype": 5, "value": {
+        "id":       {"type": "uint32", "dataID": 1, "value": 0},
+        "position": {"type": "array", "dataID": 2, "wiretype": 5, "elementtype": "float32",
+                     "value": [1.0, 2.0, 3.0]},
+        "label":    {"type": "string", "dataID": 3, "wiretype": 5, "value": "record"},
+    }}
+
+DESCRIPTION = {
+    "type": "struct", "dataID": None, "wiretype": 7, "value": {
+        "header":   {"type": "uint64", "dataID": 1, "value": 0},
+        "records":  {"type": "array", "dataID": 2, "wiretype": 7,
+                     "value": [RECORD] * 1000},
+    }}
+
+
+def _measure(name, function, repeat):
+    start = time.perf_counter()
+    for _unused in range(0, repeat):
+        function()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f'{name:40s} {elapsed * 1000:8.3f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    codec = compile_description(DESCRIPTION)
+    expected = bytes(json_parser.loadd(DESCRIPTION).serialization)
+    modified = copy.deepcopy(DESCRIPTION)
+    modified['value']['records']['value'][500] = copy.deepcopy(RECORD)
+    modified['value']['records']['value'][500]['value']['id']['value'] = 1
+    actual = bytes(json_parser.loadd(modified).serialization)
+
+    print(f'{len(expected)} byte payloads, {len(diff(codec, expected, actual))} difference(s)')
+    _measure('diff (equal)', lambda: diff(codec, expected, bytearray(expected)), args.repeat)
+    _measure('diff (one member differs)', lambda: diff(codec, expected, actual), args.repeat)
+    _measure('decode both + print_details compare',
+            lambda: codec.decode(expected).print_details() == codec.decode(actual).print_details(),
+            args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/python3
+"""
+Benchmark of E2E protection and checking of serialized payloads and of the
+CRC calculation.
+
+Run from the repository root: `python benchmarks/bench_e2e.py`
+
+:copyright: Copyright 2021 by the Florian Münchbach.
+:license: BSD, see LICENSE for details.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# pylint: disable=wrong-import-position
+from someip.transport import crc
+from someip.transport.e2e import Profile1, Profile4, Profile5
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=10000)
+    parser.add_argument('--size', type=int, default=256)
+    parser.add_argument('--crc-size', type=int, default=4096)
+    args = parser.parse_args()
+
+    for name, sender, receiver in (
+            ('profile 1 (CRC-8)', Profile1(0x0123), Profile1(0x0123)),
+            ('profile 4 (CRC-32/AUTOSAR)', Profile4(0x01234567), Profile4(0x01234567)),
+            ('profile 5 (CRC-16/CCITT)', Profile5(0x0123), Profile5(0x0123))):
+        buffer = bytearray(range(0, 256)) * (args.size // 256 + 1)
+        del buffer[args.size:]
+        sender.protect(buffer)
+
+        start = time.perf_counter()
+        for _unused in range(0, args.repeat):
+            sender.protect(buffer)
+        protect = (time.perf_counter() - start) / args.repeat
+
+        start = time.perf_counter()
+        for _unused in range(0, args.repeat):
+            receiver.check(buffer)
+        check = (time.perf_counter() - start) / args.repeat
+
+        print(f'{name:28s} {args.size} bytes: protect {protect * 1e6:8.2f} us,'\
+                f' check {check * 1e6:8.2f} us')
+
+    data = bytes(range(0, 256)) * (args.crc_size // 256 + 1)
+    data = data[:args.crc_size]
+    for algorithm in (crc.CRC8_SAE_J1850, crc.CRC8_H2F, crc.CRC16_CCITT_FALSE, crc.CRC32,
+            crc.CRC32_P4):
+        # Builds the tables
+        algorithm(data)
+        start = time.perf_counter()
+        for _unused in range(0, args.repeat // 10):
+            algorithm(data)
+        elapsed = (time.perf_counter() - start) / (args.repeat // 10)
+        print(f'{algorithm.name:28s} {args.crc_size} bytes: {elapsed * 1e6:8.2f} us'\
+                f' ({elapsed * 1e6 * 1024 / args.crc_size:6.2f} us per KB)')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/python3
+"""
+Benchmark of the mutation fuzzer compared to building variants using overrides.
+
+Run from the repository root: `python benchmarks/bench_fuzzer.py`
+
+:copyright: Copyright 2021 by the Florian Münchbach.
+:license: BSD, see LICENSE for details.
+"""
+
+import argparse
+import copy
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# pylint: disable=wrong-import-position
+from someip.tlv.converter import json_parser
+from someip.tlv.fuzzer import Fuzzer
+
+DESCRIPTION = {
+    "type": "struct", "dataID": None, "wiretype": 6, "value": {
+        **{f"signal_{index}": {"type": "uint32", "dataID": index, "value": index}
+            for index in range(0, 10)},
+        "label":    {"type": "string", "dataID": 10, "wiretype": 5, "value": "status"},
+        "samples":  {"type": "array", "dataID": 11, "wiretype": 6, "elementtype": "uint16",
+                     "value": list(range(0, 20))},
+    }}
+
+
+def _measure(name, function, repeat):
+    start = time.perf_counter()
+    for _unused in range(0, repeat):
+        function()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f'{name:40s} {elapsed * 1e6:8.2f} us {1 / elapsed:12.0f} variants/s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=100000)
+    args = parser.parse_args()
+
+    message = json_parser.loadd(DESCRIPTION)
+    variants = Fuzzer(message, seed=0).variants()
+    print(f'{message.serialization_length} byte seed message')
+    _measure('fuzzer', lambda: next(variants), args.repeat)
+
+    def _override():
+        description = copy.deepcopy(DESCRIPTION)
+        description['value']['label']['length'] = 0xFF
+        return json_parser.loadd(description).serialization
+    _measure('rebuild with length override', _override, args.repeat // 100)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/python3
+"""
+Benchmark of the import time of the library and the start-up of the CLI.
+
+Each target is run in a fresh interpreter, the time of a bare interpreter
+start-up is shown for reference.
+
+Run from the repository root: `python benchmarks/bench_import.py`
+
+:copyright: Copyright 2021 by the Florian Münchbach.
+:license: BSD, see LICENSE for details.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+TARGETS = [
+    ('python (bare interpreter)', ['-c', 'pass']),
+    ('import someip', ['-c', 'import someip']),
+    ('import someip.tlv.datatypes', ['-c', 'import someip.tlv.datatypes']),
+    ('import json_parser', ['-c', 'from someip.tlv.converter import json_parser']),
+    ('import decoder', ['-c', 'from someip.tlv.converter import decoder']),
+    ('CLI (serialize one file)', None),
+]
+
+DESCRIPTION = '{"type": "struct", "dataID": null, "wiretype": 5, "value": {'\
+        '"a": {"type": "uint8", "dataID": 1, "value": 1}}}'
+
+
+def _measure(name, command, repeat):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    durations = []
+    for _unused in range(0, repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + command, env=env, check=True,
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        durations.append(time.perf_counter() - start)
+    print(f'{name:40s} {statistics.median(durations) * 1000:8.3f} ms'\
+            f' (min {min(durations) * 1000:.3f} ms)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        description = os.path.join(directory, 'message.json')
+        with open(description, 'w') as description_file:
+            description_file.write(DESCRIPTION)
+
+        for name, command in TARGETS:
+            if command is None:
+                command = ['-m', 'someip.tools.someip_tlv_serializer', description]
+            _measure(name, command, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
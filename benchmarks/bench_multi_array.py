@@ -0,0 +1,69 @@
+#!/usr/bin/python3
+"""
+Benchmark of multi-dimensional arrays against arrays of arrays of objects.
+
+Run from the repository root: `python benchmarks/bench_multi_array.py`
+
+:copyright: Copyright 2021 by the Florian Münchbach.
+:license: BSD, see LICENSE for details.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# pylint: disable=wrong-import-position
+from someip.tlv.converter.decoder import compile_description
+from someip.tlv.datatypes.basic import Uint16
+from someip.tlv.datatypes.complex import Array, MultiArray
+from someip.tlv.datatypes.consts import Types
+
+
+def _measure(name, function, repeat):
+    start = time.perf_counter()
+    for _unused in range(0, repeat):
+        function()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f'{name:40s} {elapsed * 1000:8.3f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--rows', type=int, default=256)
+    parser.add_argument('--columns', type=int, default=256)
+    args = parser.parse_args()
+
+    values = [[(row * args.columns + column) % 0x10000 for column in range(0, args.columns)]
+            for row in range(0, args.rows)]
+    flat = [value for row in values for value in row]
+    description = {"type": "array", "dataID": 1, "wiretype": 7, "elementtype": "uint16",
+            "shape": [args.rows, args.columns], "value": []}
+    nested_description = {"type": "array", "dataID": 1, "wiretype": 7, "value": [
+            {"type": "array", "dataID": None, "lengthfield_len": 4, "elementtype": "uint16",
+             "value": []}]}
+
+    def nested():
+        return Array([Array([Uint16(value, None) for value in row], None, None,
+                lengthfield_len=4) for row in values], 1, 7)
+
+    payload = bytes(nested().serialization)
+    codec = compile_description(description)
+    nested_codec = compile_description(nested_description)
+    assert bytes(codec.decode(payload).serialization) == payload
+
+    print(f'{args.rows}x{args.columns} uint16 grid, {len(payload)} byte payload')
+    _measure('encode Array of Arrays', lambda: nested().serialization, args.repeat)
+    _measure('encode MultiArray',
+            lambda: MultiArray(flat, 1, 7, elementtype=Types.UINT16,
+                shape=(args.rows, args.columns)).serialization,
+            args.repeat)
+    _measure('decode Array of Arrays', lambda: nested_codec.decode(payload), args.repeat)
+    _measure('decode MultiArray', lambda: codec.decode(payload), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/python3
+"""
+Benchmark of the NumPy array interoperability against per-item objects.
+
+Run from the repository root: `python benchmarks/bench_numpy.py` (needs NumPy)
+
+:copyright: Copyright 2021 by the Florian Münchbach.
+:license: BSD, see LICENSE for details.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# pylint: disable=wrong-import-position
+from someip.tlv.converter.decoder import compile_description
+from someip.tlv.datatypes.basic import Uint16
+from someip.tlv.datatypes.complex import Array, Struct
+
+DESCRIPTION = {
+    "type": "struct", "dataID": None, "wiretype": 7, "value": {
+        "samples":  {"type": "array", "dataID": 1, "wiretype": 7,
+                     "elementtype": "uint16", "value": []},
+    }}
+
+
+def _measure(name, function, repeat):
+    start = time.perf_counter()
+    for _unused in range(0, repeat):
+        function()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f'{name:40s} {elapsed * 1000:8.3f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--items', type=int, default=100000)
+    args = parser.parse_args()
+
+    values = (numpy.arange(0, args.items) % 0x10000).astype(numpy.uint16)
+    payload = bytes(Struct([Array.from_numpy(values, 1, 7)], None, 7).serialization)
+    codec = compile_description(DESCRIPTION)
+    numpy_codec = compile_description(DESCRIPTION, numpy=True)
+
+    print(f'{args.items} uint16 items, {len(payload)} byte payload')
+    _measure('encode via Uint16 objects',
+            lambda: Array([Uint16(value, None) for value in values.tolist()], 1, 7).serialization,
+            args.repeat)
+    _measure('encode Array.from_numpy',
+            lambda: Array.from_numpy(values, 1, 7).serialization, args.repeat)
+    _measure('decode + values via Uint16 objects',
+            lambda: numpy.array([item.value
+                for item in codec.decode(payload).get('samples').items], dtype=numpy.uint16),
+            args.repeat)
+    _measure('decode numpy=True + to_numpy',
+            lambda: numpy_codec.decode(payload).get('samples').to_numpy(), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/python3
+"""
+Benchmark of the compact pickling of data type trees versus pickling them
+attribute by attribute (the default without `__reduce__()`).
+
+Run from the repository root: `python benchmarks/bench_pickle.py`
+
+:copyright: Copyright 2021 by the Florian Münchbach.
+:license: BSD, see LICENSE for details.
+"""
+
+import argparse
+import io
+import os
+import pickle
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# pylint: disable=wrong-import-position
+from someip.tlv.datatypes._someip_data_type import _SomeIPDataType
+from someip.tlv.datatypes.basic import Float32, Uint8, Uint16, Uint32
+from someip.tlv.datatypes.complex import Array, String, Struct
+
+
+def _restore_attributes(cls, state):
+    element = cls.__new__(cls)
+    element.__dict__.update(state)
+    if hasattr(element, '_select_codec'):
+        element._codec = element._select_codec()
+    return element
+
+
+class _AttributePickler(pickle.Pickler):
+    """
+    Pickles data types attribute by attribute, like the default pickling.
+    """
+    def reducer_override(self, obj):
+        if isinstance(obj, _SomeIPDataType):
+            state = dict(obj.__dict__)
+            # Precompiled codecs can not be pickled
+            state.pop('_codec', None)
+            return (_restore_attributes, (type(obj), state))
+        return NotImplemented
+
+
+def _attribute_dumps(element):
+    stream = io.BytesIO()
+    _AttributePickler(stream, pickle.HIGHEST_PROTOCOL).dump(element)
+    return stream.getvalue()
+
+
+def _scenarios(items):
+    return {
+        'array of uint16': Array([Uint16(i % 0x10000, None) for i in range(0, items)], 1, 7),
+        'string': String('sample text ' * (items // 12), 1, None),
+        'array of structs': Array([Struct([
+                Uint32(i, 1), Float32(0.5, 2), Uint8(1, 3), Uint16(2, 4)], None, 5)
+                for i in range(0, items // 10)], 1, 7),
+        }
+
+
+def _measure(function, repeat):
+    start = time.perf_counter()
+    for _ in range(0, repeat):
+        result = function()
+    return result, (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--items', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    for scenario, element in _scenarios(args.items).items():
+        print(f'{scenario} ({element.serialization_length} bytes serialized)')
+        for name, dumps in (
+                ('attribute-wise', _attribute_dumps),
+                ('compact', lambda element: pickle.dumps(element, pickle.HIGHEST_PROTOCOL))):
+            data, dump_time = _measure(lambda: dumps(element), args.repeat)
+            loaded, load_time = _measure(lambda: pickle.loads(data), args.repeat)
+            assert loaded.serialization == element.serialization
+            print(f'    {name:16s} {len(data):10d} bytes  dumps {dump_time * 1000:8.2f} ms'\
+                    f'  loads {load_time * 1000:8.2f} ms')
+
+
+if __name__ == "__main__":
+    main()
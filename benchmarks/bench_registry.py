@@ -0,0 +1,70 @@
+#!/usr/bin/python3
+"""
+Benchmark of the schema registry dispatch with many registered shapes.
+
+Run from the repository root: `python benchmarks/bench_registry.py`
+
+:copyright: Copyright 2021 by the Florian Münchbach.
+:license: BSD, see LICENSE for details.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# pylint: disable=wrong-import-position
+from someip.tlv.converter import json_parser
+from someip.tlv.converter.registry import SchemaRegistry
+
+DESCRIPTION = {
+    "type": "struct", "dataID": None, "wiretype": 5, "value": {
+        "id":       {"type": "uint32", "dataID": 1, "value": 0},
+        "position": {"type": "array", "dataID": 2, "wiretype": 5, "elementtype": "float32",
+                     "value": [1.0, 2.0, 3.0]},
+        "label":    {"type": "string", "dataID": 3, "wiretype": 5, "value": "record"},
+    }}
+
+
+def _measure(name, function, repeat):
+    start = time.perf_counter()
+    for _unused in range(0, repeat):
+        function()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f'{name:40s} {elapsed * 1e6:8.3f} us')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=20000)
+    parser.add_argument('--shapes', type=int, default=400)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for index in range(0, args.shapes):
+            with open(os.path.join(directory, f'{index}.json'), 'w') as description_file:
+                json.dump({"serviceID": 0x1000 + index // 20, "methodID": 0x8000 + index % 20,
+                        "messageType": "NOTIFICATION", "payload": DESCRIPTION},
+                        description_file)
+
+        start = time.perf_counter()
+        registry = SchemaRegistry(directory)
+        print(f'{len(registry)} shapes loaded in {(time.perf_counter() - start) * 1000:.1f} ms,'\
+                f' {sum(registry.memory_usage().values()) // 1024} KiB')
+        start = time.perf_counter()
+        registry.reload()
+        print(f'reload (unchanged) in {(time.perf_counter() - start) * 1000:.1f} ms')
+
+        payload = bytes(json_parser.loadd(DESCRIPTION).serialization)
+        service_id, method_id = 0x1000 + args.shapes // 40, 0x8005
+        _measure('shape lookup', lambda: registry.shape(service_id, method_id, 2), args.repeat)
+        _measure('lookup + decode',
+                lambda: registry.decode(service_id, method_id, 2, payload), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
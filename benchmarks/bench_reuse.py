@@ -0,0 +1,70 @@
+#!/usr/bin/python3
+"""
+Benchmark of refilling one message tree per cycle (`assign()`,
+`decode_into()`) versus building a new tree per cycle.
+
+Run from the repository root: `python benchmarks/bench_reuse.py`
+
+:copyright: Copyright 2021 by the Florian Münchbach.
+:license: BSD, see LICENSE for details.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# pylint: disable=wrong-import-position
+from someip.tlv.converter import json_parser
+from someip.tlv.converter.decoder import compile_description
+
+
+def _description(signals):
+    return {
+        "type": "struct", "dataID": None, "wiretype": 6, "value": {
+            "counter":  {"type": "uint32", "dataID": 0, "value": 0},
+            "signals":  {"type": "struct", "dataID": 1, "value": {
+                            f"s{i}": {"type": "float32", "dataID": i, "value": 0.0}
+                            for i in range(0, signals)}},
+            "samples":  {"type": "array", "dataID": 2, "elementtype": "sint16",
+                         "value": [0] * 32},
+            }}
+
+
+def _measure(name, function, cycles):
+    start = time.perf_counter()
+    for cycle in range(0, cycles):
+        function(cycle)
+    elapsed = (time.perf_counter() - start) / cycles
+    print(f'{name:30s} {elapsed * 1e6:9.1f} us per cycle')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--cycles', type=int, default=2000)
+    parser.add_argument('--signals', type=int, default=40)
+    args = parser.parse_args()
+
+    description = _description(args.signals)
+    codec = compile_description(description)
+    message = json_parser.loadd(description)
+    payload = bytes(message.serialization)
+
+    def build(cycle):
+        description['value']['counter']['value'] = cycle
+        return json_parser.loadd(description).serialization
+
+    def assign(cycle):
+        message.assign({"counter": cycle, "samples": [cycle % 100] * 32})
+        return message.serialization
+
+    _measure('loadd per cycle', build, args.cycles)
+    _measure('assign', assign, args.cycles)
+    _measure('decode per cycle', lambda cycle: codec.decode(payload), args.cycles)
+    _measure('decode_into', lambda cycle: codec.decode_into(message, payload), args.cycles)
+
+
+if __name__ == "__main__":
+    main()
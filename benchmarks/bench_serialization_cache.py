@@ -0,0 +1,59 @@
+#!/usr/bin/python3
+"""
+Benchmark of the content-addressed serialization cache on a message with
+repeated sub-structs.
+
+Run from the repository root: `python benchmarks/bench_serialization_cache.py`
+
+:copyright: Copyright 2021 by the Florian Münchbach.
+:license: BSD, see LICENSE for details.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# pylint: disable=wrong-import-position
+from someip.tlv.converter import json_parser
+from someip.tlv.datatypes import SerializationCache
+
+
+def _description(sensors, calibration_values):
+    calibration = {
+        "type": "struct", "dataID": 1, "wiretype": 6, "value": {
+            f"c{i}": {"type": "float32", "dataID": i, "value": i * 0.5}
+            for i in range(0, calibration_values)}}
+    return {
+        "type": "struct", "dataID": None, "wiretype": 7, "value": {
+            f"sensor{j}": {"type": "struct", "dataID": j, "wiretype": 6, "value": {
+                "id": {"type": "uint8", "dataID": 0, "value": j},
+                "calibration": calibration,
+                }} for j in range(0, sensors)}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=100)
+    parser.add_argument('--sensors', type=int, default=50)
+    parser.add_argument('--calibration-values', type=int, default=40)
+    args = parser.parse_args()
+
+    message = json_parser.loadd(_description(args.sensors, args.calibration_values))
+    cache = SerializationCache()
+
+    for name, function in (
+            ('serialization', lambda: message.serialization),
+            ('SerializationCache.serialize', lambda: cache.serialize(message))):
+        start = time.perf_counter()
+        for _unused in range(0, args.repeat):
+            function()
+        elapsed = (time.perf_counter() - start) / args.repeat
+        print(f'{name:30s} {elapsed * 1000:8.3f} ms')
+    print(f'cache: {len(cache)} entries, {cache.size} bytes, hit rate {cache.hit_rate:.2%}')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/python3
+"""
+Throughput benchmark of the asyncio SOME/IP stream codec against a localhost
+echo server.
+
+Run from the repository root: `python benchmarks/bench_stream.py`
+
+:copyright: Copyright 2021 by the Florian Münchbach.
+:license: BSD, see LICENSE for details.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# pylint: disable=wrong-import-position
+from someip.tlv.converter import json_parser
+from someip.transport.stream import open_connection
+from tests.helpers import run_coroutine, run_echo_server
+
+SERVICE_ID = 0x1234
+METHOD_ID = 0x0001
+
+DESCRIPTION = {
+    "type": "struct",
+    "dataID": None,
+    "wiretype": 6,
+    "value": {
+        "counter": {"type": "uint32", "dataID": 1, "value": 1},
+        "samples": {"type": "array", "dataID": 2, "wiretype": 6,
+                    "value": list(range(0, 64)), "elementtype": "uint16"},
+        "name": {"type": "string", "dataID": 3, "value": "benchmark", "wiretype": 5},
+    }
+}
+
+
+async def _run(address, requests, in_flight, decode):
+    payload = json_parser.loadd(DESCRIPTION)
+    async with await open_connection(*address) as stream:
+        if decode:
+            stream.register(SERVICE_ID, METHOD_ID, DESCRIPTION)
+
+        async def _worker(count):
+            for _unused in range(0, count):
+                response = await stream.request(SERVICE_ID, METHOD_ID, payload)
+                if decode:
+                    _unused_element = response.element
+
+        start = time.perf_counter()
+        await asyncio.gather(*[_worker(requests // in_flight) for _unused in range(0, in_flight)])
+        return time.perf_counter() - start, len(payload.serialization)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--in-flight', type=int, default=64)
+    args = parser.parse_args()
+
+    with run_echo_server() as address:
+        for decode in (False, True):
+            elapsed, payload_len = run_coroutine(
+                    _run(address, args.requests, args.in_flight, decode))
+            requests = args.requests // args.in_flight * args.in_flight
+            print(f'stream request/response ({payload_len} byte payload,'\
+                    f' {args.in_flight} in flight, decode={decode}):'\
+                    f' {requests / elapsed:10.0f} req/s')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/python3
+"""
+Benchmark of SOME/IP-TP segmentation and reassembly of 1 MB payloads.
+
+Run from the repository root: `python benchmarks/bench_tp.py`
+
+:copyright: Copyright 2021 by the Florian Münchbach.
+:license: BSD, see LICENSE for details.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# pylint: disable=wrong-import-position
+from someip.tlv.converter import json_parser
+from someip.transport.header import Header, MessageType
+from someip.transport.tp import segment, TpReassembler
+
+HEADER = Header(0x1234, 0x8001, message_type=MessageType.NOTIFICATION)
+
+DESCRIPTION = {
+    "type": "array",
+    "dataID": None,
+    "wiretype": 7,
+    "elementtype": "uint32",
+    "value": list(range(0, 256 * 1024)),
+}
+
+
+def _measure(name, function, repeat, size):
+    start = time.perf_counter()
+    for _unused in range(0, repeat):
+        function()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f'{name:40s} {elapsed * 1000:8.2f} ms {size / elapsed / 2**20:10.1f} MiB/s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    message = json_parser.loadd(DESCRIPTION)
+    size = message.serialization_length
+    serialized = bytes(message.serialization)
+    datagrams = [bytes(header) + bytes(data) for header, data in segment(HEADER, serialized)]
+    shuffled = list(datagrams)
+    random.Random(0).shuffle(shuffled)
+
+    print(f'{size} byte payload, {len(datagrams)} segments')
+    _measure('segment (data type payload)', lambda: segment(HEADER, message), args.repeat, size)
+    _measure('segment (serialized payload)', lambda: segment(HEADER, serialized), args.repeat, size)
+    for name, order in (('reassemble (in order)', datagrams), ('reassemble (shuffled)', shuffled)):
+        def _reassemble(order=order):
+            reassembler = TpReassembler()
+            for datagram in order:
+                reassembler.feed(datagram)
+        _measure(name, _reassemble, args.repeat, size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/python3
+"""
+Benchmark of validating payloads against a description compared to decoding.
+
+Run from the repository root: `python benchmarks/bench_validator.py`
+
+:copyright: Copyright 2021 by the Florian Münchbach.
+:license: BSD, see LICENSE for details.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# pylint: disable=wrong-import-position
+from someip.tlv.converter import json_parser
+from someip.tlv.converter.decoder import compile_description
+from someip.tlv.converter.validator import validate
+
+DESCRIPTION = {
+    "type": "struct", "dataID": None, "wiretype": 6, "value": {
+        **{f"signal_{index}": {"type": "uint32", "dataID": index, "value": index}
+            for index in range(0, 10)},
+        "status":   {"type": "boolean", "dataID": 10, "value": True},
+        "label":    {"type": "string", "dataID": 11, "wiretype": 5, "value": "status"},
+        "samples":  {"type": "array", "dataID": 12, "wiretype": 6, "elementtype": "uint16",
+                     "value": list(range(0, 20))},
+    }}
+
+
+def _measure(name, function, repeat):
+    start = time.perf_counter()
+    for _unused in range(0, repeat):
+        function()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f'{name:40s} {elapsed * 1e6:8.2f} us {1 / elapsed:12.0f} msgs/s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=100000)
+    args = parser.parse_args()
+
+    codec = compile_description(DESCRIPTION)
+    payload = bytes(json_parser.loadd(DESCRIPTION).serialization)
+    malformed = bytearray(payload)
+    malformed[-2:] = b'\xFF\xFF'
+    malformed = bytes(malformed[:-1])
+
+    print(f'{len(payload)} byte payload')
+    _measure('validate (valid)', lambda: validate(codec, payload), args.repeat)
+    _measure('validate (malformed)', lambda: validate(codec, malformed), args.repeat)
+    _measure('validate (malformed, max_violations=1)',
+            lambda: validate(codec, malformed, max_violations=1), args.repeat)
+    _measure('decode', lambda: codec.decode(payload), args.repeat // 10)
+
+
+if __name__ == "__main__":
+    main()
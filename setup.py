@@ -17,6 +17,9 @@ setuptools.setup(
     install_requires=[
         # Currently not used:        'backports.cached_property; python_version < '3.8'',
     ],
+    extras_require={
+        'numpy': ['numpy'],
+    },
     classifiers=[
         'Programming Language :: Python :: 3',
         'License :: OSI Approved :: BSD License',
@@ -1,3 +1,8 @@
+from ._lazy import lazy_loader
+
 __all__ = [
         'tlv',
+        'transport',
         ]
+
+__getattr__, __dir__ = lazy_loader(__name__, submodules=__all__)
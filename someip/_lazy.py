@@ -0,0 +1,47 @@
+"""
+Lazy loading of package members.
+
+:copyright: Copyright 2021 by the Florian Münchbach.
+:license: BSD, see LICENSE for details.
+"""
+
+import sys
+
+
+def lazy_loader(package, submodules=(), attributes=None):
+    """
+    Returns module level `__getattr__()` and `__dir__()` functions (PEP 562)
+    importing the `submodules` and the `attributes` (a `dict` mapping names
+    to the submodule defining them) of `package` on first access.
+
+    Python 3.6 does not call module level `__getattr__()`: the submodules
+    and attributes are imported right away.
+    """
+    attributes = attributes or {}
+    namespace = sys.modules[package].__dict__
+
+    def _import(submodule):
+        name = f'{package}.{submodule}'
+        __import__(name)
+        return sys.modules[name]
+
+    if sys.version_info < (3, 7):
+        for submodule in submodules:
+            namespace[submodule] = _import(submodule)
+        for name, submodule in attributes.items():
+            namespace[name] = getattr(_import(submodule), name)
+
+    def __getattr__(name):
+        if name in attributes:
+            value = getattr(_import(attributes[name]), name)
+        elif name in submodules:
+            value = _import(name)
+        else:
+            raise AttributeError(f'module {package!r} has no attribute {name!r}')
+        namespace[name] = value
+        return value
+
+    def __dir__():
+        return sorted(set(namespace) | set(submodules) | set(attributes))
+
+    return __getattr__, __dir__
@@ -1,4 +1,9 @@
+from .._lazy import lazy_loader
+
 __all__ = [
         'datatypes',
         'converter',
+        'fuzzer',
         ]
+
+__getattr__, __dir__ = lazy_loader(__name__, submodules=__all__)
@@ -2,6 +2,12 @@
 SOME/IP payload serializer
 """
 
+from ..._lazy import lazy_loader
+
 __all__ = [
         'json_parser'
         ]
+
+__getattr__, __dir__ = lazy_loader(__name__,
+        submodules=('json_parser', 'batch', 'decoder', 'diff', 'push_decoder', 'registry',
+            'validator'))
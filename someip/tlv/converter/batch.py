@@ -0,0 +1,156 @@
+"""
+Encoding and decoding of many payloads at once over a process pool.
+
+Serialization and decoding are pure Python and bound to one core by the GIL.
+For batch jobs, `encode_many()` and `decode_many()` split the messages into
+chunks that are processed by worker processes:
+
+    payloads = encode_many(messages, workers=8)
+    messages = decode_many(payloads, description, workers=8)
+
+Descriptions are loaded and serialized by the workers. Data type trees are
+serialized in the calling process meanwhile: handing them over would pickle
+them, which already includes serializing them (see
+`_SomeIPDataType.__reduce__()`). The decoding workers compile the description
+once and return the decoded trees in their compact pickled form, or just the
+results of a `function` applied to them. The results keep the order of the
+inputs. Small batches, for which starting the pool would take longer than the
+work itself, are processed in the calling process.
+
+:copyright: Copyright 2021 by the Florian Münchbach.
+:license: BSD, see LICENSE for details.
+"""
+
+import itertools
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from . import json_parser
+from .decoder import compile_description
+
+# Batches with fewer messages are processed in the calling process
+DEFAULT_MIN_PARALLEL=2000
+# Chunks per worker, more chunks balance differing message sizes better
+_CHUNKS_PER_WORKER=4
+
+# Batch and codec of the decoding worker process, see _decode_chunk()
+_worker_batch = None
+_worker_codec = None
+# Identifies the batches of decode_many()
+_batches = itertools.count()
+
+
+def _serialize(message):
+    if isinstance(message, dict):
+        message = json_parser.loadd(message)
+    return bytes(message.serialization)
+
+
+def _encode_chunk(messages):
+    return [_serialize(message) for message in messages]
+
+
+def _decode_chunk(batch, decoder, buffers, function=None):
+    # The description is compiled by the first chunk of each batch a worker
+    # gets (ProcessPoolExecutor has no initializer before Python 3.7)
+    global _worker_batch, _worker_codec # pylint: disable=global-statement
+    if batch != _worker_batch:
+        _worker_codec = compile_description(*decoder)
+        _worker_batch = batch
+    if function is None:
+        return [_worker_codec.decode(buffer) for buffer in buffers]
+    return [function(_worker_codec.decode(buffer)) for buffer in buffers]
+
+
+def _workers(workers):
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError(f'The number of workers must be at least 1, got {workers}')
+    return workers
+
+
+def _chunks(items, workers, chunk_size):
+    if chunk_size is None:
+        chunk_size = max(1, math.ceil(len(items) / (workers * _CHUNKS_PER_WORKER)))
+    if chunk_size < 1:
+        raise ValueError(f'The chunk size must be at least 1, got {chunk_size}')
+    return [items[start:start + chunk_size] for start in range(0, len(items), chunk_size)]
+
+
+def encode_many(messages, workers=None, chunk_size=None, min_parallel=DEFAULT_MIN_PARALLEL):
+    """
+    Serializes many messages, each given as description (`dict`, see
+    `json_parser.loadd()`) or data type object.
+
+    Args:
+        - workers       number of worker processes, default: number of CPUs
+        - chunk_size    descriptions per chunk handed to a worker, by default
+                        they are split into four chunks per worker
+        - min_parallel  batches with fewer descriptions (or a single worker)
+                        are serialized in the calling process
+
+    Data type objects are always serialized in the calling process.
+
+    Return:
+        The serializations (`bytes`) in the order of `messages`.
+    """
+    messages = list(messages)
+    workers = _workers(workers)
+    positions = [position for position, message in enumerate(messages)
+            if isinstance(message, dict)]
+    if workers == 1 or len(positions) < min_parallel:
+        return _encode_chunk(messages)
+
+    results = [None] * len(messages)
+    with ProcessPoolExecutor(workers) as executor:
+        chunks = _chunks(positions, workers, chunk_size)
+        futures = [executor.submit(_encode_chunk, [messages[position] for position in chunk])
+                for chunk in chunks]
+        for position, message in enumerate(messages):
+            if not isinstance(message, dict):
+                results[position] = _serialize(message)
+        for chunk, future in zip(chunks, futures):
+            for position, result in zip(chunk, future.result()):
+                results[position] = result
+    return results
+
+
+def decode_many(buffers, description, workers=None, chunk_size=None,
+        min_parallel=DEFAULT_MIN_PARALLEL, function=None, name="Message Payload",
+        numpy=False):
+    """
+    Decodes many payloads of the same `description` (a `dict`, see
+    `compile_description()` for `name` and `numpy`).
+
+    The arguments `workers`, `chunk_size` and `min_parallel` are the ones of
+    `encode_many()` for the payloads. If `function` is given, it is applied
+    to each decoded data type object by the worker and its results are
+    returned instead, e.g. to extract a few values of each message without
+    handing the whole trees back. It must be picklable (defined at module
+    level).
+
+    Return:
+        The decoded data type objects (or results of `function`) in the order
+        of `buffers`.
+    """
+    # Memory views can not be pickled
+    buffers = [bytes(buffer) if isinstance(buffer, memoryview) else buffer
+            for buffer in buffers]
+    workers = _workers(workers)
+    if workers == 1 or len(buffers) < min_parallel:
+        codec = compile_description(description, name, numpy)
+        if function is None:
+            return [codec.decode(buffer) for buffer in buffers]
+        return [function(codec.decode(buffer)) for buffer in buffers]
+
+    results = []
+    batch = (os.getpid(), next(_batches))
+    decoder = (description, name, numpy)
+    with ProcessPoolExecutor(workers) as executor:
+        futures = [executor.submit(_decode_chunk, batch, decoder, chunk, function)
+                for chunk in _chunks(buffers, workers, chunk_size)]
+        for future in futures:
+            results.extend(future.result())
+    return results
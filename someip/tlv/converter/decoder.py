@@ -0,0 +1,996 @@
+"""
+Decoding of serialized SOME/IP TLV payloads.
+
+Since the SOME/IP serialization is not self-describing, decoding needs a data
+structure description in the same JSON format used for serialization (see
+`json_parser`). The `value` members of the description are not needed, except
+for determining the number of items of static (fixed length) arrays and the
+size of pre-serialized data.
+
+A description is compiled once into a tree of codec nodes, which can then be
+used to decode any number of payloads:
+
+    codec = compile_description(description)
+    message = codec.decode(payload)
+
+With `numpy=True`, (big-endian) arrays of basic types are decoded to NumPy
+views of the payload instead of item objects (see `Array.to_numpy()`).
+
+:copyright: Copyright 2021 by the Florian Münchbach.
+:license: BSD, see LICENSE for details.
+"""
+
+import struct
+
+from ..datatypes.basic import \
+        Boolean, \
+        Uint8, Uint16, Uint32, Uint64, \
+        Sint8, Sint16, Sint32, Sint64, \
+        Float32, Float64, \
+        Bitfield
+from ..datatypes.complex import Array, MultiArray, String, Struct, Union
+from ..datatypes import Preserialized
+from ..datatypes._import_helper import import_numpy
+from ..datatypes.consts import Types, TAG_LENGTH, WIRETYPE_COMPLEX_TYPE_STATIC_LEN
+from ..datatypes.traits import TRAITS, UINT_TRAITS, struct_format
+from ..datatypes.type_helpers import get_lengthfield_width_by_wiretype, \
+        check_lengthfield_length, unpack_tag_from, unpack_lengthfield_from
+
+
+_BASIC_TYPE_MAP={
+        "boolean":      (Boolean,   Types.BOOLEAN),
+        "uint8":        (Uint8,     Types.UINT8),
+        "sint8":        (Sint8,     Types.SINT8),
+        "uint16":       (Uint16,    Types.UINT16),
+        "sint16":       (Sint16,    Types.SINT16),
+        "uint32":       (Uint32,    Types.UINT32),
+        "sint32":       (Sint32,    Types.SINT32),
+        "float32":      (Float32,   Types.FLOAT32),
+        "uint64":       (Uint64,    Types.UINT64),
+        "sint64":       (Sint64,    Types.SINT64),
+        "float64":      (Float64,   Types.FLOAT64),
+        }
+
+# Width of the value of basic types by wire type, used to skip unknown members
+_VALUE_WIDTH_BY_WIRETYPE={0: 1, 1: 2, 2: 4, 3: 8}
+
+_BOM=b'\xEF\xBB\xBF'
+
+_WIRETYPE_BY_LENGTHFIELD_LEN={
+        0: WIRETYPE_COMPLEX_TYPE_STATIC_LEN,
+        1: 5,
+        2: 6,
+        4: 7}
+
+
+def _require(offset, size, end):
+    if offset + size > end:
+        raise ValueError(
+                f'Unexpected end of data: need {size} byte(s) at offset {offset},'\
+                f' only {max(end - offset, 0)} available.')
+
+
+def _consume_lengthfield(buffer, offset, end, lengthfield_len, uncounted_len=0):
+    """
+    Reads the length field (if any) at `offset`, the value having
+    `uncounted_len` bytes not covered by the length.
+
+    Return:
+        Tuple of the offset behind the length field and the end of the value,
+        None for static (no length field) types.
+    """
+    if lengthfield_len == 0:
+        return offset, None
+    _require(offset, lengthfield_len, end)
+    length = unpack_lengthfield_from(buffer, offset, lengthfield_len) + uncounted_len
+    offset += lengthfield_len
+    _require(offset, length, end)
+    return offset, offset + length
+
+
+def skip_member(buffer, offset, end, wiretype) -> int:
+    """
+    Skips the value (including length field) of a member with the given wire
+    type, e.g. an unknown member of a struct.
+
+    Return:
+        Offset behind the skipped member.
+    """
+    if wiretype in _VALUE_WIDTH_BY_WIRETYPE:
+        width = _VALUE_WIDTH_BY_WIRETYPE[wiretype]
+    elif wiretype in (5, 6, 7):
+        lengthfield_len = get_lengthfield_width_by_wiretype(wiretype)
+        _require(offset, lengthfield_len, end)
+        width = unpack_lengthfield_from(buffer, offset, lengthfield_len)
+        offset += lengthfield_len
+    else:
+        raise ValueError(
+                f'Can not skip unknown member with wire type {wiretype} at offset {offset}.')
+    _require(offset, width, end)
+    return offset + width
+
+
+class Codec:
+    """
+    Base class for compiled description nodes.
+    """
+    # Data type class decoded by the codec
+    target_type = None
+
+    def __init__(self, name, data_id, wiretype):
+        self.name = name
+        self.data_id = data_id
+        self.wiretype = wiretype
+
+    @property
+    def tagged(self) -> bool:
+        """
+        True, if a tag is expected in front of the value.
+        """
+        return self.data_id is not None
+
+    def decode(self, buffer):
+        """
+        Decodes the entire `buffer` into a `someip.tlv.datatypes` structure.
+
+        Raises a `ValueError` if the buffer is malformed or if it contains
+        trailing data.
+        """
+        element, offset = self.decode_from(buffer)
+        if offset != len(buffer):
+            raise ValueError(
+                    f'Trailing data: decoded {offset} of {len(buffer)} byte(s).')
+        return element
+
+    def decode_from(self, buffer, offset=0, end=None):
+        """
+        Decodes one element from `buffer`, starting at `offset` and reading
+        at most until `end`.
+
+        Return:
+            Tuple of the decoded element and the offset behind it.
+        """
+        return self._decode(buffer, offset, len(buffer) if end is None else end)
+
+    def decode_into(self, element, buffer):
+        """
+        Decodes the entire `buffer` into the existing data type object
+        `element`, e.g. a tree created once from the same description and
+        reused for every received payload.
+
+        The values are assigned in place (see `Serializable.assign()`), item
+        objects are reused and only created for additional array items. Data
+        IDs, wire types and length field settings of the tree are kept.
+        Raises a `ValueError` if the buffer is malformed or does not match the
+        structure of the tree. Unlike `decode()`, this includes payloads
+        lacking members of a struct, which would keep their previous values.
+
+        Return:
+            The `element`.
+        """
+        offset = self._decode_into(element, buffer, 0, len(buffer))
+        if offset != len(buffer):
+            raise ValueError(
+                    f'Trailing data: decoded {offset} of {len(buffer)} byte(s).')
+        return element
+
+    def _decode(self, buffer, offset, end):
+        wiretype = self.wiretype
+        data_id = None
+        if self.data_id is not None:
+            _require(offset, TAG_LENGTH, end)
+            wiretype, data_id = unpack_tag_from(buffer, offset)
+            offset += TAG_LENGTH
+        return self._decode_value(buffer, offset, end, wiretype, data_id)
+
+    def _decode_value(self, buffer, offset, end, wiretype, data_id):
+        """
+        Decodes the element behind the (already consumed) tag.
+        """
+        raise NotImplementedError()
+
+    def _decode_into(self, element, buffer, offset, end):
+        if not isinstance(element, self.target_type):
+            raise ValueError(f'Can not decode {self.target_type.__name__} "{self.name}" into'\
+                    f' {type(element).__name__} "{element.name}"')
+        wiretype = self.wiretype
+        if self.data_id is not None:
+            _require(offset, TAG_LENGTH, end)
+            wiretype, _data_id = unpack_tag_from(buffer, offset)
+            offset += TAG_LENGTH
+        return self._decode_value_into(element, buffer, offset, end, wiretype)
+
+    def _decode_value_into(self, element, buffer, offset, end, wiretype):
+        """
+        Decodes the value behind the (already consumed) tag into `element`.
+
+        Return:
+            The offset behind the value.
+        """
+        raise NotImplementedError()
+
+
+class _BasicCodec(Codec):
+    def __init__(self, name, data_id, wiretype, instance_type, element_type,
+            little_endian=False, traits=None):
+        super().__init__(name, data_id, wiretype)
+        self.instance_type = instance_type
+        self.target_type = instance_type
+        self.element_type = element_type
+        self.little_endian = little_endian
+        if traits is None:
+            traits = TRAITS[element_type]
+        self.struct = traits.codec_le if little_endian else traits.codec
+        # Byte order and format character of arrays of the type
+        self.byte_order, self.format_character = struct_format(self.struct)
+        # Wire type determined by the type
+        self.default_wiretype = traits.wiretype
+
+    @property
+    def size(self):
+        return self.struct.size
+
+    def make(self, value, data_id, wiretype):
+        """
+        Creates the data type object for a decoded value.
+        """
+        if self.little_endian:
+            return self.instance_type(value, data_id, wiretype=wiretype, name=self.name,
+                    little_endian=True)
+        return self.instance_type(value, data_id, wiretype=wiretype, name=self.name)
+
+    def _decode_value(self, buffer, offset, end, wiretype, data_id):
+        _require(offset, self.struct.size, end)
+        value = self.struct.unpack_from(buffer, offset)[0]
+        return self.make(value, data_id, wiretype), offset + self.struct.size
+
+    def _decode_value_into(self, element, buffer, offset, end, wiretype):
+        _require(offset, self.struct.size, end)
+        element.value = self.struct.unpack_from(buffer, offset)[0]
+        return offset + self.struct.size
+
+
+class _BitfieldCodec(_BasicCodec):
+    """
+    Bitfield, decoded like the unsigned integer of its width.
+    """
+    def __init__(self, name, data_id, wiretype, bits, flags, little_endian=False):
+        super().__init__(name, data_id, wiretype, Bitfield, Types.BITFIELD, little_endian,
+                traits=UINT_TRAITS[bits // 8])
+        self.bits = bits
+        self.flags = flags
+
+    def make(self, value, data_id, wiretype):
+        return Bitfield(value, data_id, wiretype=wiretype, name=self.name, bits=self.bits,
+                flags=self.flags, little_endian=self.little_endian)
+
+
+class _ComplexCodec(Codec):
+    # Bytes of the value not covered by the length field
+    uncounted_len = 0
+
+    def __init__(self, name, data_id, wiretype, lengthfield_len):
+        if lengthfield_len is None:
+            if wiretype is None:
+                if data_id is None:
+                    raise ValueError(
+                            'Untagged complex data types need either a "wiretype" or a'\
+                            f' "lengthfield_len" for decoding (failed element: "{name}")')
+                # Length field chosen automatically on serialization, the
+                # received wire type (5 to 7) determines the width
+                wiretype = 7
+            lengthfield_len = get_lengthfield_width_by_wiretype(wiretype)
+        check_lengthfield_length(lengthfield_len)
+        if wiretype is None:
+            wiretype = _WIRETYPE_BY_LENGTHFIELD_LEN[lengthfield_len]
+
+        super().__init__(name, data_id, wiretype)
+        self.lengthfield_len = lengthfield_len
+
+    def lengthfield_width(self, wiretype) -> int:
+        """
+        Width of the length field for the given (received) wire type.
+
+        For tagged elements, wire types 5 to 7 determine the width, in all
+        other cases the configuration applies.
+        """
+        if self.data_id is not None and wiretype in (5, 6, 7):
+            return get_lengthfield_width_by_wiretype(wiretype)
+        return self.lengthfield_len
+
+    def _decode_value(self, buffer, offset, end, wiretype, data_id):
+        lengthfield_len = self.lengthfield_width(wiretype)
+        offset, value_end = _consume_lengthfield(buffer, offset, end, lengthfield_len,
+                self.uncounted_len)
+        return self._decode_items(buffer, offset, end, value_end, wiretype, data_id,
+                lengthfield_len)
+
+    def _decode_value_into(self, element, buffer, offset, end, wiretype):
+        lengthfield_len = self.lengthfield_width(wiretype)
+        offset, value_end = _consume_lengthfield(buffer, offset, end, lengthfield_len,
+                self.uncounted_len)
+        return self._decode_items_into(element, buffer, offset, end, value_end,
+                lengthfield_len)
+
+    def _decode_items(self, buffer, offset, end, value_end, wiretype, data_id,
+            lengthfield_len):
+        """
+        Decodes the value of the complex type. `value_end` is None for static
+        (no length field) types.
+        """
+        raise NotImplementedError()
+
+    def _decode_items_into(self, element, buffer, offset, end, value_end, lengthfield_len):
+        """
+        Like `_decode_items()`, assigning the value to `element`.
+
+        Return:
+            The offset behind the value.
+        """
+        raise NotImplementedError()
+
+
+class _StructCodec(_ComplexCodec):
+    element_type = Types.STRUCT
+    target_type = Struct
+
+    def __init__(self, name, data_id, wiretype, lengthfield_len, members):
+        super().__init__(name, data_id, wiretype, lengthfield_len)
+        self.members = members
+        self.members_by_data_id = {
+                member.data_id: member for member in members if member.data_id is not None}
+        # Members are identified by their data ID, if all of them have a tag.
+        self.by_data_id = len(members) > 0 \
+                and len(self.members_by_data_id) == len(members)
+
+    def _decode_items(self, buffer, offset, end, value_end, wiretype, data_id,
+            lengthfield_len):
+        items = []
+        if value_end is not None and self.by_data_id:
+            while offset < value_end:
+                _require(offset, TAG_LENGTH, value_end)
+                member_wiretype, member_data_id = unpack_tag_from(buffer, offset)
+                offset += TAG_LENGTH
+                member = self.members_by_data_id.get(member_data_id)
+                if member is None:
+                    offset = skip_member(buffer, offset, value_end, member_wiretype)
+                    continue
+                element, offset = member._decode_value(
+                        buffer, offset, value_end, member_wiretype, member_data_id)
+                items.append(element)
+        else:
+            limit = value_end if value_end is not None else end
+            for member in self.members:
+                element, offset = member._decode(buffer, offset, limit)
+                items.append(element)
+            if value_end is not None:
+                # Skip unknown trailing data of extended structs
+                offset = value_end
+
+        return self.make(items, data_id, wiretype, lengthfield_len), offset
+
+    def _decode_items_into(self, element, buffer, offset, end, value_end, lengthfield_len):
+        members = len(element._items)
+        if value_end is not None and self.by_data_id:
+            # Data IDs of the assigned members, repeated members count once
+            assigned = set()
+            while offset < value_end:
+                _require(offset, TAG_LENGTH, value_end)
+                member_wiretype, member_data_id = unpack_tag_from(buffer, offset)
+                offset += TAG_LENGTH
+                member = self.members_by_data_id.get(member_data_id)
+                if member is None:
+                    offset = skip_member(buffer, offset, value_end, member_wiretype)
+                    continue
+                target = element.get_by_data_id(member_data_id)
+                if target is None:
+                    raise ValueError(f'Struct "{element.name}" has no member with data ID'\
+                            f' {member_data_id}')
+                offset = member._decode_value_into(
+                        target, buffer, offset, value_end, member_wiretype)
+                assigned.add(member_data_id)
+            decoded = len(assigned)
+        else:
+            if members != len(self.members):
+                raise ValueError(f'Struct "{element.name}" has {members} members,'\
+                        f' the description {len(self.members)}')
+            limit = value_end if value_end is not None else end
+            for position, member in enumerate(self.members):
+                offset = member._decode_into(element._private_item(position), buffer, offset,
+                        limit)
+            decoded = members
+            if value_end is not None:
+                offset = value_end
+
+        if decoded != members:
+            raise ValueError(f'Decoded {decoded} of the {members} members of struct'\
+                    f' "{element.name}"')
+        return offset
+
+    def make(self, items, data_id, wiretype, lengthfield_len):
+        """
+        Creates the data type object from the decoded items.
+        """
+        # Repeated members are received from other stacks, see duplicate_data_ids
+        return Struct(items, data_id, wiretype=wiretype, name=self.name,
+                lengthfield_len=lengthfield_len, unique_data_ids=False)
+
+
+class _ArrayCodec(_ComplexCodec):
+    element_type = Types.ARRAY
+    target_type = Array
+
+    def __init__(self, name, data_id, wiretype, lengthfield_len, element_codec,
+            static_length=None, static_count=None):
+        super().__init__(name, data_id, wiretype, lengthfield_len)
+        self.element = element_codec
+        self.static_length = static_length
+        self.static_count = static_count
+        # NumPy module if basic items are decoded to ndarrays, see
+        # compile_description()
+        self.numpy = None
+        if self.lengthfield_len == 0 and static_length is None and static_count is None:
+            raise ValueError(
+                    'Static arrays need either a "length" or a "value" to determine'\
+                    f' the number of items (failed element: "{name}")')
+
+    def _static_bounds(self, offset, end, value_end):
+        """
+        Returns the end of the value and the number of items (None if given
+        by the end) of the array.
+        """
+        if value_end is not None:
+            return value_end, None
+        if self.static_length is not None:
+            _require(offset, self.static_length, end)
+            return offset + self.static_length, None
+        return None, self.static_count
+
+    def _decode_items(self, buffer, offset, end, value_end, wiretype, data_id,
+            lengthfield_len):
+        element = self.element
+        value_end, count = self._static_bounds(offset, end, value_end)
+
+        if isinstance(element, _BasicCodec):
+            values, offset = self._decode_basic_values(buffer, offset, end, value_end, count)
+            items = values if self.numpy is not None and not element.little_endian \
+                    else self.make_basic_items(values)
+        else:
+            items = []
+            if count is None:
+                while offset < value_end:
+                    item, offset = element._decode(buffer, offset, value_end)
+                    items.append(item)
+            else:
+                for _unused in range(0, count):
+                    item, offset = element._decode(buffer, offset, end)
+                    items.append(item)
+
+        return self.make(items, data_id, wiretype, lengthfield_len), offset
+
+    def _decode_items_into(self, target, buffer, offset, end, value_end, lengthfield_len):
+        element = self.element
+        value_end, count = self._static_bounds(offset, end, value_end)
+
+        if isinstance(element, _BasicCodec):
+            values, offset = self._decode_basic_values(buffer, offset, end, value_end, count)
+            target.assign(values)
+            return offset
+
+        items = target.items
+        position = 0
+        limit = end if count is not None else value_end
+        while (offset < value_end) if count is None else (position < count):
+            if position < len(items):
+                offset = element._decode_into(target._private_item(position), buffer, offset,
+                        limit)
+            else:
+                item, offset = element._decode(buffer, offset, limit)
+                target.append(item)
+            position += 1
+        if position < len(items):
+            target.truncate(position)
+        return offset
+
+    def make(self, items, data_id, wiretype, lengthfield_len):
+        """
+        Creates the data type object from the decoded items.
+        """
+        if not isinstance(items, list):
+            return Array.from_numpy(items, data_id, wiretype, name=self.name,
+                    lengthfield_len=lengthfield_len)
+        return Array(items, data_id, wiretype, name=self.name,
+                lengthfield_len=lengthfield_len, elementtype=self.element.element_type)
+
+    def make_basic_items(self, values):
+        """
+        Creates the (untagged) items of an array of basic types from the
+        decoded values.
+        """
+        instance_type = self.element.instance_type
+        if isinstance(self.element, _BitfieldCodec):
+            return [self.element.make(value, None, None) for value in values]
+        if self.element.little_endian:
+            return [instance_type(value, None, little_endian=True) for value in values]
+        return [instance_type(value, None) for value in values]
+
+    def _decode_basic_values(self, buffer, offset, end, value_end, count):
+        """
+        Decodes the values of an array of basic types, as ndarray view with
+        `numpy` (big-endian only) or as tuple.
+        """
+        element = self.element
+        size = element.size
+        if count is None:
+            if (value_end - offset) % size != 0:
+                raise ValueError(
+                        f'Array length {value_end - offset} is not a multiple of the'\
+                        f' item size {size} (failed element: "{self.name}")')
+            count = (value_end - offset) // size
+        _require(offset, count * size, end)
+        if self.numpy is not None and not element.little_endian:
+            # Big-endian view of the buffer, no item objects
+            values = self.numpy.frombuffer(buffer, f'>{element.format_character}', count,
+                    offset)
+            return values, offset + count * size
+        values = struct.unpack_from(f'{element.byte_order}{count}{element.format_character}',
+                buffer, offset)
+        return values, offset + count * size
+
+
+class _MultiArrayCodec(_ArrayCodec):
+    """
+    Multi-dimensional array of a basic type, decoded to the flat storage of
+    a `MultiArray`.
+
+    `element` is the chain of (untagged) inner array codecs, i.e. validation,
+    diffing and push decoding treat it as an array of arrays.
+    """
+    target_type = MultiArray
+
+    def __init__(self, name, data_id, wiretype, lengthfield_len, element_codec, item_codec,
+            dimensions, static_shape=None):
+        super().__init__(name, data_id, wiretype, lengthfield_len, element_codec,
+                static_count=static_shape[0] if static_shape is not None else None)
+        self.item = item_codec
+        self.dimensions = dimensions
+        self.static_shape = static_shape
+
+    def _decode_items(self, buffer, offset, end, value_end, wiretype, data_id,
+            lengthfield_len):
+        data, shape, offset = self._decode_flat(buffer, offset, end, value_end,
+                lengthfield_len)
+        return MultiArray.from_buffer(data, shape, data_id, wiretype, name=self.name,
+                lengthfield_len=lengthfield_len,
+                elementtype=self.item.element_type), offset
+
+    def _decode_items_into(self, element, buffer, offset, end, value_end, lengthfield_len):
+        if element.elementtype is not self.item.element_type:
+            raise ValueError(f'Can not decode multi-dimensional array "{self.name}" into'\
+                    f' {element!r}')
+        data, shape, offset = self._decode_flat(buffer, offset, end, value_end,
+                lengthfield_len)
+        element.set_buffer(data, shape)
+        return offset
+
+    def _decode_flat(self, buffer, offset, end, value_end, lengthfield_len):
+        """
+        Decodes the big-endian values of all rows.
+
+        Return:
+            Tuple of the values, the shape and the offset behind the value.
+        """
+        data = bytearray()
+        if value_end is None:
+            shape = list(self.static_shape)
+            size = self.item.size
+            for count in shape:
+                size *= count
+            _require(offset, size, end)
+            data += buffer[offset:offset + size]
+            offset += size
+        else:
+            shape = [None] * self.dimensions
+            offset = self._decode_dimension(buffer, offset, value_end, 0, lengthfield_len,
+                    shape, data)
+        shape = [0 if count is None else count for count in shape]
+        return data, shape, offset
+
+    def _decode_dimension(self, buffer, offset, end, dimension, lengthfield_len, shape,
+            data):
+        # The received width of the outer length field applies to all dimensions
+        if dimension == self.dimensions - 1:
+            size = self.item.size
+            if (end - offset) % size != 0:
+                raise ValueError(
+                        f'Array length {end - offset} is not a multiple of the'\
+                        f' item size {size} (failed element: "{self.name}")')
+            count = (end - offset) // size
+            data += buffer[offset:end]
+            offset = end
+        else:
+            count = 0
+            while offset < end:
+                _require(offset, lengthfield_len, end)
+                length = unpack_lengthfield_from(buffer, offset, lengthfield_len)
+                offset += lengthfield_len
+                _require(offset, length, end)
+                offset = self._decode_dimension(buffer, offset, offset + length,
+                        dimension + 1, lengthfield_len, shape, data)
+                count += 1
+        if shape[dimension] is None:
+            shape[dimension] = count
+        elif shape[dimension] != count:
+            raise ValueError(f'Dimension {dimension} has rows of {shape[dimension]} and'\
+                    f' {count} items (failed element: "{self.name}")')
+        return offset
+
+    def make(self, items, data_id, wiretype, lengthfield_len):
+        """
+        Creates the data type object from the decoded rows (arrays of the
+        inner dimensions).
+        """
+        def nested(item):
+            if isinstance(item, Array):
+                return [nested(child) for child in item.items]
+            return item.value
+
+        return MultiArray([nested(item) for item in items], data_id, wiretype,
+                name=self.name, lengthfield_len=lengthfield_len,
+                elementtype=self.item.element_type,
+                shape=None if items else (0,) * self.dimensions)
+
+
+class _UnionCodec(_ComplexCodec):
+    """
+    Union with the member of the description as known alternative.
+
+    Unions of other (non-zero) selectors are kept as pre-serialized data,
+    which requires a length field.
+    """
+    element_type = Types.UNION
+    target_type = Union
+
+    def __init__(self, name, data_id, wiretype, lengthfield_len, selector, selector_len,
+            member):
+        super().__init__(name, data_id, wiretype, lengthfield_len)
+        if selector_len not in (1, 2, 4):
+            raise ValueError('A union type selector must have 1, 2 or 4 bytes'\
+                    f' (failed element: "{name}")')
+        self.selector = selector
+        self.selector_len = selector_len
+        # The length field covers only the member
+        self.uncounted_len = selector_len
+        self.selector_struct = UINT_TRAITS[selector_len].codec
+        self.member = member
+
+    def _decode_member(self, buffer, offset, end, value_end):
+        """
+        Decodes the type selector and the member.
+
+        Return:
+            Tuple of the selector, the member (None for empty unions) and the
+            offset behind the value.
+        """
+        limit = end if value_end is None else value_end
+        _require(offset, self.selector_len, limit)
+        selector = self.selector_struct.unpack_from(buffer, offset)[0]
+        offset += self.selector_len
+        if selector == 0:
+            member = None
+        elif selector == self.selector and self.member is not None:
+            member, offset = self.member._decode(buffer, offset, limit)
+        elif value_end is not None:
+            member = Preserialized(bytearray(buffer[offset:value_end]))
+        else:
+            raise ValueError(f'Unknown selector {selector} of union "{self.name}" without'\
+                    ' length field')
+        return selector, member, offset if value_end is None else value_end
+
+    def _decode_items(self, buffer, offset, end, value_end, wiretype, data_id,
+            lengthfield_len):
+        selector, member, offset = self._decode_member(buffer, offset, end, value_end)
+        return self.make(selector, member, data_id, wiretype, lengthfield_len), offset
+
+    def _decode_items_into(self, element, buffer, offset, end, value_end, lengthfield_len):
+        if element.selector_len != self.selector_len:
+            raise ValueError(f'Can not decode union "{self.name}" into {element!r}')
+        limit = end if value_end is None else value_end
+        _require(offset, self.selector_len, limit)
+        selector = self.selector_struct.unpack_from(buffer, offset)[0]
+        target = element.member
+        if selector == element.selector == self.selector and self.member is not None \
+                and target is not None:
+            offset = self.member._decode_into(target, buffer, offset + self.selector_len,
+                    limit)
+            return offset if value_end is None else value_end
+        selector, member, offset = self._decode_member(buffer, offset, end, value_end)
+        element.select(selector, member)
+        return offset
+
+    def make(self, selector, member, data_id, wiretype, lengthfield_len):
+        """
+        Creates the data type object from the decoded selector and member.
+        """
+        return Union(member, selector, data_id, wiretype, name=self.name,
+                lengthfield_len=lengthfield_len, selector_len=self.selector_len)
+
+
+def _parse_string(raw):
+    """
+    Splits the raw value of a string.
+
+    Return:
+        Tuple of the string and whether it has a BOM, a terminator and
+        padding.
+    """
+    raw = bytes(raw)
+    bom = raw.startswith(_BOM)
+    if bom:
+        raw = raw[len(_BOM):]
+    terminator = raw.find(b'\0')
+    terminate = terminator >= 0
+    padding = False
+    if terminate:
+        padding = terminator + 1 < len(raw)
+        raw = raw[:terminator]
+    return raw.decode(encoding='utf-8', errors='strict'), bom, terminate, padding
+
+
+class _StringCodec(_ComplexCodec):
+    element_type = Types.STRING
+    target_type = String
+
+    def __init__(self, name, data_id, wiretype, lengthfield_len, static_length=None):
+        super().__init__(name, data_id, wiretype, lengthfield_len)
+        self.static_length = static_length
+        if self.lengthfield_len == 0 and static_length is None:
+            raise ValueError(
+                    'Static strings need a "length" or a "value" to determine'\
+                    f' their length (failed element: "{name}")')
+
+    def _decode_items(self, buffer, offset, end, value_end, wiretype, data_id,
+            lengthfield_len):
+        if value_end is None:
+            _require(offset, self.static_length, end)
+            value_end = offset + self.static_length
+
+        return self.make(buffer[offset:value_end], data_id, wiretype, lengthfield_len), \
+                value_end
+
+    def _decode_items_into(self, element, buffer, offset, end, value_end, lengthfield_len):
+        if value_end is None:
+            _require(offset, self.static_length, end)
+            value_end = offset + self.static_length
+
+        element.assign(_parse_string(buffer[offset:value_end])[0])
+        return value_end
+
+    def make(self, raw, data_id, wiretype, lengthfield_len):
+        """
+        Creates the data type object from the raw (serialized) value.
+        """
+        string, bom, terminate, padding = _parse_string(raw)
+        return String(string, data_id, wiretype,
+                name=self.name,
+                length=len(raw) if padding else None,
+                lengthfield_len=lengthfield_len,
+                terminate=terminate, bom=bom, padding=padding)
+
+
+class _PreserializedCodec(Codec):
+    element_type = Types.PRESERIALIZED
+    target_type = Preserialized
+
+    def __init__(self, name, length):
+        super().__init__(name, None, None)
+        self.length = length
+
+    def make(self, raw):
+        """
+        Creates the data type object from the raw data.
+        """
+        return Preserialized(bytearray(raw), name=self.name)
+
+    def _decode_value(self, buffer, offset, end, wiretype, data_id):
+        _require(offset, self.length, end)
+        return self.make(buffer[offset:offset + self.length]), offset + self.length
+
+    def _decode_value_into(self, element, buffer, offset, end, wiretype):
+        _require(offset, self.length, end)
+        element.assign(buffer[offset:offset + self.length])
+        return offset + self.length
+
+
+def _compile_basic(key, element, etype):
+    instance_type, element_type = _BASIC_TYPE_MAP[etype]
+    return _BasicCodec(element.get('name', key), element.get('dataID'),
+            element.get('wiretype'), instance_type, element_type,
+            little_endian=element.get('little_endian', False))
+
+
+def _compile_bitfield(key, element):
+    bits = element.get('bits', 8)
+    flags = element.get('flags')
+    # Checks the width and the flags
+    Bitfield(0, None, bits=bits, flags=flags)
+    return _BitfieldCodec(element.get('name', key), element.get('dataID'),
+            element.get('wiretype'), bits, flags,
+            little_endian=element.get('little_endian', False))
+
+
+def _compile_struct(key, element):
+    value = element.get('value') or {}
+    members = [_compile_element(member_key, member) for member_key, member in value.items()]
+    return _StructCodec(element.get('name', key), element.get('dataID'),
+            element.get('wiretype'), element.get('lengthfield_len'), members)
+
+
+def _compile_multi_array(key, element, value):
+    etype = element['elementtype'].lower()
+    if etype not in _BASIC_TYPE_MAP:
+        raise ValueError('Multi-dimensional arrays need a basic type "elementtype"'\
+                f' (failed element: "{key}")')
+    name = element.get('name', key)
+    wiretype, lengthfield_len = element.get('wiretype'), element.get('lengthfield_len')
+    if wiretype is None and lengthfield_len is None:
+        raise ValueError('Multi-dimensional arrays need either a "wiretype" or a'\
+                f' "lengthfield_len" for decoding (failed element: "{name}")')
+    if element.get('little_endian', False):
+        raise ValueError('Multi-dimensional arrays are always big-endian'\
+                f' (failed element: "{name}")')
+
+    if 'shape' in element:
+        shape = tuple(element['shape'])
+    else:
+        shape = []
+        while isinstance(value, list):
+            shape.append(len(value))
+            value = value[0] if value else None
+        shape = tuple(shape)
+    if not shape:
+        raise ValueError(f'Multi-dimensional arrays need a non-empty "shape" (failed element: "{name}")')
+
+    item_codec = _compile_basic(None, {'dataID': None}, etype)
+    codec = _MultiArrayCodec(name, element.get('dataID'), wiretype, lengthfield_len,
+            None, item_codec, len(shape), static_shape=shape)
+    if codec.lengthfield_len != 0:
+        codec.static_shape = None
+    # Inner dimensions: untagged arrays with the same length field width
+    element_codec = item_codec
+    for count in reversed(shape[1:]):
+        element_codec = _ArrayCodec(None, None, None, codec.lengthfield_len, element_codec,
+                static_count=count)
+    codec.element = element_codec
+    return codec
+
+
+def _compile_array(key, element):
+    value = element.get('value') or []
+    if 'elementtype' in element and ('shape' in element \
+            or len(value) > 0 and isinstance(value[0], list)):
+        return _compile_multi_array(key, element, value)
+    if len(value) > 0 and isinstance(value[0], dict):
+        # Only the first item is used as template
+        element_codec = _compile_element(None, value[0])
+    elif 'elementtype' in element and element['elementtype'].lower() in _BASIC_TYPE_MAP:
+        element_codec = _compile_basic(
+                None, {'dataID': None, 'little_endian': element.get('little_endian', False)},
+                element['elementtype'].lower())
+    else:
+        raise ValueError('Elements of type "array" must either contain a'\
+                ' basic type "elementtype" or data type definitions'\
+                f' (failed element: "{key}")')
+
+    return _ArrayCodec(element.get('name', key), element.get('dataID'),
+            element.get('wiretype'), element.get('lengthfield_len'), element_codec,
+            static_length=element.get('length'),
+            static_count=len(value) if 'value' in element else None)
+
+
+def _compile_string(key, element):
+    static_length = element.get('length')
+    if static_length is None and isinstance(element.get('value'), str):
+        # Static strings without explicit length: as serialized from the value
+        static_length = len(element['value'].encode(encoding='utf-8')) \
+                + (len(_BOM) if element.get('bom', True) else 0) \
+                + (1 if element.get('terminate', True) else 0)
+
+    return _StringCodec(element.get('name', key), element.get('dataID'),
+            element.get('wiretype'), element.get('lengthfield_len'),
+            static_length=static_length)
+
+
+def _compile_union(key, element):
+    value = element.get('value')
+    if value is not None and not isinstance(value, dict):
+        raise ValueError('The value of a union must be a data type definition or null'\
+                f' (failed element: "{key}")')
+    member = _compile_element(None, value) if value is not None else None
+    selector = element.get('selector', 0 if member is None else 1)
+    return _UnionCodec(element.get('name', key), element.get('dataID'),
+            element.get('wiretype'), element.get('lengthfield_len'), selector,
+            element.get('selector_len', 4), member)
+
+
+def _compile_preserialized(key, element):
+    if 'length' in element:
+        length = element['length']
+    elif 'value' in element:
+        length = len(bytes.fromhex(element['value']))
+    else:
+        raise ValueError(
+                f'An element with pre-serialized data ({key}) must have a "length"'\
+                ' or "value" field')
+    return _PreserializedCodec(element.get('name', key), length)
+
+
+def _compile_element(key, element):
+    if not isinstance(element, dict) or 'type' not in element:
+        raise ValueError(f'Each JSON element must contain a "type" field (failed element: "{key}")')
+
+    etype = element['type'].lower()
+    if etype in _BASIC_TYPE_MAP:
+        return _compile_basic(key, element, etype)
+    if etype == 'bitfield':
+        return _compile_bitfield(key, element)
+    if etype == 'struct':
+        return _compile_struct(key, element)
+    if etype == 'array':
+        return _compile_array(key, element)
+    if etype == 'string':
+        return _compile_string(key, element)
+    if etype == 'union':
+        return _compile_union(key, element)
+    if etype == 'serialized':
+        return _compile_preserialized(key, element)
+    raise NotImplementedError(f'Unknown element type "{etype}"')
+
+
+def _decode_to_numpy(codec, numpy):
+    if isinstance(codec, _StructCodec):
+        for member in codec.members:
+            _decode_to_numpy(member, numpy)
+    elif isinstance(codec, _ArrayCodec):
+        if isinstance(codec.element, _BitfieldCodec):
+            # Bitfields have no NumPy counterpart
+            pass
+        elif isinstance(codec.element, _BasicCodec):
+            codec.numpy = numpy
+        else:
+            _decode_to_numpy(codec.element, numpy)
+    elif isinstance(codec, _UnionCodec) and codec.member is not None:
+        _decode_to_numpy(codec.member, numpy)
+
+
+def compile_description(description, name="Message Payload", numpy=False) -> Codec:
+    """
+    Compiles `description` (a `dict` type containing a data structure
+    description following the JSON format) into a codec that decodes
+    serialized payloads.
+
+    The topmost data type object will be named "Message Payload" by default.
+
+    If `numpy` is set, arrays of basic types are decoded to big-endian
+    `numpy.frombuffer()` views of the payload (see `Array.to_numpy()`), i.e.
+    the payload buffer must not be modified while the decoded arrays are in
+    use. NumPy is an optional dependency.
+    """
+    if not isinstance(description, dict):
+        raise ValueError(
+                f'Expected a dict type containing a data type description, got {type(description)}')
+    codec = _compile_element(name, description)
+    if numpy:
+        _decode_to_numpy(codec, import_numpy())
+    return codec
+
+
+def decode(description, buffer, name="Message Payload", numpy=False):
+    """
+    Decodes the serialized payload `buffer` (any bytes-like object) based on
+    `description` to a `someip.tlv.datatypes` structure.
+
+    Convenience function, compile the description once using
+    `compile_description()` when decoding many payloads.
+    """
+    return compile_description(description, name=name, numpy=numpy).decode(buffer)
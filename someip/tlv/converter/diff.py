@@ -0,0 +1,318 @@
+"""
+Structural diff of two serialized SOME/IP TLV payloads.
+
+Both buffers are walked in parallel along the tag and length field structure
+given by a compiled description (see `decoder.compile_description()`), no data
+type objects are created. The byte ranges of elements are compared as a whole
+first, equal subtrees are skipped without descending into them.
+
+    codec = compile_description(description)
+    for difference in diff(codec, expected, actual):
+        print(difference)
+
+:copyright: Copyright 2021 by the Florian Münchbach.
+:license: BSD, see LICENSE for details.
+"""
+
+from typing import NamedTuple, Any
+
+from .decoder import Codec, _BasicCodec, _StructCodec, _ArrayCodec, _StringCodec, \
+        _UnionCodec, _PreserializedCodec, _require, skip_member, compile_description
+from ..datatypes.consts import TAG_LENGTH
+from ..datatypes.type_helpers import unpack_tag_from, unpack_lengthfield_from
+
+
+class Difference(NamedTuple):
+    """
+    A difference between two serialized payloads.
+
+    - path      path of the differing element: data IDs of tagged members,
+                names of untagged members, `[index]` of array items,
+                `selector` and `member` for the type selector and member of
+                unions, separated by `/`
+    - kind      'value', 'length' (differing lengths or number of items),
+                'wiretype', 'missing' (only in the first buffer) or 'added'
+                (only in the second buffer)
+    - offset_a  offset of the element in the first buffer (None if 'added')
+    - offset_b  offset of the element in the second buffer (None if
+                'missing')
+    - value_a   decoded value for basic types and selectors, otherwise None
+    - value_b   decoded value for basic types and selectors, otherwise None
+    """
+    path: str
+    kind: str
+    offset_a: int
+    offset_b: int
+    value_a: Any = None
+    value_b: Any = None
+
+
+class _Extent(NamedTuple):
+    start: int
+    wiretype: int
+    value_start: int
+    value_end: int
+
+
+def _segment(codec):
+    return str(codec.data_id) if codec.data_id is not None else str(codec.name)
+
+
+def _extent(codec, buffer, offset, end, wiretype=None):
+    """
+    Determines the extent of an element starting at `offset`, or behind its
+    tag, if `wiretype` is given (tag already consumed).
+    """
+    start = offset
+    if wiretype is None:
+        wiretype = codec.wiretype
+        if codec.data_id is not None:
+            _require(offset, TAG_LENGTH, end)
+            wiretype, _data_id = unpack_tag_from(buffer, offset)
+            offset += TAG_LENGTH
+
+    if isinstance(codec, _BasicCodec):
+        size = codec.size
+    elif isinstance(codec, _PreserializedCodec):
+        size = codec.length
+    else:
+        width = codec.lengthfield_width(wiretype)
+        if width > 0:
+            _require(offset, width, end)
+            size = unpack_lengthfield_from(buffer, offset, width) + codec.uncounted_len
+            offset += width
+        elif isinstance(codec, _StringCodec):
+            size = codec.static_length
+        elif isinstance(codec, _ArrayCodec) and codec.static_length is not None:
+            size = codec.static_length
+        elif isinstance(codec, _ArrayCodec) and isinstance(codec.element, _BasicCodec):
+            size = codec.static_count * codec.element.size
+        elif isinstance(codec, _UnionCodec):
+            _require(offset, codec.selector_len, end)
+            selector = codec.selector_struct.unpack_from(buffer, offset)[0]
+            value_end = offset + codec.selector_len
+            if selector != 0:
+                if selector != codec.selector or codec.member is None:
+                    raise ValueError(f'Unknown selector {selector} of union "{codec.name}"'\
+                            ' without length field')
+                value_end = _extent(codec.member, buffer, value_end, end).value_end
+            return _Extent(start, wiretype, offset, value_end)
+        else:
+            children = [codec.element] * codec.static_count if isinstance(codec, _ArrayCodec) \
+                    else codec.members
+            value_end = offset
+            for child in children:
+                value_end = _extent(child, buffer, value_end, end).value_end
+            return _Extent(start, wiretype, offset, value_end)
+    _require(offset, size, end)
+    return _Extent(start, wiretype, offset, offset + size)
+
+
+class _Differ:
+    def __init__(self, buffer_a, buffer_b, max_differences):
+        self.a = memoryview(buffer_a).cast('B')
+        self.b = memoryview(buffer_b).cast('B')
+        # bytes.startswith() compares a view using memcmp, much faster than
+        # comparing memoryviews item by item. Neither buffer is copied.
+        if isinstance(buffer_a, (bytes, bytearray)):
+            self._prefix = buffer_a.startswith
+            self._swapped = False
+        elif isinstance(buffer_b, (bytes, bytearray)):
+            self._prefix = buffer_b.startswith
+            self._swapped = True
+        else:
+            self._prefix = None
+        self.max_differences = max_differences
+        self.differences = []
+
+    def equal(self, start_a, end_a, start_b, end_b):
+        if end_a - start_a != end_b - start_b:
+            return False
+        if self._prefix is None:
+            return self.a[start_a:end_a] == self.b[start_b:end_b]
+        if self._swapped:
+            return self._prefix(self.a[start_a:end_a], start_b)
+        return self._prefix(self.b[start_b:end_b], start_a)
+
+    def report(self, path, kind, offset_a, offset_b, value_a=None, value_b=None):
+        self.differences.append(
+                Difference('/'.join(path), kind, offset_a, offset_b, value_a, value_b))
+        if self.max_differences is not None and len(self.differences) >= self.max_differences:
+            raise _Done()
+
+    def element(self, codec, path, extent_a, extent_b):
+        """
+        Compares two elements of the same codec given their extents.
+        """
+        if self.equal(extent_a.start, extent_a.value_end, extent_b.start, extent_b.value_end):
+            return
+        count = len(self.differences)
+
+        if extent_a.wiretype != extent_b.wiretype:
+            self.report(path, 'wiretype', extent_a.start, extent_b.start,
+                    extent_a.wiretype, extent_b.wiretype)
+            return
+
+        if isinstance(codec, _BasicCodec):
+            self.report(path, 'value', extent_a.start, extent_b.start,
+                    codec.struct.unpack_from(self.a, extent_a.value_start)[0],
+                    codec.struct.unpack_from(self.b, extent_b.value_start)[0])
+            return
+        if isinstance(codec, _StructCodec):
+            if codec.by_data_id and codec.lengthfield_width(extent_a.wiretype) > 0:
+                self.tagged_members(codec, path, extent_a, extent_b)
+            else:
+                self.sequence(codec.members, path, extent_a, extent_b, False)
+        elif isinstance(codec, _ArrayCodec):
+            if isinstance(codec.element, _BasicCodec):
+                self.basic_items(codec.element, path, extent_a, extent_b)
+            else:
+                self.sequence(codec.element, path, extent_a, extent_b, True)
+        elif isinstance(codec, _UnionCodec):
+            self.union(codec, path, extent_a, extent_b)
+
+        if len(self.differences) == count:
+            # No difference in the children (or no children): length field,
+            # trailing data or value of strings and pre-serialized data
+            length_a = extent_a.value_end - extent_a.value_start
+            length_b = extent_b.value_end - extent_b.value_start
+            self.report(path, 'length' if length_a != length_b else 'value',
+                    extent_a.start, extent_b.start)
+
+    def sequence(self, children, path, extent_a, extent_b, array):
+        """
+        Compares untagged struct members or array items in order.
+        """
+        offset_a, offset_b = extent_a.value_start, extent_b.value_start
+        end_a, end_b = extent_a.value_end, extent_b.value_end
+        index = 0
+        while True:
+            if array:
+                child = children
+                more_a, more_b = offset_a < end_a, offset_b < end_b
+            else:
+                if index >= len(children):
+                    return
+                child = children[index]
+                more_a = more_b = True
+            if not more_a or not more_b:
+                if more_a or more_b:
+                    self.report(path, 'length', extent_a.start, extent_b.start,
+                            index if not more_a else None, index if not more_b else None)
+                return
+            child_a = _extent(child, self.a, offset_a, end_a)
+            child_b = _extent(child, self.b, offset_b, end_b)
+            segment = f'[{index}]' if array else _segment(child)
+            self.element(child, path + (segment,), child_a, child_b)
+            offset_a, offset_b = child_a.value_end, child_b.value_end
+            index += 1
+
+    def union(self, codec, path, extent_a, extent_b):
+        """
+        Compares the type selectors of unions and the members of the
+        alternative known by the description.
+        """
+        size = codec.selector_len
+        _require(extent_a.value_start, size, extent_a.value_end)
+        _require(extent_b.value_start, size, extent_b.value_end)
+        selector_a = codec.selector_struct.unpack_from(self.a, extent_a.value_start)[0]
+        selector_b = codec.selector_struct.unpack_from(self.b, extent_b.value_start)[0]
+        if selector_a != selector_b:
+            self.report(path + ('selector',), 'value', extent_a.value_start,
+                    extent_b.value_start, selector_a, selector_b)
+        elif selector_a == codec.selector and codec.member is not None:
+            member = codec.member
+            self.element(member, path + ('member',),
+                    _extent(member, self.a, extent_a.value_start + size, extent_a.value_end),
+                    _extent(member, self.b, extent_b.value_start + size, extent_b.value_end))
+
+    def basic_items(self, element, path, extent_a, extent_b):
+        size = element.size
+        count_a = (extent_a.value_end - extent_a.value_start) // size
+        count_b = (extent_b.value_end - extent_b.value_start) // size
+        offset_a, offset_b = extent_a.value_start, extent_b.value_start
+        for index in range(0, min(count_a, count_b)):
+            if not self.equal(offset_a, offset_a + size, offset_b, offset_b + size):
+                self.report(path + (f'[{index}]',), 'value', offset_a, offset_b,
+                        element.struct.unpack_from(self.a, offset_a)[0],
+                        element.struct.unpack_from(self.b, offset_b)[0])
+            offset_a += size
+            offset_b += size
+        if count_a != count_b:
+            self.report(path, 'length', extent_a.start, extent_b.start, count_a, count_b)
+
+    def _tagged(self, codec, buffer, extent):
+        members = {}
+        offset, end = extent.value_start, extent.value_end
+        while offset < end:
+            _require(offset, TAG_LENGTH, end)
+            wiretype, data_id = unpack_tag_from(buffer, offset)
+            member = codec.members_by_data_id.get(data_id)
+            if member is None:
+                member_end = skip_member(buffer, offset + TAG_LENGTH, end, wiretype)
+                member_extent = _Extent(offset, wiretype, offset + TAG_LENGTH, member_end)
+            else:
+                member_extent = _extent(member, buffer, offset + TAG_LENGTH, end,
+                        wiretype)._replace(start=offset)
+            members.setdefault(data_id, member_extent)
+            offset = member_extent.value_end
+        return members
+
+    def tagged_members(self, codec, path, extent_a, extent_b):
+        """
+        Compares the members of structs identified by their data IDs.
+        """
+        members_a = self._tagged(codec, self.a, extent_a)
+        members_b = self._tagged(codec, self.b, extent_b)
+        for data_id, member_a in members_a.items():
+            member_b = members_b.get(data_id)
+            member_path = path + (str(data_id),)
+            if member_b is None:
+                self.report(member_path, 'missing', member_a.start, None)
+                continue
+            member = codec.members_by_data_id.get(data_id)
+            if member is None:
+                if not self.equal(member_a.start, member_a.value_end,
+                        member_b.start, member_b.value_end):
+                    self.report(member_path, 'value', member_a.start, member_b.start)
+            else:
+                self.element(member, member_path, member_a, member_b)
+        for data_id, member_b in members_b.items():
+            if data_id not in members_a:
+                self.report(path + (str(data_id),), 'added', None, member_b.start)
+
+
+class _Done(Exception):
+    pass
+
+
+def diff(description, buffer_a, buffer_b, max_differences=None, name="Message Payload") \
+        -> list:
+    """
+    Compares the serialized payloads `buffer_a` and `buffer_b` (bytes-like
+    objects) following the structure of `description`, a compiled `Codec` or
+    a description (compiled on each call, use `compile_description()` when
+    comparing many payloads).
+
+    Return:
+        List of `Difference`s, empty if the payloads are equal. At most
+        `max_differences` differences are reported, if given.
+
+    Raises a `ValueError` if a payload is malformed.
+    """
+    codec = description if isinstance(description, Codec) \
+            else compile_description(description, name)
+    differ = _Differ(buffer_a, buffer_b, max_differences)
+    if differ.equal(0, len(differ.a), 0, len(differ.b)):
+        return []
+    extent_a = _extent(codec, differ.a, 0, len(differ.a))
+    extent_b = _extent(codec, differ.b, 0, len(differ.b))
+    path = (str(codec.name),)
+    try:
+        differ.element(codec, path, extent_a, extent_b)
+        # Trailing data behind the top-level element
+        if not differ.equal(extent_a.value_end, len(differ.a), extent_b.value_end, len(differ.b)):
+            differ.report(path, 'length', extent_a.value_end, extent_b.value_end)
+    except _Done:
+        pass
+    return differ.differences
@@ -3,8 +3,6 @@
 :license: BSD, see LICENSE for details.
 """
 
-import logging
-import json
 import os
 
 from enum import Enum
@@ -13,12 +11,25 @@ from ..datatypes.basic import \
         Boolean, \
         Uint8, Uint16, Uint32, Uint64, \
         Sint8, Sint16, Sint32, Sint64, \
-        Float32, Float64
-from ..datatypes.complex import Array, String, Struct
+        Float32, Float64, \
+        Bitfield
+from ..datatypes.complex import Array, MultiArray, String, Struct, Union
 from ..datatypes import Preserialized
+from ..datatypes.consts import Types
 
 
-logger = logging.getLogger("SOMEIP")
+_LOGGER = None
+
+def _logger():
+    """
+    The "SOMEIP" logger, `logging` is only imported when it is needed.
+    """
+    global _LOGGER # pylint: disable=global-statement
+    if _LOGGER is None:
+        # pylint: disable=import-outside-toplevel
+        import logging
+        _LOGGER = logging.getLogger("SOMEIP")
+    return _LOGGER
 
 class _CATEGORY(Enum):
     BASIC = 0
@@ -40,6 +51,8 @@ _TYPE_MAP={
         "string":       (String,        _CATEGORY.COMPLEX       ),
         "array":        (Array,         _CATEGORY.COMPLEX       ),
         "struct":       (Struct,  _CATEGORY.COMPLEX       ),
+        "bitfield":     (Bitfield,      _CATEGORY.BASIC         ),
+        "union":        (Union,         _CATEGORY.COMPLEX       ),
         "serialized":   (Preserialized, _CATEGORY.PRESERIALIZED ),
         }
 
@@ -58,7 +71,7 @@ def _get_fields(element, key):
             element['name'] if 'name' in element else key
             )
 
-    logger.debug('JSON fields: %s.', fields)
+    _logger().debug('JSON fields: %s.', fields)
     return fields
 
 
@@ -68,7 +81,13 @@ def _serialize_basic(key, element, instance_type):
 
     data_id, value, wiretype, length, _unused, name = _get_fields(element, key)
 
-    return instance_type(value, data_id, wiretype=wiretype, name=name, length=length)
+    little_endian = element.get('little_endian', False)
+    if instance_type == Bitfield:
+        return instance_type(value, data_id, wiretype=wiretype, name=name, length=length,
+                bits=element.get('bits', 8), flags=element.get('flags'),
+                little_endian=little_endian)
+    return instance_type(value, data_id, wiretype=wiretype, name=name, length=length,
+            little_endian=little_endian)
 
 
 def _serialize_array_of_dicts(key, element, instance_type):
@@ -99,7 +118,8 @@ def _serialize_array_with_element_type(key, element, instance_type, element_type
                 {
                     'dataID': None,
                     'value': array_entry,
-                    'type': element_type
+                    'type': element_type,
+                    'little_endian': element.get('little_endian', False)
                 } if category == _CATEGORY.BASIC \
                         else array_entry,
                 element_type)
@@ -109,9 +129,31 @@ def _serialize_array_with_element_type(key, element, instance_type, element_type
     return instance_type(parsed_values, data_id, wiretype=wiretype, name=name,
             length=length, lengthfield_len=lengthfield_len)
 
+def _is_multi_array(element, value):
+    return 'elementtype' in element and ('shape' in element \
+            or len(value) > 0 and isinstance(value[0], list))
+
+
+def _serialize_multi_array(key, element):
+    data_id, value, wiretype, length, lengthfield_len, name = _get_fields(element, key)
+    element_type = element['elementtype'].lower()
+    if _TYPE_MAP.get(element_type, (None, None))[1] != _CATEGORY.BASIC:
+        raise ValueError('Multi-dimensional arrays need a basic type "elementtype"'\
+                f' (failed element: "{key}")')
+    if element.get('little_endian', False):
+        raise ValueError(f'Multi-dimensional arrays are always big-endian (failed element: "{key}")')
+
+    return MultiArray(value, data_id, wiretype=wiretype, name=name, length=length,
+            lengthfield_len=lengthfield_len, elementtype=Types[element_type.upper()],
+            shape=element.get('shape'))
+
+
 def _serialize_array(key, element, instance_type):
     _, value, _, _, _, _ = _get_fields(element, key)
 
+    if _is_multi_array(element, value):
+        return _serialize_multi_array(key, element)
+
     has_dicts = False
     for array_element in value:
         if isinstance(array_element, dict):
@@ -140,8 +182,9 @@ def _serialize_struct(key, element, instance_type):
     for struct_element_key, struct_element in value.items():
         parsed_values.append(_serialize_element(struct_element_key, struct_element))
 
+    # The uniqueness of data IDs is not validated for descriptions
     retval = instance_type(parsed_values, data_id, wiretype=wiretype, name=name,
-            length=length, lengthfield_len=lengthfield_len)
+            length=length, lengthfield_len=lengthfield_len, unique_data_ids=False)
 
     return retval
 
@@ -157,6 +200,19 @@ def _serialize_string(key, element, instance_type):
             bom=bom, padding=padding)
 
 
+def _serialize_union(key, element, instance_type):
+    data_id, value, wiretype, length, lengthfield_len, name = _get_fields(element, key)
+    if value is not None and not isinstance(value, dict):
+        raise ValueError('The value of a union must be a data type definition or null'\
+                f' (failed element: "{key}")')
+    member = _serialize_element(None, value) if value is not None else None
+    selector = element['selector'] if 'selector' in element else (0 if member is None else 1)
+
+    return instance_type(member, selector, data_id, wiretype=wiretype, name=name,
+            length=length, lengthfield_len=lengthfield_len,
+            selector_len=element.get('selector_len', 4))
+
+
 def _serialize_complex_type(key, element, instance_type):
     retval = None
     _ensure_mandatory_fields(key, element)
@@ -167,6 +223,8 @@ def _serialize_complex_type(key, element, instance_type):
         retval = _serialize_string(key, element, instance_type)
     elif instance_type == Struct:
         retval = _serialize_struct(key, element, instance_type)
+    elif instance_type == Union:
+        retval = _serialize_union(key, element, instance_type)
     else:
         raise ValueError(f'Unknown element instance type: {instance_type}')
     return retval
@@ -199,7 +257,7 @@ def _serialize_element(key, element):
     parsed = None
     if 'type' in element:
         etype = element['type'].lower()
-        logger.debug("Parsing element: %s = %s", str(key), str(element))
+        _logger().debug("Parsing element: %s = %s", key, element)
         parsed = _serialize_element_by_type(key, element, etype)
     else:
         raise ValueError(f'Each JSON element must contain a "type" field (failed element: "{key}")')
@@ -242,6 +300,8 @@ def loads(description, name="Message Payload") -> bytearray:
     if not isinstance(description, str):
         raise ValueError(
                 f'Expected a str type containing a data type description, got {type(description)}')
+    # pylint: disable=import-outside-toplevel
+    import json
     json_content = json.loads(description)
     return loadd(json_content, name=name)
 
@@ -259,6 +319,8 @@ def load(file_like, name="Message Payload") -> bytearray:
     Return:
         Parsed structure as `someip.tlv.datatypes` objects.
     """
+    # pylint: disable=import-outside-toplevel
+    import json
     json_content = json.load(file_like)
     return loadd(json_content, name=name)
 
@@ -281,6 +343,6 @@ def load_from_file(filename, name="Message Payload") -> bytearray:
     if not (os.path.exists(filename) and os.path.isfile(filename)):
         raise ValueError(f'Not a file, does not exist or not readable: "{filename}"')
 
-    logger.info("Serializing message in file: '%s'.", filename)
+    _logger().info("Serializing message in file: '%s'.", filename)
     with open(filename, 'r') as json_file:
         return load(json_file, name=name)
@@ -0,0 +1,468 @@
+"""
+Sans-IO incremental ("push") decoder for serialized SOME/IP TLV payloads.
+
+The `IncrementalDecoder` does not perform any I/O, data is pushed into it in
+arbitrary fragments using `feed()`. It keeps its state between calls
+(partially read tags, length fields and values as well as the stack of nested
+complex types), so no data is ever decoded twice and the work per byte stays
+constant, no matter how the input is fragmented.
+
+Each call of `feed()` returns the events that completed with the fed data:
+`MessageDecoded` for each completed top-level element and, if enabled,
+`ElementStarted`, `ValueDecoded` and `ElementFinished` events for the nested
+elements.
+
+    decoder = IncrementalDecoder(compile_description(description))
+    for fragment in fragments:
+        for event in decoder.feed(fragment):
+            ...
+
+:copyright: Copyright 2021 by the Florian Münchbach.
+:license: BSD, see LICENSE for details.
+"""
+
+import struct
+from typing import NamedTuple, Any
+
+from .decoder import Codec, _BasicCodec, _StructCodec, _ArrayCodec, _StringCodec, \
+        _UnionCodec, _PreserializedCodec, _VALUE_WIDTH_BY_WIRETYPE
+from ..datatypes.consts import Types, TAG_LENGTH
+from ..datatypes.type_helpers import unpack_tag_from, unpack_lengthfield_from, \
+        get_lengthfield_width_by_wiretype
+from ...transport.header import Header, HEADER_LENGTH
+
+
+class ElementStarted(NamedTuple):
+    """
+    The tag and length field (if any) of a complex element have been read.
+    """
+    name: str
+    element_type: Types
+    data_id: int
+    depth: int
+
+
+class ValueDecoded(NamedTuple):
+    """
+    A basic type, string, union or pre-serialized element has been decoded.
+
+    Unions are read as a whole using their length field, `value` is the
+    decoded member (None for empty unions).
+    """
+    name: str
+    element_type: Types
+    data_id: int
+    value: Any
+    depth: int
+
+
+class ElementFinished(NamedTuple):
+    """
+    A complex element has been decoded completely.
+    """
+    name: str
+    element_type: Types
+    data_id: int
+    depth: int
+
+
+class MessageDecoded(NamedTuple):
+    """
+    A top-level element has been decoded completely.
+
+    The header is only set for framed decoders.
+    """
+    element: Any
+    header: Header = None
+
+
+# Decoder steps, the second member of each step tuple is the number of bytes
+# the step needs at least.
+_ADVANCE=0
+_HEADER=1
+_TAG=2
+_LENGTHFIELD=3
+_VALUE=4
+_RAW=5
+_ITEMS=6
+_SKIP=7
+_SKIP_LENGTHFIELD=8
+
+_ADVANCE_STEP=(_ADVANCE, 0)
+
+
+class _Frame:
+    """
+    State of a complex element (struct or array) being decoded.
+    """
+    __slots__ = ('codec', 'data_id', 'wiretype', 'lengthfield_len', 'end', 'limit',
+            'items', 'index', 'remaining')
+
+    def __init__(self, codec, data_id, wiretype, lengthfield_len, end, limit, remaining):
+        self.codec = codec
+        self.data_id = data_id
+        self.wiretype = wiretype
+        self.lengthfield_len = lengthfield_len
+        # end of the value, None for static types without known length
+        self.end = end
+        # the innermost known end of this or any of the enclosing elements
+        self.limit = limit
+        self.items = []
+        self.index = 0
+        self.remaining = remaining
+
+
+class IncrementalDecoder:
+    """
+    Sans-IO decoder for a stream of serialized payloads.
+
+    Args:
+        - codec     compiled description (see `decoder.compile_description()`)
+                    of the top-level element
+        - framed    if True, each payload is expected to be preceded by a
+                    SOME/IP header, which limits the payload length. Otherwise,
+                    the payloads are expected back to back.
+        - events    if True, events for all nested elements are emitted,
+                    otherwise only `MessageDecoded` events.
+
+    After a decoding error, the decoder must be `reset()`.
+    """
+    def __init__(self, codec: Codec, framed=False, events=False):
+        self._codec = codec
+        self._framed = framed
+        self._emit_events = events
+        self._events = []
+        self.reset()
+
+    def reset(self):
+        """
+        Discards all state, e.g. after a decoding error.
+        """
+        self._stack = []
+        self._partial = bytearray()
+        self._position = 0
+        self._step = _ADVANCE_STEP
+        self._header = None
+        self._message_end = None
+        self._root_started = False
+        self._error = None
+
+    @property
+    def position(self) -> int:
+        """
+        Number of bytes consumed since creation or the last `reset()`.
+        """
+        return self._position
+
+    @property
+    def at_message_boundary(self) -> bool:
+        """
+        True, if no data of an incomplete message has been fed.
+        """
+        return not self._stack and self._header is None and self._step is _ADVANCE_STEP
+
+    def feed(self, data) -> list:
+        """
+        Pushes the next fragment of `data` (any bytes-like object) into the
+        decoder.
+
+        Return:
+            List of events that completed with this fragment.
+        """
+        if self._error is not None:
+            raise ValueError(f'Decoder failed before, reset required: {self._error}')
+        self._events = events = []
+        view = memoryview(data).cast('B')
+        try:
+            self._run(view)
+        except ValueError as exc:
+            self._error = exc
+            raise
+        return events
+
+    def _run(self, view):
+        pos = 0
+        end = len(view)
+        while True:
+            step = self._step
+            kind = step[0]
+            if kind == _ADVANCE:
+                if pos == end and not self._stack and self._header is None:
+                    break
+                self._advance()
+                continue
+            if pos == end and step[1] > 0:
+                break
+
+            if kind == _ITEMS:
+                pos = self._read_items(view, pos)
+            elif kind == _SKIP:
+                skipped = min(step[1], end - pos)
+                pos += skipped
+                self._position += skipped
+                self._step = (_SKIP, step[1] - skipped) if skipped < step[1] else _ADVANCE_STEP
+            else:
+                chunk, pos = self._take(view, pos, step[1])
+                if chunk is not None:
+                    self._handle(step, chunk)
+
+    def _take(self, view, pos, size):
+        """
+        Returns `size` bytes, either directly from the view or buffered over
+        several fragments, or None if not enough data is available yet.
+        """
+        available = len(view) - pos
+        if not self._partial and available >= size:
+            self._position += size
+            return view[pos:pos + size], pos + size
+
+        needed = min(size - len(self._partial), available)
+        self._partial += view[pos:pos + needed]
+        self._position += needed
+        pos += needed
+        if len(self._partial) < size:
+            return None, pos
+        chunk = bytes(self._partial)
+        self._partial.clear()
+        return chunk, pos
+
+    @property
+    def _limit(self):
+        return self._stack[-1].limit if self._stack else self._message_end
+
+    def _set_read(self, kind, size, *args):
+        limit = self._limit
+        if limit is not None and self._position + size > limit:
+            raise ValueError(
+                    f'Element exceeds the enclosing length: need {size} byte(s) at offset'\
+                    f' {self._position}, only {limit - self._position} available.')
+        self._step = (kind, size, *args)
+
+    def _emit(self, event):
+        if self._emit_events:
+            self._events.append(event)
+
+    def _handle(self, step, chunk):
+        kind = step[0]
+        if kind == _VALUE:
+            _unused, _size, codec, wiretype, data_id = step
+            value = codec.struct.unpack_from(chunk)[0]
+            self._emit(ValueDecoded(codec.name, codec.element_type, data_id, value,
+                    len(self._stack)))
+            self._deliver(codec.make(value, data_id, wiretype))
+        elif kind == _TAG:
+            wiretype, data_id = unpack_tag_from(chunk)
+            codec = step[2]
+            if codec is None:
+                codec = self._stack[-1].codec.members_by_data_id.get(data_id)
+                if codec is None:
+                    self._skip_unknown(wiretype)
+                    return
+            self._begin_value(codec, wiretype, data_id)
+        elif kind == _LENGTHFIELD:
+            _unused, width, codec, wiretype, data_id = step
+            self._begin_complex(codec, wiretype, data_id, width,
+                    unpack_lengthfield_from(chunk, 0, width) + codec.uncounted_len)
+        elif kind == _RAW:
+            _unused, _size, codec, wiretype, data_id, lengthfield_len = step
+            if isinstance(codec, _PreserializedCodec):
+                element = codec.make(chunk)
+                value = element.serialized_value
+            elif isinstance(codec, _UnionCodec):
+                element = codec._decode_items(chunk, 0, len(chunk), len(chunk), wiretype,
+                        data_id, lengthfield_len)[0]
+                value = element.member
+            else:
+                element = codec.make(chunk, data_id, wiretype, lengthfield_len)
+                value = element.string
+            self._emit(ValueDecoded(codec.name, codec.element_type, data_id, value,
+                    len(self._stack)))
+            self._deliver(element)
+        elif kind == _SKIP_LENGTHFIELD:
+            self._set_read(_SKIP, unpack_lengthfield_from(chunk, 0, step[1]))
+        elif kind == _HEADER:
+            self._header = Header.unpack_from(chunk)
+            self._message_end = self._position + self._header.payload_length
+            self._step = _ADVANCE_STEP
+
+    def _skip_unknown(self, wiretype):
+        if wiretype in _VALUE_WIDTH_BY_WIRETYPE:
+            self._set_read(_SKIP, _VALUE_WIDTH_BY_WIRETYPE[wiretype])
+        elif wiretype in (5, 6, 7):
+            self._set_read(_SKIP_LENGTHFIELD, get_lengthfield_width_by_wiretype(wiretype))
+        else:
+            raise ValueError(
+                    f'Can not skip unknown member with wire type {wiretype}'\
+                    f' at offset {self._position}.')
+
+    def _begin_element(self, codec):
+        if codec.data_id is not None:
+            self._set_read(_TAG, TAG_LENGTH, codec)
+        else:
+            self._begin_value(codec, codec.wiretype, None)
+
+    def _begin_value(self, codec, wiretype, data_id):
+        if isinstance(codec, _BasicCodec):
+            self._set_read(_VALUE, codec.size, codec, wiretype, data_id)
+        elif isinstance(codec, _PreserializedCodec):
+            self._set_read(_RAW, codec.length, codec, wiretype, data_id, None)
+        else:
+            width = codec.lengthfield_width(wiretype)
+            if width > 0:
+                self._set_read(_LENGTHFIELD, width, codec, wiretype, data_id)
+            else:
+                self._begin_complex(codec, wiretype, data_id, 0, None)
+
+    def _begin_complex(self, codec, wiretype, data_id, lengthfield_len, length):
+        if isinstance(codec, _StringCodec):
+            self._set_read(_RAW, codec.static_length if length is None else length,
+                    codec, wiretype, data_id, lengthfield_len)
+            return
+        if isinstance(codec, _UnionCodec):
+            if length is None:
+                raise ValueError('Unions without length field can not be decoded'\
+                        f' incrementally (failed element: "{codec.name}")')
+            self._set_read(_RAW, length, codec, wiretype, data_id, lengthfield_len)
+            return
+
+        remaining = None
+        if length is None:
+            if isinstance(codec, _ArrayCodec) and codec.static_length is not None:
+                length = codec.static_length
+            elif isinstance(codec, _ArrayCodec) and isinstance(codec.element, _BasicCodec):
+                length = codec.static_count * codec.element.size
+            elif isinstance(codec, _ArrayCodec):
+                remaining = codec.static_count
+            elif not self._stack and self._framed:
+                # A static top-level struct ends with the payload
+                length = self._message_end - self._position
+
+        end = None
+        limit = self._limit
+        if length is not None:
+            end = self._position + length
+            if limit is not None and end > limit:
+                raise ValueError(
+                        f'Element length {length} at offset {self._position} exceeds'\
+                        f' the enclosing length by {end - limit} byte(s).')
+            limit = end
+            if isinstance(codec, _ArrayCodec) and isinstance(codec.element, _BasicCodec) \
+                    and length % codec.element.size != 0:
+                raise ValueError(
+                        f'Array length {length} is not a multiple of the'\
+                        f' item size {codec.element.size} (failed element: "{codec.name}")')
+
+        self._emit(ElementStarted(codec.name, codec.element_type, data_id, len(self._stack)))
+        self._stack.append(_Frame(codec, data_id, wiretype, lengthfield_len, end, limit,
+                remaining))
+        self._step = _ADVANCE_STEP
+
+    def _advance(self):
+        """
+        Determines the next step after an element has been completed.
+        """
+        if not self._stack:
+            self._advance_message()
+            return
+
+        frame = self._stack[-1]
+        codec = frame.codec
+        if isinstance(codec, _StructCodec):
+            if frame.end is not None and codec.by_data_id:
+                if self._position < frame.end:
+                    self._set_read(_TAG, TAG_LENGTH, None)
+                    return
+            elif frame.index < len(codec.members):
+                frame.index += 1
+                self._begin_element(codec.members[frame.index - 1])
+                return
+            elif frame.end is not None and self._position < frame.end:
+                # Skip unknown trailing data of extended structs
+                self._set_read(_SKIP, frame.end - self._position)
+                return
+        else:
+            if frame.end is not None:
+                more = self._position < frame.end
+            else:
+                more = frame.remaining > 0
+            if more:
+                if isinstance(codec.element, _BasicCodec):
+                    self._step = (_ITEMS, 1)
+                else:
+                    if frame.remaining is not None:
+                        frame.remaining -= 1
+                    self._begin_element(codec.element)
+                return
+
+        self._stack.pop()
+        self._emit(ElementFinished(codec.name, codec.element_type, frame.data_id,
+                len(self._stack)))
+        self._deliver(codec.make(frame.items, frame.data_id, frame.wiretype,
+                frame.lengthfield_len))
+
+    def _advance_message(self):
+        if self._framed:
+            if self._header is None:
+                self._set_read(_HEADER, HEADER_LENGTH)
+            elif not self._root_started:
+                self._root_started = True
+                self._begin_element(self._codec)
+            elif self._position < self._message_end:
+                # Skip trailing data behind the top-level element
+                self._set_read(_SKIP, self._message_end - self._position)
+            else:
+                self._header = None
+                self._message_end = None
+                self._root_started = False
+                self._step = _ADVANCE_STEP
+        else:
+            self._begin_element(self._codec)
+
+    def _deliver(self, element):
+        self._step = _ADVANCE_STEP
+        if self._stack:
+            self._stack[-1].items.append(element)
+        else:
+            self._events.append(MessageDecoded(element, self._header))
+
+    def _read_items(self, view, pos):
+        """
+        Decodes as many items of an array of basic types as available at
+        once.
+        """
+        frame = self._stack[-1]
+        codec = frame.codec
+        element = codec.element
+        size = element.size
+
+        if self._partial:
+            chunk, pos = self._take(view, pos, size)
+            if chunk is None:
+                return pos
+            values = element.struct.unpack_from(chunk)
+            self._add_items(frame, values)
+        else:
+            wanted = (frame.end - self._position) // size
+            count = min(wanted, (len(view) - pos) // size)
+            if count > 0:
+                values = struct.unpack_from(
+                        f'{element.byte_order}{count}{element.format_character}', view, pos)
+                pos += count * size
+                self._position += count * size
+                self._add_items(frame, values)
+            if count < wanted and pos < len(view):
+                # Buffer the incomplete item
+                _unused, pos = self._take(view, pos, size)
+                return pos
+
+        self._step = _ADVANCE_STEP
+        return pos
+
+    def _add_items(self, frame, values):
+        codec = frame.codec
+        if self._emit_events:
+            depth = len(self._stack)
+            element = codec.element
+            self._events.extend(ValueDecoded(element.name, element.element_type, None, value, depth)
+                    for value in values)
+        frame.items.extend(codec.make_basic_items(values))
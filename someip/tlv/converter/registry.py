@@ -0,0 +1,298 @@
+"""
+Registry of message payload descriptions dispatched by message ID.
+
+A registry loads a directory of description files once, compiles them and
+dispatches decoding and encoding by service ID, method (or event) ID and
+message type using a single dictionary lookup:
+
+    registry = SchemaRegistry('descriptions/')
+    message = registry.decode(0x1234, 0x8001, MessageType.NOTIFICATION, payload)
+
+Each description file (`*.json`) contains one message shape:
+
+    {
+        "serviceID": "0x1234",
+        "methodID": "0x8001",
+        "messageType": "NOTIFICATION",
+        "payload": { ...description in the JSON format... }
+    }
+
+IDs are numbers or (hex) strings, the message type is a number or the name
+of a `MessageType`.
+
+`reload()` picks up changed, added and removed files. The shapes are swapped
+as a whole, i.e. readers never wait for a reload and always see a consistent
+set of shapes.
+
+:copyright: Copyright 2021 by the Florian Münchbach.
+:license: BSD, see LICENSE for details.
+"""
+
+import json
+import os
+import sys
+import threading
+import types
+from typing import NamedTuple, Optional
+
+from . import json_parser
+from .decoder import Codec, compile_description
+from ..datatypes.serializable import Serializable
+from ...transport.header import Header, MessageType, HEADER_LENGTH
+
+
+class Shape(NamedTuple):
+    """
+    A registered message shape.
+
+    - service_id    service ID
+    - method_id     method or event ID
+    - message_type  message type
+    - description   the payload description
+    - codec         the compiled description
+    - prototype     the data type tree of the description, cloned for
+                    encoding (must not be modified), None for descriptions
+                    that can only be decoded (e.g. pre-serialized data
+                    given by length)
+    - path          the description file, None if registered directly
+    - memory        approximate memory used by description, codec and
+                    prototype in bytes
+    """
+    service_id: int
+    method_id: int
+    message_type: int
+    description: dict
+    codec: Codec
+    prototype: Optional[Serializable]
+    path: str
+    memory: int
+
+
+class Reload(NamedTuple):
+    """
+    Result of `SchemaRegistry.reload()`.
+
+    - loaded    files (re-)loaded
+    - removed   files removed since the last reload
+    - failed    files that could not be loaded mapped to the error message,
+                the previously loaded version (if any) stays registered and
+                the file is retried once it changes
+    """
+    loaded: list
+    removed: list
+    failed: dict
+
+
+def _key(service_id, method_id, message_type):
+    return (service_id << 24) | (method_id << 8) | message_type
+
+
+def _parse_id(value, field, maximum):
+    if isinstance(value, str):
+        value = int(value, 0)
+    if not isinstance(value, int) or value not in range(0, maximum + 1):
+        raise ValueError(f'"{field}" must be in the range [0,0x{maximum:X}] (is {value})')
+    return value
+
+
+def _parse_message_type(value):
+    if isinstance(value, str) and value.upper() in MessageType.__members__:
+        return int(MessageType[value.upper()])
+    return _parse_id(value, 'messageType', 0xFF)
+
+
+def _deep_size(obj, seen=None) -> int:
+    """
+    Approximate memory used by `obj` and all objects it references (classes,
+    functions and modules are not counted).
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen or isinstance(obj, (type, types.ModuleType, types.FunctionType,
+            types.BuiltinFunctionType)):
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_deep_size(key, seen) + _deep_size(value, seen)
+                for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(_deep_size(item, seen) for item in obj)
+    if hasattr(obj, '__dict__'):
+        size += _deep_size(vars(obj), seen)
+    for slot in getattr(type(obj), '__slots__', ()):
+        size += _deep_size(getattr(obj, slot, None), seen)
+    return size
+
+
+class SchemaRegistry:
+    """
+    Message shapes by service ID, method ID and message type.
+
+    Args:
+        - directory     directory containing the description files (optional,
+                        shapes can be registered using `register()`)
+        - strict        if set, the initial load raises a `ValueError` for
+                        files that can not be loaded
+    """
+    def __init__(self, directory=None, strict=True):
+        self.directory = directory
+        # Replaced as a whole on changes, never modified in place
+        self._shapes = {}
+        # path -> (stat signature, key), key is None for failed files
+        self._files = {}
+        self._lock = threading.Lock()
+        if directory is not None:
+            result = self.reload()
+            if strict and result.failed:
+                raise ValueError('Failed loading descriptions: ' + '; '.join(
+                        f'{path}: {error}' for path, error in result.failed.items()))
+
+    def __len__(self):
+        return len(self._shapes)
+
+    def __iter__(self):
+        return iter(self._shapes.values())
+
+    def __contains__(self, ids):
+        return _key(*ids) in self._shapes
+
+    def shape(self, service_id, method_id, message_type) -> Shape:
+        """
+        Returns the registered `Shape`, raises a `KeyError` for unknown IDs.
+        """
+        shape = self._shapes.get(_key(service_id, method_id, message_type))
+        if shape is None:
+            raise KeyError(f'No description registered for service 0x{service_id:04X},'\
+                    f' method 0x{method_id:04X}, message type 0x{message_type:02X}')
+        return shape
+
+    def decode(self, service_id, method_id, message_type, payload):
+        """
+        Decodes `payload` using the description registered for the IDs.
+        """
+        return self.shape(service_id, method_id, message_type).codec.decode(payload)
+
+    def decode_message(self, message):
+        """
+        Decodes the payload of a complete SOME/IP `message` (header and
+        payload), dispatched by its header.
+
+        Return:
+            The `Header` and the decoded payload.
+        """
+        header = Header.unpack_from(message)
+        end = HEADER_LENGTH + header.payload_length
+        if end > len(message):
+            raise ValueError(f'Message truncated: need {end} bytes, got {len(message)}')
+        payload = memoryview(message)[HEADER_LENGTH:end]
+        return header, self.decode(header.service_id, header.method_id, header.message_type,
+                payload)
+
+    def encode(self, service_id, method_id, message_type, values=None) -> bytearray:
+        """
+        Serializes the description registered for the IDs.
+
+        `values` (a `dict`) updates the values of the description's top-level
+        struct by member name or data ID (see `Struct.update()`). The tree
+        loaded on registration is cloned, only the updated members are
+        copied.
+        """
+        shape = self.shape(service_id, method_id, message_type)
+        if shape.prototype is None:
+            # Raises the error of loading the description
+            json_parser.loadd(shape.description)
+        message = shape.prototype.clone()
+        if values:
+            message.update(values)
+        return message.serialization
+
+    def memory_usage(self) -> dict:
+        """
+        Approximate memory used per shape in bytes, by (service ID, method
+        ID, message type).
+        """
+        return {(shape.service_id, shape.method_id, shape.message_type): shape.memory
+                for shape in self._shapes.values()}
+
+    def register(self, service_id, method_id, message_type, description, path=None) -> Shape:
+        """
+        Compiles and registers `description` for the IDs, replacing a shape
+        registered before.
+        """
+        service_id = _parse_id(service_id, 'serviceID', 0xFFFF)
+        method_id = _parse_id(method_id, 'methodID', 0xFFFF)
+        message_type = _parse_message_type(message_type)
+        shape = self._compile(service_id, method_id, message_type, description, path)
+        with self._lock:
+            shapes = dict(self._shapes)
+            shapes[_key(service_id, method_id, message_type)] = shape
+            self._shapes = shapes
+        return shape
+
+    def reload(self) -> Reload:
+        """
+        Loads description files added or changed (by modification time and
+        size) since the last reload and drops the shapes of removed files.
+        """
+        with self._lock:
+            loaded, failed = [], {}
+            shapes = dict(self._shapes)
+            files = {}
+            for name in sorted(os.listdir(self.directory)):
+                path = os.path.join(self.directory, name)
+                if not name.endswith('.json') or not os.path.isfile(path):
+                    continue
+                stat = os.stat(path)
+                signature = (stat.st_mtime_ns, stat.st_size)
+                previous = self._files.get(path)
+                if previous is not None and previous[0] == signature:
+                    files[path] = previous
+                    continue
+                try:
+                    shape = self._load_file(path)
+                    key = _key(shape.service_id, shape.method_id, shape.message_type)
+                    other = shapes.get(key)
+                    if other is not None and other.path != path:
+                        raise ValueError(f'IDs already registered by {other.path}')
+                except (OSError, ValueError, NotImplementedError) as error:
+                    # Keeps a previously loaded version, retried once changed
+                    failed[path] = str(error)
+                    files[path] = (signature, previous[1] if previous is not None else None)
+                    continue
+                if previous is not None and previous[1] not in (None, key):
+                    shapes.pop(previous[1], None)
+                shapes[key] = shape
+                files[path] = (signature, key)
+                loaded.append(path)
+
+            removed = [path for path in self._files if path not in files]
+            for path in removed:
+                key = self._files[path][1]
+                if key is not None:
+                    shapes.pop(key, None)
+            self._files = files
+            self._shapes = shapes
+        return Reload(loaded, removed, failed)
+
+    def _load_file(self, path) -> Shape:
+        with open(path, 'r') as description_file:
+            content = json.load(description_file)
+        if not isinstance(content, dict) or 'payload' not in content:
+            raise ValueError('Expected an object with "serviceID", "methodID",'\
+                    ' "messageType" and "payload" members')
+        return self._compile(
+                _parse_id(content.get('serviceID'), 'serviceID', 0xFFFF),
+                _parse_id(content.get('methodID'), 'methodID', 0xFFFF),
+                _parse_message_type(content.get('messageType')),
+                content['payload'], path)
+
+    @staticmethod
+    def _compile(service_id, method_id, message_type, description, path) -> Shape:
+        codec = compile_description(description)
+        try:
+            prototype = json_parser.loadd(description)
+        except ValueError:
+            prototype = None
+        return Shape(service_id, method_id, message_type, description, codec, prototype, path,
+                _deep_size(description) + _deep_size(codec) + _deep_size(prototype))
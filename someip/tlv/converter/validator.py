@@ -0,0 +1,428 @@
+"""
+Validation of serialized SOME/IP TLV payloads against a description.
+
+The payload is walked along the tag and length field structure given by a
+compiled description (see `decoder.compile_description()`), no data type
+objects are created. All violations found are reported, validation continues
+behind a malformed element wherever its end can still be determined.
+
+    codec = compile_description(description)
+    violations = validate(codec, payload)
+    if violations:
+        reject(payload, violations)
+
+A codec is translated once into a tree of checking functions, which is cached
+for later calls with the same codec.
+
+:copyright: Copyright 2021 by the Florian Münchbach.
+:license: BSD, see LICENSE for details.
+"""
+
+import weakref
+from typing import NamedTuple
+
+from .decoder import Codec, _BasicCodec, _StructCodec, _ArrayCodec, _StringCodec, \
+        _UnionCodec, _PreserializedCodec, _VALUE_WIDTH_BY_WIRETYPE, skip_member, \
+        compile_description
+from ..datatypes.consts import Types, TAG_LENGTH, WIRETYPE_COMPLEX_TYPE_STATIC_LEN
+from ..datatypes.traits import UINT_TRAITS
+
+
+class Violation(NamedTuple):
+    """
+    A violation of the description found in a serialized payload.
+
+    - path      path of the element: data IDs of tagged members, names of
+                untagged members and `[index]` of array items, separated by
+                `/`
+    - offset    offset of the element (or of the offending field) in the
+                payload
+    - kind      'truncated' (not enough data), 'wiretype', 'data_id' (tag of
+                an unexpected data ID), 'length' (length field overruns the
+                enclosing element or does not fit the type), 'value'
+                (invalid boolean or string encoding, unknown selector of
+                a union without length field), 'missing' (described
+                member not found), 'duplicate' (member received twice) or
+                'trailing' (data behind the top-level element)
+    - message   human-readable description
+    """
+    path: str
+    offset: int
+    kind: str
+    message: str
+
+
+_LENGTHFIELD_STRUCTS={width: UINT_TRAITS[width].codec for width in (1, 2, 4)}
+
+# Checking functions by codec
+_COMPILED=weakref.WeakKeyDictionary()
+
+
+class _Done(Exception):
+    pass
+
+
+def _format_path(path):
+    """
+    Formats a path given as linked (parent, segment) tuples. Array indices
+    are given as `int`, array items themselves have no segment (None).
+    """
+    segments = []
+    while path is not None:
+        path, segment = path
+        if segment is not None:
+            segments.append(f'[{segment}]' if isinstance(segment, int) else segment)
+    return '/'.join(reversed(segments))
+
+
+class _Violations(list):
+    def __init__(self, max_violations):
+        super().__init__()
+        self.max_violations = max_violations
+
+    def add(self, path, offset, kind, message):
+        self.append(Violation(_format_path(path), offset, kind, message))
+        if self.max_violations is not None and len(self) >= self.max_violations:
+            raise _Done()
+
+    def truncated(self, path, offset, size, end):
+        self.add(path, offset, 'truncated',
+                f'Need {size} byte(s) at offset {offset}, only {max(end - offset, 0)} available.')
+
+
+def _skip(buffer, offset, end, wiretype):
+    try:
+        return skip_member(buffer, offset, end, wiretype)
+    except ValueError:
+        return None
+
+
+# The checking functions for values have the signature
+#   value(buffer, offset, end, wiretype, parent, violations) -> offset
+# with `offset` pointing behind the tag, `parent` the path of the enclosing
+# element and return the offset behind the value, None if its end can not be
+# determined. The path of the element itself is only created if needed.
+
+def _compile_basic(codec, segment):
+    size = codec.struct.size
+    tagged = codec.data_id is not None
+    wiretypes = {codec.wiretype, codec.default_wiretype}
+    boolean = codec.element_type == Types.BOOLEAN
+    type_name = codec.element_type.name
+
+    def value(buffer, offset, end, wiretype, parent, violations):
+        if tagged and wiretype not in wiretypes:
+            violations.add((parent, segment), offset - TAG_LENGTH, 'wiretype',
+                    f'Wire type {wiretype} does not match type {type_name}.')
+            return _skip(buffer, offset, end, wiretype)
+        if offset + size > end:
+            violations.truncated((parent, segment), offset, size, end)
+            return None
+        if boolean and buffer[offset] > 1:
+            violations.add((parent, segment), offset, 'value',
+                    f'Invalid boolean value 0x{buffer[offset]:02X}.')
+        return offset + size
+    return value
+
+
+def _compile_preserialized(codec, segment):
+    length = codec.length
+
+    def value(buffer, offset, end, wiretype, parent, violations):
+        if offset + length > end:
+            violations.truncated((parent, segment), offset, length, end)
+            return None
+        return offset + length
+    return value
+
+
+def _compile_complex(codec, segment, content):
+    """
+    Checks wire type and length field of a complex type and calls
+    `content(buffer, offset, end, value_end, path, violations)` for the value,
+    `value_end` being None for types without length field.
+    """
+    tagged = codec.data_id is not None
+    type_name = codec.element_type.name
+    widths = {wiretype: codec.lengthfield_width(wiretype)
+            for wiretype in (WIRETYPE_COMPLEX_TYPE_STATIC_LEN, 5, 6, 7)}
+    static_width = codec.lengthfield_len
+    uncounted_len = codec.uncounted_len
+
+    def value(buffer, offset, end, wiretype, parent, violations):
+        path = (parent, segment)
+        if tagged:
+            width = widths.get(wiretype)
+            if width is None:
+                violations.add(path, offset - TAG_LENGTH, 'wiretype',
+                        f'Wire type {wiretype} is not valid for complex type {type_name}.')
+                return _skip(buffer, offset, end, wiretype) \
+                        if wiretype in _VALUE_WIDTH_BY_WIRETYPE else None
+        else:
+            width = static_width
+
+        if width == 0:
+            return content(buffer, offset, end, None, path, violations)
+        if offset + width > end:
+            violations.truncated(path, offset, width, end)
+            return None
+        length = _LENGTHFIELD_STRUCTS[width].unpack_from(buffer, offset)[0]
+        value_end = offset + width + uncounted_len + length
+        if value_end > end:
+            violations.add(path, offset, 'length',
+                    f'Length field value {length} overruns the'\
+                    f' enclosing element by {value_end - end} byte(s).')
+            return None
+        return content(buffer, offset + width, end, value_end, path, violations)
+    return value
+
+
+def _compile_struct(codec, segment):
+    members = [_compile_element(member, _segment(member)) for member in codec.members]
+    members_by_data_id = {member.data_id: _compile_value(member, str(member.data_id))
+            for member in codec.members if member.data_id is not None}
+    by_data_id = codec.by_data_id
+    # Fast path: value sizes of basic members (without value checks) by
+    # their expected tag
+    basic_sizes = {}
+    for member in codec.members:
+        if isinstance(member, _BasicCodec) and member.data_id is not None \
+                and member.element_type != Types.BOOLEAN:
+            for wiretype in (member.wiretype, member.default_wiretype):
+                if wiretype is not None:
+                    basic_sizes[(wiretype << 12) | member.data_id] = member.size
+
+    def content(buffer, offset, end, value_end, path, violations):
+        if value_end is None or not by_data_id:
+            limit = end if value_end is None else value_end
+            for member in members:
+                offset = member(buffer, offset, limit, path, violations)
+                if offset is None:
+                    return value_end
+            # Unknown trailing data of extended structs is allowed
+            return offset if value_end is None else value_end
+
+        seen = set()
+        while offset < value_end:
+            if offset + TAG_LENGTH > value_end:
+                violations.truncated(path, offset, TAG_LENGTH, value_end)
+                return value_end
+            tag = (buffer[offset] << 8) | buffer[offset + 1]
+            data_id = tag & 0xFFF
+            if data_id in seen:
+                violations.add((path, str(data_id)), offset, 'duplicate',
+                        f'Member with data ID {data_id} received more than once.')
+            seen.add(data_id)
+            size = basic_sizes.get(tag)
+            if size is not None and offset + TAG_LENGTH + size <= value_end:
+                offset += TAG_LENGTH + size
+                continue
+            wiretype = tag >> 12
+            member = members_by_data_id.get(data_id)
+            if member is not None:
+                next_offset = member(buffer, offset + TAG_LENGTH, value_end, wiretype, path,
+                        violations)
+            else:
+                # Unknown members are skipped
+                next_offset = _skip(buffer, offset + TAG_LENGTH, value_end, wiretype)
+                if next_offset is None:
+                    violations.add((path, str(data_id)), offset, 'wiretype',
+                            f'Can not skip unknown member with wire type {wiretype}.')
+            if next_offset is None:
+                return value_end
+            offset = next_offset
+
+        if len(seen) < len(members_by_data_id) or not seen.issuperset(members_by_data_id):
+            for data_id in members_by_data_id:
+                if data_id not in seen:
+                    violations.add((path, str(data_id)), value_end, 'missing',
+                            f'Member with data ID {data_id} not found.')
+        return value_end
+
+    return _compile_complex(codec, segment, content)
+
+
+def _compile_basic_array(codec, segment):
+    size = codec.element.size
+    boolean = codec.element.element_type == Types.BOOLEAN
+    static_length = codec.static_length
+    static_count = codec.static_count
+
+    def content(buffer, offset, end, value_end, path, violations):
+        if value_end is None and static_length is not None:
+            value_end = offset + static_length
+        if value_end is None:
+            items_end = offset + static_count * size
+        else:
+            items_end = value_end
+            if (value_end - offset) % size != 0:
+                violations.add(path, offset, 'length',
+                        f'Array length {value_end - offset} is not a multiple of the'\
+                        f' item size {size}.')
+        if items_end > end:
+            violations.truncated(path, offset, items_end - offset, end)
+            return None
+        if boolean and bytes(buffer[offset:items_end]).strip(b'\x00\x01'):
+            violations.add(path, offset, 'value', 'Invalid boolean value in array.')
+        return items_end
+
+    return _compile_complex(codec, segment, content)
+
+
+def _compile_array(codec, segment):
+    if isinstance(codec.element, _BasicCodec):
+        return _compile_basic_array(codec, segment)
+
+    static_length = codec.static_length
+    static_count = codec.static_count
+    # Items are named by their index, given as parent path
+    item = _compile_element(codec.element, None)
+
+    def content(buffer, offset, end, value_end, path, violations):
+        if value_end is None and static_length is not None:
+            if offset + static_length > end:
+                violations.truncated(path, offset, static_length, end)
+                return None
+            value_end = offset + static_length
+        if value_end is None:
+            for index in range(0, static_count):
+                offset = item(buffer, offset, end, (path, index), violations)
+                if offset is None:
+                    return None
+            return offset
+        index = 0
+        while offset < value_end:
+            offset = item(buffer, offset, value_end, (path, index), violations)
+            if offset is None:
+                break
+            index += 1
+        return value_end
+
+    return _compile_complex(codec, segment, content)
+
+
+def _compile_string(codec, segment):
+    static_length = codec.static_length
+
+    def content(buffer, offset, end, value_end, path, violations):
+        if value_end is None:
+            value_end = offset + static_length
+            if value_end > end:
+                violations.truncated(path, offset, static_length, end)
+                return None
+        try:
+            str(buffer[offset:value_end], encoding='utf-8', errors='strict')
+        except UnicodeDecodeError as error:
+            violations.add(path, offset + error.start, 'value',
+                    f'Invalid UTF-8 string: {error.reason}.')
+        return value_end
+
+    return _compile_complex(codec, segment, content)
+
+
+def _compile_union(codec, segment):
+    selector_len = codec.selector_len
+    selector_struct = codec.selector_struct
+    known_selector = codec.selector
+    member = _compile_element(codec.member, 'member') \
+            if codec.member is not None else None
+
+    def content(buffer, offset, end, value_end, path, violations):
+        limit = end if value_end is None else value_end
+        if offset + selector_len > limit:
+            violations.truncated(path, offset, selector_len, limit)
+            return None if value_end is None else value_end
+        selector = selector_struct.unpack_from(buffer, offset)[0]
+        offset += selector_len
+        if selector == known_selector and member is not None:
+            offset = member(buffer, offset, limit, path, violations)
+        elif selector != 0 and value_end is None:
+            violations.add(path, offset - selector_len, 'value',
+                    f'Unknown selector {selector} of a union without length field.')
+            return None
+        # Other alternatives are skipped by the length field
+        return offset if value_end is None else value_end
+
+    return _compile_complex(codec, segment, content)
+
+
+def _compile_value(codec, segment):
+    if isinstance(codec, _BasicCodec):
+        return _compile_basic(codec, segment)
+    if isinstance(codec, _StructCodec):
+        return _compile_struct(codec, segment)
+    if isinstance(codec, _ArrayCodec):
+        return _compile_array(codec, segment)
+    if isinstance(codec, _StringCodec):
+        return _compile_string(codec, segment)
+    if isinstance(codec, _UnionCodec):
+        return _compile_union(codec, segment)
+    if isinstance(codec, _PreserializedCodec):
+        return _compile_preserialized(codec, segment)
+    raise NotImplementedError(f'Unknown codec {type(codec).__name__}')
+
+
+def _compile_element(codec, segment):
+    """
+    Returns a function `element(buffer, offset, end, parent, violations)`
+    checking an element including its tag.
+    """
+    data_id = codec.data_id
+    default_wiretype = codec.wiretype
+    value = _compile_value(codec, segment)
+
+    if data_id is None:
+        def element(buffer, offset, end, parent, violations):
+            return value(buffer, offset, end, default_wiretype, parent, violations)
+        return element
+
+    def element(buffer, offset, end, parent, violations):
+        if offset + TAG_LENGTH > end:
+            violations.truncated((parent, segment), offset, TAG_LENGTH, end)
+            return None
+        wiretype = buffer[offset] >> 4
+        received_data_id = ((buffer[offset] & 0x0F) << 8) | buffer[offset + 1]
+        if received_data_id != data_id:
+            violations.add((parent, segment), offset, 'data_id',
+                    f'Expected data ID {data_id}, got {received_data_id}.')
+        return value(buffer, offset + TAG_LENGTH, end, wiretype, parent, violations)
+    return element
+
+
+def _segment(codec):
+    return str(codec.data_id) if codec.data_id is not None else str(codec.name)
+
+
+def _compiled(codec):
+    element = _COMPILED.get(codec)
+    if element is None:
+        element = _compile_element(codec, str(codec.name))
+        _COMPILED[codec] = element
+    return element
+
+
+def validate(description, buffer, max_violations=None, name="Message Payload") -> list:
+    """
+    Validates the serialized payload `buffer` (bytes-like object) against
+    `description`, a compiled `Codec` or a description (compiled on each call,
+    use `compile_description()` when validating many payloads).
+
+    Return:
+        List of `Violation`s, empty if the payload is valid. At most
+        `max_violations` violations are reported, if given (use 1 to only
+        accept or reject payloads).
+    """
+    codec = description if isinstance(description, Codec) \
+            else compile_description(description, name)
+    element = _compiled(codec)
+    if not isinstance(buffer, (bytes, bytearray)):
+        buffer = memoryview(buffer).cast('B')
+    violations = _Violations(max_violations)
+    try:
+        offset = element(buffer, 0, len(buffer), None, violations)
+        if offset is not None and offset < len(buffer):
+            violations.add((None, str(codec.name)), offset, 'trailing',
+                    f'{len(buffer) - offset} byte(s) of trailing data.')
+    except _Done:
+        pass
+    return list(violations)
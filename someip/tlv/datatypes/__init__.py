@@ -1,9 +1,18 @@
-from .consts import Types
-from .preserialized import Preserialized
+from ..._lazy import lazy_loader
 
 __all__ = [
         'basic',
         'complex',
+        'Frozen',
         'Preserialized',
+        'SerializationCache',
         'Types'
         ]
+
+# Modules are imported on first access only
+__getattr__, __dir__ = lazy_loader(__name__, submodules=('basic', 'complex'), attributes={
+        'Frozen': 'frozen',
+        'Preserialized': 'preserialized',
+        'SerializationCache': 'serialization_cache',
+        'Types': 'consts',
+        })
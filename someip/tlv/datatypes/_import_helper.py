@@ -3,3 +3,16 @@ try:
 except ImportError:
     from backports.cached_property import cached_property
 
+
+
+def import_numpy():
+    """
+    Imports NumPy, which is an optional dependency, on first use.
+    """
+    try:
+        # pylint: disable=import-outside-toplevel
+        import numpy
+    except ImportError as error:
+        raise ImportError(
+                'NumPy is required for ndarray support (pip install someip[numpy])') from error
+    return numpy
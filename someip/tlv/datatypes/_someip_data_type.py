@@ -13,6 +13,16 @@ from .type_helpers import generate_tag, get_wiretype_from_element,\
 from .serializable import Serializable
 
 
+def _unpickle(descriptor, data):
+    """
+    Rebuilds a data type pickled by `_SomeIPDataType.__reduce__()`.
+    """
+    element, offset = descriptor[0]._from_shape_descriptor(descriptor, memoryview(data), 0)
+    if offset != len(data):
+        raise ValueError(f'Pickled data does not match its shape descriptor:'\
+                f' {len(data) - offset} trailing byte(s)')
+    return element
+
 
 class _SomeIPDataType(Serializable):
     """
@@ -21,6 +31,9 @@ class _SomeIPDataType(Serializable):
     This class has *no* value, as that one depends on the specific
     implementation.
     """
+    # Number of data IDs changed after construction, indexes by data ID (see
+    # Struct) are rebuilt when it changed
+    _data_id_changes = 0
     def __init__(self, elementtype, dataID : int, wiretype=None, name=None, length=None):
         """
         Args:
@@ -45,6 +58,31 @@ class _SomeIPDataType(Serializable):
         self.length = length
 
 
+    def __reduce__(self):
+        """
+        Pickles the data type compactly, e.g. for handing message trees to
+        worker processes: instead of the attributes of every node, a shape
+        descriptor (classes and settings, but no values, see
+        `_shape_descriptor()`) and the serialization holding the values are
+        pickled. Equal shapes of array items are pickled once.
+
+        Unpickling parses the serialization along the descriptor. Arrays of
+        basic types and strings create their item objects only when they are
+        accessed.
+        """
+        # Serializing first resolves the automatic length field widths
+        data = bytes(self.serialization)
+        return (_unpickle, (self._shape_descriptor(), data))
+
+    def __copy__(self):
+        # Plain copy of the attributes, see clone(); pickling would serialize
+        copied = self.__class__.__new__(self.__class__)
+        copied.__dict__.update(self.__dict__)
+        return copied
+
+    def _shape_descriptor(self):
+        return (self.__class__, self._name, self._data_id, self._wiretype, self._length)
+
     # Make read-only members read only
     type = property(operator.attrgetter("_type"))
     name = property(operator.attrgetter("_name"))
@@ -62,8 +100,10 @@ class _SomeIPDataType(Serializable):
         Override the data_id written into the tag field (if any, i.e. if
         `data_id != None`) during serialization.
         """
-        if data_id not in range(0, 0xFFF + 1) and data_id is not None:
+        if data_id is not None and data_id not in range(0, 0xFFF + 1):
             raise ValueError(f'DataID must be in the range [0,0xFFF] or None (is {data_id})')
+        if getattr(self, '_data_id', data_id) != data_id:
+            _SomeIPDataType._data_id_changes += 1
         self._data_id = data_id
 
 
@@ -121,17 +161,20 @@ class _SomeIPDataType(Serializable):
     _INDENT_INCREMENT=4
     _BYTES_PER_ROW=4
 
-    def print_details(self, indent=0, cwidth=15, hide_tag=False):
+    def iter_details(self, indent=0, cwidth=15, hide_tag=False, max_items=None,
+            max_depth=None):
         data_indent=indent + _SomeIPDataType._INDENT_INCREMENT
         title = f'{self.name}({self.type.name})' if self.name is not None else self.type.name
-        tag = generate_tag(self.wiretype, self.data_id)
-        strings= [f'{"":>{3*_SomeIPDataType._BYTES_PER_ROW - 1}} | {"":>{indent}}{title}:']
+        yield f'{"":>{3*_SomeIPDataType._BYTES_PER_ROW - 1}} | {"":>{indent}}{title}:'
         if not hide_tag:
-            strings.append(format_bytearray_description_table(
-                tag,
+            yield format_bytearray_description_table(
+                generate_tag(self.wiretype, self.data_id),
                 f'{"":>{data_indent}}Tag (Wire Type: {self.wiretype}; Data ID: {self.data_id})',
-                _SomeIPDataType._BYTES_PER_ROW))
-        return '\n'.join(strings)
+                _SomeIPDataType._BYTES_PER_ROW)
+
+    @staticmethod
+    def _elision_line(indent, text):
+        return f'{"":>{3*_SomeIPDataType._BYTES_PER_ROW - 1}} | {"":>{indent}}... ({text})'
 
 
     def _pretty_print(self, indent=0, cwidth=15):
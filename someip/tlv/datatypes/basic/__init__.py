@@ -2,7 +2,8 @@ from .basic_types import \
         Boolean, \
         Uint8, Uint16, Uint32, Uint64, \
         Sint8, Sint16, Sint32, Sint64, \
-        Float32, Float64
+        Float32, Float64, \
+        Bitfield
 
 __all__ = [
         'Boolean',
@@ -16,4 +17,5 @@ __all__ = [
         'Sint64',
         'Float32',
         'Float64',
+        'Bitfield',
         ]
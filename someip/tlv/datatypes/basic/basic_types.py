@@ -5,10 +5,11 @@
 
 import operator
 from abc import abstractmethod
-import struct
 
 from someip.tlv.datatypes.consts import Types
-from someip.tlv.datatypes.type_helpers import generate_tag, format_bytearray_description_table
+from someip.tlv.datatypes.traits import TRAITS, UINT_TRAITS
+from someip.tlv.datatypes.type_helpers import generate_tag, format_bytearray_description_table,\
+        tag_length, pack_tag_into
 from someip.tlv.datatypes._someip_data_type import _SomeIPDataType
 
 class _BasicDataType(_SomeIPDataType):
@@ -21,14 +22,52 @@ class _BasicDataType(_SomeIPDataType):
             elementtype,
             value,
             dataID,
-            pack_format : str,
             wiretype=None,
             name=None,
-            length=None
+            length=None,
+            little_endian=False
         ):
+        """
+        Args:
+            - little_endian     serialize the value in little-endian byte
+                                order instead of the network byte order
+                                required by SOME/IP (for non-standard
+                                deployments)
+        """
+        self._little_endian = bool(little_endian)
         super().__init__(elementtype, dataID, wiretype, name, length)
+        self._codec = self._select_codec()
         self.value = value
-        self._pack_format = pack_format
+
+    def _select_codec(self):
+        """
+        Precompiled `struct.Struct` packing the value.
+        """
+        traits = TRAITS[self._type]
+        return traits.codec_le if self._little_endian else traits.codec
+
+    def _shape_options(self):
+        """
+        Further constructor arguments of the shape descriptor as (name,
+        value) pairs.
+        """
+        return (('little_endian', True),) if self._little_endian else ()
+
+    def _shape_descriptor(self):
+        return super()._shape_descriptor() + (self._shape_options(),)
+
+    @classmethod
+    def _from_shape_descriptor(cls, descriptor, data, offset, tagged=True):
+        """
+        Items of arrays of basic types are serialized without tag, they are
+        rebuilt with `tagged` set to False.
+        """
+        _, name, data_id, wiretype, length, options = descriptor
+        element = cls(0, data_id, wiretype, name, length, **dict(options))
+        if tagged:
+            offset += tag_length(data_id)
+        element.value = element._codec.unpack_from(data, offset)[0]
+        return element, offset + element._codec.size
 
     @abstractmethod
     def _check_value(self, value):
@@ -38,6 +77,25 @@ class _BasicDataType(_SomeIPDataType):
         value.
         """
 
+    def _check_range(self, value, message):
+        """
+        Checks that the integer `value` is within the range of the type.
+        """
+        traits = TRAITS[self._type]
+        if type(value) is int: # pylint: disable=unidiomatic-typecheck
+            if traits.minimum <= value <= traits.maximum:
+                return value
+        elif value in range(traits.minimum, traits.maximum + 1):
+            return value
+        raise ValueError(message)
+
+    @property
+    def little_endian(self):
+        """
+        True if the value is serialized in little-endian byte order.
+        """
+        return self._little_endian
+
     @property
     def value(self):
         """
@@ -52,20 +110,16 @@ class _BasicDataType(_SomeIPDataType):
         """
         self._value = self._check_value(value)
 
+    def assign(self, value):
+        self.value = value
+
     @property
     def length(self):
         if self._length is not None:
             return self._length
-        else:
-            for length, types in [
-                    (1, (Types.BOOLEAN, Types.UINT8, Types.SINT8)),
-                    (2, (Types.UINT16, Types.SINT16)),
-                    (4, (Types.UINT32, Types.SINT32, Types.FLOAT32)),
-                    (8, (Types.UINT64, Types.SINT64, Types.FLOAT64))
-                    ]:
-                if self.type in types:
-                    return length
+        if self._codec is None:
             raise ValueError("Failed to compute length, either specify it or fix element type.")
+        return self._codec.size
 
     @length.setter
     def length(self, length):
@@ -78,7 +132,7 @@ class _BasicDataType(_SomeIPDataType):
 
     @property
     def serialized_value(self):
-        return struct.pack(self._pack_format, self.value)
+        return self._codec.pack(self.value)
 
     @property
     def serialization(self):
@@ -87,6 +141,22 @@ class _BasicDataType(_SomeIPDataType):
 
         return tmp
 
+    @property
+    def serialization_length(self):
+        return tag_length(self.data_id) + self._value_size
+
+    @property
+    def _value_size(self):
+        """
+        Actual number of bytes of the serialized value.
+        """
+        return self._codec.size
+
+    def _serialize_into(self, buffer, offset):
+        offset = pack_tag_into(buffer, offset, self.wiretype, self.data_id)
+        self._codec.pack_into(buffer, offset, self.value)
+        return offset + self._codec.size
+
     @property
     def lengthfield(self):
         return bytearray()
@@ -99,17 +169,15 @@ class _BasicDataType(_SomeIPDataType):
     def _short_print(self, additional=[]):
         return super()._short_print(additional=[f'val: {self.value}'])
 
-    def print_details(self, indent=0, cwidth=15, hide_tag=False):
+    def iter_details(self, indent=0, cwidth=15, hide_tag=False, max_items=None,
+            max_depth=None):
         data_indent = indent + __class__._INDENT_INCREMENT
-        strings = [
-                super().print_details(indent, cwidth, hide_tag),
-                format_bytearray_description_table(
-                    self.serialized_value,
-                    f'{"":>{data_indent}}{"Value":<{cwidth}}: {self.value}',
-                    __class__._BYTES_PER_ROW
-                    )
-                ]
-        return '\n'.join(strings)
+        yield from super().iter_details(indent, cwidth, hide_tag, max_items, max_depth)
+        yield format_bytearray_description_table(
+                self.serialized_value,
+                f'{"":>{data_indent}}{"Value":<{cwidth}}: {self.value}',
+                __class__._BYTES_PER_ROW
+                )
 
 
 
@@ -126,35 +194,35 @@ class Boolean(_BasicDataType):
             raise ValueError("Value must be convertible to boolean.")
         return bool(value)
 
-    def __init__(self, value, dataID, wiretype=None, name=None, length=None):
+    def __init__(self, value, dataID, wiretype=None, name=None, length=None,
+            little_endian=False):
         super().__init__(
                 Types.BOOLEAN,
                 value,
                 dataID,
-                '!?',
                 wiretype,
                 name,
-                length)
+                length,
+                little_endian)
 
 class Uint8(_BasicDataType):
     """
     8-bit unsigned integer data type.
     """
 
-    def __init__(self, value, dataID, wiretype=None, name=None, length=None):
+    def __init__(self, value, dataID, wiretype=None, name=None, length=None,
+            little_endian=False):
         super().__init__(
                 Types.UINT8,
                 value,
                 dataID,
-                '!B',
                 wiretype,
                 name,
-                length)
+                length,
+                little_endian)
 
     def _check_value(self, value):
-        if value not in range(0, 0xFF + 1):
-            raise ValueError("uint8 value must be in [0, 2^8 - 1].")
-        return value
+        return self._check_range(value, "uint8 value must be in [0, 2^8 - 1].")
 
 
 class Uint16(_BasicDataType):
@@ -162,20 +230,19 @@ class Uint16(_BasicDataType):
     16-bit unsigned integer data type.
     """
 
-    def __init__(self, value, dataID, wiretype=None, name=None, length=None):
+    def __init__(self, value, dataID, wiretype=None, name=None, length=None,
+            little_endian=False):
         super().__init__(
                 Types.UINT16,
                 value,
                 dataID,
-                '!H',
                 wiretype,
                 name,
-                length)
+                length,
+                little_endian)
 
     def _check_value(self, value):
-        if value not in range(0, 0xFFFF + 1):
-            raise ValueError("uint16 value must be in [0, 2^16 - 1].")
-        return value
+        return self._check_range(value, "uint16 value must be in [0, 2^16 - 1].")
 
 
 
@@ -184,20 +251,19 @@ class Uint32(_BasicDataType):
     32-bit unsigned integer data type.
     """
 
-    def __init__(self, value, dataID, wiretype=None, name=None, length=None):
+    def __init__(self, value, dataID, wiretype=None, name=None, length=None,
+            little_endian=False):
         super().__init__(
                 Types.UINT32,
                 value,
                 dataID,
-                '!I',
                 wiretype,
                 name,
-                length)
+                length,
+                little_endian)
 
     def _check_value(self, value):
-        if value not in range(0, 0xFFFFFFFF + 1):
-            raise ValueError("uint32 value must be in [0, 2^32 - 1].")
-        return value
+        return self._check_range(value, "uint32 value must be in [0, 2^32 - 1].")
 
 
 class Uint64(_BasicDataType):
@@ -205,20 +271,19 @@ class Uint64(_BasicDataType):
     64-bit unsigned integer data type.
     """
 
-    def __init__(self, value, dataID, wiretype=None, name=None, length=None):
+    def __init__(self, value, dataID, wiretype=None, name=None, length=None,
+            little_endian=False):
         super().__init__(
                 Types.UINT64,
                 value,
                 dataID,
-                '!Q',
                 wiretype,
                 name,
-                length)
+                length,
+                little_endian)
 
     def _check_value(self, value):
-        if value not in range(0, 0xFFFFFFFFFFFFFFFF + 1):
-            raise ValueError("uint32 value must be in [0, 2^64 - 1].")
-        return value
+        return self._check_range(value, "uint32 value must be in [0, 2^64 - 1].")
 
 
 
@@ -227,20 +292,19 @@ class Sint8(_BasicDataType):
     8-bit signed integer data type.
     """
 
-    def __init__(self, value, dataID, wiretype=None, name=None, length=None):
+    def __init__(self, value, dataID, wiretype=None, name=None, length=None,
+            little_endian=False):
         super().__init__(
                 Types.SINT8,
                 value,
                 dataID,
-                '!b',
                 wiretype,
                 name,
-                length)
+                length,
+                little_endian)
 
     def _check_value(self, value):
-        if value not in range(-128,128):
-            raise ValueError("sint8 value must be in [-128,127].")
-        return value
+        return self._check_range(value, "sint8 value must be in [-128,127].")
 
 
 class Sint16(_BasicDataType):
@@ -248,20 +312,19 @@ class Sint16(_BasicDataType):
     16-bit signed integer data type.
     """
 
-    def __init__(self, value, dataID, wiretype=None, name=None, length=None):
+    def __init__(self, value, dataID, wiretype=None, name=None, length=None,
+            little_endian=False):
         super().__init__(
                 Types.SINT16,
                 value,
                 dataID,
-                '!h',
                 wiretype,
                 name,
-                length)
+                length,
+                little_endian)
 
     def _check_value(self, value):
-        if value not in range(-32768,32768):
-            raise ValueError("sint16 value must be in [-32768,32767].")
-        return value
+        return self._check_range(value, "sint16 value must be in [-32768,32767].")
 
 
 class Sint32(_BasicDataType):
@@ -269,40 +332,38 @@ class Sint32(_BasicDataType):
     32-bit signed integer data type.
     """
 
-    def __init__(self, value, dataID, wiretype=None, name=None, length=None):
+    def __init__(self, value, dataID, wiretype=None, name=None, length=None,
+            little_endian=False):
         super().__init__(
                 Types.SINT32,
                 value,
                 dataID,
-                '!i',
                 wiretype,
                 name,
-                length)
+                length,
+                little_endian)
 
     def _check_value(self, value):
-        if value not in range(-2147483648,2147483648):
-            raise ValueError("sint32 value must be in [-2147483648,2147483647].")
-        return value
+        return self._check_range(value, "sint32 value must be in [-2147483648,2147483647].")
 
 class Sint64(_BasicDataType):
     """
     64-bit signed integer data type.
     """
 
-    def __init__(self, value, dataID, wiretype=None, name=None, length=None):
+    def __init__(self, value, dataID, wiretype=None, name=None, length=None,
+            little_endian=False):
         super().__init__(
                 Types.SINT64,
                 value,
                 dataID,
-                '!q',
                 wiretype,
                 name,
-                length)
+                length,
+                little_endian)
 
     def _check_value(self, value):
-        if value not in range(-9223372036854775808,9223372036854775808):
-            raise ValueError("sint64 value must be in [-9223372036854775808,9223372036854775807].")
-        return value
+        return self._check_range(value, "sint64 value must be in [-9223372036854775808,9223372036854775807].")
 
 
 
@@ -312,7 +373,8 @@ class Float32(_BasicDataType):
     Single precision 32-bit floating point data type.
     """
 
-    def __init__(self, value, dataID, wiretype=None, name=None, length=None):
+    def __init__(self, value, dataID, wiretype=None, name=None, length=None,
+            little_endian=False):
         """
         Note: Values that can not be represented exactly as 32-bit IEEE-754
         (single precision) will not be rejected but approximated when
@@ -322,10 +384,10 @@ class Float32(_BasicDataType):
                 Types.FLOAT32,
                 value,
                 dataID,
-                '!f',
                 wiretype,
                 name,
-                length)
+                length,
+                little_endian)
 
     def _check_value(self, value):
         if not isinstance(value, (int, float)):
@@ -339,7 +401,8 @@ class Float64(_BasicDataType):
     Double precision 64-bit floating point data type.
     """
 
-    def __init__(self, value, dataID, wiretype=None, name=None, length=None):
+    def __init__(self, value, dataID, wiretype=None, name=None, length=None,
+            little_endian=False):
         """
         Note: Values that can not be represented exactly as 64-bit IEEE-754
         (double precision) will not be rejected but approximated when
@@ -349,12 +412,175 @@ class Float64(_BasicDataType):
                 Types.FLOAT64,
                 value,
                 dataID,
-                '!d',
                 wiretype,
                 name,
-                length)
+                length,
+                little_endian)
 
     def _check_value(self, value):
         if not isinstance(value, (int, float)):
             raise ValueError(f'float64 value must be of float or int type, got {type(value)}')
         return float(value)
+
+
+
+class Bitfield(_BasicDataType):
+    """
+    Bitfield data type: named flags packed into one unsigned integer of 8, 16,
+    32 or 64 bits, serialized like the unsigned integer of that width.
+
+    The flags are kept as a single integer, several flags are set or tested
+    at once using masks (see `update()`, `set_bits()` and `test()`).
+    """
+
+    def __init__(self, value, dataID, wiretype=None, name=None, length=None, bits=8,
+            flags=None, little_endian=False):
+        """
+        Args:
+            - value     the packed integer or a `dict` of flag values by name
+            - bits      width of the bitfield in bits (8, 16, 32 or 64)
+            - flags     `dict` mapping flag names to their bit position or to
+                        a tuple (lowest bit, number of bits) for multi-bit
+                        fields
+        """
+        if bits not in (8, 16, 32, 64):
+            raise ValueError(f'A bitfield must have 8, 16, 32 or 64 bits, got {bits}.')
+        self._bits = bits
+        self._masks = {}
+        for flag, position in dict(flags or {}).items():
+            first, count = (position, 1) if isinstance(position, int) else position
+            if count < 1 or first < 0 or first + count > bits:
+                raise ValueError(f'Flag "{flag}" exceeds the {bits} bits of the bitfield.')
+            self._masks[flag] = ((1 << count) - 1) << first
+        super().__init__(
+                Types.BITFIELD,
+                value,
+                dataID,
+                wiretype,
+                name,
+                length,
+                little_endian)
+
+    bits = property(operator.attrgetter("_bits"))
+
+    def _shape_options(self):
+        flags = tuple((flag, ((mask & -mask).bit_length() - 1, bin(mask).count('1')))
+                for flag, mask in self._masks.items())
+        return super()._shape_options() + (('bits', self._bits), ('flags', flags))
+
+    def _select_codec(self):
+        # Packed like the unsigned integer of the same width
+        traits = UINT_TRAITS[self._bits // 8]
+        return traits.codec_le if self._little_endian else traits.codec
+
+    @property
+    def flags(self) -> dict:
+        """
+        Masks of the flags by name.
+        """
+        return dict(self._masks)
+
+    def _check_value(self, value):
+        if isinstance(value, dict):
+            value = self._merge(0, value)
+        elif value not in range(0, 1 << self._bits):
+            raise ValueError(f'bitfield value must be in [0, 2^{self._bits} - 1].')
+        return value
+
+    def _mask(self, flag):
+        mask = self._masks.get(flag)
+        if mask is None:
+            raise KeyError(flag)
+        return mask
+
+    def _merge(self, value, flags):
+        clear = 0
+        bits = 0
+        for flag, flag_value in flags.items():
+            mask = self._mask(flag)
+            shift = (mask & -mask).bit_length() - 1
+            flag_value = int(flag_value)
+            if flag_value < 0 or flag_value << shift & ~mask:
+                raise ValueError(f'Value {flag_value} does not fit into flag "{flag}".')
+            clear |= mask
+            bits |= flag_value << shift
+        return (value & ~clear) | bits
+
+    def mask(self, *flags) -> int:
+        """
+        Returns the combined mask of the named flags.
+        """
+        mask = 0
+        for flag in flags:
+            mask |= self._mask(flag)
+        return mask
+
+    def __getitem__(self, flag):
+        """
+        Returns a single bit flag as `bool`, a multi-bit field as `int`.
+        """
+        mask = self._mask(flag)
+        lowest = mask & -mask
+        value = (self._value & mask) // lowest
+        return bool(value) if mask == lowest else value
+
+    def __setitem__(self, flag, value):
+        self._value = self._merge(self._value, {flag: value})
+
+    def __contains__(self, flag):
+        return flag in self._masks
+
+    def update(self, flags):
+        """
+        Sets several flags at once from a `dict` of values by name.
+        """
+        self._value = self._merge(self._value, flags)
+
+    def as_dict(self) -> dict:
+        """
+        Returns the values of all flags by name.
+        """
+        return {flag: self[flag] for flag in self._masks}
+
+    def set_bits(self, mask):
+        """
+        Sets all bits of `mask`.
+        """
+        self.value = self._value | mask
+
+    def clear_bits(self, mask):
+        """
+        Clears all bits of `mask`.
+        """
+        self._value &= ~mask
+
+    def test(self, mask) -> bool:
+        """
+        Returns True if all bits of `mask` are set.
+        """
+        return self._value & mask == mask
+
+    @property
+    def length(self):
+        if self._length is not None:
+            return self._length
+        return self._bits // 8
+
+    @length.setter
+    def length(self, length):
+        self._length = length
+
+    def _pretty_print(self, indent=0, cwidth=15):
+        parent = super()._pretty_print(indent, cwidth)
+        data_indent = indent + __class__._INDENT_INCREMENT
+        return ''.join([parent] + [f'\n{"":>{data_indent}}{flag:<{cwidth}}: {value}'
+                for flag, value in self.as_dict().items()])
+
+    def iter_details(self, indent=0, cwidth=15, hide_tag=False, max_items=None,
+            max_depth=None):
+        yield from super().iter_details(indent, cwidth, hide_tag, max_items, max_depth)
+        data_indent = indent + __class__._INDENT_INCREMENT
+        for flag, value in self.as_dict().items():
+            yield format_bytearray_description_table(
+                    b'', f'{"":>{data_indent}}{flag:<{cwidth}}: {value}',
+                    __class__._BYTES_PER_ROW)
@@ -1,8 +1,12 @@
 from .array_types import Array, String
+from .multi_array import MultiArray
 from .struct_types import Struct
+from .union_types import Union
 
 __all__ = [
         'Array',
+        'MultiArray',
         'String',
         'Struct',
+        'Union',
         ]
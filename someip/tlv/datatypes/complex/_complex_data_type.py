@@ -4,13 +4,14 @@
 """
 
 from abc import abstractmethod
-import operator
 
 from .._someip_data_type import _SomeIPDataType
 from ..consts  import WIRETYPE_COMPLEX_TYPE_STATIC_LEN
 from ..type_helpers import get_lengthfield_width_by_wiretype, \
         format_bytearray_description_table, serialize_lengthfield, \
-        check_lengthfield_length
+        check_lengthfield_length, generate_tag, tag_length, pack_tag_into, \
+        pack_lengthfield_into, get_minimal_lengthfield_width, \
+        get_wiretype_by_lengthfield_width
 from ..serializable import Serializable
 
 
@@ -24,13 +25,109 @@ class _ComplexDataType(_SomeIPDataType):
             length=None,
             lengthfield_len=None
         ):
+        """
+        If neither `wiretype` nor `lengthfield_len` is given, the smallest
+        length field (1, 2 or 4 bytes) holding the length is chosen and the
+        wire type (5, 6 or 7) written into the tag follows from it. Untagged
+        elements need either of them, a receiver could not tell the width.
+        """
+        # Needed by the length setter and _set_items() already
+        self._auto_lengthfield = False
+        self._lengthfield_len = None
+        # Items already copied after cloning (by id), None if no item is
+        # shared with a clone, see clone()
+        self._private = None
 
         super().__init__(elementtype, dataID, wiretype=wiretype, name=name, length=length)
 
         self._set_items(items)
         self.lengthfield_length = lengthfield_len
 
-    items = property(operator.attrgetter("_items"))
+    @property
+    def items(self):
+        # The list is handed out as it is, so all items shared with a clone
+        # are copied. get() and [] of structs copy only the item accessed.
+        if self._private is not None:
+            for position in range(0, len(self._items)):
+                self._private_item(position)
+            self._private = None
+        return self._items
+
+    def clone(self):
+        clone = super().clone()
+        clone._copy_item_list()
+        # The items are shared from now on, both copy them on first access
+        self._private = {}
+        clone._private = {}
+        return clone
+
+    def _copy_item_list(self):
+        """
+        Replaces the (shared) containers of a fresh clone by copies.
+        """
+        self._items = list(self._items)
+
+    def _private_item(self, position):
+        """
+        Returns the item at `position`, copying it first if it is still shared
+        with a clone.
+        """
+        element = self._items[position]
+        private = self._private
+        if private is None or id(element) in private:
+            return element
+        copied = element.clone()
+        self._items[position] = copied
+        private[id(copied)] = copied
+        self._replace_item(element, copied)
+        return copied
+
+    def _private_member(self, element):
+        """
+        Like `_private_item()`, for an item given by object.
+        """
+        if self._private is None or id(element) in self._private:
+            return element
+        position = next(i for i, item in enumerate(self._items) if item is element)
+        return self._private_item(position)
+
+    def _add_private(self, items):
+        """
+        Marks newly added items as not shared with a clone.
+        """
+        if self._private is not None:
+            for element in items:
+                self._private[id(element)] = element
+
+    def _replace_item(self, element, copied):
+        """
+        Called after the shared item `element` has been replaced by its copy.
+        """
+
+    def _shape_descriptor(self):
+        # The width of the serialized length field is needed to parse it
+        lengthfield_len = None if self._auto_lengthfield else self._lengthfield_len
+        return super()._shape_descriptor() + (lengthfield_len, self._lengthfield_len)
+
+    @staticmethod
+    def _value_offset(descriptor, offset):
+        """
+        Offset of the value behind the tag and the length field of a
+        serialized complex data type with the shape `descriptor`.
+        """
+        return offset + tag_length(descriptor[2]) + descriptor[6]
+
+    @staticmethod
+    def _items_from_shape_descriptors(descriptors, data, offset):
+        """
+        Rebuilds the items with the shape `descriptors` from `data` at
+        `offset`. Returns the items and the offset behind them.
+        """
+        items = []
+        for descriptor in descriptors:
+            element, offset = descriptor[0]._from_shape_descriptor(descriptor, data, offset)
+            items.append(element)
+        return items, offset
 
     def _check_element(self, element):
         if not isinstance(element, Serializable):
@@ -49,12 +146,16 @@ class _ComplexDataType(_SomeIPDataType):
         #TODO: Exposing lists allows appending / extending unchecked!
         self._check_items(items)
         self._items = items
+        self._private = None
+        self._invalidate_lengthfield()
 
     def clear(self):
         """
         Remove all items from this data type's list of items.
         """
         self._items.clear()
+        self._private = None
+        self._invalidate_lengthfield()
 
     def append(self, element: Serializable):
         """
@@ -62,6 +163,8 @@ class _ComplexDataType(_SomeIPDataType):
         """
         self._check_element(element)
         self._items.append(element)
+        self._add_private([element])
+        self._invalidate_lengthfield()
 
     def extend(self, items: list):
         """
@@ -69,6 +172,8 @@ class _ComplexDataType(_SomeIPDataType):
         """
         self._check_items(items)
         self._items.extend(items)
+        self._add_private(items)
+        self._invalidate_lengthfield()
 
     def insert(self, index: int, element: Serializable):
         """
@@ -76,6 +181,8 @@ class _ComplexDataType(_SomeIPDataType):
         """
         self._check_element(element)
         self._items.insert(index, element)
+        self._add_private([element])
+        self._invalidate_lengthfield()
 
 
     @property
@@ -88,31 +195,126 @@ class _ComplexDataType(_SomeIPDataType):
     def length(self, length):
         pass
 
+    @property
+    def wiretype(self):
+        if self._wiretype is not None:
+            return self._wiretype
+        return get_wiretype_by_lengthfield_width(self.lengthfield_length)
+
+    @wiretype.setter
+    def wiretype(self, wiretype):
+        _SomeIPDataType.wiretype.fset(self, wiretype)
+
+    @property
+    def _tag_wiretype(self):
+        """
+        Wire type written into the tag, using the length field width cached
+        by the last `serialization_length` traversal.
+        """
+        if self._wiretype is not None:
+            return self._wiretype
+        return get_wiretype_by_lengthfield_width(self._lengthfield_len)
+
+    @_SomeIPDataType.data_id.setter
+    def data_id(self, data_id):
+        if data_id is None and self._auto_lengthfield:
+            raise ValueError('Untagged complex data types need either a wiretype or a'\
+                    ' length field length')
+        _SomeIPDataType.data_id.fset(self, data_id)
+
     @property
     def lengthfield_length(self):
+        if self._auto_lengthfield:
+            self._lengthfield_len = get_minimal_lengthfield_width(self.length)
         return self._lengthfield_len
 
     @lengthfield_length.setter
     def lengthfield_length(self, lengthfield_len):
         if lengthfield_len is not None:
             check_lengthfield_length(lengthfield_len)
+            self._auto_lengthfield = False
             self._lengthfield_len = lengthfield_len
+        elif self._wiretype is None and self.data_id is not None:
+            # Chosen by length, see serialization_length
+            self._auto_lengthfield = True
+            self._lengthfield_len = None
         # TODO: is this limitation actually needed...? it should have one to be correct, though.
-        elif self.wiretype == WIRETYPE_COMPLEX_TYPE_STATIC_LEN:
+        elif self._wiretype == WIRETYPE_COMPLEX_TYPE_STATIC_LEN:
             raise ValueError(
                     'A complex wire type 4 data type must have a specified length field length')
         else:
-            self._lengthfield_len = get_lengthfield_width_by_wiretype(self.wiretype)
+            self._auto_lengthfield = False
+            self._lengthfield_len = get_lengthfield_width_by_wiretype(self._wiretype)
+
+    def _invalidate_lengthfield(self):
+        """
+        Drops an automatically chosen length field width after the items or
+        the length changed.
+        """
+        if self._auto_lengthfield:
+            self._lengthfield_len = None
 
     @property
     def lengthfield(self):
-        return serialize_lengthfield(self.length, self._lengthfield_len)
+        length = self.length
+        if self._auto_lengthfield:
+            self._lengthfield_len = get_minimal_lengthfield_width(length)
+        return serialize_lengthfield(length, self._lengthfield_len)
 
     @property
     @abstractmethod
     def serialization(self):
         pass
 
+    @property
+    def serialization_length(self):
+        """
+        Determines the length bottom-up: the children's lengths are known
+        before a length field width is chosen, so one traversal caches the
+        automatically chosen widths of the whole subtree (used by
+        `serialize_into()`).
+        """
+        value_size = self._value_size
+        if self._auto_lengthfield:
+            self._lengthfield_len = get_minimal_lengthfield_width(
+                    self._counted_length(value_size) if self._length is None
+                    else self._length)
+        return tag_length(self.data_id) + self._lengthfield_len + value_size
+
+    def _counted_length(self, value_size):
+        """
+        Length field value of a serialized value of `value_size` bytes.
+        """
+        return value_size
+
+    @property
+    @abstractmethod
+    def _value_size(self):
+        """
+        Actual number of bytes of the serialized value, independent of a
+        possibly overridden `length`.
+        """
+
+    def _serialize_into(self, buffer, offset):
+        offset = pack_tag_into(buffer, offset, self._tag_wiretype, self.data_id)
+        offset = pack_lengthfield_into(buffer, offset, self.length, self._lengthfield_len)
+        return self._serialize_value_into(buffer, offset)
+
+    def _serialize_value_into(self, buffer, offset):
+        for element in self._items:
+            offset = element._serialize_into(buffer, offset)
+        return offset
+
+    def _collect_iov(self, builder):
+        lengthfield = self.lengthfield
+        builder.append(generate_tag(self._tag_wiretype, self.data_id))
+        builder.append(lengthfield)
+        self._collect_value_iov(builder)
+
+    def _collect_value_iov(self, builder):
+        for element in self._items:
+            element._collect_iov(builder)
+
     def _pretty_print_extra(self, indent=0, cwidth=15, startvalue="", endvalue=""):
         data_indent=indent + __class__._INDENT_INCREMENT
         value_indent=data_indent+ __class__._INDENT_INCREMENT
@@ -134,17 +336,60 @@ class _ComplexDataType(_SomeIPDataType):
         return self._pretty_print_extra(indent, cwidth)
 
     def _short_print(self, additional=[]):
-        return super()._short_print(additional=[f'val: {self.items}'])
+        return super()._short_print(additional=[f'val: {self._items}'])
 
-    def print_details(self, indent=0, cwidth=15, hide_tag=False):
+    def iter_details(self, indent=0, cwidth=15, hide_tag=False, max_items=None,
+            max_depth=None):
         data_indent=indent + __class__._INDENT_INCREMENT
-        strings = [
-                super().print_details(indent, cwidth, hide_tag),
-                format_bytearray_description_table(
-                    self.lengthfield,
-                    f'{"":>{data_indent}}{"Length":<{cwidth}}: {self.length}'\
-                        f' (length field: {self._lengthfield_len} byte(s)'\
-                        f'{" ommitted / fixed length type" if self._lengthfield_len == 0 else ""})',
-                    _SomeIPDataType._BYTES_PER_ROW),
-                ]
-        return '\n'.join(strings)
+        yield from super().iter_details(indent, cwidth, hide_tag, max_items, max_depth)
+        lengthfield = self.lengthfield
+        yield format_bytearray_description_table(
+                lengthfield,
+                f'{"":>{data_indent}}{"Length":<{cwidth}}: {self.length}'\
+                    f' (length field: {self._lengthfield_len} byte(s)'\
+                    f'{" ommitted / fixed length type" if self._lengthfield_len == 0 else ""})',
+                _SomeIPDataType._BYTES_PER_ROW)
+
+    def _iter_items_details(self, indent, cwidth, hide_tag, max_items, max_depth,
+            elide=True):
+        """
+        Yields the detail lines of the items, eliding items according to
+        `max_items` (if `elide` is set) and `max_depth`.
+        """
+        count = self._item_count()
+        if max_depth is not None and max_depth <= 0:
+            if count:
+                yield self._elision_line(indent, f'{count} item(s) not shown')
+            return
+
+        child_depth = None if max_depth is None else max_depth - 1
+        elided = 0
+        head, tail = count, count
+        if elide and max_items is not None and count > 2 * max_items:
+            elided = count - 2 * max_items
+            head, tail = max_items, count - max_items
+
+        for element in self._item_range(0, head):
+            yield from self._iter_item_details(
+                    element, indent, cwidth, hide_tag, max_items, child_depth)
+        if elided:
+            yield self._elision_line(indent, f'{elided} item(s) elided')
+        for element in self._item_range(tail, count):
+            yield from self._iter_item_details(
+                    element, indent, cwidth, hide_tag, max_items, child_depth)
+
+    def _item_count(self):
+        """
+        Number of items, without creating lazily stored item objects.
+        """
+        return len(self._items)
+
+    def _item_range(self, start, end):
+        """
+        Returns the items #`start` to #`end` - 1. Lazily stored item objects
+        are only created for this range and are not kept.
+        """
+        return self._items[start:end]
+
+    def _iter_item_details(self, element, indent, cwidth, hide_tag, max_items, max_depth):
+        yield from element.iter_details(indent, cwidth, hide_tag, max_items, max_depth)
@@ -4,13 +4,53 @@
 """
 
 import operator
+import struct
 
 from ._complex_data_type import _ComplexDataType
-from ..basic import Uint8
+from .._import_helper import import_numpy
+from ..basic import \
+        Boolean, \
+        Uint8, Uint16, Uint32, Uint64, \
+        Sint8, Sint16, Sint32, Sint64, \
+        Float32, Float64
 from ..consts  import Types
 from ..type_helpers import is_arrayish, is_basic_type, is_complex_type,\
         is_preserialized_type, generate_tag
 from ..serializable import Serializable
+from ..traits import struct_format
+
+
+# Big-endian NumPy dtype and item class by basic type
+_NUMPY_TYPES={
+        Types.BOOLEAN:  ('>?',  Boolean),
+        Types.UINT8:    ('>u1', Uint8),
+        Types.SINT8:    ('>i1', Sint8),
+        Types.UINT16:   ('>u2', Uint16),
+        Types.SINT16:   ('>i2', Sint16),
+        Types.UINT32:   ('>u4', Uint32),
+        Types.SINT32:   ('>i4', Sint32),
+        Types.FLOAT32:  ('>f4', Float32),
+        Types.UINT64:   ('>u8', Uint64),
+        Types.SINT64:   ('>i8', Sint64),
+        Types.FLOAT64:  ('>f8', Float64),
+        }
+
+_BASIC_CLASSES=frozenset(instance_type for _, instance_type in _NUMPY_TYPES.values())
+
+# Basic type by NumPy dtype kind and item size
+_TYPE_BY_DTYPE={
+        ('b', 1): Types.BOOLEAN,
+        ('u', 1): Types.UINT8,
+        ('i', 1): Types.SINT8,
+        ('u', 2): Types.UINT16,
+        ('i', 2): Types.SINT16,
+        ('u', 4): Types.UINT32,
+        ('i', 4): Types.SINT32,
+        ('f', 4): Types.FLOAT32,
+        ('u', 8): Types.UINT64,
+        ('i', 8): Types.SINT64,
+        ('f', 8): Types.FLOAT64,
+        }
 
 
 class _ArrayType(_ComplexDataType):
@@ -23,6 +63,14 @@ class _ArrayType(_ComplexDataType):
             length=None,
             lengthfield_len=None,
             elementtype=None):
+        # Big-endian ndarray holding the values instead of item objects, see
+        # from_numpy()
+        self._values = None
+        # Serialized values of plain items of a basic type instead of item
+        # objects and how to create the items (class, format, options), see
+        # _set_raw()
+        self._raw = None
+        self._raw_items = None
         super().__init__(
                 Types.ARRAY,
                 items,
@@ -37,6 +85,211 @@ class _ArrayType(_ComplexDataType):
 
     elementtype = property(operator.attrgetter("_elementtype"))
 
+    @property
+    def _items(self):
+        if self._values is not None:
+            # Item objects are only created when they are accessed
+            self._item_list = self._items_from_values(self._values)
+            self._values = None
+            # The new item objects are not shared with a clone
+            self._private = None
+        elif self._raw is not None:
+            self._item_list = self._items_from_raw(self._raw)
+            self._raw = None
+            self._private = None
+        return self._item_list
+
+    @_items.setter
+    def _items(self, items):
+        self._item_list = items
+        self._values = None
+        self._raw = None
+
+    def _items_from_values(self, values):
+        """
+        Creates the item objects of the ndarray `values`.
+        """
+        instance_type = _NUMPY_TYPES[self._elementtype][1]
+        return [instance_type(value, None) for value in values.tolist()]
+
+    def _items_from_raw(self, raw):
+        """
+        Creates the item objects of the serialized values `raw`, see
+        `_set_raw()`.
+        """
+        item_class, item_format, options = self._raw_items
+        count = len(raw) // struct.calcsize(item_format)
+        options = dict(options)
+        return [item_class(value, None, **options) for value in
+                struct.unpack(f'{item_format[0]}{count}{item_format[1:]}', raw)]
+
+    def _item_count(self):
+        if self._values is not None:
+            return len(self._values)
+        if self._raw is not None:
+            return len(self._raw) // struct.calcsize(self._raw_items[1])
+        return super()._item_count()
+
+    def _item_range(self, start, end):
+        if self._values is not None:
+            return self._items_from_values(self._values[start:end])
+        if self._raw is not None:
+            size = struct.calcsize(self._raw_items[1])
+            return self._items_from_raw(self._raw[start * size:end * size])
+        return super()._item_range(start, end)
+
+    def _set_raw(self, raw, item_class, item_format, options=()):
+        """
+        Replaces the items by the serialized values `raw` (`bytes`) of plain
+        items of `item_class`, packed with the `struct` format `item_format`
+        and created with the constructor `options` (name, value pairs). The
+        item objects are only created when they are accessed.
+        """
+        self._item_list = []
+        self._values = None
+        self._raw = raw
+        self._raw_items = (item_class, item_format, options)
+        self._private = None
+        self._invalidate_lengthfield()
+
+    def _copy_item_list(self):
+        # The ndarray is copied by to_numpy(), if needed
+        self._item_list = list(self._item_list)
+
+    def _shape_descriptor(self):
+        """
+        The items of arrays of basic types are described once (with their
+        number) if they are plain, i.e. of one class and without data ID,
+        name or length, which is the case for decoded and JSON parsed arrays.
+        """
+        if self._values is not None:
+            items = ('ndarray', len(self._values))
+        elif self._raw is not None:
+            items = ('values',) + self._raw_items \
+                    + (len(self._raw) // struct.calcsize(self._raw_items[1]),)
+        elif is_basic_type(self._elementtype) and self._plain_basic_items():
+            first = self._item_list[0]
+            items = ('values', type(first), struct_format(first._codec), first._shape_options(),
+                    len(self._item_list))
+        else:
+            # Runs of items of equal shape are described once
+            runs = []
+            for element in self._items:
+                shape = element._shape_descriptor()
+                if runs and runs[-1][0] == shape:
+                    runs[-1][1] += 1
+                else:
+                    runs.append([shape, 1])
+            items = ('items', tuple((shape, count) for shape, count in runs))
+        return super()._shape_descriptor() + (self._elementtype, items)
+
+    def _plain_basic_items(self):
+        items = self._item_list
+        if not items or type(items[0]) not in _BASIC_CLASSES:
+            return False
+        item_class = type(items[0])
+        little_endian = items[0]._little_endian
+        return all(type(item) is item_class and item._data_id is None
+                and item._name is None and item._length is None
+                and item._little_endian == little_endian for item in items)
+
+    @classmethod
+    def _from_shape_descriptor(cls, descriptor, data, offset):
+        _, name, data_id, wiretype, length, lengthfield_len, _, elementtype, items \
+                = descriptor
+        offset = cls._value_offset(descriptor, offset)
+        kind = items[0]
+        if kind == 'ndarray':
+            dtype = _NUMPY_TYPES[elementtype][0]
+            values = import_numpy().frombuffer(data, dtype, items[1], offset)
+            array = cls([], data_id, wiretype, name, length, lengthfield_len, elementtype)
+            # A writable copy, the pickled data is read-only
+            array._set_values(values.copy())
+            return array, offset + values.nbytes
+        if kind == 'values':
+            _, item_class, item_format, options, count = items
+            end = offset + count * struct.calcsize(item_format)
+            array = cls([], data_id, wiretype, name, length, lengthfield_len, elementtype)
+            array._set_raw(bytes(data[offset:end]), item_class, item_format, options)
+            return array, end
+        # Items of basic types without tag, see _serialize_value_into()
+        tagged = (False,) if is_basic_type(elementtype) else ()
+        item_list = []
+        for shape, count in items[1]:
+            for _ in range(0, count):
+                element, offset = shape[0]._from_shape_descriptor(shape, data, offset, *tagged)
+                item_list.append(element)
+        return cls(item_list, data_id, wiretype, name, length, lengthfield_len,
+                elementtype), offset
+
+    def _set_values(self, ndarray):
+        """
+        Replaces the items by the values of the one-dimensional `ndarray`.
+        """
+        numpy = import_numpy()
+        ndarray = numpy.asarray(ndarray)
+        if ndarray.ndim != 1:
+            raise ValueError(
+                    f'Only one-dimensional ndarrays are supported, got {ndarray.ndim} dimensions')
+        elementtype = _TYPE_BY_DTYPE.get((ndarray.dtype.kind, ndarray.dtype.itemsize))
+        if elementtype is None:
+            raise ValueError(f'No SOME/IP basic type for NumPy dtype {ndarray.dtype}')
+        self._item_list = []
+        self._elementtype = elementtype
+        # No copy for big-endian (and single byte) arrays
+        self._values = numpy.ascontiguousarray(
+                ndarray, dtype=_NUMPY_TYPES[elementtype][0])
+        self._invalidate_lengthfield()
+
+    def assign(self, values):
+        """
+        Assigns the item `values` in place, see `Serializable.assign()`.
+
+        Existing items are reused; missing items are created like the last
+        item (or from the basic element type), surplus items are removed.
+        NumPy based arrays take the values as ndarray.
+        """
+        if hasattr(values, 'dtype') and self._elementtype in _NUMPY_TYPES:
+            self._set_values(values)
+            return
+        if self._values is not None:
+            self._set_values(import_numpy().asarray(values, dtype=self._values.dtype))
+            return
+
+        items = self.items
+        for item, value in zip(items, values):
+            item.assign(value)
+        if len(values) > len(items):
+            for value in values[len(items):]:
+                self.append(self._new_item(value))
+        elif len(values) < len(items):
+            self.truncate(len(values))
+        else:
+            self._invalidate_lengthfield()
+
+    def _new_item(self, value):
+        if self._items:
+            item = self._items[-1].clone()
+            item.assign(value)
+            return item
+        if self._elementtype not in _NUMPY_TYPES:
+            raise ValueError('Can not add items of complex types to an empty array')
+        return _NUMPY_TYPES[self._elementtype][1](value, None)
+
+    def truncate(self, count):
+        """
+        Removes all items behind the first `count` items.
+        """
+        del self._items[count:]
+        self._invalidate_lengthfield()
+
+    @property
+    def _raw_values(self):
+        """
+        The serialized values of a NumPy based array, without copying them.
+        """
+        return memoryview(self._values.view('u1'))
+
     def _check_items(self, items):
         if not is_arrayish(items):
             raise ValueError(
@@ -48,6 +301,10 @@ class _ArrayType(_ComplexDataType):
     def length(self):
         if self._length is not None:
             return self._length
+        elif self._values is not None:
+            return self._values.nbytes
+        elif self._raw is not None:
+            return len(self._raw)
         else:
             length = 0
             num_items = len(self._items)
@@ -60,8 +317,10 @@ class _ArrayType(_ComplexDataType):
                 if is_basic_type(self.elementtype):
                     length = num_items * self._items[0].length
                 elif is_complex_type(self.elementtype):
+                    # The length field of an item may not cover all of its
+                    # value, e.g. the type selector of unions
                     for element in self._items:
-                        length = length + len(element.lengthfield) + element.length
+                        length = length + element.serialization_length
                 elif is_preserialized_type(self.elementtype):
                     for element in self._items:
                         length = length + element.length
@@ -74,9 +333,45 @@ class _ArrayType(_ComplexDataType):
     @length.setter
     def length(self, length):
         self._length = length
+        self._invalidate_lengthfield()
+
+    @property
+    def _value_size(self):
+        if self._values is not None:
+            return self._values.nbytes
+        if self._raw is not None:
+            return len(self._raw)
+        if is_basic_type(self.elementtype):
+            return len(self._items) * self._items[0]._value_size if self._items else 0
+        elif is_complex_type(self.elementtype) or is_preserialized_type(self._elementtype):
+            return sum(element.serialization_length for element in self._items)
+        raise NotImplementedError("Can't load an element of this kind.")
+
+    def _serialize_value_into(self, buffer, offset):
+        if self._values is not None:
+            end = offset + self._values.nbytes
+            buffer[offset:end] = self._raw_values
+            return end
+        if self._raw is not None:
+            end = offset + len(self._raw)
+            buffer[offset:end] = self._raw
+            return end
+        if is_basic_type(self.elementtype):
+            for element in self._items:
+                # Basic array items are serialized without tag
+                element._codec.pack_into(buffer, offset, element.value)
+                offset += element._codec.size
+            return offset
+        elif is_complex_type(self.elementtype) or is_preserialized_type(self._elementtype):
+            return super()._serialize_value_into(buffer, offset)
+        raise NotImplementedError("Can't load an element of this kind.")
 
     @property
     def serialized_value(self):
+        if self._values is not None:
+            return bytearray(self._raw_values)
+        if self._raw is not None:
+            return bytearray(self._raw)
         serialized = bytearray()
         if is_basic_type(self.elementtype):
             for element in self._items:
@@ -90,11 +385,27 @@ class _ArrayType(_ComplexDataType):
 
 
 
+    def _collect_value_iov(self, builder):
+        if self._values is not None:
+            builder.reference(self._raw_values)
+        elif self._raw is not None:
+            # Immutable, safe to reference
+            builder.reference(self._raw)
+        elif is_basic_type(self.elementtype):
+            # The packed values are a fresh buffer anyway, no need to copy them
+            builder.reference(self.serialized_value)
+        elif is_complex_type(self.elementtype) or is_preserialized_type(self._elementtype):
+            super()._collect_value_iov(builder)
+        else:
+            raise NotImplementedError("Can't load an element of this kind.")
+
     @property
     def serialization(self):
-        serialized = generate_tag(self.wiretype, self.data_id)
-        #TODO handling for multi-dim, complex types, etc
-        serialized.extend(self.lengthfield)
+        lengthfield = self.lengthfield
+        serialized = generate_tag(self._tag_wiretype, self.data_id)
+        # Multi-dimensional arrays of basic types: see MultiArray
+        #TODO handling for complex types, etc
+        serialized.extend(lengthfield)
         serialized.extend(self.serialized_value)
 
         return serialized
@@ -112,9 +423,12 @@ class Array(_ArrayType):
     """
 
     def __init__(self, items : list, dataID, wiretype, name=None,
-            length=None, lengthfield_len=None):
+            length=None, lengthfield_len=None, elementtype=None):
         """
         value items *must* be of a known Types entry!
+
+        The `elementtype` is taken from the first item, it only needs to be
+        specified for empty arrays.
         """
         super().__init__(
                 items,
@@ -122,16 +436,54 @@ class Array(_ArrayType):
                 wiretype=wiretype,
                 name=name,
                 length=length,
-                lengthfield_len=lengthfield_len)
+                lengthfield_len=lengthfield_len,
+                elementtype=elementtype)
+
+    @classmethod
+    def from_numpy(cls, ndarray, dataID, wiretype=None, name=None, length=None,
+            lengthfield_len=None):
+        """
+        Creates an array of basic types from the one-dimensional NumPy
+        `ndarray` without creating an object per item.
+
+        The element type follows from the dtype (e.g. `uint16` -> `UINT16`,
+        `float32` -> `FLOAT32`, `bool` -> `BOOLEAN`). Big-endian and single
+        byte ndarrays are used without copying, i.e. modifications of the
+        ndarray change the serialization.
+        """
+        array = cls([], dataID, wiretype, name=name, length=length,
+                lengthfield_len=lengthfield_len, elementtype=Types.NONE)
+        array._set_values(ndarray)
+        return array
 
-    def print_details(self, indent=0, cwidth=15, hide_tag=False):
+    def to_numpy(self):
+        """
+        Returns the values of an array of basic types as big-endian NumPy
+        ndarray.
+
+        Arrays created by `from_numpy()` or decoded with `numpy=True` (see
+        `compile_description()`) return their ndarray without copying it.
+        """
+        if self._values is not None:
+            if self._private is not None:
+                # Shared with a clone
+                self._values = self._values.copy()
+                self._private = None
+            return self._values
+        if self._elementtype not in _NUMPY_TYPES:
+            raise ValueError('Only arrays of basic types can be converted to ndarrays,'\
+                    f' got element type {self._elementtype}')
+        numpy = import_numpy()
+        return numpy.array([element.value for element in self._items],
+                dtype=_NUMPY_TYPES[self._elementtype][0])
+
+    def iter_details(self, indent=0, cwidth=15, hide_tag=False, max_items=None,
+            max_depth=None):
         data_indent=indent + __class__._INDENT_INCREMENT
-        strings = [super().print_details(indent, cwidth, hide_tag)]
+        yield from super().iter_details(indent, cwidth, hide_tag, max_items, max_depth)
 
         value_indent = data_indent + __class__._INDENT_INCREMENT
-        for element in self._items:
-            strings.append(element.print_details(value_indent, cwidth, True))
-        return '\n'.join(strings)
+        yield from self._iter_items_details(value_indent, cwidth, True, max_items, max_depth)
 
 
 
@@ -157,6 +509,9 @@ class String(_ArrayType):
                         to a deviation from the perceived string length.
                         E.g. the length of string '€ℕℝ∂∀' is 15 byte and not 5
                         (characters).
+
+    The `Uint8` items of the serialized string are only created when they are
+    accessed, e.g. by `items`.
     """
     def __init__(self, string, dataID, wiretype, name=None, length=None,
             lengthfield_len=None, terminate=True, bom=True, padding=False):
@@ -192,7 +547,25 @@ class String(_ArrayType):
         if self.padding and self.length is not None and len(ustring) < self.length:
             ustring.extend([0] * (self.length - len(ustring)))
 
-        self._set_items([Uint8(c, None) for c in ustring])
+        self._set_raw(bytes(ustring), Uint8, '!B')
+
+    def _shape_descriptor(self):
+        return _ComplexDataType._shape_descriptor(self) + (self._terminate, self._bom,
+                self._padding, self._value_size, len(self._string.encode('utf-8')))
+
+    @classmethod
+    def _from_shape_descriptor(cls, descriptor, data, offset):
+        _, name, data_id, wiretype, length, lengthfield_len, _, terminate, bom, padding, \
+                size, string_size = descriptor
+        offset = cls._value_offset(descriptor, offset)
+        raw = bytes(data[offset:offset + size])
+        start = 3 if bom else 0
+        string = cls(raw[start:start + string_size].decode('utf-8', errors='replace'),
+                data_id, wiretype, name, length, lengthfield_len, terminate, bom, padding)
+        if string._raw != raw:
+            # The items were modified directly
+            string._raw = raw
+        return string, offset + size
 
     def __convert_to_string(self, to_convert):
         # easier to have one common way...
@@ -234,6 +607,10 @@ class String(_ArrayType):
         self.__recreate_string_items()
 
 
+    def assign(self, string):
+        if string != self._string:
+            self.string = string
+
     @property
     def string(self):
         return self._string
@@ -273,13 +650,14 @@ class String(_ArrayType):
         self.__recreate_string_items()
 
 
-    def print_details(self, indent=0, cwidth=15, hide_tag=False):
+    def iter_details(self, indent=0, cwidth=15, hide_tag=False, max_items=None,
+            max_depth=None):
         data_indent=indent + __class__._INDENT_INCREMENT
-        strings = [super().print_details(indent, cwidth, hide_tag)]
+        yield from super().iter_details(indent, cwidth, hide_tag, max_items, max_depth)
 
         value_indent = data_indent + __class__._INDENT_INCREMENT
-        for element in self._items:
-            strings.append(
-                    f'{element.print_details(value_indent, cwidth, True)}'\
-                    f' ({chr(element.value)}, 0x{element.value:x})')
-        return '\n'.join(strings)
+        yield from self._iter_items_details(value_indent, cwidth, True, max_items, max_depth)
+
+    def _iter_item_details(self, element, indent, cwidth, hide_tag, max_items, max_depth):
+        yield f'{element.print_details(indent, cwidth, True)}'\
+                f' ({chr(element.value)}, 0x{element.value:x})'
@@ -0,0 +1,443 @@
+"""
+:copyright: Copyright 2021 by the Florian Münchbach.
+:license: BSD, see LICENSE for details.
+"""
+
+import array
+import functools
+import operator
+import sys
+
+from ._complex_data_type import _ComplexDataType
+from .._someip_data_type import _SomeIPDataType
+from .array_types import _NUMPY_TYPES, _TYPE_BY_DTYPE
+from .._import_helper import import_numpy
+from ..consts  import Types
+from ..type_helpers import format_bytearray_description_table, serialize_lengthfield, \
+        tag_length, pack_lengthfield_into, get_minimal_lengthfield_width
+
+
+def _typecode(codes, itemsize):
+    # The item sizes of the C types depend on the platform
+    return next(code for code in codes if array.array(code).itemsize == itemsize)
+
+
+# array.array type code by basic type
+_TYPECODES={
+        Types.BOOLEAN:  'B',
+        Types.UINT8:    'B',
+        Types.SINT8:    'b',
+        Types.UINT16:   _typecode('HI', 2),
+        Types.SINT16:   _typecode('hi', 2),
+        Types.UINT32:   _typecode('IL', 4),
+        Types.SINT32:   _typecode('il', 4),
+        Types.FLOAT32:  'f',
+        Types.UINT64:   _typecode('LQ', 8),
+        Types.SINT64:   _typecode('lq', 8),
+        Types.FLOAT64:  'd',
+        }
+
+_SWAP_BYTES = sys.byteorder == 'little'
+
+
+def _product(shape):
+    # math.prod() requires Python 3.8
+    return functools.reduce(operator.mul, shape, 1)
+
+
+def _infer_shape(values):
+    shape = []
+    while isinstance(values, (list, tuple)):
+        shape.append(len(values))
+        if not values:
+            break
+        values = values[0]
+    return tuple(shape)
+
+
+def _flatten(values, shape, dimension, flat):
+    if not isinstance(values, (list, tuple)) or len(values) != shape[dimension]:
+        raise ValueError(f'Ragged values, expected {shape[dimension]} item(s) in'\
+                f' dimension {dimension} for shape {shape}')
+    if dimension == len(shape) - 1:
+        flat.extend(values)
+        return
+    for row in values:
+        _flatten(row, shape, dimension + 1, flat)
+
+
+class MultiArray(_ComplexDataType):
+    """
+    Multi-dimensional SOME/IP array of a basic type.
+
+    The values are kept in one flat, row-major buffer (an `array.array`)
+    instead of an item object per value. On the wire a multi-dimensional
+    array is an array of arrays: each dimension has its own length field, all
+    of the same width. The innermost rows are written as contiguous slices of
+    the buffer, i.e. there is no per-value work on serialization.
+    """
+
+    def __init__(self, values, dataID, wiretype=None, name=None, length=None,
+            lengthfield_len=None, elementtype=None, shape=None):
+        """
+        Args:
+            - values        nested lists of numbers (the `shape` is taken
+                            from them) or a flat sequence of numbers in
+                            row-major order (requires `shape`)
+            - elementtype   basic type of the values, one of `Types`
+            - shape         number of items per dimension, e.g. `(3, 4)` for
+                            three rows of four values
+
+        `length` and `lengthfield_len` apply to the outermost dimension, the
+        inner dimensions use the same length field width.
+        """
+        if elementtype not in _TYPECODES:
+            raise ValueError(
+                    f'Multi-dimensional arrays need a basic element type, got {elementtype}')
+        self._elementtype = elementtype
+        self._shape = (0,)
+        self._values = array.array(_TYPECODES[elementtype])
+        super().__init__(
+                Types.ARRAY,
+                [],
+                dataID,
+                wiretype=wiretype,
+                name=name,
+                length=length,
+                lengthfield_len=lengthfield_len)
+        self.set_values(values, shape)
+
+    elementtype = property(operator.attrgetter("_elementtype"))
+    shape = property(operator.attrgetter("_shape"))
+    # No item objects, the values are copied on first write, see values
+    items = property(operator.attrgetter("_items"))
+
+    @property
+    def values(self):
+        """
+        The flat, row-major buffer of values (native byte order). It may be
+        modified in place, as long as its size is kept.
+        """
+        return self._private_values()
+
+    def _private_values(self):
+        """
+        Returns the buffer of values, copying it first if it is still shared
+        with a clone.
+        """
+        if self._private is not None:
+            self._values = array.array(self._values.typecode, self._values)
+            self._private = None
+        return self._values
+
+    def set_values(self, values, shape=None):
+        """
+        Replaces the values, see the constructor for the arguments.
+        """
+        if shape is None:
+            shape = _infer_shape(values)
+            if not shape:
+                raise ValueError('Flat values need a shape')
+        shape = tuple(int(size) for size in shape)
+        if not shape or any(size < 0 for size in shape):
+            raise ValueError(f'Invalid shape {shape}')
+
+        if isinstance(values, (list, tuple)) and values \
+                and isinstance(values[0], (list, tuple)):
+            flat = []
+            _flatten(values, shape, 0, flat)
+            values = flat
+        if len(values) != _product(shape):
+            raise ValueError(f'Expected {_product(shape)} values for shape {shape},'\
+                    f' got {len(values)}')
+        if self._elementtype == Types.BOOLEAN and any(value not in (0, 1) for value in values):
+            raise ValueError("Value must be convertible to boolean.")
+        try:
+            self._values = array.array(_TYPECODES[self._elementtype], values)
+        except (OverflowError, TypeError) as error:
+            raise ValueError(f'Invalid value for {self._elementtype.name}: {error}') from error
+        self._shape = shape
+        self._private = None
+        self._invalidate_lengthfield()
+
+    @classmethod
+    def from_buffer(cls, buffer, shape, dataID, wiretype=None, name=None, length=None,
+            lengthfield_len=None, elementtype=None):
+        """
+        Creates a multi-dimensional array from the big-endian values in
+        `buffer` (any bytes-like object without length fields, row-major).
+        """
+        multi_array = cls([], dataID, wiretype, name=name, length=length,
+                lengthfield_len=lengthfield_len, elementtype=elementtype, shape=(0,))
+        multi_array.set_buffer(buffer, shape)
+        return multi_array
+
+    def set_buffer(self, buffer, shape):
+        """
+        Replaces the values by the big-endian values in `buffer` (see
+        `from_buffer()`). The storage is reused if the number of values is
+        kept.
+        """
+        count = _product(shape)
+        itemsize = self._values.itemsize
+        if len(buffer) != count * itemsize:
+            raise ValueError(f'Expected {count} values for shape {tuple(shape)},'\
+                    f' got {len(buffer) / itemsize:g}')
+        if self._private is None and len(self._values) == count:
+            memoryview(self._values).cast('B')[:] = buffer
+        else:
+            self._values = array.array(self._values.typecode)
+            self._values.frombytes(buffer)
+            self._private = None
+        if _SWAP_BYTES:
+            self._values.byteswap()
+        self._shape = tuple(shape)
+        self._invalidate_lengthfield()
+
+    def assign(self, values):
+        """
+        Assigns the values, see `set_values()`. Flat values keep the shape.
+        """
+        nested = isinstance(values, (list, tuple)) and len(values) > 0 \
+                and isinstance(values[0], (list, tuple))
+        self.set_values(values, None if nested else self._shape)
+
+    @classmethod
+    def from_numpy(cls, ndarray, dataID, wiretype=None, name=None, length=None,
+            lengthfield_len=None):
+        """
+        Creates a multi-dimensional array from the NumPy `ndarray` (copied),
+        the element type follows from the dtype (see `Array.from_numpy()`).
+        """
+        numpy = import_numpy()
+        ndarray = numpy.asarray(ndarray)
+        elementtype = _TYPE_BY_DTYPE.get((ndarray.dtype.kind, ndarray.dtype.itemsize))
+        if elementtype is None:
+            raise ValueError(f'No SOME/IP basic type for NumPy dtype {ndarray.dtype}')
+        big_endian = numpy.ascontiguousarray(ndarray, dtype=_NUMPY_TYPES[elementtype][0])
+        return cls.from_buffer(big_endian.tobytes(), ndarray.shape, dataID, wiretype,
+                name=name, length=length, lengthfield_len=lengthfield_len,
+                elementtype=elementtype)
+
+    def to_numpy(self):
+        """
+        Returns the values as NumPy ndarray of the array's shape, sharing the
+        (native byte order) buffer.
+        """
+        numpy = import_numpy()
+        dtype = '?' if self._elementtype == Types.BOOLEAN else self._values.typecode
+        return numpy.frombuffer(self._private_values(), dtype=dtype).reshape(self._shape)
+
+    def tolist(self):
+        """
+        Returns the values as nested lists.
+        """
+        values = self._values.tolist()
+        if self._elementtype == Types.BOOLEAN:
+            values = [bool(value) for value in values]
+        for size in reversed(self._shape[1:]):
+            values = [values[start:start + size] for start in range(0, len(values), size)]
+        return values
+
+    def _offset(self, index):
+        if not isinstance(index, tuple):
+            index = (index,)
+        if len(index) != len(self._shape):
+            raise IndexError(f'Expected {len(self._shape)} indices, got {len(index)}')
+        offset = 0
+        for position, size in zip(index, self._shape):
+            if position < 0:
+                position += size
+            if not 0 <= position < size:
+                raise IndexError(f'Index {index} out of range for shape {self._shape}')
+            offset = offset * size + position
+        return offset
+
+    def __getitem__(self, index):
+        value = self._values[self._offset(index)]
+        return bool(value) if self._elementtype == Types.BOOLEAN else value
+
+    def __setitem__(self, index, value):
+        try:
+            self._private_values()[self._offset(index)] = value
+        except (OverflowError, TypeError) as error:
+            raise ValueError(f'Invalid value for {self._elementtype.name}: {error}') from error
+
+    def _shape_descriptor(self):
+        return super()._shape_descriptor() + (self._elementtype, self._shape)
+
+    @classmethod
+    def _from_shape_descriptor(cls, descriptor, data, offset):
+        _, name, data_id, wiretype, length, lengthfield_len, width, elementtype, shape \
+                = descriptor
+        offset = cls._value_offset(descriptor, offset)
+        row_size = shape[-1] * array.array(_TYPECODES[elementtype]).itemsize
+        rows = []
+
+        def parse_dimension(dimension, offset):
+            if dimension == len(shape) - 1:
+                rows.append(data[offset:offset + row_size])
+                return offset + row_size
+            for _ in range(0, shape[dimension]):
+                # Skip the length field of the inner array
+                offset = parse_dimension(dimension + 1, offset + width)
+            return offset
+
+        offset = parse_dimension(0, offset)
+        return cls.from_buffer(b''.join(rows), shape, data_id, wiretype, name, length,
+                lengthfield_len, elementtype), offset
+
+    def _check_element(self, element):
+        raise ValueError('The values of a multi-dimensional array are set using set_values()')
+
+    def clear(self):
+        self.set_values([], (0,) * len(self._shape))
+
+
+    def _content_sizes(self, width):
+        """
+        Serialized size of one array (without its length field) per
+        dimension, for the given length field width.
+        """
+        sizes = [0] * len(self._shape)
+        size = self._values.itemsize
+        for dimension in range(len(self._shape) - 1, -1, -1):
+            size = self._shape[dimension] * size
+            sizes[dimension] = size
+            size += width
+        return sizes
+
+    def _resolve_lengthfield(self):
+        """
+        The length field width, chosen by the outer length in automatic mode.
+        The inner length fields count towards the outer length, so the
+        smallest width holding the resulting length is taken.
+        """
+        if self._auto_lengthfield:
+            if self._length is not None:
+                self._lengthfield_len = get_minimal_lengthfield_width(self._length)
+            else:
+                for width in (1, 2, 4):
+                    if self._content_sizes(width)[0] < 1 << (8 * width):
+                        break
+                self._lengthfield_len = get_minimal_lengthfield_width(
+                        self._content_sizes(width)[0])
+        return self._lengthfield_len
+
+    lengthfield_length = property(_resolve_lengthfield,
+            _ComplexDataType.lengthfield_length.fset)
+
+    @property
+    def length(self):
+        if self._length is not None:
+            return self._length
+        return self._value_size
+
+    @length.setter
+    def length(self, length):
+        self._length = length
+        self._invalidate_lengthfield()
+
+    @property
+    def _value_size(self):
+        return self._content_sizes(self._resolve_lengthfield())[0]
+
+    @property
+    def lengthfield(self):
+        width = self._resolve_lengthfield()
+        return serialize_lengthfield(self.length, width)
+
+    @property
+    def serialization_length(self):
+        width = self._resolve_lengthfield()
+        return tag_length(self.data_id) + width + self._content_sizes(width)[0]
+
+    def _big_endian_values(self):
+        values = self._values
+        if _SWAP_BYTES and values.itemsize > 1:
+            values = array.array(values.typecode, values)
+            values.byteswap()
+        return memoryview(values).cast('B')
+
+    def _serialize_value_into(self, buffer, offset):
+        data = self._big_endian_values()
+        width = self._resolve_lengthfield()
+        if width == 0 or len(self._shape) == 1:
+            end = offset + len(data)
+            buffer[offset:end] = data
+            return end
+
+        sizes = self._content_sizes(width)
+        last = len(self._shape) - 1
+        row_size = sizes[last]
+
+        def serialize_dimension(dimension, offset, position):
+            if dimension == last:
+                buffer[offset:offset + row_size] = data[position:position + row_size]
+                return offset + row_size, position + row_size
+            inner_size = sizes[dimension + 1]
+            for _unused in range(0, self._shape[dimension]):
+                offset = pack_lengthfield_into(buffer, offset, inner_size, width)
+                offset, position = serialize_dimension(dimension + 1, offset, position)
+            return offset, position
+
+        offset, _unused = serialize_dimension(0, offset, 0)
+        return offset
+
+    @property
+    def serialized_value(self):
+        serialized = bytearray(self._value_size)
+        self._serialize_value_into(serialized, 0)
+        return serialized
+
+    @property
+    def serialization(self):
+        serialized = bytearray(self.serialization_length)
+        self._serialize_into(serialized, 0)
+        return serialized
+
+    def _collect_value_iov(self, builder):
+        # The serialized value is a fresh buffer anyway, no need to copy it
+        builder.reference(self.serialized_value)
+
+    def _pretty_print(self, indent=0, cwidth=15):
+        return self._pretty_print_extra(indent, cwidth, startvalue=f'{self.tolist()}')
+
+    def _short_print(self, additional=[]):
+        return _SomeIPDataType._short_print(self, additional=[
+            f'shape: {self._shape}', f'{self._elementtype.name}'])
+
+    def iter_details(self, indent=0, cwidth=15, hide_tag=False, max_items=None,
+            max_depth=None):
+        data_indent=indent + __class__._INDENT_INCREMENT
+        yield from super().iter_details(indent, cwidth, hide_tag, max_items, max_depth)
+        yield format_bytearray_description_table(
+                b'',
+                f'{"":>{data_indent}}{"Shape":<{cwidth}}: {self._shape}'\
+                    f' of {self._elementtype.name}',
+                __class__._BYTES_PER_ROW)
+        if max_depth is not None and max_depth <= 0:
+            return
+
+        # One line per row of the innermost dimension
+        value_indent = data_indent + __class__._INDENT_INCREMENT
+        values = bytes(self._big_endian_values())
+        row_size = self._content_sizes(0)[-1]
+        rows = _product(self._shape[:-1])
+        elided = 0
+        shown = range(0, rows)
+        if max_items is not None and rows > 2 * max_items:
+            elided = rows - 2 * max_items
+            shown = list(range(0, max_items)) + list(range(rows - max_items, rows))
+        for row in shown:
+            if elided and row == rows - max_items:
+                yield self._elision_line(value_indent, f'{elided} row(s) elided')
+            index = []
+            remainder = row
+            for size in reversed(self._shape[:-1]):
+                remainder, position = divmod(remainder, size)
+                index.insert(0, position)
+            yield format_bytearray_description_table(
+                    values[row * row_size:(row + 1) * row_size],
+                    f'{"":>{value_indent}}{index}',
+                    __class__._BYTES_PER_ROW)
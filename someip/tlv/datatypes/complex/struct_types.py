@@ -4,16 +4,226 @@
 """
 
 from ._complex_data_type import _ComplexDataType
+from .._someip_data_type import _SomeIPDataType
 from ..consts  import Types
 from ..type_helpers import generate_tag
+from ..serializable import Serializable
 
 
 class _StructType(_ComplexDataType):
     def __init__(self, items, dataID, wiretype=None, name=None,
-            length=None, lengthfield_len=None):
+            length=None, lengthfield_len=None, unique_data_ids=True):
+        # Needed by _set_items() already
+        self._unique_data_ids = unique_data_ids
         super().__init__(Types.STRUCT, items, dataID, wiretype, name,
                 length, lengthfield_len)
 
+    def _set_items(self, items):
+        # Only the new items are checked against each other
+        self._by_data_id = {}
+        self._indexed_data_id_changes = _SomeIPDataType._data_id_changes
+        self._check_data_ids(items)
+        super()._set_items(items)
+        self._rebuild_indexes()
+
+    def _rebuild_indexes(self):
+        self._by_name = {}
+        self._by_data_id = {}
+        self._duplicate_data_ids = set()
+        self._indexed_data_id_changes = _SomeIPDataType._data_id_changes
+        self._index_members(self._items)
+
+    def _index_members(self, members):
+        """
+        Adds `members` to the name and data ID indexes. The first member with
+        a given name or data ID is indexed.
+        """
+        for member in members:
+            name = getattr(member, 'name', None)
+            if name is not None:
+                self._by_name.setdefault(name, member)
+            data_id = getattr(member, 'data_id', None)
+            if data_id is not None:
+                if data_id in self._by_data_id:
+                    self._duplicate_data_ids.add(data_id)
+                else:
+                    self._by_data_id[data_id] = member
+
+    def _check_indexes(self):
+        """
+        Rebuilds the data ID index if data IDs were changed since it was
+        built (names can not be changed).
+        """
+        if self._indexed_data_id_changes != _SomeIPDataType._data_id_changes:
+            self._rebuild_indexes()
+
+    def _copy_item_list(self):
+        super()._copy_item_list()
+        self._by_name = dict(self._by_name)
+        self._by_data_id = dict(self._by_data_id)
+        self._duplicate_data_ids = set(self._duplicate_data_ids)
+
+    def _replace_item(self, element, copied):
+        if self._by_name.get(copied.name) is element:
+            self._by_name[copied.name] = copied
+        data_id = getattr(copied, 'data_id', None)
+        if self._by_data_id.get(data_id) is element:
+            self._by_data_id[data_id] = copied
+
+    def _shape_descriptor(self):
+        return super()._shape_descriptor() + (self._unique_data_ids,
+                tuple(element._shape_descriptor() for element in self._items))
+
+    @classmethod
+    def _from_shape_descriptor(cls, descriptor, data, offset):
+        _, name, data_id, wiretype, length, lengthfield_len, _, unique_data_ids, members \
+                = descriptor
+        items, offset = cls._items_from_shape_descriptors(
+                members, data, cls._value_offset(descriptor, offset))
+        return cls(items, data_id, wiretype, name, length, lengthfield_len,
+                unique_data_ids), offset
+
+    def _check_data_ids(self, members):
+        if not self._unique_data_ids:
+            return
+        self._check_indexes()
+        seen = set()
+        for member in members:
+            data_id = getattr(member, 'data_id', None)
+            if data_id is None:
+                continue
+            if data_id in seen or data_id in self._by_data_id:
+                raise ValueError(f'Duplicate data ID {data_id} in struct "{self.name}"')
+            seen.add(data_id)
+
+    def clear(self):
+        super().clear()
+        self._rebuild_indexes()
+
+    def append(self, element):
+        self._check_data_ids([element])
+        super().append(element)
+        self._index_members([element])
+
+    def extend(self, items):
+        self._check_data_ids(items)
+        super().extend(items)
+        self._index_members(items)
+
+    def insert(self, index, element):
+        self._check_data_ids([element])
+        super().insert(index, element)
+        if index >= len(self._items) - 1:
+            self._index_members([element])
+            return
+        # The inserted member precedes others, it is indexed unless a
+        # preceding member has the same name or data ID
+        name = getattr(element, 'name', None)
+        data_id = getattr(element, 'data_id', None)
+        preceding = self._items[:index]
+        if name is not None and not any(member.name == name for member in preceding):
+            self._by_name[name] = element
+        if data_id is not None:
+            if data_id in self._by_data_id:
+                self._duplicate_data_ids.add(data_id)
+            if not any(getattr(member, 'data_id', None) == data_id for member in preceding):
+                self._by_data_id[data_id] = element
+
+    @property
+    def duplicate_data_ids(self) -> set:
+        """
+        Data IDs used by more than one member, e.g. structs created with
+        `unique_data_ids=False` or members whose data ID was changed.
+        """
+        self._check_indexes()
+        return set(self._duplicate_data_ids)
+
+    def _lookup(self, index, key, attribute):
+        if attribute == 'data_id':
+            self._check_indexes()
+            index = self._by_data_id
+        return index.get(key)
+
+    def get(self, name, default=None):
+        """
+        Returns the (first) member named `name` or `default`.
+        """
+        member = self._lookup(self._by_name, name, 'name')
+        return default if member is None else self._private_member(member)
+
+    def get_by_data_id(self, data_id, default=None):
+        """
+        Returns the (first) member with the data ID `data_id` or `default`.
+        """
+        member = self._lookup(self._by_data_id, data_id, 'data_id')
+        return default if member is None else self._private_member(member)
+
+    def __getitem__(self, key):
+        """
+        Returns the member named `key` (str) or the member with the data ID
+        `key` (int). Allows path access like `message["status"]["temp"]`.
+        """
+        member = self.get_by_data_id(key) if isinstance(key, int) else self.get(key)
+        if member is None:
+            raise KeyError(key)
+        return member
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def update(self, mapping):
+        """
+        Updates members from `mapping`, keyed by member name or data ID.
+
+        The values of basic data type members are set, strings are set for
+        `String` members, nested `dict` values update nested structs and
+        data type objects replace the member.
+        """
+        for key, value in mapping.items():
+            member = self[key]
+            if isinstance(value, Serializable):
+                position = next(i for i, item in enumerate(self._items) if item is member)
+                self._check_element(value)
+                same_data_id = getattr(value, 'data_id', None) == getattr(member, 'data_id', None)
+                if not same_data_id:
+                    self._check_data_ids([value])
+                self._items[position] = value
+                self._add_private([value])
+                if same_data_id and value.name == member.name:
+                    self._replace_item(member, value)
+                else:
+                    self._rebuild_indexes()
+            elif isinstance(value, dict) and isinstance(member, _StructType):
+                member.update(value)
+            elif hasattr(member, 'string') and isinstance(value, str):
+                member.string = value
+            elif hasattr(member, 'value'):
+                member.value = value
+            else:
+                raise ValueError(
+                        f'Can not update member "{key}" of struct "{self.name}"'\
+                        f' with a value of type {type(value)}')
+
+    def assign(self, values):
+        """
+        Assigns the values of the members in place, see
+        `Serializable.assign()`. Unlike `update()`, members are never
+        replaced.
+        """
+        if isinstance(values, dict):
+            for key, value in values.items():
+                self[key].assign(value)
+            return
+        if len(values) != len(self._items):
+            raise ValueError(f'Struct "{self.name}" has {len(self._items)} members,'\
+                    f' got {len(values)} values')
+        for position, value in enumerate(values):
+            self._private_item(position).assign(value)
+
     @property
     def length(self):
         if self._length is not None:
@@ -29,12 +239,18 @@ class _StructType(_ComplexDataType):
     @length.setter
     def length(self, length):
         self._length = length
+        self._invalidate_lengthfield()
+
+    @property
+    def _value_size(self):
+        return sum(element.serialization_length for element in self._items)
 
 
     @property
     def serialization(self):
-        serialized = generate_tag(self.wiretype, self.data_id)
-        serialized.extend(self.lengthfield)
+        lengthfield = self.lengthfield
+        serialized = generate_tag(self._tag_wiretype, self.data_id)
+        serialized.extend(lengthfield)
         serialized.extend(self.serialized_value)
         return serialized
 
@@ -55,23 +271,29 @@ class _StructType(_ComplexDataType):
     def _pretty_print_extra(self, indent=0, cwidth=15, startvalue="", endvalue=""):
         return super()._pretty_print_extra(indent, cwidth, startvalue="{", endvalue="}")
 
-    def print_details(self, indent=0, cwidth=15, hide_tag=False):
+    def iter_details(self, indent=0, cwidth=15, hide_tag=False, max_items=None,
+            max_depth=None):
         data_indent=indent + __class__._INDENT_INCREMENT
-        strings = [super().print_details(indent, cwidth, hide_tag)]
+        yield from super().iter_details(indent, cwidth, hide_tag, max_items, max_depth)
 
         value_indent = data_indent + __class__._INDENT_INCREMENT
-        for element in self._items:
-            strings.append(element.print_details(value_indent, cwidth))
-        return '\n'.join(strings)
+        # Struct members are never elided by max_items
+        yield from self._iter_items_details(value_indent, cwidth, False, max_items, max_depth,
+                elide=False)
 
 
 class Struct(_StructType):
     def __init__(self, items : list, dataID, wiretype=None, name=None,
-            length=None, lengthfield_len=None):
+            length=None, lengthfield_len=None, unique_data_ids=True):
         """
         value items *must* be of a known Types type!
+
+        Adding a member with a data ID already used by another member raises
+        a `ValueError`, unless `unique_data_ids` is False. Then duplicates
+        are reported by `duplicate_data_ids`.
         """
         super().__init__(items, dataID, wiretype=wiretype, name=name,
-                length=length, lengthfield_len=lengthfield_len)
+                length=length, lengthfield_len=lengthfield_len,
+                unique_data_ids=unique_data_ids)
 
 
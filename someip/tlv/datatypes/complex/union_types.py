@@ -0,0 +1,189 @@
+"""
+:copyright: Copyright 2021 by the Florian Münchbach.
+:license: BSD, see LICENSE for details.
+"""
+
+import operator
+
+from ._complex_data_type import _ComplexDataType
+from ..consts  import Types
+from ..traits import UINT_TRAITS
+from ..type_helpers import generate_tag, format_bytearray_description_table
+
+_SELECTOR_CODECS={width: UINT_TRAITS[width].codec for width in (1, 2, 4)}
+
+
+class Union(_ComplexDataType):
+    """
+    SOME/IP Union (variant) data type.
+
+    Only the active member is held. It is serialized after the length field
+    and the type selector; as specified by SOME/IP, the length covers only
+    the member (and padding), not the selector. Selector 0 with no member
+    denotes an empty union.
+    """
+
+    def __init__(self, member, selector, dataID, wiretype=None, name=None, length=None,
+            lengthfield_len=None, selector_len=4):
+        """
+        Args:
+            - member        the active member (data type object) or None
+            - selector      value of the type selector, by convention the
+                            1-based index of the member among the union's
+                            alternatives
+            - selector_len  width of the type selector in bytes (1, 2 or 4)
+        """
+        if selector_len not in _SELECTOR_CODECS:
+            raise ValueError(
+                    f'A union type selector must have 1, 2 or 4 bytes, got {selector_len}.')
+        self._selector_codec = _SELECTOR_CODECS[selector_len]
+        self._selector_len = selector_len
+        self._selector = 0
+        super().__init__(
+                Types.UNION,
+                [] if member is None else [member],
+                dataID,
+                wiretype=wiretype,
+                name=name,
+                length=length,
+                lengthfield_len=lengthfield_len)
+        self.selector = selector
+
+    selector_len = property(operator.attrgetter("_selector_len"))
+
+    @property
+    def selector(self):
+        """
+        Value of the type selector.
+        """
+        return self._selector
+
+    @selector.setter
+    def selector(self, selector):
+        if selector not in range(0, 1 << (8 * self._selector_len)):
+            raise ValueError(f'The selector must fit into {self._selector_len} byte(s),'\
+                    f' got {selector}.')
+        self._selector = selector
+
+    @property
+    def member(self):
+        """
+        The active member, None for an empty union.
+        """
+        return self._private_item(0) if self._items else None
+
+    def select(self, selector, member):
+        """
+        Replaces the active member and the type selector.
+        """
+        self.selector = selector
+        self._set_items([] if member is None else [member])
+
+    def clear(self):
+        self.select(0, None)
+
+    def assign(self, value):
+        """
+        Assigns `value` to the active member, see `Serializable.assign()`.
+        Use `select()` to change the member.
+        """
+        member = self.member
+        if member is None:
+            raise ValueError('Can not assign a value to an empty union, use select()')
+        member.assign(value)
+
+    def _shape_descriptor(self):
+        member = self._items[0]._shape_descriptor() if self._items else None
+        return super()._shape_descriptor() + (self._selector_len, member)
+
+    @classmethod
+    def _from_shape_descriptor(cls, descriptor, data, offset):
+        _, name, data_id, wiretype, length, lengthfield_len, _, selector_len, member \
+                = descriptor
+        offset = cls._value_offset(descriptor, offset)
+        selector = _SELECTOR_CODECS[selector_len].unpack_from(data, offset)[0]
+        offset += selector_len
+        if member is not None:
+            member, offset = member[0]._from_shape_descriptor(member, data, offset)
+        return cls(member, selector, data_id, wiretype, name, length, lengthfield_len,
+                selector_len), offset
+
+    def _check_items(self, items):
+        if len(items) > 1:
+            raise ValueError('A union holds only one active member')
+        super()._check_items(items)
+
+    def append(self, element):
+        raise ValueError('The member of a union is set using select()')
+
+    def extend(self, items):
+        raise ValueError('The member of a union is set using select()')
+
+    def insert(self, index, element):
+        raise ValueError('The member of a union is set using select()')
+
+    @property
+    def serialized_selector(self) -> bytes:
+        return self._selector_codec.pack(self._selector)
+
+    @property
+    def length(self):
+        if self._length is not None:
+            return self._length
+        return self._counted_length(self._value_size)
+
+    @length.setter
+    def length(self, length):
+        self._length = length
+        self._invalidate_lengthfield()
+
+    @property
+    def _value_size(self):
+        return self._selector_len + sum(element.serialization_length for element in self._items)
+
+    def _counted_length(self, value_size):
+        # The length field does not cover the type selector
+        return value_size - self._selector_len
+
+    def _serialize_value_into(self, buffer, offset):
+        self._selector_codec.pack_into(buffer, offset, self._selector)
+        return super()._serialize_value_into(buffer, offset + self._selector_len)
+
+    def _collect_value_iov(self, builder):
+        builder.append(self.serialized_selector)
+        super()._collect_value_iov(builder)
+
+    @property
+    def serialized_value(self):
+        serialized = bytearray(self.serialized_selector)
+        for element in self._items:
+            serialized.extend(element.serialization)
+        return serialized
+
+    @property
+    def serialization(self):
+        lengthfield = self.lengthfield
+        serialized = generate_tag(self._tag_wiretype, self.data_id)
+        serialized.extend(lengthfield)
+        serialized.extend(self.serialized_value)
+        return serialized
+
+    def _pretty_print_extra(self, indent=0, cwidth=15, startvalue="", endvalue=""):
+        return super()._pretty_print_extra(indent, cwidth,
+                startvalue=f'(selector {self._selector})')
+
+    def iter_details(self, indent=0, cwidth=15, hide_tag=False, max_items=None,
+            max_depth=None):
+        data_indent=indent + __class__._INDENT_INCREMENT
+        yield from super().iter_details(indent, cwidth, hide_tag, max_items, max_depth)
+        yield format_bytearray_description_table(
+                self.serialized_selector,
+                f'{"":>{data_indent}}{"Selector":<{cwidth}}: {self._selector}'\
+                    f' ({self._selector_len} byte(s))',
+                __class__._BYTES_PER_ROW)
+
+        value_indent = data_indent + __class__._INDENT_INCREMENT
+        # Untagged members are printed without their (empty) tag
+        hide_member_tag = self.member is not None and self.member.data_id is None
+        yield from self._iter_items_details(value_indent, cwidth, hide_member_tag, max_items,
+                max_depth, elide=False)
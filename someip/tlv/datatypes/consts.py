@@ -8,6 +8,7 @@ Type constants
 from enum import Enum, auto
 
 WIRETYPE_COMPLEX_TYPE_STATIC_LEN=4
+TAG_LENGTH=2
 
 class Types(Enum):
     """
@@ -0,0 +1,163 @@
+"""
+:copyright: Copyright 2021 by the Florian Münchbach.
+:license: BSD, see LICENSE for details.
+"""
+
+import hashlib
+
+from .serializable import Serializable
+from .preserialized import iter_data_details
+from .type_helpers import tag_length
+
+
+def _restore(data, element_type, name, data_id, wiretype, length, value_offset):
+    """
+    Rebuilds a pickled `Frozen` snapshot, see `Frozen.__reduce__()`.
+    """
+    frozen = Frozen.__new__(Frozen)
+    frozen._set_fields(data, element_type, name, data_id, wiretype, length, value_offset)
+    return frozen
+
+
+class Frozen(Serializable):
+    """
+    Immutable snapshot of a serialized data type, see `Serializable.freeze()`.
+
+    The serialization is computed once when freezing, later modifications of
+    the original data type object do not affect the snapshot. All properties
+    return read-only (`bytes`) data, so a snapshot can be shared between
+    threads without locking.
+
+    Snapshots compare equal if their serializations are equal and can be used
+    as dictionary keys, e.g. to deduplicate identical outgoing payloads.
+    """
+    __slots__ = ('_data', '_type', '_name', '_data_id', '_wiretype', '_length',
+            '_tag_length', '_value_offset', '_digest', '_hash')
+
+    def __init__(self, element: Serializable):
+        data_id = getattr(element, 'data_id', None)
+        self._set_fields(bytes(element.serialization), element.type, element.name, data_id,
+                getattr(element, 'wiretype', None), element.length,
+                tag_length(data_id) + len(element.lengthfield))
+
+    def _set_fields(self, data, element_type, name, data_id, wiretype, length, value_offset):
+        set_attribute = object.__setattr__
+        set_attribute(self, '_data', data)
+        set_attribute(self, '_type', element_type)
+        set_attribute(self, '_name', name)
+        set_attribute(self, '_data_id', data_id)
+        set_attribute(self, '_wiretype', wiretype)
+        set_attribute(self, '_length', length)
+        set_attribute(self, '_tag_length', tag_length(data_id))
+        set_attribute(self, '_value_offset', value_offset)
+        set_attribute(self, '_digest', hashlib.blake2b(data, digest_size=16).digest())
+        set_attribute(self, '_hash', hash(data))
+
+    def __reduce__(self):
+        return (_restore, (self._data,) + self._shape_descriptor()[1:-1])
+
+    def _shape_descriptor(self):
+        return (Frozen, self._type, self._name, self._data_id, self._wiretype, self._length,
+                self._value_offset, len(self._data))
+
+    @classmethod
+    def _from_shape_descriptor(cls, descriptor, data, offset):
+        end = offset + descriptor[-1]
+        return _restore(bytes(data[offset:end]), *descriptor[1:-1]), end
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{type(self).__name__} objects are immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError(f'{type(self).__name__} objects are immutable')
+
+    @property
+    def type(self):
+        return self._type
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def data_id(self):
+        return self._data_id
+
+    @property
+    def wiretype(self):
+        return self._wiretype
+
+    @property
+    def length(self) -> int:
+        """
+        Value of the length field (or length of the value) at freezing time.
+        """
+        return self._length
+
+    @property
+    def digest(self) -> bytes:
+        """
+        Content hash (BLAKE2b, 16 bytes) of the serialization.
+        """
+        return self._digest
+
+    @property
+    def serialized_value(self) -> bytes:
+        return self._data[self._value_offset:]
+
+    @property
+    def serialization(self) -> bytes:
+        return self._data
+
+    @property
+    def serialization_length(self) -> int:
+        return len(self._data)
+
+    @property
+    def lengthfield(self) -> bytes:
+        return self._data[self._tag_length:self._value_offset]
+
+    def freeze(self):
+        return self
+
+    def clone(self):
+        return self
+
+    def assign(self, value):
+        raise AttributeError(f'{type(self).__name__} objects are immutable')
+
+    def _serialize_into(self, buffer, offset):
+        end = offset + len(self._data)
+        buffer[offset:end] = self._data
+        return end
+
+    def _collect_iov(self, builder):
+        builder.reference(self._data)
+
+    _INDENT_INCREMENT=4
+    _BYTES_PER_ROW=4
+
+    def print_details(self, indent=0, cwidth=15, hide_tag=True, max_items=None,
+            max_depth=None):
+        return super().print_details(indent, cwidth, hide_tag, max_items, max_depth)
+
+    def iter_details(self, indent=0, cwidth=15, hide_tag=True, max_items=None,
+            max_depth=None):
+        title = f'{self._name}({self._type.name})' if self._name is not None \
+                else self._type.name
+        yield f'{"":>{3*Frozen._BYTES_PER_ROW - 1}} | {"":>{indent}}{title} (frozen):'
+        yield from iter_data_details(self._data, indent + Frozen._INDENT_INCREMENT,
+                Frozen._BYTES_PER_ROW, max_items)
+
+    def __eq__(self, other):
+        if not isinstance(other, Frozen):
+            return NotImplemented
+        return self._hash == other._hash and self._data == other._data
+
+    def __hash__(self):
+        return self._hash
+
+    def __repr__(self):
+        title = f'{self._name}({self._type.name})' if self._name is not None \
+                else self._type.name
+        return f'Frozen({title}; len: {len(self._data)}; digest: {self._digest.hex()})'
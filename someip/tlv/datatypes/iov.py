@@ -0,0 +1,131 @@
+"""
+Scatter-gather (iovec) output helpers.
+
+Instead of concatenating a whole serialization into one buffer, the data
+types can describe their serialization as a list of buffer segments (see
+`serialization_iov()`).
+Small parts like tags and length fields are coalesced into one scratch
+buffer, large leaf buffers (e.g. `Preserialized` data or the packed values of
+arrays of basic types) are referenced directly.
+The resulting list can be passed to `socket.sendmsg()` or `os.writev()`.
+
+:copyright: Copyright 2021 by the Florian Münchbach.
+:license: BSD, see LICENSE for details.
+"""
+
+import os
+
+# Buffers smaller than this are copied into the scratch buffer, larger ones
+# are referenced.
+DEFAULT_REFERENCE_THRESHOLD=1024
+
+# Maximum number of segments passed to a single sendmsg / writev call.
+# POSIX guarantees at least 16, Linux and most BSDs allow 1024.
+try:
+    IOV_MAX = os.sysconf('SC_IOV_MAX')
+except (AttributeError, ValueError, OSError):
+    IOV_MAX = 1024
+if IOV_MAX <= 0:
+    IOV_MAX = 1024
+
+
+class IovBuilder:
+    """
+    Collects the segments of a serialization.
+
+    Data passed to `append()` is copied into a single scratch buffer, data
+    passed to `reference()` is referenced without copying, if it is at least
+    `reference_threshold` bytes long.
+    """
+    def __init__(self, reference_threshold=DEFAULT_REFERENCE_THRESHOLD):
+        self._threshold = reference_threshold
+        self._scratch = bytearray()
+        # Either (start, end) tuples into the scratch buffer or referenced buffers
+        self._parts = []
+        self._scratch_start = 0
+
+    def append(self, data):
+        """
+        Copies (small) `data` into the scratch buffer.
+        """
+        self._scratch += data
+
+    def reference(self, data):
+        """
+        References (large) `data`, i.e. the buffer must not be modified until
+        the segments have been written.
+        Data shorter than the reference threshold gets copied anyway.
+        """
+        if len(data) < self._threshold:
+            self._scratch += data
+        else:
+            self._close_scratch_part()
+            self._parts.append(memoryview(data))
+
+    def _close_scratch_part(self):
+        end = len(self._scratch)
+        if end > self._scratch_start:
+            self._parts.append((self._scratch_start, end))
+            self._scratch_start = end
+
+    @property
+    def segments(self) -> list:
+        """
+        The list of collected segments (`memoryview`s).
+        """
+        self._close_scratch_part()
+        scratch = memoryview(bytes(self._scratch))
+        return [scratch[part[0]:part[1]] if isinstance(part, tuple) else part
+                for part in self._parts]
+
+
+def _advance(segments, index, sent):
+    """
+    Skips `sent` bytes of `segments` starting at `index`.
+    Returns the new index and the (possibly sliced) remaining segments.
+    """
+    while sent > 0:
+        segment_len = len(segments[index])
+        if sent >= segment_len:
+            sent -= segment_len
+            index += 1
+        else:
+            segments[index] = segments[index][sent:]
+            sent = 0
+    return index
+
+
+def sendmsg_all(sock, segments):
+    """
+    Sends all `segments` using `sock.sendmsg()`, taking care of partial sends
+    and of the IOV_MAX limit.
+
+    Return:
+        Number of bytes sent.
+    """
+    segments = [memoryview(s) for s in segments if len(s) > 0]
+    index = 0
+    total = 0
+    while index < len(segments):
+        sent = sock.sendmsg(segments[index:index + IOV_MAX])
+        total += sent
+        index = _advance(segments, index, sent)
+    return total
+
+
+def writev_all(fd, segments):
+    """
+    Writes all `segments` to the file descriptor `fd` using `os.writev()`,
+    taking care of partial writes and of the IOV_MAX limit.
+
+    Return:
+        Number of bytes written.
+    """
+    segments = [memoryview(s) for s in segments if len(s) > 0]
+    index = 0
+    total = 0
+    while index < len(segments):
+        written = os.writev(fd, segments[index:index + IOV_MAX])
+        total += written
+        index = _advance(segments, index, written)
+    return total
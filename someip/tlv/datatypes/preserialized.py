@@ -9,6 +9,22 @@ from .consts import Types
 from .serializable import Serializable
 from .type_helpers import format_bytearray_description_table, format_bytearray_to_stringsblock
 
+
+def iter_data_details(data, indent, bytes_per_row, max_items=None):
+    """
+    Yields the detail lines of raw data. If `max_items` is set, only the
+    first and last `max_items` rows of longer data are shown.
+    """
+    rows = (len(data) + bytes_per_row - 1) // bytes_per_row
+    if max_items is None or rows <= 2 * max_items:
+        yield format_bytearray_description_table(data, f'{"":>{indent}}Data', bytes_per_row)
+        return
+    head = max_items * bytes_per_row
+    tail = (rows - max_items) * bytes_per_row
+    yield format_bytearray_description_table(data[:head], f'{"":>{indent}}Data', bytes_per_row)
+    yield f'{"":>{3*bytes_per_row - 1}} | {"":>{indent}}... ({tail - head} byte(s) elided)'
+    yield format_bytearray_description_table(data[tail:], '', bytes_per_row)
+
 class Preserialized(Serializable):
     """
     Wrapps pre-serialized data with the Serializable interface.
@@ -67,6 +83,28 @@ class Preserialized(Serializable):
         """
         return bytearray()
 
+    def assign(self, value):
+        """
+        Replaces the data by `value` (bytes-like or a hex `str`).
+        """
+        self._data = bytearray(bytes.fromhex(value) if isinstance(value, str) else value)
+
+    def _shape_descriptor(self):
+        return (Preserialized, self._name, len(self._data))
+
+    @classmethod
+    def _from_shape_descriptor(cls, descriptor, data, offset):
+        _, name, length = descriptor
+        return cls(bytearray(data[offset:offset + length]), name), offset + length
+
+    def _serialize_into(self, buffer, offset):
+        end = offset + len(self._data)
+        buffer[offset:end] = self._data
+        return end
+
+    def _collect_iov(self, builder):
+        builder.reference(self._data)
+
     _INDENT_INCREMENT=4
     _BYTES_PER_ROW=4
 
@@ -75,18 +113,16 @@ class Preserialized(Serializable):
         return f'{self.name}({self.type.name})' if self.name is not None \
                 else self.type.name
 
-    def print_details(self, indent=0, cwidth=15, hide_tag=True):
-        data_indent=indent + Preserialized._INDENT_INCREMENT
+    def print_details(self, indent=0, cwidth=15, hide_tag=True, max_items=None,
+            max_depth=None):
+        return super().print_details(indent, cwidth, hide_tag, max_items, max_depth)
 
-        strings= [
-                f'{"":>{3*Preserialized._BYTES_PER_ROW - 1}} | '\
-                        f'{"":>{indent}}{self._formatted_title}:',
-                format_bytearray_description_table(
-                    self.serialization,
-                    f'{"":>{data_indent}}Data',
-                    Preserialized._BYTES_PER_ROW)
-                ]
-        return '\n'.join(strings)
+    def iter_details(self, indent=0, cwidth=15, hide_tag=True, max_items=None,
+            max_depth=None):
+        yield f'{"":>{3*Preserialized._BYTES_PER_ROW - 1}} | '\
+                f'{"":>{indent}}{self._formatted_title}:'
+        yield from iter_data_details(self._data, indent + Preserialized._INDENT_INCREMENT,
+                Preserialized._BYTES_PER_ROW, max_items)
 
     def _pretty_print(self, indent=0, cwidth=15):
         data_indent=indent + Preserialized._INDENT_INCREMENT
@@ -3,8 +3,13 @@
 :license: BSD, see LICENSE for details.
 """
 
+import copy
+import mmap
+import os
 from abc import ABC, abstractmethod
 
+from .iov import IovBuilder, DEFAULT_REFERENCE_THRESHOLD
+
 class Serializable(ABC):
     """
     Abstract type describing a serializable SOME/IP object.
@@ -58,3 +63,184 @@ class Serializable(ABC):
         In case a length field must not be serialized for this type, the
         returned `bytearray` will be empty.
         """
+
+    @abstractmethod
+    def iter_details(self, indent=0, cwidth=15, hide_tag=False, max_items=None,
+            max_depth=None):
+        """
+        Generator yielding the lines of the detailed explanation of the
+        serialization (see `print_details()`) one by one.
+
+        Args:
+            - max_items     if set, only the first and last `max_items` items
+                            of longer arrays and strings are shown
+            - max_depth     if set, items of complex types nested deeper than
+                            `max_depth` levels are not shown
+        """
+
+    def print_details(self, indent=0, cwidth=15, hide_tag=False, max_items=None,
+            max_depth=None) -> str:
+        """
+        Detailed explanation of the serialization, as one string.
+
+        Use `write_details()` for large payloads.
+        """
+        return '\n'.join(self.iter_details(indent, cwidth, hide_tag, max_items, max_depth))
+
+    def write_details(self, stream, max_items=None, max_depth=None):
+        """
+        Writes the detailed explanation of the serialization (see
+        `print_details()`) to the text `stream` line by line, without building
+        it in memory as a whole.
+        """
+        for line in self.iter_details(max_items=max_items, max_depth=max_depth):
+            stream.write(line)
+            stream.write('\n')
+
+    def serialization_iov(self, reference_threshold=DEFAULT_REFERENCE_THRESHOLD) -> list:
+        """
+        Scatter-gather variant of the `serialization` property.
+
+        Returns the serialization as a list of buffer segments (`memoryview`s)
+        that can be passed to `socket.sendmsg()` or `os.writev()`.
+        Tags and length fields are coalesced into one scratch buffer, leaf
+        buffers of at least `reference_threshold` bytes are referenced directly
+        instead of being copied.
+
+        Note: Referenced buffers must not be modified until the segments have
+        been written.
+        """
+        builder = IovBuilder(reference_threshold)
+        self._collect_iov(builder)
+        return builder.segments
+
+    def freeze(self):
+        """
+        Returns an immutable snapshot (`Frozen`) of this data type.
+
+        The snapshot serializes once and caches the serialization, its length
+        and a content hash. It is safe to share between threads and can be
+        used as dictionary key to deduplicate identical payloads.
+        """
+        # pylint: disable=import-outside-toplevel
+        from .frozen import Frozen
+        return Frozen(self)
+
+    @abstractmethod
+    def assign(self, value):
+        """
+        Assigns new values to this data type object in place, e.g. to refill
+        the same message tree every cycle instead of building a new one.
+
+        The `value` follows the structure of the data type: a number (or a
+        `dict` of flags for bitfields) for basic types, a `str` for strings,
+        a sequence of item values for arrays (items are reused, added or
+        removed to match), nested lists or a flat sequence for
+        multi-dimensional arrays, a `dict` by member name or data ID (members
+        not given keep their values) or a sequence by position for structs,
+        the member's value for unions and bytes for pre-serialized data.
+        Data IDs, wire types and length field settings are kept.
+        """
+
+    def clone(self):
+        """
+        Returns a copy of this data type for producing variants of a message.
+
+        Unlike `copy.deepcopy()`, the children of complex data types are
+        shared between the original and the clone. A shared child is copied
+        (shallowly again) on first access through its parent, e.g. by
+        `message["status"]`, so only the nodes along the modified paths are
+        copied and unchanged subtrees, including their cached length field
+        widths, stay shared. `items` copies all direct children at once.
+        Modifications of either tree do not affect the other one.
+
+        Note: References to children obtained *before* cloning point to the
+        shared objects, access them through the tree after cloning.
+        """
+        return copy.copy(self)
+
+    def _shape_descriptor(self):
+        """
+        Describes this data type for compact pickling (see
+        `_SomeIPDataType.__reduce__()`): a (hashable) tuple starting with the
+        class, whose `_from_shape_descriptor()` rebuilds the data type from
+        the descriptor and the serialization.
+
+        Data types without a shape descriptor are pickled as they are.
+        """
+        return (Serializable, self)
+
+    @classmethod
+    def _from_shape_descriptor(cls, descriptor, data, offset):
+        """
+        Rebuilds a data type from its `descriptor` and its serialization in
+        `data` at `offset`. Returns the data type and the offset behind its
+        serialization.
+        """
+        element = descriptor[1]
+        return element, offset + element.serialization_length
+
+    def _collect_iov(self, builder):
+        """
+        Adds the serialization of this data type to the `IovBuilder`.
+        """
+        builder.append(self.serialization)
+
+    def serialize_into(self, buffer, offset=0) -> int:
+        """
+        Writes the serialization directly into the writable `buffer` (e.g. a
+        `bytearray`, `memoryview` or `mmap`) at `offset`.
+
+        The buffer must provide at least `serialization_length` bytes behind
+        `offset`.
+
+        Return:
+            The offset behind the written serialization.
+        """
+        end = offset + self.serialization_length
+        if end > len(buffer):
+            raise ValueError(
+                    f'Buffer too small, need {end} bytes, got {len(buffer)}')
+        return self._serialize_into(buffer, offset)
+
+    def _serialize_into(self, buffer, offset) -> int:
+        """
+        Writes the serialization into `buffer` at `offset` without any checks.
+        Returns the offset behind the written serialization.
+        """
+        data = self.serialization
+        end = offset + len(data)
+        buffer[offset:end] = data
+        return end
+
+    def write_to_mmap(self, path, fsync=False) -> int:
+        """
+        Writes the serialization into the file `path` (created or truncated).
+
+        The file is sized exactly using `serialization_length`, memory-mapped
+        and the serialization is encoded directly into the mapping, i.e. the
+        serialized data is never built in memory as a whole.
+
+        Args:
+            - path      path of the file to write
+            - fsync     if True, flushes the mapping and syncs the file to
+                        disk before returning
+
+        Return:
+            The number of bytes written.
+        """
+        size = self.serialization_length
+        with open(path, 'w+b') as output_file:
+            output_file.truncate(size)
+            if size > 0:
+                with mmap.mmap(output_file.fileno(), size) as mapped:
+                    written = self._serialize_into(mapped, 0)
+                    if fsync:
+                        mapped.flush()
+                if written != size:
+                    raise RuntimeError(
+                            f'Serialization length mismatch: expected {size} bytes,'\
+                            f' wrote {written}')
+            if fsync:
+                os.fsync(output_file.fileno())
+        return size
@@ -0,0 +1,202 @@
+"""
+Content-addressed serialization cache.
+
+:copyright: Copyright 2021 by the Florian Münchbach.
+:license: BSD, see LICENSE for details.
+"""
+
+from collections import OrderedDict
+
+from .basic.basic_types import _BasicDataType
+from .complex import Array, MultiArray, String
+from .complex._complex_data_type import _ComplexDataType
+from .type_helpers import generate_tag, is_basic_type
+
+DEFAULT_MAX_ENTRIES=4096
+DEFAULT_MAX_BYTES=16 * 1024 * 1024
+
+
+class _Entry:
+    __slots__ = ('node_id', 'data')
+
+    def __init__(self, node_id):
+        self.node_id = node_id
+        self.data = None
+
+
+def _is_leaf(element):
+    """
+    True for data types serialized as a whole: basic types, strings,
+    multi-dimensional arrays and arrays storing their items as NumPy
+    ndarray or serialized values (their item objects are not created).
+    """
+    if not isinstance(element, _ComplexDataType) or isinstance(element, (String, MultiArray)):
+        return True
+    return isinstance(element, Array) and (element._values is not None or element._raw is not None)
+
+
+def _leaf_key(element):
+    if isinstance(element, _BasicDataType):
+        value = element.value
+        if isinstance(value, float):
+            # Distinguishes -0.0 and 0.0
+            value = value.hex()
+        # The width of bitfields, their flags do not change the serialization
+        return (type(element), element.data_id, element.wiretype, element.little_endian,
+                getattr(element, 'bits', None), value)
+    if isinstance(element, String):
+        return (String, element.data_id, element.wiretype, element._length,
+                element.lengthfield_length, element.string, element.terminate, element.bom,
+                element.padding)
+    return (type(element), bytes(element.serialization))
+
+
+class SerializationCache:
+    """
+    Opt-in cache reusing the serialization of identical subtrees.
+
+    Structs, arrays and unions are interned by their structural identity:
+    the data type, data ID, wire type, length and length field overrides,
+    the type selector of unions and the values of all children. Identical subtrees, e.g. the same sub-struct
+    repeated in several places of a message or in consecutive messages, are
+    serialized once and the cached bytes are reused afterwards.
+
+    The cache is bounded by the number of entries and the number of cached
+    bytes, the least recently used entries are evicted first.
+
+    Note: The structure of a message is hashed on every use, the cache only
+    pays off if large subtrees repeat. Check `hit_rate` for a given schema.
+
+    Args:
+        - max_entries   maximum number of interned subtrees
+        - max_bytes     maximum number of cached serialized bytes
+    """
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._next_id = 0
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        """
+        Number of cached serialized bytes.
+        """
+        return self._size
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        Ratio of subtree lookups answered from the cache.
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def clear(self):
+        """
+        Drops all cached entries, the counters are kept.
+        """
+        self._entries.clear()
+        self._size = 0
+
+    def reset_counters(self):
+        """
+        Resets the hit, miss and eviction counters.
+        """
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def serialize(self, element) -> bytearray:
+        """
+        Returns the serialization of `element`, equal to its `serialization`
+        property, reusing cached serializations of identical subtrees.
+        """
+        entries = {}
+        # Only evaluated to choose and cache the automatic length field
+        # widths of the tree, the wire types of the emitted tags depend on them
+        _length = element.serialization_length
+        self._intern(element, entries)
+        output = bytearray()
+        self._emit(element, entries, output)
+        self._evict()
+        return output
+
+    def serialize_into(self, element, buffer, offset=0) -> int:
+        """
+        Like `Serializable.serialize_into()`, using the cache.
+
+        Return:
+            The offset behind the written serialization.
+        """
+        data = self.serialize(element)
+        end = offset + len(data)
+        if end > len(buffer):
+            raise ValueError(f'Buffer too small, need {end} bytes, got {len(buffer)}')
+        buffer[offset:end] = data
+        return end
+
+    def _intern(self, element, entries):
+        """
+        Determines the structural key of `element` bottom-up.
+
+        Returns the key used in the parent's key.
+        """
+        if _is_leaf(element):
+            return _leaf_key(element)
+
+        key = (type(element), element.data_id, element._tag_wiretype, element._length,
+                element._lengthfield_len, getattr(element, 'elementtype', None),
+                getattr(element, 'serialized_selector', None),
+                tuple(self._intern(item, entries) for item in element._items))
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = _Entry(self._next_id)
+            self._next_id += 1
+            self._entries[key] = entry
+        else:
+            self._entries.move_to_end(key)
+        entries[id(element)] = entry
+        return entry.node_id
+
+    def _emit(self, element, entries, output):
+        entry = entries.get(id(element))
+        if entry is None:
+            output += element.serialization
+            return
+
+        if entry.data is not None:
+            self.hits += 1
+            output += entry.data
+            return
+
+        self.misses += 1
+        start = len(output)
+        lengthfield = element.lengthfield
+        output += generate_tag(element._tag_wiretype, element.data_id)
+        output += lengthfield
+        # Type selector of unions
+        output += getattr(element, 'serialized_selector', b'')
+        if getattr(element, 'elementtype', None) is not None \
+                and is_basic_type(element.elementtype):
+            output += element.serialized_value
+        else:
+            for item in element._items:
+                self._emit(item, entries, output)
+        entry.data = bytes(output[start:])
+        self._size += len(entry.data)
+
+    def _evict(self):
+        entries = self._entries
+        while entries and (len(entries) > self.max_entries or self._size > self.max_bytes):
+            _key, entry = entries.popitem(last=False)
+            if entry.data is not None:
+                self._size -= len(entry.data)
+            self.evictions += 1
@@ -0,0 +1,105 @@
+"""
+Static properties of the data types, looked up by `Types`.
+
+The helpers of `type_helpers`, the basic data types and the decoder read the
+width, default wire type and the precompiled `struct.Struct` codecs from this
+table instead of searching type lists and parsing format strings per call.
+
+:copyright: Copyright 2021 by the Florian Münchbach.
+:license: BSD, see LICENSE for details.
+"""
+
+import struct
+from enum import Enum
+from typing import NamedTuple
+
+from .consts import Types
+
+
+class Category(Enum):
+    """
+    Category of a data type.
+    """
+    NONE = 0
+    BASIC = 1
+    COMPLEX = 2
+    PRESERIALIZED = 3
+
+
+class TypeTraits(NamedTuple):
+    """
+    Static properties of a data type.
+
+    - category  the `Category`
+    - width     width of the serialized value in bytes, None if it is not
+                fixed by the type
+    - wiretype  wire type of the type, None if it depends on the element
+                (length field width of complex types, width of bitfields)
+    - codec     precompiled (big-endian) `struct.Struct` of the value, None
+                if the type has none
+    - codec_le  little-endian variant of `codec` for non-standard
+                deployments
+    - minimum   smallest valid value of integer and boolean types, else None
+    - maximum   largest valid value of integer and boolean types, else None
+    """
+    category: Category
+    width: int
+    wiretype: int
+    codec: struct.Struct
+    codec_le: struct.Struct
+    minimum: int
+    maximum: int
+
+
+def _basic(format_character, minimum=None, maximum=None):
+    codec = struct.Struct(f'!{format_character}')
+    wiretype = {1: 0, 2: 1, 4: 2, 8: 3}[codec.size]
+    return TypeTraits(Category.BASIC, codec.size, wiretype, codec,
+            struct.Struct(f'<{format_character}'), minimum, maximum)
+
+
+def struct_format(codec):
+    """
+    Format string of the `struct.Struct` `codec` (`bytes` before Python 3.7).
+    """
+    format_string = codec.format
+    return format_string.decode() if isinstance(format_string, bytes) else format_string
+
+
+def _other(category):
+    return TypeTraits(category, None, None, None, None, None, None)
+
+
+TRAITS={
+        Types.NONE:             _other(Category.NONE),
+        Types.BOOLEAN:          _basic('?', 0, 1),
+        Types.UINT8:            _basic('B', 0, 0xFF),
+        Types.SINT8:            _basic('b', -0x80, 0x7F),
+        Types.UINT16:           _basic('H', 0, 0xFFFF),
+        Types.SINT16:           _basic('h', -0x8000, 0x7FFF),
+        Types.UINT32:           _basic('I', 0, 0xFFFFFFFF),
+        Types.SINT32:           _basic('i', -0x80000000, 0x7FFFFFFF),
+        Types.FLOAT32:          _basic('f'),
+        Types.UINT64:           _basic('Q', 0, 0xFFFFFFFFFFFFFFFF),
+        Types.SINT64:           _basic('q', -0x8000000000000000, 0x7FFFFFFFFFFFFFFF),
+        Types.FLOAT64:          _basic('d'),
+        Types.ARRAY:            _other(Category.COMPLEX),
+        Types.STRING:           _other(Category.COMPLEX),
+        Types.STRUCT:           _other(Category.COMPLEX),
+        # Width and codec follow from the number of bits of the bitfield
+        Types.BITFIELD:         _other(Category.BASIC),
+        Types.UNION:            _other(Category.COMPLEX),
+        Types.PRESERIALIZED:    _other(Category.PRESERIALIZED),
+        }
+
+BASIC_TYPES=frozenset(
+        element_type for element_type, traits in TRAITS.items()
+        if traits.category is Category.BASIC)
+COMPLEX_TYPES=frozenset(
+        element_type for element_type, traits in TRAITS.items()
+        if traits.category is Category.COMPLEX)
+
+# Traits of the unsigned integer types by width, used for length fields,
+# bitfields and union selectors
+UINT_TRAITS={traits.width: traits for traits in (
+        TRAITS[Types.UINT8], TRAITS[Types.UINT16], TRAITS[Types.UINT32], TRAITS[Types.UINT64])}
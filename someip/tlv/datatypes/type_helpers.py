@@ -5,18 +5,19 @@ Some helpers
 :license: BSD, see LICENSE for details.
 """
 
-import struct
+from .consts import Types, TAG_LENGTH, WIRETYPE_COMPLEX_TYPE_STATIC_LEN
+from .traits import TRAITS, BASIC_TYPES, COMPLEX_TYPES, UINT_TRAITS, Category
 
-from .consts import Types
+_WIRETYPE_BY_LENGTHFIELD_WIDTH={0: WIRETYPE_COMPLEX_TYPE_STATIC_LEN, 1: 5, 2: 6, 4: 7}
+# Length field codecs by width
+_LENGTHFIELD_CODECS={width: UINT_TRAITS[width].codec for width in (1, 2, 4)}
 
 
 def is_basic_type(element_type):
-    return element_type in (Types.BOOLEAN, Types.UINT8, Types.SINT8,
-            Types.UINT16, Types.SINT16, Types.UINT32, Types.SINT32,
-            Types.FLOAT32, Types.UINT64, Types.SINT64, Types.FLOAT64)
+    return element_type in BASIC_TYPES
 
 def is_complex_type(element_type):
-    return element_type in (Types.ARRAY, Types.STRING, Types.STRUCT)
+    return element_type in COMPLEX_TYPES
 
 def is_preserialized_type(element_type):
     return element_type == Types.PRESERIALIZED
@@ -56,12 +57,12 @@ def serialize_lengthfield(value_length, lengthfield_len) -> bytearray:
         value_length    - value to loadd into the length field
         lengthfield_len - width of the length field
     """
-    check_lengthfield_length(lengthfield_len)
-
-    return struct.pack('!B', value_length) if lengthfield_len == 1 \
-            else struct.pack('!H', value_length) if lengthfield_len == 2 \
-            else struct.pack('!I', value_length) if lengthfield_len == 4 \
-            else bytearray()
+    if lengthfield_len == 0:
+        return bytearray()
+    codec = _LENGTHFIELD_CODECS.get(lengthfield_len)
+    if codec is None:
+        check_lengthfield_length(lengthfield_len)
+    return codec.pack(value_length)
 
 
 
@@ -84,33 +85,98 @@ def generate_tag(wiretype, data_id):
             (0xFF & data_id)
             ]) if data_id is not None else bytearray()
 
+def tag_length(data_id):
+    """
+    Returns the width of the tag in bytes, depending on whether a tag is
+    serialized for the given data ID at all.
+    """
+    return 0 if data_id is None else TAG_LENGTH
+
+def unpack_tag_from(buffer, offset=0):
+    """
+    Reads a tag from `buffer` at `offset`.
+
+    Return:
+        Tuple of wire type (including the reserved bit) and data ID.
+    """
+    if offset + TAG_LENGTH > len(buffer):
+        raise ValueError(f'Not enough data to read a tag at offset {offset}.')
+    return (buffer[offset] >> 4) & 0xF, ((buffer[offset] & 0x0F) << 8) | buffer[offset + 1]
+
+def unpack_lengthfield_from(buffer, offset, lengthfield_len) -> int:
+    """
+    Reads a length field of width `lengthfield_len` from `buffer` at `offset`.
+    """
+    check_lengthfield_length(lengthfield_len)
+    if offset + lengthfield_len > len(buffer):
+        raise ValueError(f'Not enough data to read a length field at offset {offset}.')
+
+    return buffer[offset] if lengthfield_len == 1 \
+            else _LENGTHFIELD_CODECS[lengthfield_len].unpack_from(buffer, offset)[0] \
+            if lengthfield_len else 0
+
+def pack_tag_into(buffer, offset, wiretype, data_id) -> int:
+    """
+    Writes the tag for given wire type and data ID into `buffer` at `offset`.
+
+    Return:
+        The offset behind the written tag.
+    """
+    tag = generate_tag(wiretype, data_id)
+    end = offset + len(tag)
+    buffer[offset:end] = tag
+    return end
+
+def pack_lengthfield_into(buffer, offset, value_length, lengthfield_len) -> int:
+    """
+    Writes a length field with the given length value and field width into
+    `buffer` at `offset`.
+
+    Return:
+        The offset behind the written length field.
+    """
+    lengthfield = serialize_lengthfield(value_length, lengthfield_len)
+    end = offset + len(lengthfield)
+    buffer[offset:end] = lengthfield
+    return end
+
 def _convert_basic_type_to_wiretype(basic_type):
-    # TODO optimize... looping...-.-
-    for wiretype, types in [
-            (0, (Types.BOOLEAN, Types.UINT8, Types.SINT8)),
-            (1, (Types.UINT16, Types.SINT16)),
-            (2, (Types.UINT32, Types.SINT32, Types.FLOAT32)),
-            (3, (Types.UINT64, Types.SINT64, Types.FLOAT64))
-            ]:
-        if basic_type in types:
-            return wiretype
-    # Not found?!
-    raise ValueError("Unknown basic type, can't determine wiretype")
+    traits = TRAITS.get(basic_type)
+    if traits is None or traits.category is not Category.BASIC or traits.wiretype is None:
+        raise ValueError("Unknown basic type, can't determine wiretype")
+    return traits.wiretype
+
+def get_minimal_lengthfield_width(length) -> int:
+    """
+    Returns the width of the smallest length field (1, 2 or 4 bytes) that can
+    hold the given length.
+    """
+    if length <= 0xFF:
+        return 1
+    elif length <= 0xFFFF:
+        return 2
+    elif length <= 0xFFFFFFFF:
+        return 4
+    raise ValueError("Element length too large."\
+            " Elements longer than 0xFFFFFFFF can not be serialized.")
+
+def get_wiretype_by_lengthfield_width(lengthfield_len):
+    """
+    Returns the wire type of complex types with a length field of the given
+    width (4 for omitted length fields).
+    """
+    check_lengthfield_length(lengthfield_len)
+    return _WIRETYPE_BY_LENGTHFIELD_WIDTH[lengthfield_len]
 
 def _determine_complex_type_wiretype(element):
     """
-    Note: This method only returns wiretypes 5 through 7, since a wiretype 4
-        must be specified as a mandatory value.
+    Returns the wire type matching the length field width of the element.
+
+    Note: Wire types 5 through 7 are returned for length fields chosen
+        automatically (see `get_minimal_lengthfield_width()`), wire type 4
+        only for an explicitly omitted length field.
     """
-    if element.length <= 0xFF:
-        pass # TODO
-    elif element.length <= 0xFFFF:
-        pass # TODO
-    elif element.length <= 0xFFFFFFFF:
-        pass # TODO
-    else:
-        raise ValueError("Element length too large."\
-                "Elements longer than 0xFFFFFFFF can not be serialized.")
+    return get_wiretype_by_lengthfield_width(element.lengthfield_length)
 
 
 
@@ -133,6 +199,9 @@ def get_wiretype_from_element(element, override=None):
             raise ValueError(f'The wire type can only be overriden with values\
                     in range(0, 15), got {override}')
         return override
+    elif element.type == Types.BITFIELD:
+        # Transported as unsigned integer of the same width
+        return UINT_TRAITS[element.bits // 8].wiretype
     elif is_basic_type(element.type):
         return _convert_basic_type_to_wiretype(element.type)
     elif is_complex_type(element.type):
@@ -163,9 +232,10 @@ def is_arrayish(list_of_elements, expected_type=None) -> bool:
 
 def format_bytearray_to_stringsblock(list_of_bytes, bytes_per_row):
     # TODO move into print_helper module
-    hex_list=["{:02X}".format(i) for i in list_of_bytes]
-
-    return [' '.join(j) for j in [hex_list[i:i+bytes_per_row] for i in range(0, len(hex_list), bytes_per_row)]]
+    hex_string = ' '.join(f'{byte:02X}' for byte in list_of_bytes)
+    # Each byte takes 3 characters (2 digits and a separator)
+    row_width = 3 * bytes_per_row
+    return [hex_string[i:i + row_width - 1] for i in range(0, len(hex_string), row_width)]
 
 def format_bytearray_description_table(list_of_bytes, text, bytes_per_row):
     # TODO move into print_helper module
@@ -0,0 +1,262 @@
+"""
+Mutation fuzzer for serialized SOME/IP TLV payloads.
+
+Generating malformed variants using the `wiretype` and `length` overrides of
+the data types requires rebuilding and serializing a tree per variant. The
+fuzzer instead serializes a seed message once, determines the layout (offsets
+of all tags, length fields and values) and mutates copies of the serialized
+buffer in place:
+
+    for mutant in Fuzzer(message, seed=42).variants(10000):
+        send(mutant.data)
+
+The variants only depend on the seed message, the `seed` and the selected
+mutations, i.e. a failing variant can be reproduced by its index.
+
+:copyright: Copyright 2021 by the Florian Münchbach.
+:license: BSD, see LICENSE for details.
+"""
+
+import bisect
+import random
+import struct
+from typing import NamedTuple
+
+from .datatypes.complex import MultiArray, String
+from .datatypes.type_helpers import tag_length
+
+MUTATIONS=(
+        'tag_bitflip',          # flip one bit of a tag (wire type or data ID)
+        'wiretype',             # replace the wire type of a tag (including reserved bit)
+        'length_overflow',      # length field value larger than the actual length
+        'length_underflow',     # length field value smaller than the actual length
+        'value_bitflip',        # flip one bit of a basic type's value
+        'truncate',             # cut the payload short
+        'duplicate',            # repeat an element (enclosing length fields adjusted)
+        )
+
+_LENGTHFIELD_STRUCTS={1: struct.Struct('!B'), 2: struct.Struct('!H'), 4: struct.Struct('!I')}
+
+
+class ElementLayout(NamedTuple):
+    """
+    Position of an element within the serialized seed message.
+
+    - path                  names of the element and its parents, separated
+                            by `/`, array items as `[index]`
+    - start                 offset of the element (tag, if any)
+    - end                   offset behind the element
+    - tag_offset            offset of the tag, None if untagged
+    - lengthfield_offset    offset of the length field
+    - lengthfield_width     width of the length field, 0 if there is none
+    - value_offset          offset of the value
+    - parent                index of the enclosing element in the layout,
+                            None for the top-level element
+    - leaf                  True for basic types, strings, multi-dimensional
+                            arrays and pre-serialized data
+    """
+    path: str
+    start: int
+    end: int
+    tag_offset: int
+    lengthfield_offset: int
+    lengthfield_width: int
+    value_offset: int
+    parent: int
+    leaf: bool
+
+
+class Mutant(NamedTuple):
+    """
+    A mutated variant of the seed message.
+
+    - data      the mutated serialization
+    - mutation  name of the mutation (see `MUTATIONS`)
+    - path      path of the mutated element (see `ElementLayout`)
+    - offset    offset of the mutation in `data`
+    """
+    data: bytearray
+    mutation: str
+    path: str
+    offset: int
+
+
+def layout(element) -> list:
+    """
+    Determines the layout of the serialization of `element` and its children
+    (in serialization order) without serializing it.
+    """
+    elements = []
+    _collect_layout(element, str(element.name), 0, None, elements)
+    return elements
+
+
+def _collect_layout(element, path, offset, parent, elements):
+    start = offset
+    end = offset + element.serialization_length
+    data_id = getattr(element, 'data_id', None)
+    tag_len = tag_length(data_id)
+    width = len(element.lengthfield)
+    leaf = not hasattr(element, '_item_range') or isinstance(element, (String, MultiArray))
+    elements.append(ElementLayout(path, start, end, start if tag_len else None,
+            start + tag_len, width, start + tag_len + width, parent, leaf))
+    if leaf:
+        return
+    index = len(elements) - 1
+    # Unions: the items follow the type selector
+    offset = start + tag_len + width + getattr(element, 'selector_len', 0)
+    # Neither keeps lazily stored items nor copies items shared with a clone
+    items = element._item_range(0, element._item_count())
+    for position, item in enumerate(items):
+        if getattr(element, 'elementtype', None) is not None:
+            item_path = f'{path}/[{position}]'
+        else:
+            item_path = f'{path}/{item.name if item.name is not None else position}'
+        _collect_layout(item, item_path, offset, index, elements)
+        offset += item.serialization_length
+
+
+class Fuzzer:
+    """
+    Generates mutated variants of a seed message.
+
+    Args:
+        - element       the seed message (data type object), serialized once
+        - seed          seed of the random number generator
+        - mutations     names of the mutations to apply (default: all of
+                        `MUTATIONS`), mutations without a target in the
+                        seed message (e.g. no tags) are left out
+    """
+    def __init__(self, element, seed=None, mutations=MUTATIONS):
+        unknown = set(mutations) - set(MUTATIONS)
+        if unknown:
+            raise ValueError(f'Unknown mutation(s) {", ".join(sorted(unknown))}.')
+
+        self.data = bytes(element.serialization)
+        self.layout = layout(element)
+        self._random = random.Random(seed)
+        self._tags = [item for item in self.layout if item.tag_offset is not None]
+        self._lengthfields = [item for item in self.layout if item.lengthfield_width > 0]
+        self._values = [item for item in self.layout
+                if item.leaf and item.end > item.value_offset]
+        self._children = [item for item in self.layout if item.parent is not None]
+        self._starts = [item.start for item in self.layout]
+        self._boundaries = sorted({offset for item in self.layout
+                for offset in (item.start, item.value_offset, item.end) if offset < len(self.data)})
+
+        targets = {
+                'tag_bitflip': self._tags,
+                'wiretype': self._tags,
+                'length_overflow': self._lengthfields,
+                'length_underflow': self._lengthfields,
+                'value_bitflip': self._values,
+                'truncate': self._boundaries,
+                'duplicate': self._children,
+                }
+        self.mutations = tuple(mutation for mutation in mutations if targets[mutation])
+        if not self.mutations:
+            raise ValueError('None of the mutations is applicable to the seed message.')
+        self._mutators = [getattr(self, f'_{mutation}') for mutation in self.mutations]
+
+    def mutate(self) -> Mutant:
+        """
+        Returns the next mutated variant.
+        """
+        return self._random.choice(self._mutators)()
+
+    def variants(self, count=None):
+        """
+        Generator yielding `count` (default: unlimited) mutated variants.
+        """
+        mutate = self.mutate
+        if count is None:
+            while True:
+                yield mutate()
+        for _unused in range(0, count):
+            yield mutate()
+
+    def _tag_bitflip(self):
+        item = self._random.choice(self._tags)
+        data = bytearray(self.data)
+        bit = self._random.getrandbits(4)
+        data[item.tag_offset + (bit >> 3)] ^= 0x80 >> (bit & 0x7)
+        return Mutant(data, 'tag_bitflip', item.path, item.tag_offset)
+
+    def _wiretype(self):
+        item = self._random.choice(self._tags)
+        data = bytearray(self.data)
+        offset = item.tag_offset
+        wiretype = data[offset] >> 4
+        # Any other wire type, including the reserved bit
+        wiretype = (wiretype + 1 + self._random.randrange(0, 15)) & 0xF
+        data[offset] = (wiretype << 4) | (data[offset] & 0x0F)
+        return Mutant(data, 'wiretype', item.path, offset)
+
+    def _lengthfield(self, overflow):
+        item = self._random.choice(self._lengthfields)
+        lengthfield = _LENGTHFIELD_STRUCTS[item.lengthfield_width]
+        actual = lengthfield.unpack_from(self.data, item.lengthfield_offset)[0]
+        maximum = (1 << (8 * item.lengthfield_width)) - 1
+        if overflow and actual == maximum or not overflow and actual == 0:
+            overflow = not overflow
+        if overflow:
+            # Mostly small overruns, sometimes the maximum value
+            value = min(actual + 1 + self._random.getrandbits(4), maximum) \
+                    if self._random.getrandbits(2) else maximum
+        else:
+            value = max(actual - 1 - self._random.getrandbits(4), 0) \
+                    if self._random.getrandbits(2) else 0
+        data = bytearray(self.data)
+        lengthfield.pack_into(data, item.lengthfield_offset, value)
+        return Mutant(data, 'length_overflow' if overflow else 'length_underflow', item.path,
+                item.lengthfield_offset)
+
+    def _length_overflow(self):
+        return self._lengthfield(True)
+
+    def _length_underflow(self):
+        return self._lengthfield(False)
+
+    def _value_bitflip(self):
+        item = self._random.choice(self._values)
+        offset = self._random.randrange(item.value_offset, item.end)
+        data = bytearray(self.data)
+        data[offset] ^= 1 << self._random.getrandbits(3)
+        return Mutant(data, 'value_bitflip', item.path, offset)
+
+    def _truncate(self):
+        # Cut at element and value boundaries or anywhere
+        if self._random.getrandbits(1):
+            offset = self._random.choice(self._boundaries)
+        else:
+            offset = self._random.randrange(0, len(self.data))
+        # Innermost element containing the offset
+        item = self.layout[max(bisect.bisect_right(self._starts, offset) - 1, 0)]
+        while item.end <= offset and item.parent is not None:
+            item = self.layout[item.parent]
+        return Mutant(bytearray(self.data[:offset]), 'truncate', item.path, offset)
+
+    def _duplicate(self):
+        item = self._random.choice(self._children)
+        data = bytearray(self.data[:item.end])
+        data += self.data[item.start:]
+        # Keep the duplicate within the enclosing elements
+        size = item.end - item.start
+        parent = item.parent
+        while parent is not None:
+            enclosing = self.layout[parent]
+            if enclosing.lengthfield_width > 0:
+                lengthfield = _LENGTHFIELD_STRUCTS[enclosing.lengthfield_width]
+                length = lengthfield.unpack_from(data, enclosing.lengthfield_offset)[0] + size
+                maximum = (1 << (8 * enclosing.lengthfield_width)) - 1
+                lengthfield.pack_into(data, enclosing.lengthfield_offset, min(length, maximum))
+            parent = enclosing.parent
+        return Mutant(data, 'duplicate', item.path, item.end)
+
+
+def fuzz(element, count=None, seed=None, mutations=MUTATIONS):
+    """
+    Generator yielding `count` (default: unlimited) mutated variants of
+    `element`, see `Fuzzer`.
+    """
+    return Fuzzer(element, seed, mutations).variants(count)
@@ -5,22 +5,25 @@
 :license: BSD, see LICENSE for details.
 """
 
-import argparse
 import logging
-import json
 import sys
 from someip.tlv.converter import json_parser
 from someip.tlv.datatypes.type_helpers import format_bytearray_to_stringsblock
 
 logger = logging.getLogger("SOMEIP")
-logger.setLevel(logging.INFO)
-formatter = logging.Formatter('%(levelname)-8s - %(message)s')
-ch = logging.StreamHandler()
-ch.setFormatter(formatter)
-logger.addHandler(ch)
+
+
+def _setup_logging():
+    logger.setLevel(logging.INFO)
+    formatter = logging.Formatter('%(levelname)-8s - %(message)s')
+    ch = logging.StreamHandler()
+    ch.setFormatter(formatter)
+    logger.addHandler(ch)
 
 
 def __parse_args():
+    # pylint: disable=import-outside-toplevel; only needed when run as script
+    import argparse
     parser = argparse.ArgumentParser(description="SOME/IP TLV payload serializer")
     parser.add_argument('json', metavar='JSON', type=str, nargs='+',
             help='JSON message definition. Can be specified multiple times.')
@@ -28,12 +31,18 @@ def __parse_args():
             help='Print a verbose explanaition of the serialization')
     parser.add_argument('--quiet', '-q', action='store_true',
             help='Be more quiet')
+    parser.add_argument('--max-items', type=int, default=None, metavar='N',
+            help='Explain only the first and last N items of arrays and strings')
+    parser.add_argument('--max-depth', type=int, default=None, metavar='N',
+            help='Explain nested data types up to a depth of N only')
 
     args=parser.parse_args()
     logger.debug("Parsed arguments: %s", args)
     return args
 
-def _print_serialization(filename, explain, quiet=False):
+def _print_serialization(filename, explain, quiet=False, max_items=None, max_depth=None):
+    # pylint: disable=import-outside-toplevel; imported by json_parser on use
+    import json
     message = None
 
     if quiet:
@@ -49,7 +58,7 @@ def _print_serialization(filename, explain, quiet=False):
         sys.exit(1)
     else:
         if explain:
-            print(message.print_details())
+            message.write_details(sys.stdout, max_items=max_items, max_depth=max_depth)
         else:
             lines = [] if quiet else [ '------------------------------\nSerialized message:\n' ]
             lines.extend(format_bytearray_to_stringsblock(message.serialization, 8))
@@ -58,10 +67,11 @@ def _print_serialization(filename, explain, quiet=False):
             print('\n'.join(lines))
 
 def main():
+    _setup_logging()
     args = __parse_args()
 
     for filename in args.json:
-        _print_serialization(filename, args.explain, args.quiet)
+        _print_serialization(filename, args.explain, args.quiet, args.max_items, args.max_depth)
 
 if __name__ == "__main__":
     main()
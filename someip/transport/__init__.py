@@ -0,0 +1,16 @@
+"""
+SOME/IP transport integration for serialized TLV payloads.
+"""
+
+from .._lazy import lazy_loader
+
+__all__ = [
+        'archive',
+        'crc',
+        'e2e',
+        'header',
+        'stream',
+        'tp',
+        ]
+
+__getattr__, __dir__ = lazy_loader(__name__, submodules=__all__)
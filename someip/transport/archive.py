@@ -0,0 +1,353 @@
+"""
+Indexed archive of recorded payloads.
+
+An archive consists of two files: the data file (`path`) holding the
+serialized payloads back to back, and the index file (`path` + `.idx`) holding
+one fixed-width entry per payload:
+
+    timestamp       int64, nanoseconds (e.g. `time.time_ns()`)
+    offset          uint64, offset of the payload in the data file
+    length          uint32, length of the payload
+    message ID      uint32, service ID and method ID (`Header.message_id`)
+    name offset     uint64, offset of the UTF-8 description name in the data
+                    file (each name is written once per writer)
+    name length     uint16
+
+All numbers are big-endian. Both files start with a magic number and the
+format version. The writer buffers the index entries and writes them only
+after the payloads they refer to were flushed. Entries left partially written
+or referring to missing data by an interrupted writer (e.g. on a system crash,
+the files are not synced) are dropped when the archive is continued; the
+reader rejects them.
+
+The reader maps both files into memory (`mmap`): payload #N is found by
+computing the position of its index entry, time ranges by a binary search on
+the timestamps, which must not decrease. Payloads are returned as
+`memoryview`s of the mapping and can be passed to a codec's `decode()`
+without copying.
+
+:copyright: Copyright 2021 by the Florian Münchbach.
+:license: BSD, see LICENSE for details.
+"""
+
+import mmap
+import os
+import struct
+import time
+from typing import NamedTuple
+
+from .tp import serialize_payload
+
+ARCHIVE_VERSION=1
+INDEX_SUFFIX='.idx'
+
+_DATA_MAGIC=b'SOMEIPAD'
+_INDEX_MAGIC=b'SOMEIPAI'
+_FILE_HEADER_STRUCT = struct.Struct('!8sI')
+_ENTRY_STRUCT = struct.Struct('!qQIIQH')
+_TIMESTAMP_STRUCT = struct.Struct('!q')
+# Buffered index entries are written after flushing the data at this size
+_INDEX_BUFFER_SIZE=64 * 1024
+
+
+class Record(NamedTuple):
+    """
+    Archived payload with its metadata, see `ArchiveReader`.
+    """
+    index: int
+    timestamp: int
+    message_id: int
+    name: str
+    payload: memoryview
+
+
+def _check_header(header, magic, path):
+    if len(header) < _FILE_HEADER_STRUCT.size:
+        raise ValueError(f'Not an archive file: {path}')
+    file_magic, version = _FILE_HEADER_STRUCT.unpack_from(header)
+    if file_magic != magic:
+        raise ValueError(f'Not an archive file: {path}')
+    if version != ARCHIVE_VERSION:
+        raise ValueError(f'Unsupported archive version {version}: {path}')
+
+
+def _open_file(path, magic):
+    """
+    Opens `path` for appending, creating it with the file header if needed.
+    """
+    archive_file = open(path, 'a+b') # pylint: disable=consider-using-with
+    archive_file.seek(0)
+    header = archive_file.read(_FILE_HEADER_STRUCT.size)
+    if header:
+        try:
+            _check_header(header, magic, path)
+        except ValueError:
+            archive_file.close()
+            raise
+    else:
+        archive_file.write(_FILE_HEADER_STRUCT.pack(magic, ARCHIVE_VERSION))
+        archive_file.flush()
+    return archive_file
+
+
+def _map(path, magic):
+    """
+    Maps `path` into memory for reading.
+    """
+    with open(path, 'rb') as archive_file:
+        _check_header(archive_file.read(_FILE_HEADER_STRUCT.size), magic, path)
+        return mmap.mmap(archive_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _entry_valid(entry, data_size):
+    """
+    True if the payload and name of the index `entry` are within the data
+    file of `data_size` bytes.
+    """
+    _, offset, length, _, name_offset, name_length = entry
+    return offset + length <= data_size and name_offset + name_length <= data_size \
+            and offset >= _FILE_HEADER_STRUCT.size and name_offset >= _FILE_HEADER_STRUCT.size
+
+
+def _time_ns():
+    """
+    Current time in nanoseconds since the epoch (`time.time_ns()` requires
+    Python 3.7).
+    """
+    if hasattr(time, 'time_ns'):
+        return time.time_ns()
+    return int(time.time() * 1e9)
+
+
+class ArchiveWriter:
+    """
+    Appends payloads with their metadata to an archive, see the module
+    documentation. An existing archive is continued.
+
+    Use as context manager or `close()` the writer.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            - path      path of the data file, the index file is `path` +
+                        `.idx`
+        """
+        self._data = _open_file(path, _DATA_MAGIC)
+        try:
+            self._index = _open_file(path + INDEX_SUFFIX, _INDEX_MAGIC)
+        except Exception:
+            self._data.close()
+            raise
+        self._offset = self._data.seek(0, os.SEEK_END)
+        # Drop the entries of an interrupted writer that were written
+        # partially or refer to data missing in the data file
+        entries = (self._index.seek(0, os.SEEK_END) - _FILE_HEADER_STRUCT.size) \
+                // _ENTRY_STRUCT.size
+        self._last_timestamp = None
+        while entries:
+            self._index.seek(_FILE_HEADER_STRUCT.size + (entries - 1) * _ENTRY_STRUCT.size)
+            entry = _ENTRY_STRUCT.unpack(self._index.read(_ENTRY_STRUCT.size))
+            if _entry_valid(entry, self._offset):
+                self._last_timestamp = entry[0]
+                break
+            entries -= 1
+        self._index.truncate(_FILE_HEADER_STRUCT.size + entries * _ENTRY_STRUCT.size)
+        self._count = entries
+        # Index entries of payloads not flushed yet
+        self._pending = bytearray()
+        # Offset and length of the names written by this writer
+        self._names = {}
+
+    def __len__(self):
+        return self._count
+
+    def append(self, payload, timestamp=None, message_id=0, name=None) -> int:
+        """
+        Appends `payload` (data type object or bytes-like object).
+
+        Args:
+            - timestamp     reception time in nanoseconds, default: now. Must
+                            not be smaller than the one of the previous
+                            payload
+            - message_id    32 bit message ID of the payload
+            - name          name of the payload's description, e.g. to select
+                            the codec when reading, default: the name of the
+                            data type object (if any)
+
+        Return:
+            The index of the payload in the archive.
+        """
+        if timestamp is None:
+            timestamp = _time_ns()
+        if self._last_timestamp is not None and timestamp < self._last_timestamp:
+            raise ValueError(f'Timestamps must not decrease, got {timestamp} after'\
+                    f' {self._last_timestamp}')
+        if message_id not in range(0, 0x100000000):
+            raise ValueError(f'The message ID must be a 32 bit number, got {message_id}')
+        if name is None:
+            name = getattr(payload, 'name', None) or ''
+
+        name_offset, name_length = self._write_name(name)
+        data = serialize_payload(payload)
+        offset = self._offset
+        self._data.write(data)
+        self._offset += len(data)
+        self._pending += _ENTRY_STRUCT.pack(
+                timestamp, offset, len(data), message_id, name_offset, name_length)
+        self._last_timestamp = timestamp
+        self._count += 1
+        if len(self._pending) >= _INDEX_BUFFER_SIZE:
+            self.flush()
+        return self._count - 1
+
+    def _write_name(self, name):
+        location = self._names.get(name)
+        if location is None:
+            encoded = name.encode('utf-8')
+            if len(encoded) > 0xFFFF:
+                raise ValueError(f'Description name too long ({len(encoded)} bytes)')
+            location = (self._offset, len(encoded))
+            self._data.write(encoded)
+            self._offset += len(encoded)
+            self._names[name] = location
+        return location
+
+    def flush(self):
+        """
+        Writes the buffered payloads to the data file, then their index
+        entries to the index file.
+        """
+        self._data.flush()
+        self._index.write(self._pending)
+        self._pending.clear()
+        self._index.flush()
+
+    def close(self):
+        if not self._data.closed:
+            self.flush()
+        self._data.close()
+        self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class ArchiveReader:
+    """
+    Random access to the payloads of an archive, see the module
+    documentation.
+
+    The reader sees the payloads archived when it was opened. Payloads are
+    `memoryview`s of the memory-mapped data file: release them (and objects
+    referencing them, e.g. arrays decoded with `numpy=True`) before closing
+    the reader.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            - path      path of the data file, the index file is `path` +
+                        `.idx`
+        """
+        self._data = _map(path, _DATA_MAGIC)
+        try:
+            self._index = _map(path + INDEX_SUFFIX, _INDEX_MAGIC)
+        except Exception:
+            self._data.close()
+            raise
+        self._data_view = memoryview(self._data)
+        # A partially written entry is ignored
+        self._count = (len(self._index) - _FILE_HEADER_STRUCT.size) // _ENTRY_STRUCT.size
+        self._names = {}
+
+    def __len__(self):
+        return self._count
+
+    def _entry(self, index):
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(f'Archive index out of range: {index}')
+        entry = _ENTRY_STRUCT.unpack_from(
+                self._index, _FILE_HEADER_STRUCT.size + index * _ENTRY_STRUCT.size)
+        if not _entry_valid(entry, len(self._data)):
+            raise ValueError(f'Archive entry {index} refers to data missing in the data file')
+        return index, entry
+
+    def _name(self, offset, length):
+        name = self._names.get(offset)
+        if name is None:
+            name = str(self._data[offset:offset + length], 'utf-8')
+            self._names[offset] = name
+        return name
+
+    def payload(self, index) -> memoryview:
+        """
+        Returns the payload #`index` without copying it.
+        """
+        _, (_, offset, length, _, _, _) = self._entry(index)
+        return self._data_view[offset:offset + length]
+
+    def __getitem__(self, index) -> Record:
+        """
+        Returns the payload #`index` with its metadata as `Record`.
+        """
+        index, (timestamp, offset, length, message_id, name_offset, name_length) \
+                = self._entry(index)
+        return Record(index, timestamp, message_id, self._name(name_offset, name_length),
+                self._data_view[offset:offset + length])
+
+    def __iter__(self):
+        for index in range(0, self._count):
+            yield self[index]
+
+    def timestamp(self, index) -> int:
+        """
+        Returns the timestamp of the payload #`index`.
+        """
+        return self._entry(index)[1][0]
+
+    def bisect(self, timestamp) -> int:
+        """
+        Returns the index of the first payload archived at or after
+        `timestamp`, `len(reader)` if there is none.
+        """
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            middle_timestamp = _TIMESTAMP_STRUCT.unpack_from(
+                    self._index, _FILE_HEADER_STRUCT.size + middle * _ENTRY_STRUCT.size)[0]
+            if middle_timestamp < timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def range(self, start=None, end=None):
+        """
+        Yields the records archived at or after `start` and before `end`
+        (timestamps in nanoseconds, None for no limit).
+        """
+        first = 0 if start is None else self.bisect(start)
+        last = self._count if end is None else self.bisect(end)
+        for index in range(first, last):
+            yield self[index]
+
+    def close(self):
+        """
+        Unmaps the files. Raises a `BufferError` if payloads are still
+        referenced.
+        """
+        self._data_view.release()
+        self._data.close()
+        self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
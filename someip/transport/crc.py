@@ -0,0 +1,194 @@
+"""
+Table driven CRC calculation.
+
+The CRCs are calculated using 65536 entry lookup tables, which are built on
+first use: two bytes per step for 8 bit CRCs, four bytes per step using two
+tables for the others. The CRC-16/CCITT-FALSE and CRC-32 (IEEE 802.3)
+calculations are delegated to `binascii` and `zlib`.
+
+Longer buffers are processed without a step per word by the 8 bit CRCs: the
+register of a buffer is a linear function of its bytes, so the registers of
+all bytes are looked up at once (`bytes.translate()`) and the registers of
+adjacent blocks combined pairwise, shifting the register of the first block
+by the length of the second one. Each round halves the number of blocks and
+runs in C.
+
+:copyright: Copyright 2021 by the Florian Münchbach.
+:license: BSD, see LICENSE for details.
+"""
+
+import binascii
+import struct
+import zlib
+
+from ..tlv.datatypes._import_helper import cached_property
+
+
+# 8 bit CRCs of buffers with at least this many bytes are computed pairwise
+_PAIRWISE_MIN_LENGTH=384
+
+
+def _reflect(value, width):
+    return int(f'{value:0{width}b}'[::-1], 2)
+
+
+class Crc:
+    """
+    CRC algorithm following the common parametrization (width, polynomial,
+    initial value, final XOR value, reflection of input and output).
+
+    Calling the object computes the CRC over a bytes-like object. The
+    calculation can be continued over several buffers by passing the
+    previous result as `crc`.
+    """
+    def __init__(self, width, poly, init, xorout, reflected, name=None):
+        if width not in (8, 16, 32):
+            raise ValueError(f'Unsupported CRC width {width}.')
+        self.width = width
+        self.poly = poly
+        self.init = init
+        self.xorout = xorout
+        self.reflected = reflected
+        self.name = name
+        self._mask = (1 << width) - 1
+        self._native = None
+        if not reflected and width == 16 and poly == 0x1021:
+            self._native = binascii.crc_hqx
+        elif reflected and width == 32 and poly == 0x04C11DB7 and xorout == 0xFFFFFFFF:
+            self._native = lambda data, register: zlib.crc32(data, register ^ 0xFFFFFFFF) \
+                    ^ 0xFFFFFFFF
+
+    def __repr__(self):
+        return f'Crc({self.name or hex(self.poly)})'
+
+    @cached_property
+    def _table8(self):
+        width = self.width
+        table = []
+        if self.reflected:
+            poly = _reflect(self.poly, width)
+            for byte in range(0, 256):
+                register = byte
+                for _unused in range(0, 8):
+                    register = (register >> 1) ^ poly if register & 1 else register >> 1
+                table.append(register)
+        else:
+            top = 1 << (width - 1)
+            for byte in range(0, 256):
+                register = byte << (width - 8)
+                for _unused in range(0, 8):
+                    register = ((register << 1) ^ self.poly) if register & top else register << 1
+                table.append(register & self._mask)
+        return table
+
+    @cached_property
+    def _table16(self):
+        # CRC register after processing the two bytes of the index, starting at 0
+        table8 = self._table8
+        if self.reflected:
+            return [table8[table8[index & 0xFF] & 0xFF ^ (index >> 8)] ^ (table8[index & 0xFF] >> 8)
+                    for index in range(0, 0x10000)]
+        shift = self.width - 8
+        mask = self._mask
+        table = []
+        for index in range(0, 0x10000):
+            register = table8[index >> 8]
+            register = ((register << 8) & mask) ^ table8[((register >> shift) ^ index) & 0xFF]
+            table.append(register)
+        return table
+
+    @cached_property
+    def _table32(self):
+        # CRC register after processing the two bytes of the index followed
+        # by two zero bytes, starting at 0
+        table16 = self._table16
+        if self.reflected:
+            return [(register >> 16) ^ table16[register & 0xFFFF] for register in table16]
+        shift = self.width - 16
+        mask = self._mask
+        return [((register << 16) & mask) ^ table16[register >> shift] for register in table16]
+
+    @cached_property
+    def _shift_tables(self):
+        # Translation tables of 8 bit registers to the ones after processing
+        # 2**index zero bytes
+        tables = [bytes(self._table8)]
+        for _unused in range(1, 64):
+            tables.append(tables[-1].translate(tables[-1]))
+        return tables
+
+    def register(self, data, register) -> int:
+        """
+        Processes `data` starting with the (raw) CRC `register`, i.e. without
+        applying the initial and final XOR values.
+        """
+        if self._native is not None:
+            return self._native(data, register)
+
+        data = memoryview(data).cast('B')
+        table16 = self._table16
+        if self.width == 8 and not self.reflected:
+            if len(data) >= _PAIRWISE_MIN_LENGTH:
+                return self._register_pairwise(data, register)
+            count = len(data) // 2
+            for word in struct.unpack_from(f'>{count}H', data):
+                register = table16[(register << 8) ^ word]
+            processed = count * 2
+        else:
+            count = len(data) // 4
+            table32 = self._table32
+            if self.reflected:
+                for word in struct.unpack_from(f'<{count}I', data):
+                    word ^= register
+                    register = table32[word & 0xFFFF] ^ table16[word >> 16]
+            else:
+                shift = 32 - self.width
+                for word in struct.unpack_from(f'>{count}I', data):
+                    word ^= register << shift
+                    register = table32[word >> 16] ^ table16[word & 0xFFFF]
+            processed = count * 4
+
+        if processed == len(data):
+            return register
+        table8 = self._table8
+        if self.reflected:
+            for byte in data[processed:]:
+                register = (register >> 8) ^ table8[(register ^ byte) & 0xFF]
+        else:
+            shift = self.width - 8
+            mask = self._mask
+            for byte in data[processed:]:
+                register = ((register << 8) & mask) ^ table8[((register >> shift) ^ byte) & 0xFF]
+        return register
+
+    def _register_pairwise(self, data, register):
+        """
+        `register()` of an 8 bit (not reflected) CRC over the non-empty
+        `data`, see the module description.
+        """
+        # Starting at 0, the register is XORed into the first byte instead
+        lanes = bytearray(data)
+        lanes[0] ^= register
+        # Processing a byte from 0 equals processing a zero byte from it
+        lanes = lanes.translate(self._shift_tables[0])
+        for shift_table in self._shift_tables:
+            if len(lanes) == 1:
+                break
+            if len(lanes) % 2:
+                # Leading zero bytes keep the register at 0
+                lanes.insert(0, 0)
+            first = int.from_bytes(lanes[0::2].translate(shift_table), 'big')
+            lanes = bytearray((first ^ int.from_bytes(lanes[1::2], 'big'))
+                    .to_bytes(len(lanes) // 2, 'big'))
+        return lanes[0]
+
+    def __call__(self, data, crc=None) -> int:
+        register = self.init if crc is None else crc ^ self.xorout
+        return self.register(data, register) ^ self.xorout
+
+
+CRC8_SAE_J1850 = Crc(8, 0x1D, 0xFF, 0xFF, False, name='CRC-8/SAE-J1850')
+CRC8_H2F = Crc(8, 0x2F, 0xFF, 0xFF, False, name='CRC-8/AUTOSAR')
+CRC16_CCITT_FALSE = Crc(16, 0x1021, 0xFFFF, 0x0000, False, name='CRC-16/CCITT-FALSE')
+CRC32 = Crc(32, 0x04C11DB7, 0xFFFFFFFF, 0xFFFFFFFF, True, name='CRC-32')
+CRC32_P4 = Crc(32, 0xF4ACFB13, 0xFFFFFFFF, 0xFFFFFFFF, True, name='CRC-32/AUTOSAR')
@@ -0,0 +1,270 @@
+"""
+AUTOSAR end-to-end (E2E) protection of serialized payloads.
+
+The E2E profiles protect a payload by a CRC and an alive counter written into
+a header at a fixed position within the payload. The header is usually part of
+the data type tree (e.g. the first members of the top-level struct), its
+position can be determined using `value_offset()`.
+
+Both protecting and checking operate in place on the serialized buffer, no
+copy of the payload is made:
+
+    profile = Profile4(data_id=0x1234, offset=value_offset(message, header_element))
+    buffer = bytearray(message.serialization_length)
+    message.serialize_into(buffer)
+    profile.protect(buffer)
+
+The sender and receiver states (counters) are kept separately, a profile object
+is used for one direction of one data element.
+
+:copyright: Copyright 2021 by the Florian Münchbach.
+:license: BSD, see LICENSE for details.
+"""
+
+import struct
+from enum import Enum
+
+from .crc import CRC8_SAE_J1850, CRC16_CCITT_FALSE, CRC32_P4
+
+
+class E2EStatus(Enum):
+    """
+    Result of checking a received payload.
+    """
+    OK = 'ok'
+    REPEATED = 'repeated'
+    OK_SOME_LOST = 'ok_some_lost'
+    WRONG_SEQUENCE = 'wrong_sequence'
+    ERROR = 'error'
+
+
+def value_offset(root, element) -> int:
+    """
+    Determines the offset of the value of `element` (i.e. behind its tag and
+    length field) within the serialization of `root`, without serializing.
+    """
+    offset = _find_value_offset(root, element, 0)
+    if offset is None:
+        raise ValueError(f'Element {element!r} is not part of {root!r}.')
+    return offset
+
+
+def _find_value_offset(current, element, offset):
+    value_size = getattr(current, '_value_size', current.serialization_length)
+    offset += current.serialization_length - value_size
+    if current is element:
+        return offset
+    if not hasattr(current, '_item_range'):
+        return None
+    # The member of a union follows the type selector
+    offset += getattr(current, 'selector_len', 0)
+    # Neither creates lazily stored items nor copies items shared with a clone
+    for item in current._item_range(0, current._item_count()):
+        found = _find_value_offset(item, element, offset)
+        if found is not None:
+            return found
+        offset += item.serialization_length
+    return None
+
+
+class _E2EProfile:
+    """
+    Base class of the E2E profiles.
+
+    Args:
+        - data_id               data ID of the protected data element
+        - offset                offset of the E2E header within the payload
+        - max_delta_counter     maximum counter increment accepted as
+                                `OK_SOME_LOST`
+    """
+    # Number of counter values
+    counter_modulo = 0x100
+    header_length = 0
+
+    def __init__(self, data_id, offset=0, max_delta_counter=1):
+        self.data_id = data_id
+        self.offset = offset
+        self.max_delta_counter = max_delta_counter
+        self.counter = 0
+        self._last_counter = None
+
+    def protect(self, buffer, length=None) -> int:
+        """
+        Writes the E2E header (counter, CRC, ...) into the serialized payload
+        `buffer` (writable bytes-like object, e.g. `bytearray`, `memoryview`
+        or `mmap`) of `length` bytes (default: the whole buffer) and increments
+        the counter.
+
+        Return:
+            The counter value written.
+        """
+        view = memoryview(buffer).cast('B')
+        length = len(view) if length is None else length
+        self._check_length(length)
+        counter = self.counter
+        self._write_header(view, length, counter)
+        self._write_crc(view, self._compute_crc(view, length))
+        self.counter = (counter + 1) % self.counter_modulo
+        return counter
+
+    def check(self, data, length=None) -> E2EStatus:
+        """
+        Checks the received serialized payload `data` (bytes-like object) of
+        `length` bytes (default: the whole buffer) and updates the receiver
+        state.
+        """
+        view = memoryview(data).cast('B')
+        length = len(view) if length is None else length
+        if length < self.offset + self.header_length or length > len(view):
+            return E2EStatus.ERROR
+        if not self._check_header(view, length) \
+                or self._read_crc(view) != self._compute_crc(view, length):
+            return E2EStatus.ERROR
+
+        counter = self._read_counter(view)
+        last_counter = self._last_counter
+        self._last_counter = counter
+        if last_counter is None:
+            return E2EStatus.OK
+        delta = (counter - last_counter) % self.counter_modulo
+        if delta == 0:
+            return E2EStatus.REPEATED
+        if delta == 1:
+            return E2EStatus.OK
+        if delta <= self.max_delta_counter:
+            return E2EStatus.OK_SOME_LOST
+        return E2EStatus.WRONG_SEQUENCE
+
+    def _check_length(self, length):
+        if length < self.offset + self.header_length:
+            raise ValueError(
+                    f'Payload of {length} byte(s) too short for the E2E header at'\
+                    f' offset {self.offset}.')
+
+    def _write_header(self, view, length, counter):
+        raise NotImplementedError()
+
+    def _check_header(self, view, length) -> bool:
+        return True
+
+    def _read_counter(self, view) -> int:
+        raise NotImplementedError()
+
+    def _compute_crc(self, view, length) -> int:
+        raise NotImplementedError()
+
+    def _write_crc(self, view, crc):
+        raise NotImplementedError()
+
+    def _read_crc(self, view) -> int:
+        raise NotImplementedError()
+
+
+class Profile1(_E2EProfile):
+    """
+    E2E profile 1: CRC-8 (SAE J1850) over both bytes of the data ID and the
+    payload (except the CRC byte), 4 bit counter (0 to 14).
+
+    The CRC byte is located at `offset`, the counter in the low nibble of the
+    byte at `counter_offset`.
+    """
+    counter_modulo = 15
+    header_length = 1
+
+    def __init__(self, data_id, offset=0, counter_offset=1, max_delta_counter=1):
+        super().__init__(data_id, offset, max_delta_counter)
+        self.counter_offset = counter_offset
+        self._data_id_bytes = struct.pack('<H', data_id)
+
+    def _check_length(self, length):
+        super()._check_length(length)
+        if length <= self.counter_offset:
+            raise ValueError(
+                    f'Payload of {length} byte(s) too short for the E2E counter at'\
+                    f' offset {self.counter_offset}.')
+
+    def _check_header(self, view, length):
+        return length > self.counter_offset
+
+    def _write_header(self, view, length, counter):
+        view[self.counter_offset] = (view[self.counter_offset] & 0xF0) | counter
+
+    def _read_counter(self, view):
+        return view[self.counter_offset] & 0x0F
+
+    def _compute_crc(self, view, length):
+        crc = CRC8_SAE_J1850(self._data_id_bytes)
+        crc = CRC8_SAE_J1850(view[:self.offset], crc)
+        return CRC8_SAE_J1850(view[self.offset + 1:length], crc)
+
+    def _write_crc(self, view, crc):
+        view[self.offset] = crc
+
+    def _read_crc(self, view):
+        return view[self.offset]
+
+
+class Profile4(_E2EProfile):
+    """
+    E2E profile 4: 12 byte header at `offset` consisting of length (16 bit),
+    counter (16 bit), data ID (32 bit) and CRC-32 (AUTOSAR polynomial,
+    32 bit), all big endian. The CRC covers the entire payload except the CRC.
+    """
+    counter_modulo = 0x10000
+    header_length = 12
+
+    _FIELDS = struct.Struct('!HHI')
+    _CRC = struct.Struct('!I')
+
+    def _write_header(self, view, length, counter):
+        self._FIELDS.pack_into(view, self.offset, length, counter, self.data_id)
+
+    def _check_header(self, view, length):
+        received_length, _counter, data_id = self._FIELDS.unpack_from(view, self.offset)
+        return received_length == length and data_id == self.data_id
+
+    def _read_counter(self, view):
+        return self._FIELDS.unpack_from(view, self.offset)[1]
+
+    def _compute_crc(self, view, length):
+        crc = CRC32_P4(view[:self.offset + 8])
+        return CRC32_P4(view[self.offset + 12:length], crc)
+
+    def _write_crc(self, view, crc):
+        self._CRC.pack_into(view, self.offset + 8, crc)
+
+    def _read_crc(self, view):
+        return self._CRC.unpack_from(view, self.offset + 8)[0]
+
+
+class Profile5(_E2EProfile):
+    """
+    E2E profile 5: 3 byte header at `offset` consisting of the CRC-16
+    (CCITT-FALSE, little endian) and an 8 bit counter. The CRC covers the
+    payload (except the CRC) followed by the data ID (16 bit, little endian).
+    """
+    counter_modulo = 0x100
+    header_length = 3
+
+    _CRC = struct.Struct('<H')
+
+    def __init__(self, data_id, offset=0, max_delta_counter=1):
+        super().__init__(data_id, offset, max_delta_counter)
+        self._data_id_bytes = struct.pack('<H', data_id)
+
+    def _write_header(self, view, length, counter):
+        view[self.offset + 2] = counter
+
+    def _read_counter(self, view):
+        return view[self.offset + 2]
+
+    def _compute_crc(self, view, length):
+        crc = CRC16_CCITT_FALSE(view[:self.offset])
+        crc = CRC16_CCITT_FALSE(view[self.offset + 2:length], crc)
+        return CRC16_CCITT_FALSE(self._data_id_bytes, crc)
+
+    def _write_crc(self, view, crc):
+        self._CRC.pack_into(view, self.offset, crc)
+
+    def _read_crc(self, view):
+        return self._CRC.unpack_from(view, self.offset)[0]
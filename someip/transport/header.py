@@ -0,0 +1,112 @@
+"""
+SOME/IP message header.
+
+:copyright: Copyright 2021 by the Florian Münchbach.
+:license: BSD, see LICENSE for details.
+"""
+
+import struct
+from enum import IntEnum
+from typing import NamedTuple
+
+HEADER_LENGTH=16
+# The length field covers everything behind it: request ID, protocol version,
+# interface version, message type, return code and payload.
+LENGTH_FIELD_OFFSET=4
+LENGTH_COVERED_HEADER_BYTES=8
+PROTOCOL_VERSION=1
+
+_HEADER_STRUCT = struct.Struct('!HHIHHBBBB')
+
+
+class MessageType(IntEnum):
+    """
+    SOME/IP message types.
+    """
+    REQUEST = 0x00
+    REQUEST_NO_RETURN = 0x01
+    NOTIFICATION = 0x02
+    RESPONSE = 0x80
+    ERROR = 0x81
+    TP_REQUEST = 0x20
+    TP_REQUEST_NO_RETURN = 0x21
+    TP_NOTIFICATION = 0x22
+    TP_RESPONSE = 0xA0
+    TP_ERROR = 0xA1
+
+
+TP_FLAG=0x20
+
+
+class Header(NamedTuple):
+    """
+    SOME/IP message header.
+
+    The `length` is the value of the header's length field, i.e. the payload
+    length plus 8.
+    """
+    service_id: int
+    method_id: int
+    length: int = LENGTH_COVERED_HEADER_BYTES
+    client_id: int = 0
+    session_id: int = 0
+    protocol_version: int = PROTOCOL_VERSION
+    interface_version: int = 1
+    message_type: int = MessageType.REQUEST
+    return_code: int = 0
+
+    @property
+    def payload_length(self) -> int:
+        """
+        Length of the payload following the header.
+        """
+        return self.length - LENGTH_COVERED_HEADER_BYTES
+
+    @property
+    def message_id(self) -> int:
+        """
+        The 32 bit message ID (service ID and method ID).
+        """
+        return (self.service_id << 16) | self.method_id
+
+    @property
+    def request_id(self) -> int:
+        """
+        The 32 bit request ID (client ID and session ID).
+        """
+        return (self.client_id << 16) | self.session_id
+
+    def with_payload_length(self, payload_length):
+        """
+        Returns a copy of the header with the length field set for a payload
+        of `payload_length` bytes.
+        """
+        return self._replace(length=payload_length + LENGTH_COVERED_HEADER_BYTES)
+
+    def pack(self) -> bytes:
+        """
+        Serializes the header.
+        """
+        return _HEADER_STRUCT.pack(*self)
+
+    def pack_into(self, buffer, offset=0) -> int:
+        """
+        Serializes the header into `buffer` at `offset`.
+
+        Return:
+            The offset behind the header.
+        """
+        _HEADER_STRUCT.pack_into(buffer, offset, *self)
+        return offset + HEADER_LENGTH
+
+    @classmethod
+    def unpack_from(cls, buffer, offset=0):
+        """
+        Parses a header from `buffer` at `offset`.
+        """
+        if offset + HEADER_LENGTH > len(buffer):
+            raise ValueError(f'Not enough data to read a SOME/IP header at offset {offset}.')
+        header = cls._make(_HEADER_STRUCT.unpack_from(buffer, offset))
+        if header.length < LENGTH_COVERED_HEADER_BYTES:
+            raise ValueError(f'Invalid SOME/IP length field value {header.length}.')
+        return header
@@ -0,0 +1,288 @@
+"""
+asyncio based stream codec for SOME/IP over TCP.
+
+`SomeIpStream` wraps an `asyncio.StreamReader` / `asyncio.StreamWriter` pair,
+frames outgoing payloads (data type trees or pre-serialized bytes) with a
+SOME/IP header and decodes incoming messages against registered payload
+descriptions.
+
+Requests are pipelined, i.e. any number of requests can be in flight at the
+same time. Responses are matched by service ID, method ID, client ID and
+session ID.
+All messages queued within one event loop iteration are written with a single
+`writelines()` call.
+
+:copyright: Copyright 2021 by the Florian Münchbach.
+:license: BSD, see LICENSE for details.
+"""
+
+import asyncio
+
+from ..tlv.converter.decoder import Codec, compile_description
+from ..tlv.datatypes.serializable import Serializable
+from ..tlv.datatypes._import_helper import cached_property
+from .header import Header, MessageType, HEADER_LENGTH
+
+
+class Message:
+    """
+    A received SOME/IP message.
+
+    The payload is decoded on first access of `element`, if a description is
+    registered for the message. Decoding errors are raised on access.
+    """
+    def __init__(self, header: Header, payload: bytes, codec: Codec = None):
+        self.header = header
+        self.payload = payload
+        self._codec = codec
+
+    @cached_property
+    def element(self):
+        """
+        The decoded payload as `someip.tlv.datatypes` structure or None, if no
+        description is registered for this message.
+        """
+        return self._codec.decode(self.payload) if self._codec is not None else None
+
+    def __repr__(self):
+        return f'Message({self.header}, {len(self.payload)} byte(s) payload)'
+
+
+def _response_key(header):
+    return (header.service_id, header.method_id, header.client_id, header.session_id)
+
+
+class SomeIpStream:
+    """
+    SOME/IP message stream on top of an asyncio stream reader / writer pair.
+
+    Args:
+        - reader        `asyncio.StreamReader`
+        - writer        `asyncio.StreamWriter`
+        - client_id     client ID used for requests
+    """
+    def __init__(self, reader, writer, client_id=0):
+        self._reader = reader
+        self._writer = writer
+        self._client_id = client_id
+        self._session_id = 0
+
+        self._codecs = {}
+        self._pending = {}
+        self._incoming = asyncio.Queue()
+        self._reader_task = None
+        self._error = None
+
+        self._write_buffer = []
+        self._flush_handle = None
+
+    @property
+    def writer(self):
+        return self._writer
+
+    @property
+    def pending_requests(self) -> int:
+        """
+        Number of requests waiting for a response.
+        """
+        return len(self._pending)
+
+    def register(self, service_id, method_id, description, message_type=None,
+            name="Message Payload"):
+        """
+        Registers a payload description for decoding incoming messages.
+
+        Args:
+            - description   payload description (`dict` following the JSON
+                            format) or an already compiled `Codec`
+            - message_type  (optional) only use the description for messages
+                            of this type, otherwise for all messages with the
+                            given service and method ID
+        """
+        codec = description if isinstance(description, Codec) \
+                else compile_description(description, name=name)
+        self._codecs[(service_id, method_id, message_type)] = codec
+
+    def _find_codec(self, header):
+        codec = self._codecs.get((header.service_id, header.method_id, header.message_type))
+        if codec is None:
+            codec = self._codecs.get((header.service_id, header.method_id, None))
+        return codec
+
+    def next_session_id(self) -> int:
+        """
+        Returns the next session ID, wrapping around from 0xFFFF to 1.
+        """
+        self._session_id = self._session_id % 0xFFFF + 1
+        return self._session_id
+
+    def send(self, header: Header, payload=b''):
+        """
+        Queues a message for sending. The length field of the header is set
+        according to the payload.
+
+        The message is written with all other messages queued in the same
+        event loop iteration. Use `drain()` for flow control.
+
+        Args:
+            - header    `Header` of the message
+            - payload   `Serializable` data type tree or bytes-like object
+        """
+        if isinstance(payload, Serializable):
+            length = payload.serialization_length
+            segments = payload.serialization_iov()
+        else:
+            length = len(payload)
+            segments = (payload,)
+
+        self._write_buffer.append(header.with_payload_length(length).pack())
+        self._write_buffer.extend(segments)
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_event_loop().call_soon(self.flush)
+
+    def flush(self):
+        """
+        Writes all queued messages.
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._write_buffer:
+            data, self._write_buffer = self._write_buffer, []
+            self._writer.writelines(data)
+
+    async def drain(self):
+        """
+        Writes all queued messages and waits until the write buffer of the
+        underlying transport is drained.
+        """
+        self.flush()
+        await self._writer.drain()
+
+    def notify(self, service_id, method_id, payload=b'', interface_version=1):
+        """
+        Queues a notification (event) message.
+        """
+        self.send(Header(service_id, method_id,
+                client_id=self._client_id,
+                interface_version=interface_version,
+                message_type=MessageType.NOTIFICATION), payload)
+
+    async def request(self, service_id, method_id, payload=b'', interface_version=1):
+        """
+        Sends a request and waits for the response.
+
+        Any number of requests can be awaited concurrently.
+
+        Return:
+            The response `Message`.
+        """
+        header = Header(service_id, method_id,
+                client_id=self._client_id,
+                session_id=self.next_session_id(),
+                interface_version=interface_version,
+                message_type=MessageType.REQUEST)
+        if self._error is not None:
+            raise self._error
+        key = _response_key(header)
+        if key in self._pending:
+            raise RuntimeError(f'Too many requests in flight, session ID {header.session_id} in use.')
+
+        future = asyncio.get_event_loop().create_future()
+        self._pending[key] = future
+        self._ensure_reader()
+        try:
+            self.send(header, payload)
+            return await future
+        finally:
+            self._pending.pop(key, None)
+
+    async def receive(self) -> Message:
+        """
+        Waits for the next incoming message that is not a response to one of
+        the requests sent using `request()`.
+        """
+        self._ensure_reader()
+        message = await self._incoming.get()
+        if isinstance(message, Exception):
+            # Keep the stream "closed" for other receivers as well
+            self._incoming.put_nowait(message)
+            raise message
+        return message
+
+    async def read_message(self) -> Message:
+        """
+        Reads the next message from the stream.
+
+        Note: Must not be used in combination with `request()` or
+        `receive()`, which read messages in the background.
+
+        Raises `asyncio.IncompleteReadError` at the end of the stream.
+        """
+        header = Header.unpack_from(await self._reader.readexactly(HEADER_LENGTH))
+        payload = await self._reader.readexactly(header.payload_length) \
+                if header.payload_length > 0 else b''
+        return Message(header, payload, self._find_codec(header))
+
+    def _ensure_reader(self):
+        if self._reader_task is None:
+            self._reader_task = asyncio.get_event_loop().create_task(self._read_loop())
+
+    async def _read_loop(self):
+        try:
+            while True:
+                message = await self.read_message()
+                future = self._pending.get(_response_key(message.header)) \
+                        if message.header.message_type in (MessageType.RESPONSE, MessageType.ERROR) \
+                        else None
+                if future is not None:
+                    if not future.done():
+                        future.set_result(message)
+                else:
+                    self._incoming.put_nowait(message)
+        except asyncio.CancelledError:
+            raise
+        # pylint: disable=broad-except; failures are forwarded to all waiters.
+        except Exception as exc:
+            error = ConnectionError('SOME/IP stream closed') \
+                    if isinstance(exc, asyncio.IncompleteReadError) else exc
+            self._error = error
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            self._incoming.put_nowait(error)
+
+    async def close(self):
+        """
+        Writes all queued messages and closes the stream.
+        """
+        self.flush()
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            try:
+                await self._reader_task
+            except asyncio.CancelledError:
+                pass
+        self._writer.close()
+        # StreamWriter.wait_closed() requires Python 3.7
+        if hasattr(self._writer, 'wait_closed'):
+            try:
+                await self._writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+
+async def open_connection(host, port, client_id=0, **kwargs) -> SomeIpStream:
+    """
+    Opens a TCP connection and wraps it into a `SomeIpStream`.
+
+    Additional keyword arguments are passed to `asyncio.open_connection()`.
+    """
+    reader, writer = await asyncio.open_connection(host, port, **kwargs)
+    return SomeIpStream(reader, writer, client_id=client_id)
@@ -0,0 +1,293 @@
+"""
+SOME/IP-TP segmentation and reassembly.
+
+Payloads exceeding the maximum UDP datagram size are transferred in segments.
+Each segment carries a copy of the SOME/IP header (with the TP flag set in the
+message type and the length field covering the segment only) followed by the
+4 byte TP header: the segment's offset within the payload (in units of 16
+bytes, upper 28 bits) and the "more segments" flag (lowest bit).
+
+The segmenter does not copy the payload, it returns each segment as a small
+header buffer and a `memoryview` slice of the serialized payload, which can be
+passed to `socket.sendmsg()` directly. The reassembler copies the segments
+into one buffer per message and handles segments received out of order and
+duplicates. Incompletely received messages are bounded in number and
+optionally discarded after a timeout.
+
+:copyright: Copyright 2021 by the Florian Münchbach.
+:license: BSD, see LICENSE for details.
+"""
+
+import struct
+import time
+from collections import OrderedDict
+
+from ..tlv.datatypes.serializable import Serializable
+from .header import Header, HEADER_LENGTH, TP_FLAG, LENGTH_COVERED_HEADER_BYTES
+
+TP_HEADER_LENGTH=4
+# Segment offsets are given in units of 16 bytes
+TP_OFFSET_UNIT=16
+TP_MORE_SEGMENTS_FLAG=0x01
+# Maximum segment length fitting into an UDP datagram on Ethernet
+DEFAULT_MAX_SEGMENT_LENGTH=1392
+DEFAULT_MAX_MESSAGE_LENGTH=16 * 1024 * 1024
+DEFAULT_MAX_PENDING=16
+
+_TP_OFFSET_MASK=0xFFFFFFF0
+
+_SEGMENT_HEADER_STRUCT = struct.Struct('!HHIHHBBBBI')
+
+
+def serialize_payload(payload):
+    """
+    Returns `payload` (data type object or bytes-like object) as bytes-like
+    object, serializing data type objects exactly once.
+    """
+    if isinstance(payload, Serializable):
+        buffer = bytearray(payload.serialization_length)
+        payload.serialize_into(buffer)
+        return buffer
+    return payload
+
+
+def segment(header: Header, payload, max_segment_length=DEFAULT_MAX_SEGMENT_LENGTH) -> list:
+    """
+    Splits `payload` (data type object or bytes-like object) into SOME/IP-TP
+    segments of at most `max_segment_length` bytes (rounded down to a multiple
+    of 16).
+
+    The message type of `header` is sent with the TP flag set, the length field
+    is set for each segment.
+
+    Return:
+        List of (header, data) tuples, the header being the SOME/IP header
+        followed by the TP header and data being a `memoryview` slice of the
+        serialized payload.
+    """
+    max_segment_length -= max_segment_length % TP_OFFSET_UNIT
+    if max_segment_length <= 0:
+        raise ValueError(
+                f'The maximum segment length must be at least {TP_OFFSET_UNIT} bytes.')
+
+    view = memoryview(serialize_payload(payload)).cast('B')
+    fields = list(header)
+    fields[7] = header.message_type | TP_FLAG
+    length_covered = LENGTH_COVERED_HEADER_BYTES + TP_HEADER_LENGTH
+
+    segments = []
+    total = len(view)
+    for offset in range(0, max(total, 1), max_segment_length):
+        data = view[offset:offset + max_segment_length]
+        fields[2] = len(data) + length_covered
+        more = TP_MORE_SEGMENTS_FLAG if offset + len(data) < total else 0
+        segments.append((_SEGMENT_HEADER_STRUCT.pack(*fields, offset | more), data))
+    return segments
+
+
+def parse_tp_header(buffer, offset=0):
+    """
+    Parses the TP header at `offset`.
+
+    Return:
+        Tuple of the segment's offset (in bytes) within the payload and the
+        "more segments" flag.
+    """
+    if offset + TP_HEADER_LENGTH > len(buffer):
+        raise ValueError(f'Not enough data to read a SOME/IP-TP header at offset {offset}.')
+    value = struct.unpack_from('!I', buffer, offset)[0]
+    return value & _TP_OFFSET_MASK, bool(value & TP_MORE_SEGMENTS_FLAG)
+
+
+class _PendingMessage:
+    __slots__ = ('header', 'buffer', 'segments', 'received', 'total', 'last_received')
+
+    def __init__(self, header, capacity):
+        self.header = header
+        self.buffer = bytearray(capacity)
+        # offset -> length of the received segments
+        self.segments = {}
+        self.received = 0
+        # payload length, known once the last segment was received
+        self.total = None
+        # time of the most recently received segment
+        self.last_received = None
+
+    def add(self, offset, data, more):
+        end = offset + len(data)
+        if not more:
+            if self.total is not None and self.total != end:
+                raise ValueError(
+                        f'Conflicting last segments: payload length {self.total} and {end}.')
+            self.total = end
+        elif len(data) % TP_OFFSET_UNIT != 0:
+            raise ValueError(
+                    f'Segment length {len(data)} at offset {offset} is not a multiple'\
+                    f' of {TP_OFFSET_UNIT} bytes.')
+        if self.total is not None and end > self.total:
+            raise ValueError(
+                    f'Segment at offset {offset} exceeds the payload length {self.total}.')
+
+        if offset in self.segments:
+            # Duplicate
+            return
+        if end > len(self.buffer):
+            self.buffer.extend(bytes(max(end, 2 * len(self.buffer)) - len(self.buffer)))
+        self.buffer[offset:end] = data
+        self.segments[offset] = len(data)
+        self.received += len(data)
+
+    @property
+    def complete(self) -> bool:
+        if self.total is None or self.received < self.total:
+            return False
+        # The received lengths add up, check for gaps caused by overlapping segments
+        covered = 0
+        for offset in sorted(self.segments):
+            if offset > covered:
+                return False
+            covered = max(covered, offset + self.segments[offset])
+        return covered >= self.total
+
+
+class TpReassembler:
+    """
+    Reassembles SOME/IP-TP segments to messages.
+
+    Segments of several messages may be received interleaved, they are
+    distinguished by message ID, request ID, interface version and message
+    type. The reassembly buffer is allocated on the first received segment
+    (for its end, or `expected_length` if larger) and grown if necessary.
+
+    At most `max_pending` messages are reassembled at a time, a segment of
+    another message discards the one whose last segment was received least
+    recently. With a `timeout`, messages without a segment for `timeout`
+    seconds are discarded when the next segment is added or on `expire()`.
+
+    Args:
+        - max_message_length    maximum length of a reassembled payload
+        - expected_length       initial size of the reassembly buffers
+        - max_pending           maximum number of incompletely received
+                                messages
+        - timeout               seconds after which an incompletely
+                                received message is discarded, default:
+                                never
+        - clock                 function returning the current time in
+                                seconds
+    """
+    def __init__(self, max_message_length=DEFAULT_MAX_MESSAGE_LENGTH, expected_length=0,
+            max_pending=DEFAULT_MAX_PENDING, timeout=None, clock=time.monotonic):
+        if max_pending < 1:
+            raise ValueError(f'At least one pending message is required, got {max_pending}')
+        if timeout is not None and timeout <= 0:
+            raise ValueError(f'The timeout must be positive, got {timeout}')
+        self._max_message_length = max_message_length
+        self._expected_length = expected_length
+        self._max_pending = max_pending
+        self._timeout = timeout
+        self._clock = clock
+        # Least recently received first
+        self._pending = OrderedDict()
+        self.evictions = 0
+
+    @property
+    def pending(self) -> int:
+        """
+        Number of incompletely received messages.
+        """
+        return len(self._pending)
+
+    def reset(self):
+        """
+        Discards all incompletely received messages.
+        """
+        self._pending.clear()
+
+    def expire(self) -> int:
+        """
+        Discards the incompletely received messages without a segment for
+        `timeout` seconds.
+
+        Return:
+            The number of discarded messages.
+        """
+        if self._timeout is None:
+            return 0
+        return self._expire(self._clock())
+
+    def _expire(self, now):
+        expired = 0
+        pending = self._pending
+        while pending and now - next(iter(pending.values())).last_received >= self._timeout:
+            pending.popitem(last=False)
+            expired += 1
+        self.evictions += expired
+        return expired
+
+    def feed(self, datagram):
+        """
+        Processes one received datagram containing a SOME/IP message.
+
+        Messages without TP flag are returned as they are.
+
+        Return:
+            Tuple of the header (without TP flag, with the length field set for
+            the entire payload) and the payload of a completed message or None,
+            if the message is not complete yet.
+        """
+        header = Header.unpack_from(datagram)
+        end = HEADER_LENGTH + header.payload_length
+        if end > len(datagram):
+            raise ValueError(
+                    f'Datagram of {len(datagram)} byte(s) is shorter than its length field'\
+                    f' indicates ({end} byte(s)).')
+        view = memoryview(datagram).cast('B')
+        if not header.message_type & TP_FLAG:
+            return header, view[HEADER_LENGTH:end]
+
+        offset, more = parse_tp_header(datagram, HEADER_LENGTH)
+        return self.add_segment(header, offset, more, view[HEADER_LENGTH + TP_HEADER_LENGTH:end])
+
+    def add_segment(self, header: Header, offset, more, data):
+        """
+        Adds a segment, given the header of the segment, the (parsed) TP header
+        and the segment's data.
+
+        Return:
+            See `feed()`.
+        """
+        if offset + len(data) > self._max_message_length:
+            raise ValueError(
+                    f'Segment at offset {offset} exceeds the maximum message length'\
+                    f' {self._max_message_length}.')
+
+        now = None
+        if self._timeout is not None:
+            now = self._clock()
+            self._expire(now)
+
+        key = (header.message_id, header.request_id, header.interface_version,
+                header.message_type)
+        message = self._pending.get(key)
+        if message is None:
+            if len(self._pending) >= self._max_pending:
+                self._pending.popitem(last=False)
+                self.evictions += 1
+            message = _PendingMessage(header, max(offset + len(data), self._expected_length))
+            self._pending[key] = message
+        else:
+            self._pending.move_to_end(key)
+        message.last_received = now
+
+        try:
+            message.add(offset, data, more)
+        except ValueError:
+            del self._pending[key]
+            raise
+
+        if not message.complete:
+            return None
+        del self._pending[key]
+        del message.buffer[message.total:]
+        header = message.header._replace(message_type=message.header.message_type & ~TP_FLAG)
+        return header.with_payload_length(message.total), message.buffer
@@ -4,6 +4,7 @@ Test helpers
 
 from .optional_exception_tester import OptionalExceptionTester
 from .helper_functions import cartesianproduct, random_sample, create_testset_simple_range, check_tag
+from .echo_server import run_coroutine, run_echo_server
 
 __all__ = [
         "OptionalExceptionTester",
@@ -11,4 +12,6 @@ __all__ = [
         "create_testset_simple_range",
         "check_tag",
         "random_sample",
+        "run_coroutine",
+        "run_echo_server",
         ]
@@ -0,0 +1,106 @@
+"""
+SOME/IP echo server on localhost for transport tests and benchmarks.
+
+The server runs its own event loop in a background thread, so it can be used
+from synchronous test code (e.g. as pytest fixture) while the client side runs
+in `run_coroutine()`.
+"""
+
+import asyncio
+import contextlib
+import threading
+
+from someip.transport.header import MessageType
+from someip.transport.stream import SomeIpStream
+
+
+async def _echo(reader, writer):
+    """
+    Answers each request with a response carrying the same payload.
+    Notifications are echoed back unchanged.
+    """
+    stream = SomeIpStream(reader, writer)
+    try:
+        while True:
+            message = await stream.read_message()
+            header = message.header
+            if header.message_type == MessageType.REQUEST:
+                stream.send(header._replace(message_type=MessageType.RESPONSE), message.payload)
+            elif header.message_type == MessageType.NOTIFICATION:
+                stream.send(header, message.payload)
+            await stream.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        await stream.close()
+
+
+def run_coroutine(coroutine):
+    """
+    Runs `coroutine` in a new event loop and returns its result, like
+    `asyncio.run()` (which requires Python 3.7).
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(coroutine)
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+
+
+def _pending_tasks(loop):
+    # asyncio.all_tasks() requires Python 3.7
+    if hasattr(asyncio, 'all_tasks'):
+        return asyncio.all_tasks(loop)
+    return {task for task in asyncio.Task.all_tasks(loop) if not task.done()}
+
+
+@contextlib.contextmanager
+def run_echo_server(host='127.0.0.1'):
+    """
+    Runs an echo server on `host` with an ephemeral port.
+
+    Yields:
+        Tuple of host and port the server listens on.
+    """
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+    address = []
+
+    async def _serve():
+        server = await asyncio.start_server(_echo, host, 0)
+        address.append(server.sockets[0].getsockname()[:2])
+        started.set()
+        try:
+            # Serves until cancelled
+            await loop.create_future()
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    serve_task = loop.create_task(_serve())
+
+    def _run():
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(serve_task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            # Let the connection handlers finish their cancellation
+            pending = _pending_tasks(loop)
+            for task in pending:
+                task.cancel()
+            if pending:
+                loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.close()
+
+    thread = threading.Thread(target=_run, daemon=True)
+    thread.start()
+    started.wait()
+    try:
+        yield address[0]
+    finally:
+        loop.call_soon_threadsafe(serve_task.cancel)
+        thread.join()
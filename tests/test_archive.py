@@ -0,0 +1,129 @@
+"""
+Test cases for the indexed payload archive.
+"""
+
+import pytest
+
+from someip.tlv.converter import json_parser
+from someip.tlv.converter.decoder import compile_description
+from someip.transport.archive import INDEX_SUFFIX, ArchiveReader, ArchiveWriter
+
+DESCRIPTION = {
+    "type": "struct", "dataID": None, "wiretype": 6, "value": {
+        "counter":  {"type": "uint16", "dataID": 1, "value": 0},
+        "label":    {"type": "string", "dataID": 2, "value": "archive"},
+    }}
+
+
+def _message(counter):
+    return json_parser.loadd({**DESCRIPTION, "value": {**DESCRIPTION["value"],
+            "counter": {"type": "uint16", "dataID": 1, "value": counter}}}, name="Status")
+
+
+@pytest.fixture(name="path")
+def fixture_path(tmp_path):
+    return str(tmp_path / "trace.someip")
+
+
+def test_random_access(path):
+    with ArchiveWriter(path) as writer:
+        for counter in range(0, 10):
+            assert writer.append(_message(counter), timestamp=counter * 100,
+                    message_id=0x12340001) == counter
+        writer.append(b"\x01\x02", timestamp=1000, name="raw")
+        assert len(writer) == 11
+
+    codec = compile_description(DESCRIPTION)
+    with ArchiveReader(path) as reader:
+        assert len(reader) == 11
+        record = reader[7]
+        assert (record.index, record.timestamp, record.message_id, record.name) \
+                == (7, 700, 0x12340001, "Status")
+        assert isinstance(record.payload, memoryview)
+        assert codec.decode(record.payload)["counter"].value == 7
+        assert bytes(reader[-1].payload) == b"\x01\x02"
+        assert reader[-1].name == "raw"
+        assert bytes(reader.payload(3)) == bytes(_message(3).serialization)
+        assert [record.index for record in reader] == list(range(0, 11))
+        with pytest.raises(IndexError):
+            reader[11] # pylint: disable=pointless-statement
+        del record
+
+
+def test_time_range(path):
+    with ArchiveWriter(path) as writer:
+        for timestamp in (10, 20, 20, 30, 40):
+            writer.append(b"\x00", timestamp=timestamp)
+        with pytest.raises(ValueError, match='must not decrease'):
+            writer.append(b"\x00", timestamp=39)
+        with pytest.raises(ValueError, match='32 bit'):
+            writer.append(b"\x00", timestamp=50, message_id=1 << 32)
+
+    with ArchiveReader(path) as reader:
+        assert [record.index for record in reader.range(20, 40)] == [1, 2, 3]
+        assert [record.index for record in reader.range(start=25)] == [3, 4]
+        assert [record.index for record in reader.range(end=11)] == [0]
+        assert not list(reader.range(41))
+        assert reader.bisect(0) == 0 and reader.timestamp(-1) == 40
+
+
+def test_continue_and_interrupted_writer(path):
+    with ArchiveWriter(path) as writer:
+        writer.append(_message(1), timestamp=1)
+    with open(path + INDEX_SUFFIX, 'ab') as index_file:
+        index_file.write(b"\x00" * 5)
+
+    with ArchiveReader(path) as reader:
+        assert len(reader) == 1
+
+    with ArchiveWriter(path) as writer:
+        assert len(writer) == 1
+        with pytest.raises(ValueError, match='must not decrease'):
+            writer.append(b"", timestamp=0)
+        writer.append(_message(2), timestamp=2)
+
+    with ArchiveReader(path) as reader:
+        assert [(record.timestamp, record.name) for record in reader] \
+                == [(1, "Status"), (2, "Status")]
+        assert bytes(reader[1].payload) == bytes(_message(2).serialization)
+
+
+def test_missing_data(path):
+    with ArchiveWriter(path) as writer:
+        writer.append(b"\x01\x02", timestamp=1)
+        writer.append(b"\x03\x04", timestamp=2)
+    with open(path, 'r+b') as data_file:
+        data_file.truncate(data_file.seek(0, 2) - 1)
+
+    with ArchiveReader(path) as reader:
+        assert len(reader) == 2
+        assert bytes(reader.payload(0)) == b"\x01\x02"
+        with pytest.raises(ValueError, match='missing'):
+            reader.payload(1)
+
+    with ArchiveWriter(path) as writer:
+        assert len(writer) == 1
+        writer.append(b"\x05\x06", timestamp=2)
+
+    with ArchiveReader(path) as reader:
+        assert [bytes(record.payload) for record in reader] == [b"\x01\x02", b"\x05\x06"]
+
+
+def test_index_written_after_data(path):
+    writer = ArchiveWriter(path)
+    writer.append(b"\x01", timestamp=1)
+    with ArchiveReader(path) as reader:
+        assert len(reader) == 0
+    writer.flush()
+    with ArchiveReader(path) as reader:
+        assert bytes(reader.payload(0)) == b"\x01"
+    writer.close()
+
+
+def test_not_an_archive(path):
+    with open(path, 'wb') as data_file:
+        data_file.write(b"not an archive")
+    with pytest.raises(ValueError, match='Not an archive'):
+        ArchiveWriter(path)
+    with pytest.raises(ValueError, match='Not an archive'):
+        ArchiveReader(path)
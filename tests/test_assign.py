@@ -0,0 +1,199 @@
+"""
+Test cases for refilling message trees in place (assign and decode_into).
+"""
+
+import pytest
+
+from someip.tlv.converter import json_parser
+from someip.tlv.converter.decoder import compile_description
+from someip.tlv.datatypes import Preserialized
+from someip.tlv.datatypes.basic import Uint8, Uint16
+from someip.tlv.datatypes.complex import Array, MultiArray, String, Struct, Union
+from someip.tlv.datatypes.consts import Types
+
+DESCRIPTION = {
+    "type": "struct", "dataID": None, "wiretype": 6, "value": {
+        "header":   {"type": "struct", "dataID": 1, "value": {
+                        "counter":  {"type": "uint16", "dataID": 1, "value": 1},
+                        "flags":    {"type": "uint8", "dataID": 2, "value": 0}}},
+        "label":    {"type": "string", "dataID": 2, "value": "first"},
+        "samples":  {"type": "array", "dataID": 3, "elementtype": "uint16",
+                     "value": [1, 2, 3]},
+        "points":   {"type": "array", "dataID": 4, "value": [
+                        {"type": "struct", "dataID": None, "lengthfield_len": 1, "value": {
+                            "x": {"type": "sint8", "dataID": None, "value": 1},
+                            "y": {"type": "sint8", "dataID": None, "value": 2}}}]},
+        "grid":     {"type": "array", "dataID": 5, "wiretype": 5, "elementtype": "uint8",
+                     "value": [[1, 2], [3, 4]]},
+    }}
+
+VALUES = {
+    "header": {"counter": 7, "flags": 3},
+    "label": "second",
+    "samples": [4, 5],
+    "points": [[-1, -2], [3, 4], [5, 6]],
+    "grid": [[5, 6], [7, 8]],
+}
+
+
+def _expected():
+    expected = dict(DESCRIPTION["value"])
+    expected["header"] = {**expected["header"], "value": {
+            "counter": {"type": "uint16", "dataID": 1, "value": 7},
+            "flags": {"type": "uint8", "dataID": 2, "value": 3}}}
+    expected["label"] = {**expected["label"], "value": "second"}
+    expected["samples"] = {**expected["samples"], "value": [4, 5]}
+    point = DESCRIPTION["value"]["points"]["value"][0]
+    expected["points"] = {**expected["points"], "value": [
+            {**point, "value": {
+                "x": {"type": "sint8", "dataID": None, "value": x},
+                "y": {"type": "sint8", "dataID": None, "value": y}}}
+            for x, y in VALUES["points"]]}
+    expected["grid"] = {**expected["grid"], "value": VALUES["grid"]}
+    return json_parser.loadd({**DESCRIPTION, "value": expected})
+
+
+def test_assign_reuses_objects():
+    message = json_parser.loadd(DESCRIPTION)
+    counter = message["header"]["counter"]
+    samples = message["samples"].items[:]
+
+    message.assign(VALUES)
+
+    assert message.serialization == _expected().serialization
+    assert message["header"]["counter"] is counter
+    assert message["samples"].items == samples[:2]
+    assert [item.value for item in message["samples"].items] == [4, 5]
+    # Strings create no item objects until the items are accessed
+    message["label"].assign("fourth")
+    assert message["label"]._item_list == []
+    assert message["label"].string == "fourth"
+    assert [chr(item.value) for item in message["label"].items[3:9]] == list("fourth")
+
+
+def test_assign_by_position_and_errors():
+    message = Struct([Uint8(1, 1, name="a"), Uint16(2, 2, name="b")], None, 5)
+
+    message.assign([3, 4])
+    assert [item.value for item in message.items] == [3, 4]
+    message.assign({2: 5})
+    assert message["b"].value == 5
+
+    with pytest.raises(ValueError, match='2 members'):
+        message.assign([1])
+    with pytest.raises(KeyError):
+        message.assign({"c": 1})
+    with pytest.raises(ValueError):
+        message.assign({"a": 256})
+    with pytest.raises(ValueError, match='complex types'):
+        Array([], 1, 5, elementtype=Types.STRUCT).assign([{}])
+
+
+def test_assign_other_types():
+    union = Union(Uint8(1, None), 1, 1, selector_len=1)
+    union.assign(2)
+    assert union.member.value == 2
+    with pytest.raises(ValueError, match='empty union'):
+        Union(None, 0, 1, 5).assign(1)
+
+    grid = MultiArray([[1, 2], [3, 4]], 1, 5, elementtype=Types.UINT8)
+    grid.assign([5, 6, 7, 8])
+    assert grid.tolist() == [[5, 6], [7, 8]]
+    grid.assign([[1, 2, 3]])
+    assert grid.shape == (1, 3)
+
+    data = Preserialized("0102")
+    data.assign(b"\x03\x04\x05")
+    assert data.serialization == bytearray(b"\x03\x04\x05")
+
+    with pytest.raises(AttributeError):
+        Uint8(1, 1).freeze().assign(2)
+
+
+def test_assign_after_clone_keeps_original():
+    message = json_parser.loadd(DESCRIPTION)
+    serialization = bytes(message.serialization)
+    clone = message.clone()
+
+    clone.assign(VALUES)
+
+    assert message.serialization == serialization
+    assert clone.serialization == _expected().serialization
+
+
+def test_decode_into():
+    codec = compile_description(DESCRIPTION)
+    message = json_parser.loadd(DESCRIPTION)
+    counter = message["header"]["counter"]
+    grid_values = message["grid"].values
+    payload = bytes(_expected().serialization)
+
+    assert codec.decode_into(message, payload) is message
+
+    assert message.serialization == payload
+    assert message["header"]["counter"] is counter
+    assert [[coordinate.value for coordinate in point.items]
+            for point in message["points"].items] == VALUES["points"]
+    # Same shape, the storage is reused
+    assert message["grid"].values is grid_values
+
+    # Back to the original content: surplus items are removed
+    codec.decode_into(message, bytes(json_parser.loadd(DESCRIPTION).serialization))
+    assert message.serialization == json_parser.loadd(DESCRIPTION).serialization
+    assert message["header"]["counter"] is counter
+
+
+def test_decode_into_mismatch():
+    codec = compile_description(DESCRIPTION)
+    payload = bytes(json_parser.loadd(DESCRIPTION).serialization)
+
+    with pytest.raises(ValueError, match='Can not decode'):
+        codec.decode_into(Array([], None, 5, elementtype=Types.UINT8), payload)
+    message = json_parser.loadd(DESCRIPTION)
+    with pytest.raises(ValueError, match='no member with data ID'):
+        codec.decode_into(Struct(message.items[1:], None, 6), payload)
+    with pytest.raises(ValueError, match='Trailing data'):
+        codec.decode_into(message, payload + b"\x00")
+
+    positional = {"type": "struct", "dataID": None, "lengthfield_len": 1, "value": {
+            "a": {"type": "uint8", "dataID": None, "value": 1}}}
+    with pytest.raises(ValueError, match='has 2 members'):
+        compile_description(positional).decode_into(
+                Struct([Uint8(1, None), Uint8(2, None)], None, 5), b"\x01\x01")
+
+
+def test_decode_into_repeated_member():
+    description = {"type": "struct", "dataID": None, "wiretype": 6, "value": {
+            "a": {"type": "uint8", "dataID": 1, "value": 1},
+            "b": {"type": "uint8", "dataID": 2, "value": 2}}}
+    codec = compile_description(description)
+    message = json_parser.loadd(description)
+    # Member a twice, b missing
+    payload = bytes(Struct([Uint8(7, 1), Uint8(8, 1)], None, 6,
+            unique_data_ids=False).serialization)
+
+    with pytest.raises(ValueError, match='Decoded 1 of the 2 members'):
+        codec.decode_into(message, payload)
+
+
+def test_decode_into_numpy():
+    pytest.importorskip("numpy")
+    codec = compile_description(DESCRIPTION, numpy=True)
+    message = json_parser.loadd(DESCRIPTION)
+    payload = bytes(_expected().serialization)
+
+    codec.decode_into(message, payload)
+
+    assert message["samples"].to_numpy().tolist() == [4, 5]
+    assert message.serialization == payload
+
+
+def test_static_string_decode_into():
+    description = {"type": "string", "dataID": None, "lengthfield_len": 0, "length": 8,
+            "bom": False, "padding": True, "value": "abc"}
+    target = String("abc", None, None, length=8, lengthfield_len=0, bom=False, padding=True)
+
+    compile_description(description).decode_into(target, b"xyz\x00\x00\x00\x00\x00")
+
+    assert target.string == "xyz"
+    assert target.serialization == b"xyz\x00\x00\x00\x00\x00"
@@ -0,0 +1,61 @@
+"""
+Test cases for encoding and decoding many payloads over a process pool.
+"""
+
+import pytest
+
+from someip.tlv.converter import json_parser
+from someip.tlv.converter.batch import decode_many, encode_many
+
+DESCRIPTION = {
+    "type": "struct", "dataID": None, "wiretype": 6, "value": {
+        "counter":  {"type": "uint16", "dataID": 1, "value": 0},
+        "label":    {"type": "string", "dataID": 2, "value": "batch"},
+        "samples":  {"type": "array", "dataID": 3, "elementtype": "uint8",
+                     "value": [1, 2, 3]},
+    }}
+
+
+def _description(counter):
+    return {**DESCRIPTION, "value": {**DESCRIPTION["value"],
+            "counter": {"type": "uint16", "dataID": 1, "value": counter}}}
+
+
+def _counter(message):
+    return message["counter"].value
+
+
+@pytest.mark.parametrize("workers,min_parallel", [(1, 0), (2, 100), (2, 0)])
+def test_encode_many(workers, min_parallel):
+    messages = [_description(counter) if counter % 3 else json_parser.loadd(_description(counter))
+            for counter in range(0, 20)]
+
+    payloads = encode_many(messages, workers, chunk_size=3, min_parallel=min_parallel)
+
+    assert payloads == [bytes(json_parser.loadd(_description(counter)).serialization)
+            for counter in range(0, 20)]
+
+
+@pytest.mark.parametrize("workers,min_parallel", [(1, 0), (2, 100), (2, 0)])
+def test_decode_many(workers, min_parallel):
+    payloads = [bytes(json_parser.loadd(_description(counter)).serialization)
+            for counter in range(0, 20)]
+    payloads[0] = memoryview(payloads[0])
+
+    messages = decode_many(payloads, DESCRIPTION, workers, chunk_size=3,
+            min_parallel=min_parallel)
+
+    assert [message["counter"].value for message in messages] == list(range(0, 20))
+    assert messages[5].serialization == payloads[5]
+    assert decode_many(payloads, DESCRIPTION, workers, min_parallel=min_parallel,
+            function=_counter) == list(range(0, 20))
+
+
+def test_errors():
+    with pytest.raises(ValueError, match='at least 1'):
+        encode_many([DESCRIPTION], workers=0)
+    with pytest.raises(ValueError, match='chunk size'):
+        encode_many([DESCRIPTION], workers=2, chunk_size=0, min_parallel=0)
+    with pytest.raises(ValueError):
+        decode_many([b"\x00"], DESCRIPTION, workers=2, min_parallel=0)
+    assert encode_many([], workers=2, min_parallel=0) == []
@@ -0,0 +1,296 @@
+"""
+Test cases for the Bitfield and Union data types.
+"""
+
+import copy
+import json
+import pytest
+
+from someip.tlv.converter import json_parser
+from someip.tlv.converter.decoder import compile_description
+from someip.tlv.converter.diff import diff
+from someip.tlv.converter.push_decoder import IncrementalDecoder, ValueDecoded
+from someip.tlv.converter.registry import SchemaRegistry
+from someip.tlv.converter.validator import validate
+from someip.tlv.datatypes import SerializationCache
+from someip.tlv.datatypes.basic import Bitfield, Boolean, Uint16, Uint8
+from someip.tlv.datatypes.complex import Array, String, Struct, Union
+from someip.tlv.datatypes.consts import Types
+from someip.tlv.fuzzer import layout
+from someip.transport.header import MessageType
+
+FLAGS = {'valid': 0, 'error': 1, 'mode': (4, 3), 'last': 15}
+
+DESCRIPTION = {
+    "type": "struct", "dataID": None, "wiretype": 6, "value": {
+        "status":   {"type": "bitfield", "dataID": 1, "bits": 16,
+                     "flags": {"valid": 0, "mode": [4, 3]},
+                     "value": {"valid": True, "mode": 5}},
+        "flags":    {"type": "array", "dataID": 2, "value": [
+                        {"type": "bitfield", "dataID": None, "bits": 32, "value": 7},
+                        {"type": "bitfield", "dataID": None, "bits": 32, "value": 9}]},
+        "variant":  {"type": "union", "dataID": 3, "selector": 2, "selector_len": 1,
+                     "value": {"type": "uint32", "dataID": None, "value": 7}},
+        "static":   {"type": "union", "dataID": None, "lengthfield_len": 0, "selector": 1,
+                     "value": {"type": "string", "dataID": 1, "value": "x"}},
+        "empty":    {"type": "union", "dataID": 4, "value": None},
+    }}
+
+
+@pytest.mark.parametrize("bits,wiretype,pack_type", [
+                             (8, 0, Uint8),
+                             (16, 1, Uint16),
+                         ])
+def test_bitfield_serialized_as_unsigned_integer(bits, wiretype, pack_type):
+    bitfield = Bitfield(0x35, 1, bits=bits)
+
+    assert bitfield.type == Types.BITFIELD
+    assert bitfield.wiretype == wiretype
+    assert bitfield.length == bits // 8
+    assert bitfield.serialization == pack_type(0x35, 1).serialization
+    buffer = bytearray(bitfield.serialization_length)
+    bitfield.serialize_into(buffer)
+    assert buffer == bitfield.serialization
+
+
+def test_bitfield_flags():
+    bitfield = Bitfield({'valid': True, 'mode': 5}, None, bits=16, flags=FLAGS)
+
+    assert bitfield.value == 0x51
+    assert bitfield['valid'] is True
+    assert bitfield['error'] is False
+    assert bitfield['mode'] == 5
+
+    bitfield.update({'valid': False, 'error': True, 'mode': 2, 'last': 1})
+    assert bitfield.value == 0x8022
+    assert bitfield.as_dict() == {'valid': False, 'error': True, 'mode': 2, 'last': True}
+    bitfield['mode'] = 0
+    assert bitfield.value == 0x8002
+
+    mask = bitfield.mask('valid', 'error')
+    assert mask == 0x3
+    assert not bitfield.test(mask)
+    bitfield.set_bits(mask)
+    assert bitfield.test(mask)
+    bitfield.clear_bits(bitfield.mask('last'))
+    assert bitfield.value == 0x3
+    assert 'mode' in bitfield and 'other' not in bitfield
+
+
+def test_bitfield_invalid():
+    with pytest.raises(ValueError, match='8, 16, 32 or 64'):
+        Bitfield(0, None, bits=12)
+    with pytest.raises(ValueError, match='exceeds'):
+        Bitfield(0, None, bits=8, flags={'x': (6, 3)})
+    with pytest.raises(ValueError):
+        Bitfield(0x100, None, bits=8)
+    bitfield = Bitfield(0, None, bits=16, flags=FLAGS)
+    with pytest.raises(ValueError, match='does not fit'):
+        bitfield['mode'] = 8
+    with pytest.raises(KeyError):
+        bitfield['unknown']
+
+
+def test_bitfield_replaces_struct_of_booleans():
+    booleans = Struct([Boolean(flag, None) for flag in (True, False, True)], 1, 5)
+    bitfield = Bitfield({'a': True, 'b': False, 'c': True}, 1, flags={'a': 0, 'b': 1, 'c': 2})
+
+    assert bitfield.serialization_length < booleans.serialization_length
+    assert bitfield.serialization == bytes([0x00, 0x01, 0x05])
+
+
+def test_union_serialization():
+    union = Union(Uint16(0x1234, None), 2, 1, selector_len=1)
+
+    assert union.type == Types.UNION
+    assert union.wiretype == 5
+    # The length covers the member only, not the type selector
+    assert union.length == 2
+    assert union.serialization == bytes([0x50, 0x01, 0x02, 0x02, 0x12, 0x34])
+    assert b''.join(union.serialization_iov(reference_threshold=0)) == union.serialization
+    buffer = bytearray(union.serialization_length)
+    union.serialize_into(buffer)
+    assert buffer == union.serialization
+
+    empty = Union(None, 0, 2, wiretype=6)
+    assert empty.member is None
+    assert empty.serialization == bytes([0x60, 0x02, 0x00, 0x00, 0, 0, 0, 0])
+
+
+def test_union_wire_format():
+    # Length (member only), type selector, member of 7 bytes
+    description = {"type": "union", "dataID": 3, "wiretype": 7, "selector": 1,
+            "value": {"type": "struct", "dataID": None, "wiretype": 4, "lengthfield_len": 0,
+                      "value": {
+                          "a": {"type": "uint8", "dataID": None, "value": 1},
+                          "b": {"type": "uint16", "dataID": None, "value": 2},
+                          "c": {"type": "uint32", "dataID": None, "value": 3}}}}
+    wire = bytes([0x70, 0x03, 0x00, 0x00, 0x00, 0x07, 0x00, 0x00, 0x00, 0x01,
+            0x01, 0x00, 0x02, 0x00, 0x00, 0x00, 0x03])
+    codec = compile_description(description)
+
+    assert json_parser.loadd(description).serialization == wire
+    assert codec.decode(wire).member["c"].value == 3
+    assert validate(codec, wire) == []
+    assert diff(codec, wire, wire) == []
+    events = IncrementalDecoder(codec).feed(wire)
+    assert events[-1].element.serialization == wire
+    # An unknown alternative is skipped by the length field
+    other = wire[:9] + b'\x02' + wire[10:]
+    assert codec.decode(other).member.serialized_value == wire[10:]
+
+
+def test_union_select():
+    union = Union(Uint8(1, None), 1, None, lengthfield_len=2, selector_len=2)
+
+    union.select(3, String("ab", None, 5, bom=False, terminate=False))
+
+    assert union.selector == 3
+    assert union.serialization == bytes([0x00, 0x03, 0x00, 0x03, 0x02, 0x61, 0x62])
+    union.clear()
+    assert union.member is None and union.selector == 0
+    with pytest.raises(ValueError):
+        union.append(Uint8(1, None))
+    with pytest.raises(ValueError, match='fit into 1'):
+        Union(None, 256, None, 5, selector_len=1)
+    with pytest.raises(ValueError, match='1, 2 or 4'):
+        Union(None, 0, None, 5, selector_len=3)
+
+
+def test_union_in_array_and_layout():
+    unions = Array([Union(Uint8(value, None), 1, None, lengthfield_len=1, selector_len=1)
+            for value in (1, 2)], 1, 5)
+    message = Struct([unions], None, 6)
+
+    assert unions.serialization == bytes([0x50, 0x01, 0x06, 1, 1, 1, 1, 1, 2])
+    assert SerializationCache().serialize(message) == message.serialization
+    elements = layout(message)
+    # Union members start behind the selector
+    assert elements[3].value_offset == elements[2].start + 1 + 1
+    assert message.serialization[elements[3].start] == 1
+
+
+def test_json():
+    message = json_parser.loadd({
+        "type": "struct", "dataID": None, "wiretype": 5, "value": {
+            "status": {"type": "bitfield", "dataID": 1, "bits": 16,
+                       "flags": {"valid": 0, "mode": [4, 3]},
+                       "value": {"valid": True, "mode": 2}},
+            "variant": {"type": "union", "dataID": 2, "selector": 2, "selector_len": 1,
+                        "value": {"type": "uint16", "dataID": None, "value": 7}},
+            "empty": {"type": "union", "dataID": 3, "wiretype": 6, "value": None},
+        }})
+
+    assert message['status'].as_dict() == {'valid': True, 'mode': 2}
+    assert message['variant'].selector == 2
+    assert message['variant'].member.value == 7
+    assert message['empty'].member is None
+    assert message.serialization == bytes([0x12,
+            0x10, 0x01, 0x00, 0x21,
+            0x50, 0x02, 0x02, 0x02, 0x00, 0x07,
+            0x60, 0x03, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00])
+
+
+@pytest.mark.parametrize("numpy", [False, True])
+def test_decode(numpy):
+    message = json_parser.loadd(DESCRIPTION)
+    payload = bytes(message.serialization)
+
+    decoded = compile_description(DESCRIPTION, numpy=numpy).decode(payload)
+
+    assert decoded.serialization == payload
+    assert decoded['status'].as_dict() == {'valid': True, 'mode': 5}
+    assert decoded['flags'].items[1].bits == 32
+    assert decoded['variant'].selector == 2 and decoded['variant'].member.value == 7
+    assert decoded['static'].member.string == 'x'
+    assert decoded['empty'].member is None
+
+
+def test_decode_unknown_selector():
+    description = DESCRIPTION["value"]["variant"]
+    other = json_parser.loadd({**description, "selector": 5,
+            "value": {"type": "uint16", "dataID": None, "value": 7}})
+
+    decoded = compile_description(description).decode(bytes(other.serialization))
+
+    assert decoded.selector == 5
+    assert decoded.member.serialized_value == b'\x00\x07'
+    assert decoded.serialization == other.serialization
+    with pytest.raises(ValueError, match='Unknown selector 5'):
+        compile_description(DESCRIPTION["value"]["static"]).decode(
+                bytes([0, 0, 0, 5]))
+
+
+def test_decode_into():
+    codec = compile_description(DESCRIPTION)
+    message = json_parser.loadd(DESCRIPTION)
+    modified = copy.deepcopy(DESCRIPTION)
+    modified["value"]["status"]["value"] = {"valid": False, "mode": 2}
+    modified["value"]["variant"]["value"]["value"] = 8
+    modified["value"]["empty"]["selector"] = 2
+    modified["value"]["empty"]["value"] = {"type": "uint8", "dataID": None, "value": 1}
+    payload = bytes(json_parser.loadd(modified).serialization)
+    member = message['variant'].member
+
+    codec.decode_into(message, payload)
+
+    assert message.serialization == payload
+    assert message['status']['mode'] == 2
+    # Members of the known alternative are decoded in place
+    assert message['variant'].member is member and member.value == 8
+    assert message['empty'].selector == 2
+
+
+def test_validate_and_diff():
+    payload = bytes(json_parser.loadd(DESCRIPTION).serialization)
+    modified = copy.deepcopy(DESCRIPTION)
+    modified["value"]["status"]["value"] = {"valid": True, "mode": 4}
+    modified["value"]["variant"]["value"]["value"] = 8
+    modified["value"]["empty"]["selector"] = 1
+    modified["value"]["empty"]["value"] = {"type": "uint8", "dataID": None, "value": 1}
+
+    assert validate(DESCRIPTION, payload) == []
+    assert validate(modified, bytes(json_parser.loadd(modified).serialization)) == []
+    assert [violation.kind for violation in validate(DESCRIPTION, payload[:-1])] \
+            == ['length']
+    static = DESCRIPTION["value"]["static"]
+    assert [(violation.path, violation.kind) for violation in validate(static, b'\0\0\0\1\x10')] \
+            == [('Message Payload/member', 'truncated')]
+    differences = diff(DESCRIPTION, payload, bytes(json_parser.loadd(modified).serialization))
+    assert [(difference.path, difference.kind, difference.value_a, difference.value_b)
+            for difference in differences] == [
+                ('Message Payload/1', 'value', 0x51, 0x41),
+                ('Message Payload/3/member', 'value', 7, 8),
+                ('Message Payload/4/selector', 'value', 0, 1),
+            ]
+
+
+def test_incremental_decoding():
+    description = copy.deepcopy(DESCRIPTION)
+    del description["value"]["static"]
+    codec = compile_description(description)
+    payload = bytes(json_parser.loadd(description).serialization)
+
+    decoder = IncrementalDecoder(codec, events=True)
+    events = []
+    for offset in range(0, len(payload)):
+        events += decoder.feed(payload[offset:offset + 1])
+
+    values = [event.value for event in events if isinstance(event, ValueDecoded)]
+    assert values[:3] == [0x51, 7, 9]
+    assert values[3].value == 7 and values[-1] is None
+    assert events[-1].element.serialization == payload
+    with pytest.raises(ValueError, match='without length field'):
+        IncrementalDecoder(compile_description(DESCRIPTION)).feed(
+                bytes(json_parser.loadd(DESCRIPTION).serialization))
+
+
+def test_registry(tmp_path):
+    (tmp_path / 'status.json').write_text(json.dumps({"serviceID": 1,
+            "methodID": 0x8001, "messageType": "NOTIFICATION", "payload": DESCRIPTION}))
+    payload = bytes(json_parser.loadd(DESCRIPTION).serialization)
+
+    registry = SchemaRegistry(str(tmp_path))
+
+    assert registry.decode(1, 0x8001, MessageType.NOTIFICATION, payload).serialization \
+            == payload
@@ -0,0 +1,166 @@
+"""
+Test cases for cloning data type objects with shared subtrees.
+"""
+
+import pytest
+
+from someip.tlv.converter import json_parser
+from someip.tlv.datatypes import SerializationCache
+from someip.tlv.datatypes.basic import Uint8, Uint16
+from someip.tlv.datatypes.complex import Array, MultiArray, String, Struct, Union
+from someip.tlv.datatypes.consts import Types
+
+DESCRIPTION = {
+    "type": "struct", "dataID": None, "wiretype": 6, "value": {
+        "header":   {"type": "struct", "dataID": 1, "value": {
+                        "counter":  {"type": "uint16", "dataID": 1, "value": 1},
+                        "flags":    {"type": "uint8", "dataID": 2, "value": 0}}},
+        "label":    {"type": "string", "dataID": 2, "value": "scenario"},
+        "samples":  {"type": "array", "dataID": 3, "elementtype": "uint8",
+                     "value": [1, 2, 3]},
+    }}
+
+
+def test_clone_shares_unchanged_subtrees():
+    original = json_parser.loadd(DESCRIPTION)
+    serialization = bytes(original.serialization)
+
+    clone = original.clone()
+    clone["header"]["counter"].value = 2
+
+    assert original.serialization == serialization
+    assert clone["header"]["counter"].value == 2
+    assert original["header"]["counter"].value == 1
+    # Only the modified path was copied, the other members are shared
+    assert clone._items[1] is original._items[1]
+    assert clone._items[2] is original._items[2]
+    assert clone["header"]._items[1] is original["header"]._items[1]
+    expected = json_parser.loadd(DESCRIPTION)
+    expected["header"]["counter"].value = 2
+    assert clone.serialization == expected.serialization
+
+
+def test_items_copies_direct_children_only():
+    original = json_parser.loadd(DESCRIPTION)
+
+    clone = original.clone()
+    items = clone.items
+
+    assert all(item is not shared for item, shared in zip(items, original._items))
+    assert clone._items[0]._items[0] is original._items[0]._items[0]
+    items[0]["counter"].value = 2
+    assert original["header"]["counter"].value == 1
+
+
+def test_modifying_original_does_not_affect_clone():
+    original = json_parser.loadd(DESCRIPTION)
+    clone = original.clone()
+    serialization = bytes(clone.serialization)
+
+    original["label"].string = "changed"
+    original["samples"].items[0].value = 9
+    original["header"].update({"flags": 3})
+    original["samples"].append(Uint8(4, None))
+
+    assert clone.serialization == serialization
+    assert clone["label"].string == "scenario"
+    assert [item.value for item in clone["samples"].items] == [1, 2, 3]
+    assert original["samples"].length == 4
+
+
+def test_structural_changes_and_indexes():
+    original = Struct([Uint8(1, 1, name="a"), Uint8(2, 2, name="b")], None, 5)
+    clone = original.clone()
+    added = Uint16(3, 3, name="c")
+
+    clone.append(added)
+    clone.update({"b": 5})
+
+    assert clone["c"] is added
+    assert clone[2].value == 5
+    assert clone.get("b") is clone[2]
+    assert len(original.items) == 2
+    assert original["b"].value == 2
+
+    clone.clear()
+    assert len(clone.items) == 0
+    assert original.serialization == bytes([0x06, 0x00, 0x01, 0x01, 0x00, 0x02, 0x02])
+
+
+def test_clone_of_clone():
+    original = json_parser.loadd(DESCRIPTION)
+    variants = []
+    for counter in range(0, 3):
+        variant = original.clone()
+        variant["header"]["counter"].value = counter
+        variants.append(variant)
+    second = variants[0].clone()
+    second["header"]["flags"].value = 7
+
+    assert [variant["header"]["counter"].value for variant in variants] == [0, 1, 2]
+    assert variants[0]["header"]["flags"].value == 0
+    assert second["header"]["counter"].value == 0
+    assert second["header"]["flags"].value == 7
+    assert original["header"]["counter"].value == 1
+
+
+def test_union_and_string_items():
+    union = Union(Struct([Uint8(1, 1)], None, 5), 1, 1, selector_len=1)
+    clone = union.clone()
+    clone.member.items[0].value = 2
+
+    assert union.member.items[0].value == 1
+    assert clone.serialization[-1] == 2
+
+    string = String("ab", None, 5)
+    copied = string.clone()
+    copied.items[-2].value = ord("c")
+    assert string.serialized_value[-2] == ord("b")
+
+
+def test_multi_array_values_copied_on_write():
+    original = MultiArray([[1, 2], [3, 4]], 1, 5, elementtype=Types.UINT8)
+    clone = original.clone()
+
+    assert clone._values is original._values
+    clone[0, 0] = 9
+
+    assert original[0, 0] == 1
+    assert clone.tolist() == [[9, 2], [3, 4]]
+    original.values[3] = 8
+    assert clone[1, 1] == 4
+
+
+def test_numpy_array_copied_on_write():
+    numpy = pytest.importorskip("numpy")
+    original = Array.from_numpy(numpy.arange(4, dtype=numpy.uint16), 1, 5)
+    clone = original.clone()
+
+    clone.to_numpy()[0] = 7
+
+    assert original.to_numpy()[0] == 0
+    assert clone.serialized_value[:2] == b"\x00\x07"
+
+
+def test_cache_reuses_shared_subtrees():
+    original = Struct([
+            Struct([Uint16(i, j) for j in range(0, 20)], i, 6) for i in range(0, 10)],
+            None, 6)
+    cache = SerializationCache()
+    cache.serialize(original)
+    cache.reset_counters()
+
+    clone = original.clone()
+    clone[3][5].value = 100
+
+    assert cache.serialize(clone) == clone.serialization
+    # All unchanged sub-structs are answered from the cache
+    assert cache.hits == 9
+    # Serializing did not copy the shared subtrees
+    assert clone._items[0] is original._items[0]
+
+
+def test_frozen_clone_is_itself():
+    frozen = Uint8(1, 1).freeze()
+
+    assert frozen.clone() is frozen
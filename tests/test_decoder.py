@@ -0,0 +1,137 @@
+"""
+Test cases for decoding serialized payloads based on a description.
+"""
+
+import json
+import os
+import pytest
+
+from someip.tlv.converter import json_parser
+from someip.tlv.converter.decoder import compile_description, decode
+from someip.tlv.datatypes import Types
+from someip.tlv.datatypes.basic import Uint8, Uint16
+from someip.tlv.datatypes.complex import Struct
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(__file__), '..', 'examples')
+
+DESCRIPTION = {
+    "type": "struct",
+    "dataID": None,
+    "wiretype": 6,
+    "value": {
+        "flag":     {"type": "boolean", "dataID": 1, "value": True},
+        "counter":  {"type": "uint16", "dataID": 2, "value": 4711},
+        "offset":   {"type": "sint32", "dataID": 3, "value": -5},
+        "ratio":    {"type": "float64", "dataID": 4, "value": 0.25},
+        "name":     {"type": "string", "dataID": 5, "value": "€ℕℝ∂∀", "wiretype": 5},
+        "samples":  {"type": "array", "dataID": 6, "value": [1, 2, 3, 4],
+                     "wiretype": 6, "elementtype": "sint16"},
+        "nested":   {"type": "struct", "dataID": 7, "wiretype": 4, "lengthfield_len": 2,
+                     "value": {
+                         "a": {"type": "uint8", "dataID": 0, "value": 1},
+                         "b": {"type": "uint64", "dataID": 1, "value": 2**40},
+                         }},
+        "records":  {"type": "array", "dataID": 8, "wiretype": 7, "value": [
+                        {"type": "struct", "dataID": None, "wiretype": 5, "value": {
+                            "x": {"type": "uint8", "dataID": None, "value": 1}}},
+                        {"type": "struct", "dataID": None, "wiretype": 5, "value": {
+                            "x": {"type": "uint8", "dataID": None, "value": 2}}},
+                        ]},
+    }
+}
+
+
+def test_roundtrip():
+    message = json_parser.loadd(DESCRIPTION)
+    serialized = message.serialization
+
+    decoded = decode(DESCRIPTION, serialized)
+
+    assert decoded.serialization == serialized
+    assert [item.name for item in decoded.items] == list(DESCRIPTION['value'].keys())
+    assert decoded.items[1].value == 4711
+    assert decoded.items[4].string == "€ℕℝ∂∀"
+    assert [item.value for item in decoded.items[5].items] == [1, 2, 3, 4]
+    assert decoded.items[6].items[1].value == 2**40
+
+
+@pytest.mark.parametrize("key", [
+        "string", "string_with_padding", "string_without_termination",
+        "string_no_bom", "string_special_chars", "string_static"])
+def test_roundtrip_strings(key):
+    with open(os.path.join(EXAMPLES_DIR, 'string.json'), 'r', encoding='utf-8') as json_file:
+        description = json.load(json_file)[key]
+    message = json_parser.loadd(description, name=key)
+
+    decoded = decode(description, message.serialization, name=key)
+
+    assert decoded.serialization == message.serialization
+    assert decoded.string == description['value']
+
+
+def test_tagged_members_any_order_and_unknown_skipped():
+    description = {
+        "type": "struct", "dataID": None, "wiretype": 5, "value": {
+            "a": {"type": "uint8", "dataID": 1, "value": 0},
+            "b": {"type": "uint16", "dataID": 2, "value": 0},
+        }}
+    # b, unknown uint32, unknown dynamic array, a
+    payload = bytearray([
+        0x11,
+        0x10, 0x02, 0x12, 0x34,
+        0x20, 0x09, 0x00, 0x00, 0x00, 0x01,
+        0x50, 0x0A, 0x01, 0xFF,
+        0x00, 0x01, 0x07])
+
+    decoded = decode(description, payload)
+
+    assert [(item.name, item.value) for item in decoded.items] == [("b", 0x1234), ("a", 7)]
+
+
+def test_empty_array_keeps_element_type():
+    description = {"type": "array", "dataID": None, "wiretype": 5, "value": [],
+                   "elementtype": "uint16"}
+
+    decoded = decode(description, bytearray([0]))
+
+    assert decoded.items == []
+    assert decoded.elementtype == Types.UINT16
+    assert decoded.serialization == bytearray([0])
+
+
+@pytest.mark.parametrize("payload", [
+        bytearray(),
+        bytearray([0x0D, 0x10, 0x02]),
+        bytearray([0x05, 0x10, 0x02, 0x12, 0x34]),
+        bytearray([0x04, 0x10, 0x02, 0x12, 0x34, 0x00]),
+    ])
+def test_malformed(payload):
+    codec = compile_description({
+        "type": "struct", "dataID": None, "wiretype": 5, "value": {
+            "b": {"type": "uint16", "dataID": 2, "value": 0}}})
+
+    with pytest.raises(ValueError):
+        codec.decode(payload)
+
+
+def test_decode_from_offset():
+    codec = compile_description({"type": "uint16", "dataID": None, "value": 0})
+    buffer = Uint8(1, None).serialization + Uint16(0xBEEF, None).serialization
+
+    element, offset = codec.decode_from(buffer, 1)
+
+    assert element.value == 0xBEEF
+    assert offset == 3
+
+
+def test_complex_needs_wiretype():
+    with pytest.raises(ValueError):
+        compile_description({"type": "struct", "dataID": None, "value": {}})
+
+
+def test_decode_static_struct():
+    description = {"type": "struct", "dataID": None, "wiretype": 4, "lengthfield_len": 0,
+                   "value": {"a": {"type": "uint8", "dataID": None, "value": 0}}}
+    message = Struct([Uint8(9, None, name="a")], None, 4, lengthfield_len=0)
+
+    assert decode(description, message.serialization).items[0].value == 9
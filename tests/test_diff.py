@@ -0,0 +1,147 @@
+"""
+Test cases for the structural diff of serialized payloads.
+"""
+
+import copy
+import pytest
+
+from someip.tlv.converter import json_parser
+from someip.tlv.converter import decoder
+from someip.tlv.converter.decoder import compile_description
+from someip.tlv.converter.diff import diff, Difference
+from .test_decoder import DESCRIPTION
+
+
+def _serialize(description):
+    return bytes(json_parser.loadd(description).serialization)
+
+
+def _modified(**values):
+    description = copy.deepcopy(DESCRIPTION)
+    for key, value in values.items():
+        description['value'][key]['value'] = value
+    return description
+
+
+@pytest.fixture(autouse=True)
+def no_objects(monkeypatch):
+    """
+    The diff must not create data type objects.
+    """
+    def fail(*args, **kwargs):
+        raise AssertionError('data type object created')
+    for codec_type in (decoder._StructCodec, decoder._ArrayCodec, decoder._StringCodec,
+            decoder._PreserializedCodec, decoder._BasicCodec):
+        monkeypatch.setattr(codec_type, 'make', fail)
+
+
+def test_equal():
+    payload = _serialize(DESCRIPTION)
+    assert diff(DESCRIPTION, payload, bytearray(payload)) == []
+
+
+def test_basic_values():
+    codec = compile_description(DESCRIPTION)
+    nested = copy.deepcopy(DESCRIPTION['value']['nested']['value'])
+    nested['b']['value'] = 3
+
+    differences = diff(codec, _serialize(DESCRIPTION),
+            _serialize(_modified(counter=1, nested=nested)))
+
+    assert differences == [
+            Difference('Message Payload/2', 'value', 5, 5, 4711, 1),
+            Difference('Message Payload/7/1', 'value', 66, 66, 2**40, 3)]
+
+
+@pytest.mark.parametrize("wrap_a,wrap_b", [
+                             (bytes, memoryview),
+                             (memoryview, bytearray),
+                             (memoryview, memoryview),
+                         ])
+def test_buffer_types(wrap_a, wrap_b):
+    nested = copy.deepcopy(DESCRIPTION['value']['nested']['value'])
+    nested['b']['value'] = 3
+    payload_a = wrap_a(_serialize(DESCRIPTION))
+    payload_b = wrap_b(_serialize(_modified(counter=1, nested=nested)))
+
+    assert [d.path for d in diff(DESCRIPTION, payload_a, payload_b)] \
+            == ['Message Payload/2', 'Message Payload/7/1']
+    assert diff(DESCRIPTION, payload_a, wrap_b(bytes(payload_a))) == []
+
+
+def test_array_items_and_length():
+    payload_a = _serialize(DESCRIPTION)
+    payload_b = _serialize(_modified(samples=[1, 2, 9]))
+
+    differences = diff(DESCRIPTION, payload_a, payload_b)
+
+    assert [(d.path, d.kind, d.value_a, d.value_b) for d in differences] == [
+            ('Message Payload/6/[2]', 'value', 3, 9),
+            ('Message Payload/6', 'length', 4, 3)]
+    # Members behind the array are compared at their shifted offsets
+    assert payload_a[differences[1].offset_a:] != payload_b[differences[1].offset_b:]
+
+
+def test_nested_untagged_items_and_strings():
+    records = copy.deepcopy(DESCRIPTION['value']['records']['value'])
+    records[1]['value']['x']['value'] = 7
+
+    differences = diff(DESCRIPTION, _serialize(DESCRIPTION),
+            _serialize(_modified(name='abc', records=records)))
+
+    assert [(d.path, d.kind) for d in differences] == [
+            ('Message Payload/5', 'length'),
+            ('Message Payload/8/[1]/x', 'value')]
+
+
+def test_tagged_members_any_order_missing_and_added():
+    description = {
+        "type": "struct", "dataID": None, "wiretype": 5, "value": {
+            "a": {"type": "uint8", "dataID": 1, "value": 0},
+            "b": {"type": "uint16", "dataID": 2, "value": 0},
+        }}
+    payload_a = bytes([0x07, 0x00, 0x01, 0x05, 0x10, 0x02, 0x00, 0x07])
+    # b before a and an unknown member 3
+    payload_b = bytes([0x0D, 0x10, 0x02, 0x00, 0x08, 0x20, 0x03, 0x00, 0x00, 0x00, 0x01,
+            0x00, 0x01, 0x05])
+
+    differences = diff(description, payload_a, payload_b)
+
+    assert differences == [
+            Difference('Message Payload/2', 'value', 4, 1, 7, 8),
+            Difference('Message Payload/3', 'added', None, 5)]
+    assert diff(description, payload_b, payload_a)[1] == \
+            Difference('Message Payload/3', 'missing', 5, None)
+
+
+def test_wiretype():
+    description = {
+        "type": "struct", "dataID": None, "wiretype": 5, "value": {
+            "s": {"type": "string", "dataID": 1, "wiretype": 5, "value": "x"},
+        }}
+    payload_a = bytes([0x07, 0x50, 0x01, 0x04, 0xEF, 0xBB, 0xBF, 0x78])
+    payload_b = bytes([0x08, 0x60, 0x01, 0x00, 0x04, 0xEF, 0xBB, 0xBF, 0x78])
+
+    assert diff(description, payload_a, payload_b) == [
+            Difference('Message Payload/1', 'wiretype', 1, 1, 5, 6)]
+
+
+def test_trailing_data():
+    payload = _serialize(DESCRIPTION)
+
+    assert diff(DESCRIPTION, payload, payload + b'\x00') == [
+            Difference('Message Payload', 'length', len(payload), len(payload))]
+
+
+def test_max_differences():
+    differences = diff(DESCRIPTION, _serialize(DESCRIPTION),
+            _serialize(_modified(flag=False, counter=1, offset=0)), max_differences=2)
+
+    assert [d.path for d in differences] == ['Message Payload/1', 'Message Payload/2']
+
+
+def test_malformed():
+    payload = _serialize(DESCRIPTION)
+
+    with pytest.raises(ValueError, match='Unexpected end of data'):
+        diff(DESCRIPTION, payload, payload[:-3])
@@ -0,0 +1,130 @@
+"""
+Test cases for the E2E protection profiles and the CRC calculation.
+"""
+
+import pytest
+
+from someip.tlv.converter import json_parser
+from someip.tlv.datatypes.basic import Uint32
+from someip.tlv.datatypes.complex import Array, Struct, Union
+from someip.transport.crc import Crc, CRC8_SAE_J1850, CRC8_H2F, CRC16_CCITT_FALSE, CRC32, \
+        CRC32_P4
+from someip.transport.e2e import Profile1, Profile4, Profile5, E2EStatus, value_offset
+
+DESCRIPTION = {
+    "type": "struct", "dataID": None, "wiretype": 6, "value": {
+        "e2e": {"type": "serialized", "value": "00 00 00 00 00 00 00 00 00 00 00 00"},
+        "speed": {"type": "uint16", "dataID": 1, "value": 120},
+        "name": {"type": "string", "dataID": 2, "value": "wheel", "wiretype": 5},
+    }}
+
+
+@pytest.mark.parametrize("crc, check", [
+        (CRC8_SAE_J1850, 0x4B),
+        (CRC8_H2F, 0xDF),
+        (CRC16_CCITT_FALSE, 0x29B1),
+        (CRC32, 0xCBF43926),
+        (CRC32_P4, 0x1697D06A),
+        (Crc(16, 0x8005, 0x0000, 0x0000, True), 0xBB3D),
+        (Crc(32, 0x04C11DB7, 0xFFFFFFFF, 0x00000000, False), 0x0376E6E7),
+    ])
+def test_crc_check_values(crc, check):
+    assert crc(b'123456789') == check
+    assert crc(b'6789', crc(b'12345')) == check
+
+
+@pytest.mark.parametrize("crc", [CRC8_SAE_J1850, CRC8_H2F, CRC32_P4,
+        Crc(8, 0x07, 0x00, 0x00, True), Crc(16, 0x8005, 0x0000, 0x0000, True)])
+def test_crc_long_buffers(crc):
+    data = bytes(range(0, 256)) * 20 + b'odd'
+    expected = None
+    for start in range(0, len(data), 100):
+        expected = crc(data[start:start + 100], expected)
+
+    assert crc(data) == expected
+    assert crc(memoryview(data)[1:], crc(data[:1])) == expected
+
+
+def _serialized_message():
+    message = json_parser.loadd(DESCRIPTION)
+    buffer = bytearray(message.serialization_length)
+    message.serialize_into(buffer)
+    return message, buffer
+
+
+@pytest.mark.parametrize("sender, receiver", [
+        (Profile1(0x0123, offset=3, counter_offset=4), Profile1(0x0123, offset=3, counter_offset=4)),
+        (Profile4(0x12345678, offset=2), Profile4(0x12345678, offset=2)),
+        (Profile5(0x0123, offset=2), Profile5(0x0123, offset=2)),
+    ])
+def test_protect_and_check(sender, receiver):
+    message, buffer = _serialized_message()
+    statuses = []
+    for counter in range(0, 4):
+        assert sender.protect(buffer) == counter
+        if counter != 2:
+            statuses.append(receiver.check(buffer))
+    statuses.append(receiver.check(buffer))
+
+    assert statuses == [E2EStatus.OK, E2EStatus.OK, E2EStatus.WRONG_SEQUENCE, E2EStatus.REPEATED]
+
+    buffer[-2] ^= 0x01
+    assert receiver.check(buffer) == E2EStatus.ERROR
+    assert receiver.check(buffer[:2]) == E2EStatus.ERROR
+    assert message.items[1].value == 120
+
+
+def test_profile4_checks_data_id_and_length():
+    _message, buffer = _serialized_message()
+    Profile4(0x1000, offset=2).protect(buffer)
+
+    assert Profile4(0x1000, offset=2).check(buffer) == E2EStatus.OK
+    assert Profile4(0x1001, offset=2).check(buffer) == E2EStatus.ERROR
+    assert Profile4(0x1000, offset=2).check(buffer + b'\x00', len(buffer) + 1) == E2EStatus.ERROR
+
+
+def test_counter_lost_and_wraparound():
+    sender = Profile5(0x0001)
+    receiver = Profile5(0x0001, max_delta_counter=3)
+    buffer = bytearray(8)
+    sender.counter = 0xFE
+
+    sender.protect(buffer)
+    assert receiver.check(buffer) == E2EStatus.OK
+    sender.protect(buffer)
+    sender.protect(buffer)
+    assert receiver.check(buffer) == E2EStatus.OK_SOME_LOST
+    assert sender.counter == 1
+
+
+def test_value_offset():
+    message = json_parser.loadd(DESCRIPTION)
+
+    assert value_offset(message, message.items[0]) == 2
+    assert value_offset(message, message.items[1]) == 16
+    assert value_offset(message, message.items[2]) == 21
+    assert value_offset(message, message) == 2
+    with pytest.raises(ValueError):
+        value_offset(message, json_parser.loadd(DESCRIPTION))
+
+
+def test_value_offset_in_union_and_lazy_arrays():
+    numpy = pytest.importorskip("numpy")
+    samples = Array.from_numpy(numpy.arange(4, dtype=numpy.uint16), 1)
+    header = Uint32(0, 2)
+    message = Struct([samples, Union(Struct([header], None, 5), 1, 3)], None, 6)
+    clone = message.clone()
+
+    serialization = bytes(message.serialization)
+    # root length field, samples (2 + 1 + 8), union tag, length field and
+    # selector, struct length field, header tag
+    assert value_offset(message, header) == 2 + 11 + 2 + 1 + 4 + 1 + 2 == 23
+    assert serialization[23:27] == bytes(4)
+    assert samples._values is not None
+    assert value_offset(clone, clone._items[0]) == 5
+    assert clone._items[1] is message._items[1]
+
+
+def test_protect_payload_too_short():
+    with pytest.raises(ValueError):
+        Profile4(0x1000, offset=2).protect(bytearray(10))
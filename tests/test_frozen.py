@@ -0,0 +1,83 @@
+"""
+Test cases for immutable frozen snapshots of data types.
+"""
+
+import threading
+import pytest
+
+from someip.tlv.converter import json_parser
+from someip.tlv.datatypes import Frozen, Preserialized, Types
+from someip.tlv.datatypes.basic import Uint16
+from someip.tlv.datatypes.complex import Struct
+
+DESCRIPTION = {
+    "type": "struct", "dataID": 3, "wiretype": 6, "value": {
+        "counter": {"type": "uint32", "dataID": 1, "value": 5},
+        "name": {"type": "string", "dataID": 2, "value": "frozen", "wiretype": 5},
+    }}
+
+
+def test_snapshot_properties():
+    message = json_parser.loadd(DESCRIPTION)
+    frozen = message.freeze()
+
+    assert isinstance(frozen, Frozen)
+    assert frozen.serialization == message.serialization
+    assert isinstance(frozen.serialization, bytes)
+    assert frozen.serialization_length == message.serialization_length
+    assert frozen.serialized_value == message.serialized_value
+    assert frozen.lengthfield == message.lengthfield
+    assert (frozen.type, frozen.name, frozen.data_id, frozen.wiretype, frozen.length) \
+            == (Types.STRUCT, "Message Payload", 3, 6, message.length)
+    assert frozen.freeze() is frozen
+
+
+def test_snapshot_is_immutable_and_independent():
+    message = json_parser.loadd(DESCRIPTION)
+    frozen = message.freeze()
+    serialization = bytes(message.serialization)
+
+    message.items[0].value = 6
+    with pytest.raises(AttributeError):
+        frozen._data = b''
+
+    assert frozen.serialization == serialization
+    assert frozen != message.freeze()
+
+
+def test_dedupe_by_content():
+    first = json_parser.loadd(DESCRIPTION).freeze()
+    second = json_parser.loadd(DESCRIPTION).freeze()
+    preserialized = Preserialized(bytearray(first.serialization)).freeze()
+
+    assert first == second == preserialized
+    assert len({first, second, preserialized}) == 1
+    assert first.digest == second.digest
+    assert len(first.digest) == 16
+
+
+def test_snapshot_as_member():
+    frozen = Uint16(0x1234, 1, name="value").freeze()
+    message = Struct([frozen], None, wiretype=5)
+    buffer = bytearray(message.serialization_length)
+    message.serialize_into(buffer)
+
+    assert buffer == message.serialization == bytearray([0x04, 0x10, 0x01, 0x12, 0x34])
+    assert b''.join(message.serialization_iov(reference_threshold=0)) == buffer
+    assert "(frozen)" in message.print_details()
+
+
+def test_shared_between_threads():
+    frozen = json_parser.loadd(DESCRIPTION).freeze()
+    results = []
+
+    def _send():
+        results.append(bytes(frozen.serialization))
+
+    threads = [threading.Thread(target=_send) for _unused in range(0, 8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [frozen.serialization] * 8
@@ -0,0 +1,140 @@
+"""
+Test cases for the mutation fuzzer.
+"""
+
+import pickle
+
+import pytest
+
+from someip.tlv.converter import json_parser
+from someip.tlv.converter.validator import validate
+from someip.tlv.datatypes.basic import Uint8
+from someip.tlv.datatypes.complex import Array, Struct
+from someip.tlv.datatypes.type_helpers import unpack_tag_from, unpack_lengthfield_from
+from someip.tlv.fuzzer import Fuzzer, fuzz, layout, MUTATIONS
+from .test_decoder import DESCRIPTION
+
+
+def _differing_bits(data_a, data_b):
+    return sum(bin(byte_a ^ byte_b).count('1') for byte_a, byte_b in zip(data_a, data_b))
+
+
+def test_layout():
+    message = json_parser.loadd(DESCRIPTION)
+    serialized = message.serialization
+
+    elements = layout(message)
+
+    assert elements[0].start == 0 and elements[0].end == len(serialized)
+    assert [element.path for element in elements[1:5]] == [
+            'Message Payload/flag', 'Message Payload/counter',
+            'Message Payload/offset', 'Message Payload/ratio']
+    assert elements[7].path == 'Message Payload/samples/[0]'
+    for element in elements:
+        if element.parent == 0:
+            name = element.path.split('/')[-1]
+            assert unpack_tag_from(serialized, element.tag_offset)[1] \
+                    == DESCRIPTION['value'][name]['dataID']
+        if element.lengthfield_width > 0:
+            assert unpack_lengthfield_from(serialized, element.lengthfield_offset,
+                    element.lengthfield_width) == element.end - element.value_offset
+
+
+def test_layout_keeps_lazily_stored_items():
+    raw = pickle.loads(pickle.dumps(Array([Uint8(i, None) for i in range(0, 10)], 2, 6)))
+    message = Struct([Uint8(1, 1), raw], None, 6)
+    clone = message.clone()
+
+    elements = layout(clone)
+
+    assert [element.path for element in elements[3:5]] == ['None/1/[0]', 'None/1/[1]']
+    assert [element.value_offset for element in elements[3:5]] == [9, 10]
+    assert elements[0].end == len(message.serialization) == 19
+    assert raw._raw is not None and raw._item_list == []
+    assert clone._items[1] is raw
+
+
+def test_deterministic():
+    message = json_parser.loadd(DESCRIPTION)
+
+    first = [(mutant.mutation, bytes(mutant.data)) for mutant in fuzz(message, 200, seed=7)]
+    second = [(mutant.mutation, bytes(mutant.data)) for mutant in fuzz(message, 200, seed=7)]
+
+    assert first == second
+    assert {mutation for mutation, _data in first} == set(MUTATIONS)
+    assert first != [(mutant.mutation, bytes(mutant.data))
+            for mutant in fuzz(message, 200, seed=8)]
+
+
+@pytest.mark.parametrize("mutation", ['tag_bitflip', 'value_bitflip'])
+def test_bitflips(mutation):
+    message = json_parser.loadd(DESCRIPTION)
+    serialized = bytes(message.serialization)
+
+    for mutant in fuzz(message, 100, seed=1, mutations=[mutation]):
+        assert mutant.mutation == mutation
+        assert len(mutant.data) == len(serialized)
+        assert _differing_bits(mutant.data, serialized) == 1
+        assert mutant.data[mutant.offset:mutant.offset + 2] != serialized[mutant.offset:mutant.offset + 2]
+
+
+def test_wiretype():
+    message = json_parser.loadd(DESCRIPTION)
+    serialized = bytes(message.serialization)
+
+    for mutant in fuzz(message, 100, seed=1, mutations=['wiretype']):
+        assert mutant.data[mutant.offset] >> 4 != serialized[mutant.offset] >> 4
+        assert mutant.data[mutant.offset + 1:] == serialized[mutant.offset + 1:]
+
+
+def test_length_overflow_detected():
+    message = json_parser.loadd(DESCRIPTION)
+
+    for mutant in fuzz(message, 100, seed=1, mutations=['length_overflow']):
+        assert validate(DESCRIPTION, mutant.data) != []
+
+
+def test_length_underflow():
+    message = json_parser.loadd(DESCRIPTION)
+    serialized = bytes(message.serialization)
+    elements = {element.lengthfield_offset: element for element in layout(message)}
+
+    for mutant in fuzz(message, 100, seed=1, mutations=['length_underflow']):
+        element = elements[mutant.offset]
+        assert unpack_lengthfield_from(mutant.data, mutant.offset, element.lengthfield_width) \
+                < unpack_lengthfield_from(serialized, mutant.offset, element.lengthfield_width)
+
+
+def test_truncate():
+    message = json_parser.loadd(DESCRIPTION)
+    serialized = bytes(message.serialization)
+
+    for mutant in fuzz(message, 100, seed=1, mutations=['truncate']):
+        assert len(mutant.data) == mutant.offset < len(serialized)
+        assert serialized.startswith(mutant.data)
+        assert validate(DESCRIPTION, mutant.data) != []
+
+
+def test_duplicate_keeps_structure():
+    description = {
+        "type": "struct", "dataID": None, "wiretype": 6, "value": {
+            "a": {"type": "uint8", "dataID": 1, "value": 1},
+            "nested": {"type": "struct", "dataID": 2, "wiretype": 5, "value": {
+                "b": {"type": "uint16", "dataID": 1, "value": 2}}},
+        }}
+    message = json_parser.loadd(description)
+
+    for mutant in fuzz(message, 50, seed=1, mutations=['duplicate']):
+        assert len(mutant.data) > message.serialization_length
+        # The enclosing length fields are adjusted, only the duplicate is reported
+        assert [violation.kind for violation in validate(description, mutant.data)] \
+                == ['duplicate']
+
+
+def test_invalid_mutations():
+    message = json_parser.loadd(DESCRIPTION)
+
+    with pytest.raises(ValueError, match='Unknown mutation'):
+        Fuzzer(message, mutations=['bitrot'])
+    with pytest.raises(ValueError, match='None of the mutations'):
+        Fuzzer(Uint8(1, None), mutations=['tag_bitflip', 'duplicate'])
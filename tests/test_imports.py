@@ -0,0 +1,62 @@
+"""
+Test cases for the lazy loading of packages and modules.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+import someip
+from someip.tlv import datatypes, converter
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Python 3.6 imports the attributes of the packages right away
+lazy = pytest.mark.skipif(sys.version_info < (3, 7), reason='requires PEP 562')
+
+
+def _loaded_modules(statement):
+    """
+    Names of the modules loaded by `statement` in a fresh interpreter.
+    """
+    code = f'import sys; {statement}; print(" ".join(sorted(sys.modules)))'
+    output = subprocess.run([sys.executable, '-c', code], check=True,
+            stdout=subprocess.PIPE, universal_newlines=True, env=dict(os.environ, PYTHONPATH=ROOT)).stdout
+    return set(output.split())
+
+
+@lazy
+def test_packages_import_nothing_eagerly():
+    modules = _loaded_modules('import someip.tlv.datatypes, someip.tlv.converter')
+
+    assert 'someip.tlv.datatypes.frozen' not in modules
+    assert 'someip.tlv.datatypes.basic' not in modules
+    assert 'someip.tlv.converter.json_parser' not in modules
+    assert 'hashlib' not in modules
+
+
+@lazy
+def test_json_parser_defers_json_and_logging():
+    modules = _loaded_modules('from someip.tlv.converter import json_parser')
+
+    assert 'someip.tlv.datatypes.complex' in modules
+    assert 'json' not in modules and 'logging' not in modules
+
+
+@lazy
+def test_cli_configures_logging_in_main():
+    modules = _loaded_modules('import logging; import someip.tools.someip_tlv_serializer;'\
+            ' assert not logging.getLogger("SOMEIP").handlers')
+
+    assert 'argparse' not in modules
+
+
+def test_lazy_attributes():
+    assert datatypes.Types.STRUCT.name == 'STRUCT'
+    assert datatypes.Frozen is datatypes.frozen.Frozen
+    assert someip.tlv.converter.decoder.compile_description is not None
+    assert 'SerializationCache' in dir(datatypes) and 'json_parser' in dir(converter)
+    with pytest.raises(AttributeError, match='no attribute'):
+        datatypes.Unknown # pylint: disable=pointless-statement
@@ -0,0 +1,110 @@
+"""
+Test cases for the automatic selection of the length field width of complex
+types.
+"""
+
+import pytest
+
+from someip.tlv.converter import json_parser
+from someip.tlv.converter.decoder import decode
+from someip.tlv.datatypes.basic import Uint8, Uint16
+from someip.tlv.datatypes.complex import Array, String, Struct
+from someip.tlv.datatypes.consts import Types
+from someip.tlv.datatypes.serialization_cache import SerializationCache
+
+
+def _bytes(count, dataID=1):
+    return Array([Uint8(0, None) for _ in range(count)], dataID, None,
+            elementtype=Types.UINT8)
+
+
+@pytest.mark.parametrize("count,width,wiretype", [
+                             (0, 1, 5),
+                             (0xFF, 1, 5),
+                             (0x100, 2, 6),
+                             (0xFFFF, 2, 6),
+                             (0x10000, 4, 7),
+                         ])
+def test_minimal_width(count, width, wiretype):
+    array = _bytes(count)
+
+    serialized = array.serialization
+
+    assert array.lengthfield_length == width
+    assert array.wiretype == wiretype
+    assert serialized[0] >> 4 == wiretype
+    assert len(serialized) == 2 + width + count == array.serialization_length
+    assert int.from_bytes(serialized[2:2 + width], 'big') == count
+
+
+def test_explicit_settings_kept():
+    assert _bytes(3).lengthfield_length == 1
+    assert Array([Uint8(0, None)], None, 7).lengthfield_length == 4
+    assert Array([Uint8(0, None)], None, None, lengthfield_len=2).wiretype == 6
+    array = Array([Uint8(0, None)] * 300, None, None, lengthfield_len=4)
+    assert array.lengthfield_length == 4 and array.wiretype == 7
+    assert len(Array([], None, 5, lengthfield_len=0, elementtype=Types.UINT8).serialization) == 0
+    with pytest.raises(ValueError, match='wire type 4'):
+        Array([], None, 4)
+    # Untagged elements can not tell a receiver the width of the length field
+    with pytest.raises(ValueError, match='Wiretype needed'):
+        _bytes(3, None)
+    with pytest.raises(ValueError, match='Wiretype needed'):
+        String('x', None, None)
+    with pytest.raises(ValueError, match='Untagged'):
+        _bytes(3).data_id = None
+
+
+def test_growth_propagates_to_ancestors():
+    inner = Struct([_bytes(240)], 1, name='inner')
+    outer = Struct([inner, Uint16(1, 2)], 3)
+
+    assert outer.serialization[2] == len(outer.serialization) - 3 == 250
+
+    inner.items[0].extend([Uint8(0, None)] * 20)
+    serialized = outer.serialization
+
+    # 260 byte array in a 264 byte struct in a 272 byte struct
+    assert inner.items[0].lengthfield_length == 2
+    assert inner.lengthfield_length == 2 and inner.wiretype == 6
+    assert outer.lengthfield_length == 2
+    assert serialized[0] >> 4 == 6
+    assert int.from_bytes(serialized[2:4], 'big') == len(serialized) - 4 == 272
+    assert serialized[4] >> 4 == 6 and serialized[8] >> 4 == 6
+
+
+def test_serialize_into_and_iov():
+    message = Struct([
+            Struct([_bytes(0x120), String('abc', 2, None)], 1),
+            _bytes(3, 2),
+            ], None, 6)
+    expected = message.serialization
+
+    buffer = bytearray(message.serialization_length)
+    assert message.serialize_into(buffer) == len(expected)
+    assert buffer == expected
+    assert b''.join(message.serialization_iov(reference_threshold=0)) == expected
+    assert SerializationCache().serialize(message) == expected
+
+
+def test_length_override():
+    array = _bytes(3)
+
+    array.length = 0x1000
+
+    assert array.lengthfield_length == 2
+    assert array.serialization[2:4] == b'\x10\x00'
+
+
+def test_json_and_decode_roundtrip():
+    description = {
+        "type": "struct", "dataID": None, "wiretype": 6, "value": {
+            "data": {"type": "array", "dataID": 1, "elementtype": "uint8",
+                     "value": [1] * 300},
+            "text": {"type": "string", "dataID": 2, "value": "x"},
+        }}
+    message = json_parser.loadd(description)
+    serialized = message.serialization
+
+    assert message.get('data').wiretype == 6 and message.get('text').wiretype == 5
+    assert decode(description, serialized).serialization == serialized
@@ -0,0 +1,72 @@
+"""
+Test cases for writing serializations directly into buffers and memory-mapped
+files.
+"""
+
+import pytest
+
+from someip.tlv.datatypes import Preserialized
+from someip.tlv.datatypes.basic import Boolean, Uint8, Uint32, Sint16, Float64
+from someip.tlv.datatypes.complex import Array, String, Struct
+
+
+def _create_message():
+    return Struct([
+        Boolean(True, 0),
+        Float64(1.5, 1, name="float"),
+        String("€ℕℝ∂∀", 2, 6),
+        Array([Sint16(-i, None) for i in range(0, 300)], 3, 6),
+        Array([Array([Uint8(i, None)], None, 5) for i in range(0, 3)], 4, 7),
+        Preserialized("01 02 03"),
+        Struct([Uint32(7, 0)], 5, 4, lengthfield_len=1, length=42),
+        Struct([], None, 5),
+        ], None, 7)
+
+
+@pytest.mark.parametrize("message", [
+        _create_message(),
+        Uint8(3, 0),
+        Uint8(3, None),
+        Preserialized("0a 0b"),
+        String("", None, 5, bom=False),
+    ])
+def test_serialization_length(message):
+    assert message.serialization_length == len(message.serialization)
+
+
+def test_serialize_into():
+    message = _create_message()
+    buffer = bytearray(message.serialization_length + 3)
+
+    end = message.serialize_into(buffer, 3)
+
+    assert end == len(buffer)
+    assert buffer[3:] == message.serialization
+
+
+def test_serialize_into_too_small():
+    message = _create_message()
+    buffer = bytearray(message.serialization_length - 1)
+
+    with pytest.raises(ValueError):
+        message.serialize_into(buffer)
+
+
+@pytest.mark.parametrize("fsync", [False, True])
+def test_write_to_mmap(tmp_path, fsync):
+    message = _create_message()
+    path = tmp_path / "payload.bin"
+    # Existing (longer) content must be truncated
+    path.write_bytes(b'\xff' * 2 * message.serialization_length)
+
+    written = message.write_to_mmap(path, fsync=fsync)
+
+    assert written == message.serialization_length
+    assert path.read_bytes() == message.serialization
+
+
+def test_write_to_mmap_empty(tmp_path):
+    path = tmp_path / "empty.bin"
+
+    assert Preserialized(bytearray()).write_to_mmap(path) == 0
+    assert path.read_bytes() == b''
@@ -0,0 +1,214 @@
+"""
+Test cases for multi-dimensional arrays.
+"""
+
+import pytest
+
+from someip.tlv.converter import json_parser
+from someip.tlv.converter.decoder import compile_description, decode
+from someip.tlv.converter.push_decoder import IncrementalDecoder
+from someip.tlv.converter.validator import validate
+from someip.tlv.datatypes import SerializationCache
+from someip.tlv.datatypes.basic import Uint8, Sint16
+from someip.tlv.datatypes.complex import Array, MultiArray, Struct
+from someip.tlv.datatypes.consts import Types
+from someip.tlv.fuzzer import layout
+
+VALUES = [[[1, -2], [3, -4], [5, -6]], [[7, -8], [9, -10], [11, -12]]]
+
+DESCRIPTION = {
+    "type": "struct", "dataID": None, "wiretype": 6, "value": {
+        "grid":     {"type": "array", "dataID": 1, "wiretype": 6,
+                     "elementtype": "sint16", "value": VALUES},
+        "static":   {"type": "array", "dataID": 2, "lengthfield_len": 0,
+                     "elementtype": "uint8", "shape": [2, 2], "value": [1, 2, 3, 4]},
+        "count":    {"type": "uint8", "dataID": 3, "value": 7},
+    }}
+
+
+def _nested(values, elementtype, item_type, lengthfield_len, data_id=None, wiretype=None):
+    if isinstance(values[0], list):
+        return Array([_nested(row, elementtype, item_type, lengthfield_len) for row in values],
+                data_id, wiretype, lengthfield_len=lengthfield_len)
+    return Array([item_type(value, None) for value in values], data_id, wiretype,
+            lengthfield_len=lengthfield_len, elementtype=elementtype)
+
+
+@pytest.mark.parametrize("wiretype,lengthfield_len", [(6, None), (None, 1), (None, 4)])
+def test_serialization_equals_nested_arrays(wiretype, lengthfield_len):
+    width = lengthfield_len if lengthfield_len is not None else 2
+    expected = _nested(VALUES, Types.SINT16, Sint16, width, 1, wiretype)
+
+    multi_array = MultiArray(VALUES, 1, wiretype, lengthfield_len=lengthfield_len,
+            elementtype=Types.SINT16)
+
+    assert multi_array.shape == (2, 3, 2)
+    assert multi_array.length == expected.length
+    assert multi_array.serialization_length == expected.serialization_length
+    assert multi_array.serialization == expected.serialization
+    buffer = bytearray(multi_array.serialization_length)
+    multi_array.serialize_into(buffer)
+    assert buffer == expected.serialization
+    assert b''.join(multi_array.serialization_iov(reference_threshold=0)) \
+            == expected.serialization
+
+
+def test_flat_values_with_shape():
+    flat = MultiArray(range(0, 6), None, lengthfield_len=2, elementtype=Types.UINT8,
+            shape=(2, 3))
+
+    assert flat.tolist() == [[0, 1, 2], [3, 4, 5]]
+    assert flat.serialization == MultiArray([[0, 1, 2], [3, 4, 5]], None,
+            lengthfield_len=2, elementtype=Types.UINT8).serialization
+    assert flat.serialized_value == bytes([0, 3, 0, 1, 2, 0, 3, 3, 4, 5])
+    static = MultiArray(range(0, 6), None, lengthfield_len=0, elementtype=Types.UINT8,
+            shape=(2, 3))
+    assert static.serialization == bytes(range(0, 6))
+
+
+def test_automatic_lengthfield_counts_inner_lengthfields():
+    # 250 bytes of values, the inner length fields exceed one byte in total
+    multi_array = MultiArray([0] * 250, 1, elementtype=Types.UINT8, shape=(10, 25))
+
+    assert multi_array.lengthfield_length == 2
+    assert multi_array.wiretype == 6
+    assert multi_array.length == 10 * (2 + 25)
+    assert multi_array.serialization == _nested(
+            [[0] * 25] * 10, Types.UINT8, Uint8, 2, 1).serialization
+
+    multi_array.set_values([[1, 2], [3, 4]])
+    assert multi_array.lengthfield_length == 1
+    assert multi_array.serialization == bytes([0x50, 0x01, 6, 2, 1, 2, 2, 3, 4])
+
+
+def test_access():
+    multi_array = MultiArray(VALUES, None, 6, elementtype=Types.SINT16)
+
+    assert multi_array[1, 2, 0] == 11
+    assert multi_array[-1, -1, -1] == -12
+    multi_array[0, 0, 1] = 100
+    assert multi_array.values[1] == 100
+    assert multi_array.serialized_value[4:8] == bytes([0, 1, 0, 100])
+    with pytest.raises(IndexError):
+        multi_array[2, 0, 0]
+    with pytest.raises(IndexError):
+        multi_array[0, 0]
+    with pytest.raises(ValueError):
+        multi_array[0, 0, 0] = 0x10000
+
+    boolean = MultiArray([[True, False]], None, 5, elementtype=Types.BOOLEAN)
+    assert boolean[0, 0] is True
+    assert boolean.tolist() == [[True, False]]
+
+
+def test_invalid_values():
+    with pytest.raises(ValueError, match='Ragged'):
+        MultiArray([[1, 2], [3]], None, 5, elementtype=Types.UINT8)
+    with pytest.raises(ValueError, match='Expected 6 values'):
+        MultiArray([1, 2, 3], None, 5, elementtype=Types.UINT8, shape=(2, 3))
+    with pytest.raises(ValueError, match='UINT8'):
+        MultiArray([[1, 256]], None, 5, elementtype=Types.UINT8)
+    with pytest.raises(ValueError, match='boolean'):
+        MultiArray([[1, 2]], None, 5, elementtype=Types.BOOLEAN)
+    with pytest.raises(ValueError, match='basic element type'):
+        MultiArray([[1]], None, 5, elementtype=Types.STRUCT)
+    with pytest.raises(ValueError):
+        MultiArray([[1]], None, 5, elementtype=Types.UINT8).append(Uint8(1, None))
+
+
+def test_json_and_decode_roundtrip():
+    message = json_parser.loadd(DESCRIPTION)
+    payload = message.serialization
+
+    assert isinstance(message['grid'], MultiArray)
+    assert message['static'].serialization == bytes([0x40, 0x02, 1, 2, 3, 4])
+
+    decoded = decode(DESCRIPTION, payload)
+
+    assert decoded.serialization == payload
+    assert isinstance(decoded['grid'], MultiArray)
+    assert decoded['grid'].shape == (2, 3, 2)
+    assert decoded['grid'].tolist() == VALUES
+    assert decoded['static'].tolist() == [[1, 2], [3, 4]]
+    assert decoded['count'].value == 7
+    assert validate(DESCRIPTION, payload) == []
+
+
+def test_decode_uses_received_lengthfield_width_and_empty():
+    description = {"type": "array", "dataID": 1, "wiretype": 5,
+            "elementtype": "uint8", "value": [[0]]}
+    codec = compile_description(description)
+
+    # Wire type 6: two byte length fields in all dimensions
+    decoded = codec.decode(bytes([0x60, 0x01, 0x00, 0x08,
+            0x00, 0x02, 1, 2, 0x00, 0x02, 3, 4]))
+    assert decoded.tolist() == [[1, 2], [3, 4]]
+    assert decoded.lengthfield_length == 2
+
+    empty = codec.decode(bytes([0x50, 0x01, 0x00]))
+    assert empty.shape == (0, 0)
+    assert empty.serialization == bytes([0x50, 0x01, 0x00])
+
+
+def test_decode_rejects_ragged_payload():
+    description = {"type": "array", "dataID": None, "lengthfield_len": 1,
+            "elementtype": "uint8", "value": [[0]]}
+    codec = compile_description(description)
+
+    with pytest.raises(ValueError, match='rows of 2 and 1 items'):
+        codec.decode(bytes([7, 2, 1, 2, 1, 3, 1, 4]))
+    with pytest.raises(ValueError, match='not a multiple'):
+        compile_description(dict(description, elementtype='uint16')).decode(
+                bytes([3, 1, 1, 0]))
+
+
+def test_compile_errors():
+    with pytest.raises(ValueError, match='"wiretype" or a "lengthfield_len"'):
+        compile_description({"type": "array", "dataID": 1, "elementtype": "uint8",
+                "value": [[1]]})
+    with pytest.raises(ValueError, match='basic type'):
+        compile_description({"type": "array", "dataID": 1, "wiretype": 5,
+                "elementtype": "string", "shape": [1, 1], "value": []})
+
+
+def test_incremental_decoder():
+    payload = bytes(json_parser.loadd(DESCRIPTION).serialization)
+    decoder = IncrementalDecoder(compile_description(DESCRIPTION))
+
+    events = []
+    for byte in payload:
+        events.extend(decoder.feed(bytes([byte])))
+
+    message = events[-1].element
+    assert message['grid'].tolist() == VALUES
+    assert message['static'].tolist() == [[1, 2], [3, 4]]
+    assert message.serialization == payload
+
+
+def test_cache_and_layout():
+    message = Struct([MultiArray(VALUES, 1, 6, elementtype=Types.SINT16),
+            Uint8(1, 2)], None, 6)
+    cache = SerializationCache()
+
+    assert cache.serialize(message) == message.serialization
+    message.items[0][0, 0, 0] = 42
+    assert cache.serialize(message) == message.serialization
+
+    elements = layout(message)
+    assert len(elements) == 3
+    assert elements[1].leaf
+    assert elements[1].end - elements[1].start == message.items[0].serialization_length
+
+
+def test_numpy_conversion():
+    numpy = pytest.importorskip('numpy')
+    grid = numpy.arange(0, 12, dtype=numpy.uint16).reshape(3, 4)
+
+    multi_array = MultiArray.from_numpy(grid, 1, 6)
+
+    assert multi_array.elementtype == Types.UINT16
+    assert multi_array.tolist() == grid.tolist()
+    view = multi_array.to_numpy()
+    assert view.shape == (3, 4)
+    view[0, 0] = 99
+    assert multi_array[0, 0] == 99
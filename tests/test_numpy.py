@@ -0,0 +1,117 @@
+"""
+Test cases for the NumPy interoperability of arrays.
+"""
+
+import sys
+
+import pytest
+
+from someip.tlv.converter import json_parser
+from someip.tlv.converter.decoder import compile_description, decode
+from someip.tlv.datatypes.basic import Uint16, Float32
+from someip.tlv.datatypes.complex import Array, Struct
+from someip.tlv.datatypes.consts import Types
+from .test_decoder import DESCRIPTION
+
+
+@pytest.fixture
+def np():
+    return pytest.importorskip('numpy')
+
+
+@pytest.mark.parametrize("dtype,elementtype,item_type", [
+                             ('uint16', Types.UINT16, Uint16),
+                             ('<f4', Types.FLOAT32, Float32),
+                         ])
+def test_from_numpy(np, dtype, elementtype, item_type):
+    values = np.arange(0, 300).astype(dtype)
+    expected = Array([item_type(value, None) for value in values.tolist()], 1, 6)
+
+    array = Array.from_numpy(values, 1, 6)
+
+    assert array.elementtype == elementtype
+    assert array.length == expected.length
+    assert array.serialization == expected.serialization
+    buffer = bytearray(array.serialization_length)
+    array.serialize_into(buffer)
+    assert buffer == expected.serialization
+    assert b''.join(array.serialization_iov(reference_threshold=0)) == expected.serialization
+
+
+@pytest.mark.parametrize("dtype,elementtype", [
+                             ('bool', Types.BOOLEAN),
+                             ('uint8', Types.UINT8), ('int8', Types.SINT8),
+                             ('>u4', Types.UINT32), ('int32', Types.SINT32),
+                             ('uint64', Types.UINT64), ('int64', Types.SINT64),
+                             ('float64', Types.FLOAT64),
+                         ])
+def test_dtype_mapping(np, dtype, elementtype):
+    array = Array.from_numpy(np.zeros(3, dtype=dtype), None, 5)
+
+    assert array.elementtype == elementtype
+    assert array.to_numpy().dtype.byteorder in ('>', '|')
+
+
+def test_big_endian_not_copied(np):
+    values = np.array([1, 2], dtype='>u2')
+    array = Array.from_numpy(values, None, 5)
+
+    values[0] = 0x0102
+
+    assert np.shares_memory(array.to_numpy(), values)
+    assert array.serialization == b'\x04\x01\x02\x00\x02'
+
+
+def test_items_created_on_access(np):
+    array = Array.from_numpy(np.array([1, 2, 3], dtype='uint16'), None, 5)
+    message = Struct([array], None, 5)
+
+    array.append(Uint16(4, None))
+
+    assert [item.value for item in array.items] == [1, 2, 3, 4]
+    assert message.serialization == b'\x09\x08\x00\x01\x00\x02\x00\x03\x00\x04'
+    assert array.to_numpy().tolist() == [1, 2, 3, 4]
+
+
+def test_details_elided_without_items(np):
+    values = np.arange(0, 1000, dtype='>u2')
+    array = Array.from_numpy(values, 1, 6)
+    expected = Array([Uint16(value, None) for value in values.tolist()], 1, 6)
+
+    details = array.print_details(max_items=2)
+
+    assert details == expected.print_details(max_items=2)
+    assert '... (996 item(s) elided)' in details
+    assert np.shares_memory(array.to_numpy(), values)
+
+
+def test_unsupported(np):
+    with pytest.raises(ValueError, match='dtype'):
+        Array.from_numpy(np.zeros(2, dtype='float16'), None, 5)
+    with pytest.raises(ValueError, match='one-dimensional'):
+        Array.from_numpy(np.zeros((2, 2), dtype='uint8'), None, 5)
+    with pytest.raises(ValueError, match='basic types'):
+        Array([Struct([], None, 5)], None, 5).to_numpy()
+
+
+def test_decode_views(np):
+    payload = json_parser.loadd(DESCRIPTION).serialization
+    codec = compile_description(DESCRIPTION, numpy=True)
+
+    message = codec.decode(payload)
+    samples = message.get('samples').to_numpy()
+
+    assert samples.dtype == np.dtype('>i2')
+    assert samples.tolist() == DESCRIPTION['value']['samples']['value']
+    assert np.shares_memory(samples, np.frombuffer(payload, 'u1'))
+    assert message.serialization == payload
+    assert decode(DESCRIPTION, bytes(payload), numpy=True).serialization == payload
+
+
+def test_numpy_missing(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'numpy', None)
+
+    with pytest.raises(ImportError, match='NumPy'):
+        Array.from_numpy([1, 2], None, 5)
+    with pytest.raises(ImportError, match='NumPy'):
+        compile_description(DESCRIPTION, numpy=True)
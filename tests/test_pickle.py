@@ -0,0 +1,156 @@
+"""
+Test cases for the compact pickling of data type trees.
+"""
+
+import copy
+import pickle
+
+import pytest
+
+from someip.tlv.converter import json_parser
+from someip.tlv.converter.decoder import compile_description
+from someip.tlv.datatypes import Preserialized
+from someip.tlv.datatypes.basic import Bitfield, Float32, Uint8, Uint16, Uint32
+from someip.tlv.datatypes.complex import Array, MultiArray, String, Struct, Union
+from someip.tlv.datatypes.consts import Types
+
+DESCRIPTION = {
+    "type": "struct", "dataID": None, "wiretype": 6, "value": {
+        "header":   {"type": "struct", "dataID": 1, "value": {
+                        "counter":  {"type": "uint16", "dataID": 1, "value": 1},
+                        "status":   {"type": "bitfield", "dataID": 2, "bits": 16,
+                                     "flags": {"valid": 0, "mode": [4, 3]},
+                                     "value": {"valid": True, "mode": 5}}}},
+        "label":    {"type": "string", "dataID": 2, "value": "€ scenario"},
+        "samples":  {"type": "array", "dataID": 3, "elementtype": "sint16",
+                     "value": list(range(-50, 50))},
+        "points":   {"type": "array", "dataID": 4, "wiretype": 6, "value": [
+                        {"type": "struct", "dataID": None, "lengthfield_len": 1, "value": {
+                            "x": {"type": "float32", "dataID": None, "value": float(i)},
+                            "y": {"type": "float32", "dataID": None, "value": -1.0}}}
+                        for i in range(0, 4)]},
+        "grid":     {"type": "array", "dataID": 5, "wiretype": 5, "elementtype": "uint16",
+                     "value": [[1, 2, 3], [4, 5, 6]]},
+        "variant":  {"type": "union", "dataID": 6, "selector": 2, "selector_len": 1,
+                     "value": {"type": "uint32", "dataID": None, "value": 7}},
+        "fixed":    {"type": "string", "dataID": 7, "lengthfield_len": 0, "length": 12,
+                     "bom": False, "padding": True, "value": "abc"},
+    }}
+
+
+def _round_trip(element):
+    return pickle.loads(pickle.dumps(element))
+
+
+def test_tree_round_trip():
+    message = json_parser.loadd(DESCRIPTION)
+
+    copied = _round_trip(message)
+
+    assert copied.serialization == message.serialization
+    assert copied.name == message.name
+    assert copied["header"]["status"].as_dict() == {"valid": True, "mode": 5}
+    assert copied["label"].string == "€ scenario"
+    assert copied["grid"].shape == (2, 3)
+    assert copied["variant"].selector == 2
+    assert copied["fixed"].length == 12 and copied["fixed"].padding
+    assert copied["points"].items[1]["x"].value == 1.0
+    # The configuration is kept, not only the serialization
+    copied["label"].string = "longer " * 40
+    message["label"].string = "longer " * 40
+    assert copied.serialization == message.serialization
+
+
+def test_pickle_is_compact():
+    message = Struct([
+            Array([Uint16(i, None) for i in range(0, 10000)], 1, 7),
+            String("x" * 10000, 2, None),
+            Array([Struct([Uint8(1, 1), Uint8(2, 2)], None, 5) for _ in range(0, 1000)], 3, 7),
+            ], None, 7)
+
+    pickled = pickle.dumps(message, pickle.HIGHEST_PROTOCOL)
+
+    assert len(pickled) < message.serialization_length + 500
+    assert pickle.loads(pickled).serialization == message.serialization
+
+
+def test_items_created_lazily():
+    string = String("abc", 1, None)
+    string.items[4].value = ord("x")
+    array = Array([Uint16(i, None, little_endian=True) for i in range(0, 5)], 2, None)
+
+    copied = _round_trip(string)
+    copied_array = _round_trip(array)
+
+    assert copied._item_list == [] and copied_array._item_list == []
+    assert copied.serialization == string.serialization
+    assert copied_array.length == 10
+    assert [item.value for item in copied.items[3:6]] == [ord("a"), ord("x"), ord("c")]
+    assert copied.serialization == string.serialization
+    assert [item.value for item in copied_array.items] == list(range(0, 5))
+    assert copied_array.items[0].little_endian
+    copied_array.append(Uint16(5, None, little_endian=True))
+    assert copied_array.serialized_value[-2:] == b"\x05\x00"
+
+
+def test_details_elided_without_items():
+    string = String("x" * 1000, 1, None)
+    array = Array([Uint16(i, None, little_endian=True) for i in range(0, 1000)], 2, None)
+
+    for element in (string, array):
+        copied = _round_trip(element)
+        details = copied.print_details(max_items=2)
+        assert details == element.print_details(max_items=2)
+        assert copied._item_list == []
+
+
+def test_other_types():
+    elements = [
+            Uint32(0x12345678, 1, little_endian=True),
+            Float32(0.5, None, name="gain"),
+            Bitfield(0x81, 2, bits=8, flags={"first": 0, "last": 7}),
+            Array([Uint16(1, None, little_endian=True), Uint16(2, None, name="b")], 3, 5),
+            Array([], 4, None, elementtype=Types.STRUCT),
+            Union(None, 0, 5, wiretype=6),
+            MultiArray([[1, 2], [3, 4]], 6, 4, lengthfield_len=0, elementtype=Types.UINT8),
+            Struct([Preserialized("0102"), Uint8(3, 7).freeze()], None, 5),
+            ]
+    for element in elements:
+        copied = _round_trip(element)
+        assert type(copied) is type(element)
+        assert copied.serialization == element.serialization
+        assert copied.name == element.name
+
+    assert _round_trip(elements[3]).items[1].name == "b"
+    frozen = Uint8(1, 1).freeze()
+    assert _round_trip(frozen) == frozen
+    assert _round_trip(frozen).digest == frozen.digest
+
+
+def test_numpy_arrays():
+    numpy = pytest.importorskip("numpy")
+    array = Array.from_numpy(numpy.arange(1000, dtype=numpy.float32), 1)
+
+    copied = _round_trip(array)
+
+    assert copied.to_numpy().tolist() == array.to_numpy().tolist()
+    copied.to_numpy()[0] = 5
+    assert array.to_numpy()[0] == 0
+
+    description = {"type": "struct", "dataID": None, "wiretype": 6,
+            "value": {key: DESCRIPTION["value"][key] for key in ("label", "samples", "grid")}}
+    decoded = compile_description(description, numpy=True).decode(
+            bytes(json_parser.loadd(description).serialization))
+    assert decoded["samples"]._values is not None
+    assert _round_trip(decoded).serialization == decoded.serialization
+
+
+def test_copies():
+    message = json_parser.loadd(DESCRIPTION)
+
+    copied = copy.deepcopy(message)
+    copied["header"]["counter"].value = 2
+
+    assert message["header"]["counter"].value == 1
+    assert copy.copy(message)._items is message._items
+    assert message.clone().serialization == message.serialization
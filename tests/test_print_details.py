@@ -0,0 +1,69 @@
+"""
+Test cases for the (streaming) explanation of serializations.
+"""
+
+import io
+
+from someip.tlv.converter import json_parser
+from someip.tlv.datatypes import Preserialized
+from someip.tlv.datatypes.type_helpers import format_bytearray_to_stringsblock
+
+DESCRIPTION = {
+    "type": "struct", "dataID": None, "wiretype": 6, "value": {
+        "samples": {"type": "array", "dataID": 1, "wiretype": 6,
+                    "value": list(range(0, 100)), "elementtype": "uint8"},
+        "name": {"type": "string", "dataID": 2, "value": "a" * 50, "wiretype": 5},
+        "nested": {"type": "struct", "dataID": 3, "wiretype": 5, "value": {
+            "inner": {"type": "struct", "dataID": 1, "wiretype": 5, "value": {
+                "value": {"type": "uint8", "dataID": 1, "value": 7}}}}},
+        "blob": {"type": "serialized", "value": "00" * 64},
+    }}
+
+
+def test_format_bytearray_to_stringsblock():
+    assert format_bytearray_to_stringsblock(bytearray([0xAB, 1, 2, 3, 4]), 4) \
+            == ['AB 01 02 03', '04']
+    assert format_bytearray_to_stringsblock(bytearray(), 4) == []
+
+
+def test_write_details_matches_print_details():
+    message = json_parser.loadd(DESCRIPTION)
+    stream = io.StringIO()
+
+    message.write_details(stream)
+
+    assert stream.getvalue() == message.print_details() + '\n'
+    assert '\n'.join(message.iter_details()) == message.print_details()
+
+
+def test_elide_items():
+    message = json_parser.loadd(DESCRIPTION)
+
+    details = message.print_details(max_items=2)
+
+    assert details.count('UINT8:') == 8
+    assert '... (96 item(s) elided)' in details
+    assert '... (50 item(s) elided)' in details
+    assert '... (48 byte(s) elided)' in details
+    assert 'inner(STRUCT)' in details
+
+
+def test_limit_depth():
+    message = json_parser.loadd(DESCRIPTION)
+
+    details = message.print_details(max_depth=2)
+
+    assert 'inner(STRUCT)' in details
+    assert '... (1 item(s) not shown)' in details
+    assert 'value(UINT8)' not in details
+    assert 'UINT8:' in details
+
+
+def test_preserialized_elided():
+    data = Preserialized(bytearray(range(0, 32)))
+
+    lines = list(data.iter_details(max_items=1))
+
+    assert lines[1].startswith('00 01 02 03')
+    assert lines[2].endswith('... (24 byte(s) elided)')
+    assert lines[3].startswith('1C 1D 1E 1F')
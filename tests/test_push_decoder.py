@@ -0,0 +1,111 @@
+"""
+Test cases for the sans-IO incremental push decoder.
+"""
+
+import random
+import pytest
+
+from someip.tlv.converter import json_parser
+from someip.tlv.converter.decoder import compile_description
+from someip.tlv.converter.push_decoder import IncrementalDecoder, MessageDecoded, \
+        ElementStarted, ValueDecoded, ElementFinished
+from someip.tlv.datatypes import Types
+from someip.transport.header import Header
+from .test_decoder import DESCRIPTION
+
+
+def _feed_in_chunks(decoder, data, sizes):
+    events = []
+    offset = 0
+    while offset < len(data):
+        size = next(sizes)
+        events += decoder.feed(data[offset:offset + size])
+        offset += size
+    return events
+
+
+@pytest.mark.parametrize("seed", [None, 1, 2, 3, 4])
+def test_fragmented_input_matches_one_shot_decode(seed):
+    codec = compile_description(DESCRIPTION)
+    serialized = json_parser.loadd(DESCRIPTION).serialization
+    stream = bytes(serialized) * 3
+    if seed is None:
+        sizes = iter(lambda: 1, None)
+    else:
+        rng = random.Random(seed)
+        sizes = iter(lambda: rng.randint(1, 40), None)
+
+    decoder = IncrementalDecoder(codec)
+    events = _feed_in_chunks(decoder, stream, sizes)
+
+    assert len(events) == 3
+    for event in events:
+        assert isinstance(event, MessageDecoded)
+        assert event.element.serialization == serialized
+        assert event.element.print_details() == codec.decode(serialized).print_details()
+    assert decoder.position == len(stream)
+    assert decoder.at_message_boundary
+
+
+def test_framed():
+    codec = compile_description(DESCRIPTION)
+    payload = bytes(json_parser.loadd(DESCRIPTION).serialization)
+    header = Header(0x1234, 0x0001, session_id=1).with_payload_length(len(payload) + 2)
+    # Trailing payload data behind the top-level element is skipped
+    data = header.pack() + payload + b'\x00\x00'
+
+    decoder = IncrementalDecoder(codec, framed=True)
+    events = _feed_in_chunks(decoder, data * 2, iter(lambda: 7, None))
+
+    assert [event.header for event in events] == [header, header]
+    assert events[0].element.serialization == payload
+    assert decoder.at_message_boundary
+
+
+def test_events():
+    description = {
+        "type": "struct", "dataID": None, "wiretype": 5, "value": {
+            "a": {"type": "uint8", "dataID": 1, "value": 7},
+            "b": {"type": "array", "dataID": 2, "wiretype": 5, "value": [1, 2],
+                  "elementtype": "uint16"},
+        }}
+    serialized = json_parser.loadd(description).serialization
+
+    events = IncrementalDecoder(compile_description(description), events=True).feed(serialized)
+
+    assert events[:-1] == [
+            ElementStarted("Message Payload", Types.STRUCT, None, 0),
+            ValueDecoded("a", Types.UINT8, 1, 7, 1),
+            ElementStarted("b", Types.ARRAY, 2, 1),
+            ValueDecoded(None, Types.UINT16, None, 1, 2),
+            ValueDecoded(None, Types.UINT16, None, 2, 2),
+            ElementFinished("b", Types.ARRAY, 2, 1),
+            ElementFinished("Message Payload", Types.STRUCT, None, 0),
+            ]
+    assert isinstance(events[-1], MessageDecoded)
+
+
+def test_incomplete_message_pending():
+    codec = compile_description(DESCRIPTION)
+    serialized = json_parser.loadd(DESCRIPTION).serialization
+    decoder = IncrementalDecoder(codec)
+
+    assert decoder.feed(serialized[:-1]) == []
+    assert not decoder.at_message_boundary
+    assert len(decoder.feed(serialized[-1:])) == 1
+
+
+def test_error_requires_reset():
+    codec = compile_description({
+        "type": "struct", "dataID": None, "wiretype": 5, "value": {
+            "b": {"type": "uint16", "dataID": 2, "value": 0}}})
+    decoder = IncrementalDecoder(codec)
+
+    with pytest.raises(ValueError):
+        decoder.feed(bytearray([0x03, 0x10, 0x02, 0x12]))
+    with pytest.raises(ValueError):
+        decoder.feed(bytearray([0x04]))
+
+    decoder.reset()
+    assert decoder.feed(bytearray([0x04, 0x10, 0x02, 0x12, 0x34]))[0].element.items[0].value \
+            == 0x1234
@@ -0,0 +1,160 @@
+"""
+Test cases for the schema registry.
+"""
+
+import json
+import os
+import threading
+
+import pytest
+
+from someip.tlv.converter import json_parser
+from someip.tlv.converter.registry import SchemaRegistry
+from someip.transport.header import Header, MessageType
+from .test_decoder import DESCRIPTION
+
+STATUS = {
+    "type": "struct", "dataID": None, "wiretype": 5, "value": {
+        "temp": {"type": "sint16", "dataID": 1, "value": 0},
+        "ok":   {"type": "boolean", "dataID": 2, "value": True},
+    }}
+
+
+def _write(directory, name, service_id, method_id, message_type, payload):
+    path = os.path.join(directory, name)
+    with open(path, 'w') as description_file:
+        json.dump({"serviceID": service_id, "methodID": method_id,
+                "messageType": message_type, "payload": payload}, description_file)
+    return path
+
+
+@pytest.fixture
+def directory(tmp_path):
+    _write(tmp_path, 'status.json', '0x1234', '0x8001', 'NOTIFICATION', STATUS)
+    _write(tmp_path, 'request.json', 0x1234, 1, 0, DESCRIPTION)
+    (tmp_path / 'notes.txt').write_text('ignored')
+    return str(tmp_path)
+
+
+def test_dispatch(directory):
+    registry = SchemaRegistry(directory)
+    payload = json_parser.loadd(DESCRIPTION).serialization
+
+    assert len(registry) == 2
+    assert (0x1234, 0x8001, MessageType.NOTIFICATION) in registry
+    assert registry.decode(0x1234, 1, MessageType.REQUEST, payload).serialization == payload
+    with pytest.raises(KeyError, match='method 0x0002'):
+        registry.decode(0x1234, 2, MessageType.REQUEST, payload)
+
+
+def test_encode_and_decode_message(directory):
+    registry = SchemaRegistry(directory)
+
+    payload = registry.encode(0x1234, 0x8001, MessageType.NOTIFICATION, {"temp": -5, 2: False})
+    header = Header(0x1234, 0x8001, message_type=MessageType.NOTIFICATION)\
+            .with_payload_length(len(payload))
+
+    decoded_header, message = registry.decode_message(header.pack() + payload + b'\x00')
+
+    assert decoded_header == header
+    assert message["temp"].value == -5 and message["ok"].value is False
+
+
+def test_encode_clones_prototype(directory, monkeypatch):
+    registry = SchemaRegistry(directory)
+    prototype = registry.shape(0x1234, 0x8001, 2).prototype
+    serialization = bytes(prototype.serialization)
+    def fail(*args, **kwargs):
+        raise AssertionError('description loaded')
+    monkeypatch.setattr(json_parser, 'loadd', fail)
+
+    first = registry.encode(0x1234, 0x8001, 2, {"temp": 7})
+    second = registry.encode(0x1234, 0x8001, 2)
+
+    assert first != second and bytes(second) == serialization
+    assert bytes(prototype.serialization) == serialization
+
+
+def test_register_checks_ids():
+    registry = SchemaRegistry()
+    registry.register('0x1234', 0x8001, 'NOTIFICATION', STATUS)
+
+    assert (0x1234, 0x8001, 2) in registry
+    with pytest.raises(ValueError, match='methodID'):
+        registry.register(0x1234, 0x10000, 2, STATUS)
+    with pytest.raises(ValueError, match='messageType'):
+        registry.register(0x1234, 1, 0x100, STATUS)
+    # Descriptions without values can be decoded only
+    registry.register(1, 1, 0, {"type": "serialized", "length": 2})
+    assert registry.decode(1, 1, 0, b'\x01\x02').serialized_value == b'\x01\x02'
+    with pytest.raises(ValueError, match='"value"'):
+        registry.encode(1, 1, 0)
+
+
+def test_hot_reload(directory):
+    registry = SchemaRegistry(directory)
+    assert registry.shape(0x1234, 0x8001, MessageType.NOTIFICATION).description == STATUS
+
+    changed = dict(STATUS, value=dict(STATUS['value'],
+            extra={"type": "uint8", "dataID": 3, "value": 7}))
+    path = _write(directory, 'status.json', 0x1234, 0x8001, 2, changed)
+    os.utime(path, ns=(0, 1))
+    os.remove(os.path.join(directory, 'request.json'))
+    _write(directory, 'added.json', 0x4321, 1, 'RESPONSE', STATUS)
+
+    result = registry.reload()
+
+    assert sorted(os.path.basename(path) for path in result.loaded) == ['added.json', 'status.json']
+    assert [os.path.basename(path) for path in result.removed] == ['request.json']
+    assert (0x1234, 1, 0) not in registry and (0x4321, 1, 0x80) in registry
+    assert len(registry.encode(0x1234, 0x8001, 2)) == len(registry.encode(0x4321, 1, 0x80)) + 3
+    assert registry.reload() == ([], [], {})
+
+
+def test_failed_files(directory):
+    path = _write(directory, 'broken.json', 0x1234, 0x8001, 2, STATUS)
+
+    with pytest.raises(ValueError, match='already registered'):
+        SchemaRegistry(directory)
+
+    registry = SchemaRegistry(directory, strict=False)
+    assert list(registry.reload().failed) == []
+    with open(path, 'w') as description_file:
+        description_file.write('{')
+    os.utime(path, ns=(0, 1))
+    assert list(registry.reload().failed) == [path]
+    assert len(registry) == 2
+
+
+def test_memory_usage(directory):
+    registry = SchemaRegistry(directory)
+
+    usage = registry.memory_usage()
+
+    assert set(usage) == {(0x1234, 0x8001, 2), (0x1234, 1, 0)}
+    # The larger description uses more memory
+    assert usage[(0x1234, 1, 0)] > usage[(0x1234, 0x8001, 2)] > 0
+
+
+def test_readers_during_reload(directory):
+    registry = SchemaRegistry(directory)
+    payload = bytes(json_parser.loadd(STATUS).serialization)
+    errors = []
+    done = threading.Event()
+
+    def read():
+        while not done.is_set():
+            try:
+                registry.decode(0x1234, 0x8001, 2, payload)
+            except Exception as error: # pylint: disable=broad-except
+                errors.append(error)
+
+    reader = threading.Thread(target=read)
+    reader.start()
+    for index in range(0, 50):
+        registry.register(0x1234, 0x8001, 2, STATUS)
+        registry.register(0x1000, index, 0, STATUS)
+    done.set()
+    reader.join()
+
+    assert errors == [] and len(registry) == 52
@@ -0,0 +1,125 @@
+"""
+Test cases for the content-addressed serialization cache.
+"""
+
+import json
+import os
+import pickle
+import pytest
+
+from someip.tlv.converter import json_parser
+from someip.tlv.datatypes import SerializationCache
+from someip.tlv.datatypes.basic import Bitfield, Uint16
+from someip.tlv.datatypes.complex import Array, Struct
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(__file__), '..', 'examples')
+
+CALIBRATION = {
+    "type": "struct", "dataID": 1, "wiretype": 6, "value": {
+        f"c{i}": {"type": "float32", "dataID": i, "value": i * 0.5} for i in range(0, 8)}}
+
+
+def _sensors(count, calibration=CALIBRATION):
+    return json_parser.loadd({
+        "type": "struct", "dataID": None, "wiretype": 7, "value": {
+            f"sensor{j}": {"type": "struct", "dataID": j, "wiretype": 6, "value": {
+                "id": {"type": "uint8", "dataID": 0, "value": j},
+                "calibration": calibration,
+                "samples": {"type": "array", "dataID": 2, "wiretype": 5,
+                            "value": [1, 2, 3], "elementtype": "uint16"},
+                }} for j in range(0, count)}})
+
+
+@pytest.mark.parametrize("filename", [
+        "simple_struct.json", "test.json", "single_int.json"])
+def test_same_serialization_as_uncached(filename):
+    with open(os.path.join(EXAMPLES_DIR, filename), 'r') as json_file:
+        message = json_parser.loadd(json.load(json_file))
+    cache = SerializationCache()
+
+    assert cache.serialize(message) == message.serialization
+    assert cache.serialize(message) == message.serialization
+
+
+def test_identical_subtrees_serialized_once():
+    message = _sensors(10)
+    cache = SerializationCache()
+
+    assert cache.serialize(message) == message.serialization
+    # 10 sensors + root miss, calibration blocks and sample arrays miss once
+    assert (cache.hits, cache.misses) == (18, 13)
+
+    cache.reset_counters()
+    assert cache.serialize(message) == message.serialization
+    assert (cache.hits, cache.misses, cache.hit_rate) == (1, 0, 1.0)
+
+
+def test_modifications_are_detected():
+    message = _sensors(3)
+    cache = SerializationCache()
+    cache.serialize(message)
+
+    message.items[1].items[1].items[0].value = -0.0
+    assert cache.serialize(message) == message.serialization
+    message.items[2].items[1].length = 3
+    assert cache.serialize(message) == message.serialization
+    message.items[0].items[2].append(message.items[0].items[2].items[0])
+    assert cache.serialize(message) == message.serialization
+
+
+def test_byte_order_of_leaves():
+    cache = SerializationCache()
+    big_endian = Struct([Struct([Uint16(1, 1)], 2, 6)], None, 6)
+    little_endian = Struct([Struct([Uint16(1, 1, little_endian=True)], 2, 6)], None, 6)
+
+    assert cache.serialize(big_endian) == big_endian.serialization
+    assert cache.serialize(little_endian) == little_endian.serialization
+    assert cache.serialize(little_endian).endswith(b"\x01\x00")
+
+
+def test_bitfield_width():
+    cache = SerializationCache()
+    narrow = Struct([Bitfield(5, 1, bits=8)], 2, 6)
+    wide = Struct([Bitfield(5, 1, bits=32)], 2, 6)
+
+    assert cache.serialize(narrow) == narrow.serialization
+    assert cache.serialize(wide) == wide.serialization == \
+            bytes.fromhex("60020006200100000005")
+
+
+def test_bounded():
+    cache = SerializationCache(max_entries=5, max_bytes=100)
+
+    for count in range(1, 6):
+        message = _sensors(count)
+        assert cache.serialize(message) == message.serialization
+        assert len(cache) <= 5
+        assert cache.size <= 100
+
+    assert cache.evictions > 0
+    cache.clear()
+    assert (len(cache), cache.size) == (0, 0)
+
+
+def test_serialize_into():
+    message = _sensors(2)
+    buffer = bytearray(message.serialization_length + 1)
+
+    assert SerializationCache().serialize_into(message, buffer, 1) == len(buffer)
+    assert buffer[1:] == message.serialization
+    with pytest.raises(ValueError):
+        SerializationCache().serialize_into(message, bytearray(4))
+
+
+def test_lazily_stored_items_not_created():
+    numpy = pytest.importorskip("numpy")
+    values = Array.from_numpy(numpy.arange(0, 100, dtype='>u2'), 1, 6)
+    raw = pickle.loads(pickle.dumps(Array([Uint16(i, None) for i in range(0, 100)], 2, 6)))
+    message = Struct([values, raw], None, 6)
+    cache = SerializationCache()
+
+    assert cache.serialize(message) == message.serialization
+    assert cache.serialize(message) == message.serialization
+    assert values._values is not None
+    assert raw._raw is not None and raw._item_list == []
+    assert cache.hits == 1
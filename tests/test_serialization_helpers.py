@@ -10,7 +10,8 @@ from someip.tlv.datatypes.basic import Uint8, Sint8, Uint16
 from someip.tlv.datatypes.type_helpers import \
         is_arrayish, \
         generate_tag, \
-        get_lengthfield_width_by_wiretype
+        get_lengthfield_width_by_wiretype, \
+        get_minimal_lengthfield_width
 from .helpers import \
         OptionalExceptionTester
 
@@ -70,3 +71,16 @@ def test_generate_tag(wiretype, data_id, exception):
 def test_get_lengthfield_width_by_wiretype(wiretype, expected_length, exception):
     with OptionalExceptionTester(exception):
         assert get_lengthfield_width_by_wiretype(wiretype) == expected_length
+
+@pytest.mark.parametrize("length,expected_width,exception", [
+                             (0, 1, None),
+                             (0xFF, 1, None),
+                             (0x100, 2, None),
+                             (0xFFFF, 2, None),
+                             (0x10000, 4, None),
+                             (0xFFFFFFFF, 4, None),
+                             (0x100000000, None, ValueError),
+                         ])
+def test_get_minimal_lengthfield_width(length, expected_width, exception):
+    with OptionalExceptionTester(exception):
+        assert get_minimal_lengthfield_width(length) == expected_width
@@ -0,0 +1,97 @@
+"""
+Test cases for the scatter-gather (iovec) serialization.
+"""
+
+import os
+import socket
+import threading
+import pytest
+
+from someip.tlv.datatypes import Preserialized
+from someip.tlv.datatypes.basic import Boolean, Uint8, Uint16
+from someip.tlv.datatypes.complex import Array, String, Struct
+from someip.tlv.datatypes.iov import sendmsg_all, writev_all
+
+
+def _create_message(preserialized_size):
+    return Struct([
+        Boolean(True, 0),
+        String("foobar", 1, 6),
+        Array([Uint16(i, None) for i in range(0, 600)], 2, 6),
+        Preserialized(bytearray(os.urandom(preserialized_size))),
+        Struct([
+            Uint8(3, 0),
+            Preserialized(bytearray(b'\x01\x02\x03')),
+            ], 3, 5),
+        ], None, 7)
+
+
+def _receive_all(sock, length):
+    data = bytearray()
+    while len(data) < length:
+        chunk = sock.recv(length - len(data))
+        if not chunk:
+            break
+        data.extend(chunk)
+    return data
+
+
+@pytest.mark.parametrize("preserialized_size,threshold", [
+        (0, 1024),
+        (10, 1024),
+        (4096, 1024),
+        (4096, 0),
+        (4096, 1 << 20),
+    ])
+def test_iov_matches_serialization(preserialized_size, threshold):
+    message = _create_message(preserialized_size)
+
+    segments = message.serialization_iov(threshold)
+
+    assert b''.join(segments) == message.serialization
+
+
+def test_iov_references_large_leafs():
+    message = _create_message(4096)
+    preserialized = message.items[3]
+
+    segments = message.serialization_iov()
+
+    assert any(segment.obj is preserialized.serialized_value for segment in segments)
+    # tag + length field of the struct, boolean, string and array tag are coalesced
+    assert len(segments) == 4
+
+
+def test_iov_over_socketpair():
+    message = _create_message(1 << 20)
+    expected = message.serialization
+    sender, receiver = socket.socketpair()
+
+    received = []
+    reader = threading.Thread(
+            target=lambda: received.append(_receive_all(receiver, len(expected))))
+    reader.start()
+    try:
+        sent = sendmsg_all(sender, message.serialization_iov())
+    finally:
+        reader.join()
+        sender.close()
+        receiver.close()
+
+    assert sent == len(expected)
+    assert received[0] == expected
+
+
+def test_iov_writev():
+    message = _create_message(128)
+    expected = message.serialization
+    read_fd, write_fd = os.pipe()
+    try:
+        written = writev_all(write_fd, message.serialization_iov(64))
+        data = os.read(read_fd, len(expected) + 1)
+    finally:
+        os.close(read_fd)
+        os.close(write_fd)
+
+    assert written == len(expected)
+    assert data == expected
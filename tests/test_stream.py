@@ -0,0 +1,138 @@
+"""
+Test cases for the asyncio SOME/IP stream codec.
+"""
+
+import asyncio
+import pytest
+
+from someip.tlv.converter import json_parser
+from someip.tlv.datatypes import Preserialized
+from someip.transport.header import Header, MessageType, HEADER_LENGTH
+from someip.transport.stream import SomeIpStream, open_connection
+from .helpers import run_coroutine, run_echo_server
+
+SERVICE_ID = 0x1234
+METHOD_ID = 0x0421
+
+DESCRIPTION = {
+    "type": "struct",
+    "dataID": None,
+    "wiretype": 6,
+    "value": {
+        "counter": {"type": "uint32", "dataID": 1, "value": 0},
+        "name": {"type": "string", "dataID": 2, "value": "echo", "wiretype": 5},
+    }
+}
+
+
+@pytest.fixture(scope="module")
+def echo_server():
+    with run_echo_server() as address:
+        yield address
+
+
+def _payload(counter):
+    description = dict(DESCRIPTION)
+    description['value'] = dict(DESCRIPTION['value'])
+    description['value']['counter'] = dict(DESCRIPTION['value']['counter'], value=counter)
+    return json_parser.loadd(description)
+
+
+def test_header_roundtrip():
+    header = Header(SERVICE_ID, METHOD_ID, client_id=3, session_id=7,
+            message_type=MessageType.RESPONSE).with_payload_length(5)
+    packed = header.pack()
+
+    assert len(packed) == HEADER_LENGTH
+    assert Header.unpack_from(packed) == header
+    assert header.payload_length == 5
+    assert header.message_id == 0x12340421
+
+
+def test_request_response(echo_server):
+    async def _run():
+        async with await open_connection(*echo_server, client_id=0x42) as stream:
+            stream.register(SERVICE_ID, METHOD_ID, DESCRIPTION)
+            return await stream.request(SERVICE_ID, METHOD_ID, _payload(4711))
+
+    response = run_coroutine(_run())
+
+    assert response.header.message_type == MessageType.RESPONSE
+    assert response.header.client_id == 0x42
+    assert response.payload == _payload(4711).serialization
+    assert response.element.items[0].value == 4711
+    assert response.element.items[1].string == "echo"
+
+
+def test_pipelined_requests(echo_server):
+    async def _run():
+        async with await open_connection(*echo_server) as stream:
+            stream.register(SERVICE_ID, METHOD_ID, DESCRIPTION)
+            return await asyncio.gather(*[
+                stream.request(SERVICE_ID, METHOD_ID, _payload(i)) for i in range(0, 200)])
+
+    responses = run_coroutine(_run())
+
+    assert [response.element.items[0].value for response in responses] == list(range(0, 200))
+
+
+def test_notifications_and_raw_payloads(echo_server):
+    async def _run():
+        async with await open_connection(*echo_server) as stream:
+            stream.notify(SERVICE_ID, 0x8001, b'\x01\x02')
+            stream.notify(SERVICE_ID, 0x8002, Preserialized("03 04 05"))
+            return [await stream.receive(), await stream.receive()]
+
+    first, second = run_coroutine(_run())
+
+    assert (first.header.method_id, first.payload) == (0x8001, b'\x01\x02')
+    assert (second.header.method_id, second.payload) == (0x8002, b'\x03\x04\x05')
+    assert first.element is None
+
+
+class _RecordingWriter:
+    def __init__(self):
+        self.calls = []
+
+    def writelines(self, data):
+        self.calls.append(b''.join(data))
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        pass
+
+    async def wait_closed(self):
+        pass
+
+
+def test_connection_loss_fails_pending_requests():
+    async def _run():
+        reader = asyncio.StreamReader()
+        stream = SomeIpStream(reader, _RecordingWriter())
+        request = asyncio.ensure_future(stream.request(SERVICE_ID, METHOD_ID, b''))
+        await asyncio.sleep(0)
+        reader.feed_eof()
+        with pytest.raises(ConnectionError):
+            await request
+
+    run_coroutine(_run())
+
+
+def test_writes_batched_per_loop_iteration():
+    writer = _RecordingWriter()
+
+    async def _run():
+        stream = SomeIpStream(asyncio.StreamReader(), writer)
+        for i in range(0, 100):
+            stream.notify(SERVICE_ID, METHOD_ID, _payload(i))
+        await asyncio.sleep(0)
+        stream.notify(SERVICE_ID, METHOD_ID, b'')
+        await stream.drain()
+
+    run_coroutine(_run())
+
+    assert len(writer.calls) == 2
+    assert len(writer.calls[0]) == 100 * (HEADER_LENGTH + _payload(0).serialization_length)
+    assert len(writer.calls[1]) == HEADER_LENGTH
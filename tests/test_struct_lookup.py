@@ -0,0 +1,107 @@
+"""
+Test cases for member lookup and updates of structs.
+"""
+
+import pytest
+
+from someip.tlv.converter import json_parser
+from someip.tlv.datatypes.basic import Uint8, Uint16
+from someip.tlv.datatypes.complex import Struct
+
+DESCRIPTION = {
+    "type": "struct", "dataID": None, "wiretype": 6, "value": {
+        "status": {"type": "struct", "dataID": 1, "wiretype": 5, "value": {
+            "temp": {"type": "sint16", "dataID": 0, "value": 20},
+            "label": {"type": "string", "dataID": 1, "value": "ok", "wiretype": 5},
+        }},
+        "counter": {"type": "uint32", "dataID": 2, "value": 0},
+    }}
+
+
+def test_path_access_by_name_and_data_id():
+    message = json_parser.loadd(DESCRIPTION)
+
+    assert message["status"]["temp"].value == 20
+    assert message[1][0] is message["status"]["temp"]
+    assert "counter" in message and 2 in message
+    assert "missing" not in message
+    assert message.get("missing") is None
+    with pytest.raises(KeyError):
+        message["missing"]
+
+
+def test_indexes_follow_modifications():
+    message = Struct([Uint8(1, 1, name="a")], None, 5)
+
+    message.append(Uint8(2, 2, name="b"))
+    message.extend([Uint8(3, 3, name="c")])
+    message.insert(0, Uint8(0, 4, name="a"))
+    assert message["a"].value == 0
+    assert message[3].value == 3
+
+    message.clear()
+    assert "a" not in message
+    assert message.get_by_data_id(1) is None
+
+
+def test_data_id_changed_after_insertion():
+    member = Uint8(1, 1, name="a")
+    message = Struct([member], None, 5)
+
+    member.data_id = 7
+
+    assert message[7] is member
+    assert 1 not in message
+
+
+def test_lookups_without_rebuilding(monkeypatch):
+    message = Struct([Uint16(i, i, name=f"m{i}") for i in range(0, 500)], None, 6)
+    def fail(*args, **kwargs):
+        raise AssertionError('indexes rebuilt')
+    monkeypatch.setattr(message, '_rebuild_indexes', fail)
+
+    assert "missing" not in message and 600 not in message
+    assert message.get("missing", 1) == 1
+    message.append(Uint8(0, 500, name="m500"))
+    message.insert(0, Uint8(0, 501, name="m0"))
+    message.update({"m1": 5, 499: Uint8(7, 499, name="m499")})
+    assert message["m0"].data_id == 501 and message[0].name == "m0"
+    assert message[499].value == 7 and message["m1"].value == 5
+    with pytest.raises(KeyError):
+        message.update({"missing": 1})
+
+
+def test_update():
+    message = json_parser.loadd(DESCRIPTION)
+    replacement = Uint16(5, 2, name="counter")
+
+    message.update({"status": {"temp": -3, "label": "hot"}, 2: replacement})
+
+    assert message["status"]["temp"].value == -3
+    assert message["status"]["label"].string == "hot"
+    assert message["counter"] is replacement
+    assert message.items[1] is replacement
+    with pytest.raises(KeyError):
+        message.update({"missing": 1})
+    with pytest.raises(ValueError):
+        message.update({"status": 1})
+
+
+def test_duplicate_data_ids():
+    message = Struct([Uint8(1, 0), Uint8(2, 0)], None, 5, unique_data_ids=False)
+    assert message.duplicate_data_ids == {0}
+    assert message[0].value == 1
+    message.insert(0, Uint8(3, 1))
+    message.insert(0, Uint8(4, 1))
+    assert message.duplicate_data_ids == {0, 1}
+    assert message[1].value == 4
+
+    with pytest.raises(ValueError, match='Duplicate data ID 0'):
+        Struct([Uint8(1, 0), Uint8(2, 0)], None, 5)
+    unique = Struct([Uint8(1, 0)], None, 5)
+    with pytest.raises(ValueError):
+        unique.append(Uint8(2, 0))
+    with pytest.raises(ValueError):
+        unique.insert(0, Uint8(2, 0))
+    unique.append(Uint8(2, None))
+    assert len(unique.items) == 2
@@ -0,0 +1,140 @@
+"""
+Test cases for SOME/IP-TP segmentation and reassembly.
+"""
+
+import random
+import pytest
+
+from someip.tlv.converter import json_parser
+from someip.transport.header import Header, MessageType, HEADER_LENGTH
+from someip.transport.tp import segment, parse_tp_header, TpReassembler, TP_HEADER_LENGTH
+
+HEADER = Header(0x1234, 0x8001, client_id=1, session_id=2,
+        message_type=MessageType.NOTIFICATION)
+
+
+def _datagrams(payload, max_segment_length=64):
+    return [bytes(header) + bytes(data)
+            for header, data in segment(HEADER, payload, max_segment_length)]
+
+
+def test_segment_layout():
+    payload = bytes(range(0, 100))
+
+    segments = segment(HEADER, payload, max_segment_length=70)
+
+    assert [len(data) for _unused, data in segments] == [64, 36]
+    assert all(isinstance(data, memoryview) for _unused, data in segments)
+    for (header, data), (offset, more) in zip(segments, [(0, True), (64, False)]):
+        parsed = Header.unpack_from(header)
+        assert parsed.message_type == MessageType.TP_NOTIFICATION
+        assert parsed.payload_length == TP_HEADER_LENGTH + len(data)
+        assert parse_tp_header(header, HEADER_LENGTH) == (offset, more)
+    assert b''.join(data for _unused, data in segments) == payload
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_reassembly_out_of_order_with_duplicates(seed):
+    payload = random.Random(seed).getrandbits(8000).to_bytes(1000, 'little')
+    datagrams = _datagrams(payload)
+    datagrams += datagrams[:5]
+    random.Random(seed).shuffle(datagrams)
+    reassembler = TpReassembler()
+
+    results = [result for result in map(reassembler.feed, datagrams) if result]
+
+    assert len(results) == 1
+    header, reassembled = results[0]
+    assert reassembled == payload
+    assert header == HEADER.with_payload_length(len(payload))
+    assert reassembler.pending in (0, 1)
+
+
+def test_reassembly_of_data_type_payload():
+    message = json_parser.loadd({"type": "array", "dataID": None, "wiretype": 7,
+                                 "elementtype": "uint32", "value": list(range(0, 500))})
+    reassembler = TpReassembler()
+
+    results = [reassembler.feed(datagram) for datagram in _datagrams(message)]
+
+    assert results[:-1] == [None] * (len(results) - 1)
+    assert results[-1][1] == message.serialization
+
+
+def test_interleaved_messages():
+    other = HEADER._replace(session_id=3)
+    first = [bytes(h) + bytes(d) for h, d in segment(HEADER, b'a' * 100, 32)]
+    second = [bytes(h) + bytes(d) for h, d in segment(other, b'b' * 50, 32)]
+    reassembler = TpReassembler()
+
+    results = [reassembler.feed(datagram) for pair in zip(first, second) for datagram in pair]
+    results += [reassembler.feed(datagram) for datagram in first[len(second):]]
+
+    completed = [result for result in results if result]
+    assert [(header.session_id, bytes(data)) for header, data in completed] \
+            == [(3, b'b' * 50), (2, b'a' * 100)]
+
+
+def test_unsegmented_passthrough():
+    datagram = HEADER.with_payload_length(3).pack() + b'xyz'
+
+    header, payload = TpReassembler().feed(datagram)
+
+    assert header.message_type == MessageType.NOTIFICATION
+    assert payload == b'xyz'
+
+
+def test_malformed_segments():
+    reassembler = TpReassembler(max_message_length=64)
+    header = HEADER._replace(message_type=MessageType.TP_NOTIFICATION)
+
+    with pytest.raises(ValueError):
+        reassembler.add_segment(header, 0, True, b'x' * 15)
+    with pytest.raises(ValueError):
+        reassembler.add_segment(header, 64, False, b'x')
+    reassembler.add_segment(header, 16, False, b'x' * 4)
+    with pytest.raises(ValueError):
+        reassembler.add_segment(header, 16, False, b'x' * 8)
+    assert reassembler.pending == 0
+
+
+def test_pending_messages_bounded():
+    reassembler = TpReassembler(max_pending=2)
+    messages = [[bytes(h) + bytes(d) for h, d in segment(HEADER._replace(session_id=session),
+            bytes([session]) * 80, 32)] for session in (1, 2, 3)]
+
+    assert reassembler.feed(messages[0][0]) is None
+    assert reassembler.feed(messages[1][0]) is None
+    assert reassembler.feed(messages[0][1]) is None
+    assert reassembler.feed(messages[2][0]) is None
+
+    # The message received least recently (session 2) was discarded
+    assert reassembler.pending == 2 and reassembler.evictions == 1
+    assert reassembler.feed(messages[0][2])[1] == bytes([1]) * 80
+    assert reassembler.feed(messages[1][1]) is None
+    assert reassembler.feed(messages[2][1]) is None
+    assert reassembler.feed(messages[2][2])[1] == bytes([3]) * 80
+    with pytest.raises(ValueError):
+        TpReassembler(max_pending=0)
+
+
+def test_pending_messages_expire():
+    now = [0.0]
+    reassembler = TpReassembler(timeout=2.0, clock=lambda: now[0])
+    first = [bytes(h) + bytes(d) for h, d in segment(HEADER, b'a' * 80, 32)]
+    second = [bytes(h) + bytes(d) for h, d in segment(HEADER._replace(session_id=3),
+            b'b' * 80, 32)]
+
+    reassembler.feed(first[0])
+    now[0] = 1.5
+    reassembler.feed(second[0])
+    now[0] = 2.5
+    assert reassembler.expire() == 1
+    assert reassembler.feed(first[1]) is None
+    assert reassembler.feed(second[1]) is None
+    assert reassembler.feed(second[2])[1] == b'b' * 80
+    now[0] = 10.0
+    assert reassembler.feed(first[2]) is None
+    assert reassembler.pending == 1 and reassembler.evictions == 2
+    with pytest.raises(ValueError):
+        TpReassembler(timeout=0)
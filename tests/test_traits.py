@@ -0,0 +1,110 @@
+"""
+Test cases for the data type traits and little-endian basic types.
+"""
+
+import copy
+import pickle
+
+import pytest
+
+from someip.tlv.converter import json_parser
+from someip.tlv.converter.decoder import compile_description, decode
+from someip.tlv.converter.validator import validate
+from someip.tlv.datatypes.basic import Bitfield, Float32, Sint16, Uint8, Uint32
+from someip.tlv.datatypes.complex import Array
+from someip.tlv.datatypes.consts import Types
+from someip.tlv.datatypes.traits import TRAITS, BASIC_TYPES, COMPLEX_TYPES, Category
+from someip.tlv.datatypes.type_helpers import is_basic_type, is_complex_type, \
+        serialize_lengthfield, unpack_lengthfield_from
+
+
+def test_table_covers_all_types():
+    assert set(TRAITS) == set(Types)
+    for element_type, traits in TRAITS.items():
+        assert is_basic_type(element_type) == (traits.category is Category.BASIC)
+        assert is_complex_type(element_type) == (traits.category is Category.COMPLEX)
+        if traits.codec is not None:
+            assert traits.width == traits.codec.size == traits.codec_le.size
+    assert Types.BITFIELD in BASIC_TYPES
+    assert Types.UNION in COMPLEX_TYPES
+    assert TRAITS[Types.SINT16].minimum == -0x8000
+    assert TRAITS[Types.UINT64].wiretype == 3
+
+
+@pytest.mark.parametrize("width,expected", [(1, b'\x2a'), (2, b'\x00\x2a'),
+                                            (4, b'\x00\x00\x00\x2a')])
+def test_lengthfield(width, expected):
+    assert serialize_lengthfield(42, width) == expected
+    assert unpack_lengthfield_from(expected, 0, width) == 42
+    assert serialize_lengthfield(42, 0) == b''
+
+
+def test_range_checks():
+    Uint8(255, None)
+    Sint16(-0x8000, None)
+    with pytest.raises(ValueError):
+        Uint8(256, None)
+    with pytest.raises(ValueError):
+        Sint16(0x8000, None)
+    with pytest.raises(ValueError):
+        Uint32(-1, None)
+
+
+def test_little_endian_basic_types():
+    value = Uint32(0x12345678, 1, little_endian=True)
+
+    assert value.little_endian
+    assert value.serialization == bytes([0x20, 0x01, 0x78, 0x56, 0x34, 0x12])
+    buffer = bytearray(value.serialization_length)
+    value.serialize_into(buffer)
+    assert buffer == value.serialization
+    assert Float32(1.0, None, little_endian=True).serialized_value == b'\x00\x00\x80\x3f'
+    assert Bitfield(0x0102, None, bits=16, little_endian=True).serialized_value == b'\x02\x01'
+
+    items = Array([Sint16(-2, None, little_endian=True)], None, 5)
+    assert items.serialization == bytes([0x02, 0xFE, 0xFF])
+
+
+def test_copy_and_pickle_keep_codec():
+    for element in (Uint32(0x12345678, 1, little_endian=True),
+            Bitfield(0x0102, None, bits=16, little_endian=True), Sint16(-2, 2)):
+        for copied in (copy.deepcopy(element), pickle.loads(pickle.dumps(element))):
+            assert copied.little_endian == element.little_endian
+            assert copied.serialization == element.serialization
+
+
+def test_little_endian_json_and_decoding():
+    description = {
+        "type": "struct", "dataID": None, "wiretype": 5, "value": {
+            "id":       {"type": "uint16", "dataID": 1, "little_endian": True, "value": 0x1234},
+            "samples":  {"type": "array", "dataID": 2, "wiretype": 5, "little_endian": True,
+                         "elementtype": "uint16", "value": [1, 0x200]},
+            "count":    {"type": "uint16", "dataID": 3, "value": 0x1234},
+        }}
+
+    payload = json_parser.loadd(description).serialization
+
+    assert payload == bytes([0x0F,
+            0x10, 0x01, 0x34, 0x12,
+            0x50, 0x02, 0x04, 0x01, 0x00, 0x00, 0x02,
+            0x10, 0x03, 0x12, 0x34])
+    decoded = decode(description, payload)
+    assert decoded['id'].value == 0x1234
+    assert [item.value for item in decoded['samples'].items] == [1, 0x200]
+    assert decoded.serialization == payload
+    assert validate(description, payload) == []
+
+    # Little-endian arrays are decoded to item objects, not NumPy views
+    pytest.importorskip('numpy')
+    decoded = compile_description(description, numpy=True).decode(payload)
+    assert decoded.serialization == payload
+
+
+def test_little_endian_multi_array_rejected():
+    description = {"type": "array", "dataID": 1, "wiretype": 5, "little_endian": True,
+            "elementtype": "uint8", "value": [[1]]}
+
+    with pytest.raises(ValueError, match='big-endian'):
+        json_parser.loadd(description)
+    with pytest.raises(ValueError, match='big-endian'):
+        compile_description(description)
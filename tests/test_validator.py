@@ -0,0 +1,153 @@
+"""
+Test cases for validating serialized payloads against a description.
+"""
+
+import pytest
+
+from someip.tlv.converter import json_parser
+from someip.tlv.converter import decoder
+from someip.tlv.converter.decoder import compile_description
+from someip.tlv.converter.validator import validate, Violation
+from .test_decoder import DESCRIPTION
+
+TAGGED = {
+    "type": "struct", "dataID": None, "wiretype": 5, "value": {
+        "a": {"type": "uint8", "dataID": 1, "value": 0},
+        "b": {"type": "uint16", "dataID": 2, "value": 0},
+        "c": {"type": "boolean", "dataID": 3, "value": False},
+    }}
+
+
+def _kinds(violations):
+    return [(violation.path, violation.kind) for violation in violations]
+
+
+@pytest.fixture(autouse=True)
+def no_objects(monkeypatch):
+    """
+    Validation must not create data type objects.
+    """
+    def fail(*args, **kwargs):
+        raise AssertionError('data type object created')
+    for codec_type in (decoder._StructCodec, decoder._ArrayCodec, decoder._StringCodec,
+            decoder._PreserializedCodec, decoder._BasicCodec):
+        monkeypatch.setattr(codec_type, 'make', fail)
+
+
+def test_valid():
+    payload = json_parser.loadd(DESCRIPTION).serialization
+    codec = compile_description(DESCRIPTION)
+
+    assert validate(codec, payload) == []
+    assert validate(codec, memoryview(payload)) == []
+    assert validate(DESCRIPTION, bytes(payload)) == []
+
+
+def test_tagged_members_any_order_and_unknown_skipped():
+    payload = bytes([0x0E,
+            0x00, 0x03, 0x00,                   # c
+            0x10, 0x02, 0x00, 0x07,             # b
+            0x20, 0x09, 0x00, 0x00, 0x00, 0x00, # unknown uint32
+            0x00, 0x01, 0x05])                  # a
+    payload = bytes([len(payload) - 1]) + payload[1:]
+
+    assert validate(TAGGED, payload) == []
+
+
+def test_missing_and_duplicate():
+    payload = bytes([0x09,
+            0x00, 0x01, 0x05,
+            0x10, 0x02, 0x00, 0x07,
+            0x00, 0x01, 0x06])
+    payload = bytes([len(payload) - 1]) + payload[1:]
+
+    assert _kinds(validate(TAGGED, payload)) == [
+            ('Message Payload/1', 'duplicate'),
+            ('Message Payload/3', 'missing')]
+
+
+def test_wiretype_mismatch_continues():
+    payload = bytes([0x0B,
+            0x10, 0x01, 0x00, 0x05,             # a with wire type 1 (2 bytes)
+            0x10, 0x02, 0x00, 0x07,
+            0x00, 0x03, 0x02])                  # invalid boolean
+    payload = bytes([len(payload) - 1]) + payload[1:]
+
+    violations = validate(TAGGED, payload)
+
+    assert _kinds(violations) == [
+            ('Message Payload/1', 'wiretype'),
+            ('Message Payload/3', 'value')]
+    assert violations[0].offset == 1
+    assert violations[1] == Violation('Message Payload/3', 11, 'value',
+            'Invalid boolean value 0x02.')
+
+
+def test_length_overrun_and_truncation():
+    payload = bytes(json_parser.loadd(DESCRIPTION).serialization)
+    # Length field of the string "name" (wire type 5) exceeds the struct
+    overrun = bytearray(payload)
+    overrun[27] = 0xFF
+
+    assert _kinds(validate(DESCRIPTION, overrun)) == [('Message Payload/5', 'length')]
+    assert _kinds(validate(DESCRIPTION, payload[:-3])) == [('Message Payload', 'length')]
+    assert _kinds(validate(DESCRIPTION, payload[:1])) == [('Message Payload', 'truncated')]
+    assert _kinds(validate(DESCRIPTION, payload + b'\x00')) == [('Message Payload', 'trailing')]
+
+
+def test_complex_wiretype_and_unskippable_unknown_member():
+    description = {
+        "type": "struct", "dataID": None, "wiretype": 5, "value": {
+            "s": {"type": "string", "dataID": 1, "wiretype": 5, "value": "x"},
+        }}
+    # String with wire type 2 (4 byte basic type), then a member with
+    # unknown data ID and wire type 4 (length field width unknown)
+    payload = bytes([0x0A, 0x20, 0x01, 0x00, 0x00, 0x00, 0x78, 0x40, 0x02, 0x01, 0x00])
+
+    assert _kinds(validate(description, payload)) == [
+            ('Message Payload/1', 'wiretype'),
+            ('Message Payload/2', 'wiretype')]
+
+
+def test_untagged_struct_and_array_items():
+    description = {
+        "type": "array", "dataID": None, "wiretype": 6, "value": [
+            {"type": "struct", "dataID": None, "wiretype": 4, "lengthfield_len": 0, "value": {
+                "x": {"type": "uint8", "dataID": 1, "value": 1},
+                "flag": {"type": "boolean", "dataID": None, "value": True}}},
+            ]}
+    payload = bytes([0x00, 0x08,
+            0x00, 0x01, 0x01, 0x01,
+            0x00, 0x02, 0x01, 0x05])
+
+    assert validate(description, payload) == [
+            Violation('Message Payload/[1]/1', 6, 'data_id', 'Expected data ID 1, got 2.'),
+            Violation('Message Payload/[1]/flag', 9, 'value', 'Invalid boolean value 0x05.')]
+
+
+def test_array_length_and_string_encoding():
+    description = {
+        "type": "struct", "dataID": None, "wiretype": 5, "value": {
+            "samples": {"type": "array", "dataID": 1, "wiretype": 5,
+                        "elementtype": "uint16", "value": []},
+            "text": {"type": "string", "dataID": 2, "wiretype": 5, "value": ""},
+        }}
+    payload = bytes([0x0B,
+            0x50, 0x01, 0x03, 0x00, 0x01, 0x02,
+            0x50, 0x02, 0x02, 0xC3, 0x28])
+
+    violations = validate(description, payload)
+
+    assert _kinds(violations) == [
+            ('Message Payload/1', 'length'),
+            ('Message Payload/2', 'value')]
+    assert violations[1].offset == 10
+
+
+def test_max_violations():
+    payload = bytes([0x08, 0x00, 0x03, 0x02, 0x00, 0x03, 0x03, 0x00, 0x03, 0x04])
+    payload = bytes([len(payload) - 1]) + payload[1:]
+
+    # 3 invalid values, 2 duplicates, 2 missing members
+    assert len(validate(TAGGED, payload)) == 7
+    assert len(validate(TAGGED, payload, max_violations=1)) == 1